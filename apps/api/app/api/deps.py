@@ -1,4 +1,4 @@
-from typing import Generator, Optional
+from typing import Callable, Generator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
@@ -6,6 +6,7 @@ from pydantic import ValidationError
 from sqlmodel import Session, select
 
 from app.core import security
+from app.core.rbac import PrincipalCache, get_user_permissions, has_permission
 from app.config.settings import settings
 from app.db.session import get_session
 from app.models.user import User
@@ -35,12 +36,19 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = session.get(User, token_data.sub)
+    # Zero queries on a cache hit; the merged copy belongs to this session
+    user = PrincipalCache.get(token_data.sub) or PrincipalCache.load(session, token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    if token_data.ver != user.token_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return user
+    return session.merge(user, load=False)
 
 def get_current_active_superuser(
     current_user: User = Depends(get_current_user),
@@ -56,6 +64,28 @@ def get_current_active_superuser(
         )
     return current_user
 
+def require_permission(permission: str) -> Callable[..., User]:
+    """
+    Dependency factory: the current user, if they hold `permission`
+    
+    Usage: current_user: User = Depends(require_permission("fees:write"))
+    Permissions come from PermissionCache, so repeated checks cost no queries.
+    """
+    def check_permission(
+        current_user: User = Depends(get_current_user),
+        session: Session = Depends(get_session),
+    ) -> User:
+        if current_user.is_superuser:
+            return current_user
+        if not has_permission(get_user_permissions(session, current_user.id), permission):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Missing permission: {permission}"
+            )
+        return current_user
+    
+    return check_permission
+
 def get_current_active_student(
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session),
@@ -51,7 +51,10 @@ def login(
 
     return {
         "access_token": security.create_access_token(
-            user.id, expires_delta=access_token_expires
+            user.id,
+            expires_delta=access_token_expires,
+            roles=user_roles,
+            token_version=user.token_version
         ),
         "refresh_token": security.create_refresh_token(user.id),
         "token_type": "bearer",
@@ -2,20 +2,31 @@
 Academic Dashboard API Endpoint
 """
 from typing import Optional
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlmodel import Session
 
 from app.api.deps import get_session, get_current_user
 from app.models.user import User
 from app.schemas.dashboard import AcademicDashboardResponse
-from app.services.dashboard_service import AcademicDashboardService
+from app.services.dashboard_service import AcademicDashboardService, DashboardSnapshotCache
 
 router = APIRouter()
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against the current ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(
+        tag.removeprefix("W/") == etag for tag in candidates
+    )
+
+
 @router.get("/", response_model=AcademicDashboardResponse)
 def get_academic_dashboard(
     *,
+    request: Request,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user),
     program_id: Optional[int] = Query(None, description="Filter by program ID"),
@@ -33,9 +44,27 @@ def get_academic_dashboard(
     Filters:
     - program_id: Show only batches for specific program
     - batch_id: Show only specific batch
+    
+    Caching:
+    - Responses carry an ETag; send it back in If-None-Match to get a 304
+      when the structure has not changed
     """
-    return AcademicDashboardService.get_dashboard_data(
+    etag, body = AcademicDashboardService.get_dashboard_snapshot(
         session=session,
         program_id=program_id,
         batch_id=batch_id
     )
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/cache-stats")
+def get_dashboard_cache_stats(
+    current_user: User = Depends(get_current_user)
+):
+    """Hit/miss counters for the dashboard snapshot cache (this process only)"""
+    return DashboardSnapshotCache.stats()
@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request
-from sqlmodel import Session, select, func
-from app.db.session import get_session
+from sqlalchemy.orm import selectinload
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.db.session import get_async_session
 from app.api.deps import get_current_user, get_current_active_superuser
 from app.models.user import User
 from app.models.role import Role
-from app.models.student import Student, StudentStatus
+from app.models.student import Student, StudentStatus, Gender
 from app.models.admissions import (
     Application, ApplicationStatus, ApplicationPayment, ApplicationPaymentStatus,
     ApplicationDocument, DocumentType, DocumentStatus, ApplicationActivityLog,
@@ -16,7 +19,7 @@ from app.schemas.admissions import (
     DocumentRead, DocumentUpload, DocumentVerify,
     ActivityLogRead, OfflinePaymentVerify
 )
-from app.services.activity_logger import log_activity
+from app.services.activity_logger import log_activity_async
 from app.services.admission_status import can_transition
 from app.services.email_service import email_service
 from app.middleware.rate_limit import limiter
@@ -28,7 +31,15 @@ import os
 
 router = APIRouter()
 
-def generate_application_number(session: Session) -> str:
+# Relationships serialized by ApplicationRead, plus program for emails
+APPLICATION_READ_OPTIONS = (
+    selectinload(Application.payments),
+    selectinload(Application.documents),
+    selectinload(Application.entrance_exam_score),
+    selectinload(Application.program),
+)
+
+def generate_application_number(session: AsyncSession) -> str:
     """Generate a unique application number like APP-2025-XXXX"""
     year = datetime.now().year
     prefix = f"APP-{year}-"
@@ -44,12 +55,27 @@ def get_client_ip(request: Request) -> str:
         return forwarded.split(",")[0]
     return request.client.host if request.client else "unknown"
 
+async def load_application(session: AsyncSession, id: int) -> Optional[Application]:
+    """
+    Application with everything ApplicationRead serializes loaded up front
+
+    Async sessions cannot lazy-load; populate_existing refreshes an
+    instance already in the session after a commit.
+    """
+    statement = (
+        select(Application)
+        .where(Application.id == id)
+        .options(*APPLICATION_READ_OPTIONS)
+        .execution_options(populate_existing=True)
+    )
+    return (await session.exec(statement)).first()
+
 @router.post("/quick-apply", response_model=ApplicationRead)
 @limiter.limit("5/minute")  # Rate limit: 5 requests per minute per IP
 async def quick_apply(
     data: ApplicationCreate,
     request: Request,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Public endpoint for high-conversion lead capture (Stage 1)"""
     app_number = generate_application_number(session)
@@ -61,10 +87,10 @@ async def quick_apply(
     )
     
     session.add(application)
-    session.flush()
+    await session.flush()
     
     # Log activity
-    log_activity(
+    await log_activity_async(
         session=session,
         application_id=application.id,
         activity_type=ActivityType.APPLICATION_CREATED,
@@ -73,12 +99,13 @@ async def quick_apply(
         extra_data={"fee_mode": data.fee_mode.value}
     )
     
-    session.commit()
-    session.refresh(application)
+    await session.commit()
+    application = await load_application(session, application.id)
     
     # Send application confirmation email
     try:
-        email_service.send_application_confirmation(
+        await run_in_threadpool(
+            email_service.send_application_confirmation,
             to_email=application.email,
             name=application.name,
             application_number=application.application_number,
@@ -92,13 +119,18 @@ async def quick_apply(
 
 @router.get("/recent", response_model=List[ApplicationRead | dict])
 async def get_recent_admissions(
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
     limit: int = 5
 ):
     """Admin endpoint for dashboard: Recent applications joined with courses"""
-    statement = select(Application).order_by(Application.created_at.desc()).limit(limit)
-    results = session.exec(statement).all()
+    statement = (
+        select(Application)
+        .options(selectinload(Application.program))
+        .order_by(Application.created_at.desc())
+        .limit(limit)
+    )
+    results = (await session.exec(statement)).all()
     
     # Map to dashboard expected format if needed
     formatted_results = []
@@ -118,26 +150,26 @@ async def get_recent_admissions(
 
 @router.get("/", response_model=List[ApplicationRead])
 async def list_applications(
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_superuser),
     status: Optional[ApplicationStatus] = None
 ):
     """Admin endpoint to see all applications with optional status filter"""
-    statement = select(Application)
+    statement = select(Application).options(*APPLICATION_READ_OPTIONS)
     if status:
         statement = statement.where(Application.status == status)
     
-    results = session.exec(statement).all()
+    results = (await session.exec(statement)).all()
     return results
 
 @router.get("/{id}", response_model=ApplicationRead)
 async def get_application(
     id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     """Get details of a specific application"""
-    application = session.get(Application, id)
+    application = await load_application(session, id)
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
     
@@ -153,11 +185,11 @@ async def update_application(
     id: int,
     data: ApplicationUpdate,
     request: Request,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     """Stage 2: Complete full application form (Secured endpoint)"""
-    application = session.get(Application, id)
+    application = await load_application(session, id)
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
     
@@ -183,7 +215,7 @@ async def update_application(
             
             # Log status change
             if old_status != ApplicationStatus.FORM_COMPLETED:
-                log_activity(
+                await log_activity_async(
                     session=session,
                     application_id=application.id,
                     activity_type=ActivityType.FORM_COMPLETED,
@@ -193,8 +225,8 @@ async def update_application(
                 )
     
     session.add(application)
-    session.commit()
-    session.refresh(application)
+    await session.commit()
+    application = await load_application(session, application.id)
     return application
 
 @router.post("/{id}/payment/offline-verify", response_model=ApplicationRead)
@@ -202,11 +234,11 @@ async def verify_offline_payment(
     id: int,
     data: OfflinePaymentVerify,
     request: Request,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_superuser)
 ):
     """Admin endpoint to verify offline payment"""
-    application = session.get(Application, id)
+    application = await load_application(session, id)
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
     
@@ -222,7 +254,7 @@ async def verify_offline_payment(
         application.status = ApplicationStatus.PAID
         
         # Log activity
-        log_activity(
+        await log_activity_async(
             session=session,
             application_id=application.id,
             activity_type=ActivityType.OFFLINE_PAYMENT_VERIFIED,
@@ -233,18 +265,18 @@ async def verify_offline_payment(
         )
     
     session.add(application)
-    session.commit()
-    session.refresh(application)
+    await session.commit()
+    application = await load_application(session, application.id)
     return application
 
 @router.get("/{id}/documents", response_model=List[DocumentRead])
 async def list_documents(
     id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     """Get all documents for an application with download URLs"""
-    application = session.get(Application, id)
+    application = await load_application(session, id)
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
     
@@ -256,7 +288,7 @@ async def list_documents(
         raise HTTPException(status_code=403, detail="Not authorized")
     
     statement = select(ApplicationDocument).where(ApplicationDocument.application_id == id)
-    documents = session.exec(statement).all()
+    documents = (await session.exec(statement)).all()
     
     # Generate download URLs for documents stored in MinIO
     from app.services.storage_service import storage_service
@@ -289,11 +321,11 @@ async def upload_document(
     document_type: DocumentType,
     file: UploadFile = File(...),
     request: Request = None,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     """Upload a document for an application"""
-    application = session.get(Application, id)
+    application = await load_application(session, id)
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
     
@@ -352,7 +384,7 @@ async def upload_document(
     )
     
     session.add(file_metadata)
-    session.flush()
+    await session.flush()
     
     # Create document record (keep existing structure for compatibility)
     document = ApplicationDocument(
@@ -365,10 +397,10 @@ async def upload_document(
     )
     
     session.add(document)
-    session.flush()
+    await session.flush()
     
     # Log activity
-    log_activity(
+    await log_activity_async(
         session=session,
         application_id=id,
         activity_type=ActivityType.DOCUMENT_UPLOADED,
@@ -383,8 +415,8 @@ async def upload_document(
         }
     )
     
-    session.commit()
-    session.refresh(document)
+    await session.commit()
+    await session.refresh(document)
     return document
 
 @router.put("/documents/{doc_id}/verify", response_model=DocumentRead)
@@ -392,11 +424,11 @@ async def verify_document(
     doc_id: int,
     data: DocumentVerify,
     request: Request,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_superuser)
 ):
     """Admin endpoint to verify or reject a document"""
-    document = session.get(ApplicationDocument, doc_id)
+    document = await session.get(ApplicationDocument, doc_id)
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
@@ -407,7 +439,7 @@ async def verify_document(
     
     # Log activity
     activity_type = ActivityType.DOCUMENT_VERIFIED if data.status == DocumentStatus.VERIFIED else ActivityType.DOCUMENT_REJECTED
-    log_activity(
+    await log_activity_async(
         session=session,
         application_id=document.application_id,
         activity_type=activity_type,
@@ -418,18 +450,18 @@ async def verify_document(
     )
     
     session.add(document)
-    session.commit()
-    session.refresh(document)
+    await session.commit()
+    await session.refresh(document)
     return document
 
 @router.get("/{id}/timeline", response_model=List[ActivityLogRead])
 async def get_timeline(
     id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     """Get activity timeline for an application"""
-    application = session.get(Application, id)
+    application = await load_application(session, id)
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
     
@@ -444,18 +476,18 @@ async def get_timeline(
         ApplicationActivityLog.application_id == id
     ).order_by(ApplicationActivityLog.created_at.desc())
     
-    logs = session.exec(statement).all()
+    logs = (await session.exec(statement)).all()
     return logs
 
 @router.post("/{id}/confirm", response_model=ApplicationRead)
 async def confirm_admission(
     id: int,
     request: Request,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_superuser)
 ):
     """Admin confirms admission: Triggers Student and User account creation with validation"""
-    application = session.get(Application, id)
+    application = await load_application(session, id)
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
     
@@ -490,16 +522,16 @@ async def confirm_admission(
 
     # 1. Create User account (if not exists)
     statement = select(User).where(User.email == application.email)
-    user = session.exec(statement).first()
+    user = (await session.exec(statement)).first()
     
     if not user:
         # Get STUDENT role
         role_stmt = select(Role).where(Role.name == "STUDENT")
-        student_role = session.exec(role_stmt).first()
+        student_role = (await session.exec(role_stmt)).first()
         if not student_role:
              student_role = Role(name="STUDENT", description="Student Role")
              session.add(student_role)
-             session.flush()
+             await session.flush()
              
         user = User(
             username=application.email,
@@ -510,18 +542,18 @@ async def confirm_admission(
             roles=[student_role]
         )
         session.add(user)
-        session.flush()
+        await session.flush()
 
     # 1.1 Find Academic Batch and Structure
     current_year_val = datetime.now().year
     
     # Simple logic: Admission is for current year batch
     # TODO: Make this smarter based on academic calendar
-    batch = session.exec(
+    batch = (await session.exec(
         select(AcademicBatch)
         .where(AcademicBatch.program_id == application.program_id)
         .where(AcademicBatch.joining_year == current_year_val)
-    ).first()
+    )).first()
     
     if not batch:
         raise HTTPException(
@@ -530,22 +562,22 @@ async def confirm_admission(
         )
         
     # Get 1st Year (System derived)
-    program_year = session.exec(
+    program_year = (await session.exec(
         select(ProgramYear)
         .where(ProgramYear.batch_id == batch.id)
         .where(ProgramYear.year_no == 1)
-    ).first()
+    )).first()
     
     if not program_year:
          raise HTTPException(status_code=500, detail="Batch structure incomplete: Missing 1st Year")
 
     # Get 1st Semester
-    batch_semester = session.exec(
+    batch_semester = (await session.exec(
         select(BatchSemester)
         .where(BatchSemester.batch_id == batch.id)
         .where(BatchSemester.year_no == 1)
         .where(BatchSemester.semester_no == 1)
-    ).first()
+    )).first()
     
     if not batch_semester:
         raise HTTPException(status_code=500, detail="Batch structure incomplete: Missing Semester 1")
@@ -572,7 +604,7 @@ async def confirm_admission(
         status=StudentStatus.ACTIVE
     )
     session.add(student)
-    session.flush()
+    await session.flush()
 
     # 3. Update Application status
     application.status = ApplicationStatus.ADMITTED
@@ -580,7 +612,7 @@ async def confirm_admission(
     application.updated_at = datetime.utcnow()
     
     # Log activity
-    log_activity(
+    await log_activity_async(
         session=session,
         application_id=application.id,
         activity_type=ActivityType.ADMISSION_CONFIRMED,
@@ -591,8 +623,8 @@ async def confirm_admission(
     )
     
     session.add(application)
-    session.commit()
-    session.refresh(application)
+    await session.commit()
+    application = await load_application(session, application.id)
     
     # Generate password setup token and send email
     try:
@@ -609,7 +641,8 @@ async def confirm_admission(
         program_name = application.program.name if application.program else "N/A"
         
         # Send admission confirmation email with password setup link
-        email_service.send_admission_confirmation(
+        await run_in_threadpool(
+            email_service.send_admission_confirmation,
             to_email=application.email,
             name=application.name,
             admission_number=admission_number,
@@ -1,7 +1,12 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+import csv
+import io
+from datetime import date
+from typing import Any, Iterator, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session, select, func
 from app.api.deps import get_current_user, get_session
+from app.config.settings import settings
 from app.models.user import User
 from app.models.attendance import AttendanceSession, AttendanceRecord, AttendanceStatus
 from app.schemas.attendance import (
@@ -10,8 +15,13 @@ from app.schemas.attendance import (
     AttendanceSessionUpdate,
     BulkAttendanceCreate,
     AttendanceStats,
-    AttendanceRecordRead
+    AttendanceRecordRead,
+    StudentAttendanceReportRow
 )
+from app.models.student import Student
+from app.models.subject import Subject
+from app.services.attendance_service import AttendanceService
+from app.services.export_service import FILE_FORMAT_PATTERN, ExportColumn, ExportService
 
 router = APIRouter()
 
@@ -79,39 +89,10 @@ def mark_bulk_attendance(
     if not attendance_session:
         raise HTTPException(status_code=404, detail="Attendance session not found")
 
-    created_records = []
-    
-    # Process each record
-    for record_in in bulk_in.records:
-        # Check if record already exists for this student and session
-        existing_record = session.exec(
-            select(AttendanceRecord)
-            .where(AttendanceRecord.session_id == bulk_in.session_id)
-            .where(AttendanceRecord.student_id == record_in.student_id)
-        ).first()
-
-        if existing_record:
-            # Update existing
-            existing_record.status = record_in.status
-            existing_record.remarks = record_in.remarks
-            session.add(existing_record)
-            created_records.append(existing_record)
-        else:
-            # Create new
-            record = AttendanceRecord(
-                session_id=bulk_in.session_id,
-                student_id=record_in.student_id,
-                status=record_in.status,
-                remarks=record_in.remarks
-            )
-            session.add(record)
-            created_records.append(record)
-    
+    # Prefetch + upsert in a fixed number of statements regardless of class size
+    marked_records = AttendanceService.mark_bulk(session, attendance_session, bulk_in.records)
     session.commit()
-    for record in created_records:
-        session.refresh(record)
-        
-    return created_records
+    return marked_records
 
 @router.get("/student/{student_id}/stats", response_model=AttendanceStats)
 def get_student_stats(
@@ -123,32 +104,8 @@ def get_student_stats(
     """
     Get attendance statistics for a student.
     """
-    records = session.exec(
-        select(AttendanceRecord).where(AttendanceRecord.student_id == student_id)
-    ).all()
-    
-    total_classes = len(records)
-    if total_classes == 0:
-        return AttendanceStats(
-            total_classes=0, present=0, absent=0, late=0, on_duty=0, attendance_percentage=0.0
-        )
-        
-    present = sum(1 for r in records if r.status == AttendanceStatus.PRESENT)
-    absent = sum(1 for r in records if r.status == AttendanceStatus.ABSENT)
-    late = sum(1 for r in records if r.status == AttendanceStatus.LATE)
-    on_duty = sum(1 for r in records if r.status == AttendanceStatus.ON_DUTY)
-    
-    # Consider PRESENT, LATE, and ON_DUTY as present for calculation
-    effective_present = present + late + on_duty
-    percentage = (effective_present / total_classes) * 100
-    
-    return AttendanceStats(
-        total_classes=total_classes,
-        present=present,
-        absent=absent,
-        late=late,
-        on_duty=on_duty,
-        attendance_percentage=round(percentage, 2)
+    return AttendanceService.get_student_stats(
+        session, student_id, use_summary=settings.ATTENDANCE_SUMMARY_ENABLED
     )
 
 @router.get("/student/{student_id}/history", response_model=List[AttendanceRecordRead])
@@ -166,3 +123,149 @@ def get_student_history(
     query = select(AttendanceRecord).where(AttendanceRecord.student_id == student_id)
     query = query.order_by(AttendanceRecord.created_at.desc()).offset(skip).limit(limit)
     return session.exec(query).all()
+
+ATTENDANCE_EXPORT_COLUMNS = [
+    ExportColumn("Date", "session_date"),
+    ExportColumn("Start Time", "start_time"),
+    ExportColumn("Subject Code", "subject_code"),
+    ExportColumn("Subject", "subject_name"),
+    ExportColumn("Semester", "semester"),
+    ExportColumn("Section", "section"),
+    ExportColumn("Admission Number", "admission_number"),
+    ExportColumn("Student", "student_name"),
+    ExportColumn("Status", "status"),
+    ExportColumn("Remarks", "remarks"),
+]
+
+@router.get("/records/export")
+def export_attendance_records(
+    *,
+    session: Session = Depends(get_session),
+    student_id: Optional[int] = None,
+    subject_id: Optional[int] = None,
+    program_id: Optional[int] = None,
+    section: Optional[str] = None,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    format: str = Query("csv", pattern=FILE_FORMAT_PATTERN),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Export attendance records as a streamed CSV or XLSX file.
+    """
+    query = (
+        select(
+            AttendanceSession.session_date,
+            AttendanceSession.start_time,
+            Subject.code.label("subject_code"),
+            Subject.name.label("subject_name"),
+            AttendanceSession.semester,
+            AttendanceSession.section,
+            Student.admission_number,
+            Student.name.label("student_name"),
+            AttendanceRecord.status,
+            AttendanceRecord.remarks,
+        )
+        .join(AttendanceSession, AttendanceSession.id == AttendanceRecord.session_id)
+        .join(Student, Student.id == AttendanceRecord.student_id)
+        .outerjoin(Subject, Subject.id == AttendanceSession.subject_id)
+    )
+    
+    if student_id:
+        query = query.where(AttendanceRecord.student_id == student_id)
+    if subject_id:
+        query = query.where(AttendanceSession.subject_id == subject_id)
+    if program_id:
+        query = query.where(AttendanceSession.program_id == program_id)
+    if section:
+        query = query.where(AttendanceSession.section == section)
+    if from_date:
+        query = query.where(AttendanceSession.session_date >= from_date)
+    if to_date:
+        query = query.where(AttendanceSession.session_date <= to_date)
+    
+    query = query.order_by(
+        AttendanceSession.session_date, AttendanceSession.start_time, Student.admission_number
+    )
+    return ExportService.stream(session, query, ATTENDANCE_EXPORT_COLUMNS, format, "attendance")
+
+def _stream_report_csv(
+    rows: Iterator[StudentAttendanceReportRow], subjects: List[Tuple[int, str]]
+) -> Iterator[str]:
+    """One line per student, one percentage column per subject"""
+    subject_ids = [subject_id for subject_id, _ in subjects]
+    
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    def flush() -> str:
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return value
+    
+    writer.writerow(
+        ["admission_number", "name", "section_id"]
+        + [f"{code} %" for _, code in subjects]
+        + ["total_classes", "attended", "overall %", "status"]
+    )
+    yield flush()
+    
+    for row in rows:
+        by_subject = {subject.subject_id: subject for subject in row.subjects}
+        writer.writerow(
+            [row.admission_number, row.name, row.section_id or ""]
+            + [
+                by_subject[subject_id].attendance_percentage if subject_id in by_subject else ""
+                for subject_id in subject_ids
+            ]
+            + [row.total_classes, row.attended, row.attendance_percentage,
+               "SHORTAGE" if row.is_short else "ELIGIBLE"]
+        )
+        yield flush()
+
+def _stream_report_json(rows: Iterator[StudentAttendanceReportRow], threshold: float) -> Iterator[str]:
+    # count goes last: it is only known once every row has been read
+    yield f'{{"threshold": {threshold}, "students": ['
+    count = 0
+    for row in rows:
+        yield ("," if count else "") + row.model_dump_json()
+        count += 1
+    yield f'], "count": {count}}}'
+
+@router.get("/reports/shortage")
+def get_shortage_report(
+    *,
+    session: Session = Depends(get_session),
+    batch_semester_id: Optional[int] = Query(None, description="Report on every student in this batch semester"),
+    section_id: Optional[int] = Query(None, description="Report on a single section"),
+    threshold: float = Query(75.0, ge=0, le=100, description="Minimum attendance percentage"),
+    shortage_only: bool = Query(False, description="Only include students below the threshold"),
+    format: str = Query("json", pattern="^(json|csv)$"),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Attendance shortage report for exam eligibility.
+    
+    Computes subject-wise and overall attendance for every student in a
+    batch semester (or one section) with a single aggregated query.
+    A student is short if the overall or any subject percentage is below
+    the threshold. Rows are read in batches and streamed as JSON or CSV.
+    """
+    query = AttendanceService.shortage_report_query(
+        session,
+        batch_semester_id=batch_semester_id,
+        section_id=section_id,
+        use_summary=settings.ATTENDANCE_SUMMARY_ENABLED,
+    )
+    rows = AttendanceService.iter_shortage_report(session.get_bind(), query, threshold, shortage_only)
+    
+    if format == "csv":
+        # Column headers come first, so the subjects are read up front
+        subjects = AttendanceService.shortage_report_subjects(session, query)
+        scope = f"section_{section_id}" if section_id else f"semester_{batch_semester_id}"
+        response = StreamingResponse(_stream_report_csv(rows, subjects), media_type="text/csv")
+        response.headers["Content-Disposition"] = f"attachment; filename=attendance_shortage_{scope}.csv"
+        return response
+    
+    return StreamingResponse(_stream_report_json(rows, threshold), media_type="application/json")
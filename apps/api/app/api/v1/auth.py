@@ -36,13 +36,13 @@ def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Create tokens
-    access_token = create_access_token(subject=user.id)
-    refresh_token = create_refresh_token(subject=user.id)
-    
     # Get user roles
     roles = auth_service.get_user_roles(user.id)
     
+    # Create tokens
+    access_token = create_access_token(subject=user.id, roles=roles, token_version=user.token_version)
+    refresh_token = create_refresh_token(subject=user.id)
+    
     return LoginResponse(
         access_token=access_token,
         refresh_token=refresh_token,
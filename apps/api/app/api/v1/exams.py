@@ -1,18 +1,22 @@
 from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from sqlmodel import Session, select
 from app.api.deps import get_current_user, get_session
 from app.models.user import User
 from app.models.student import Student
 from app.models.subject import Subject
 from app.models.exam import (
-    Exam, ExamSchedule, ExamResult, ExamStatus
+    Exam, ExamSchedule, ExamResult, ExamStatus, ExamType
 )
 from app.schemas.exam import (
     ExamCreate, ExamRead, ExamUpdate,
     ExamScheduleCreate, ExamScheduleRead, ExamScheduleUpdate,
-    ExamResultCreate, ExamResultRead, BulkMarksEntry
+    ExamResultCreate, ExamResultRead, BulkMarksEntry,
+    StudentTranscript, ResultProcessingRequest, ResultProcessingJob
 )
+from app.models.academic.batch import BatchSemester
+from app.services.exam_service import ExamService
+from app.services.result_service import ResultProcessingJobs, ResultProcessingService
 
 router = APIRouter()
 
@@ -121,36 +125,48 @@ def bulk_enter_marks(
     if not schedule:
         raise HTTPException(status_code=404, detail="Exam schedule not found")
         
-    created_results = []
-    
-    for record_in in bulk_in.records:
-        if record_in.exam_schedule_id != bulk_in.exam_schedule_id:
-            continue
-
-        # Check existing result
-        existing = session.exec(
-            select(ExamResult)
-            .where(ExamResult.exam_schedule_id == bulk_in.exam_schedule_id)
-            .where(ExamResult.student_id == record_in.student_id)
-        ).first()
-        
-        if existing:
-            existing.marks_obtained = record_in.marks_obtained
-            existing.grade = record_in.grade
-            existing.remarks = record_in.remarks
-            existing.is_absent = record_in.is_absent
-            session.add(existing)
-            created_results.append(existing)
-        else:
-            result = ExamResult.model_validate(record_in)
-            session.add(result)
-            created_results.append(result)
-            
+    # Grades are computed server-side; prefetch + upsert in a fixed number of statements
+    results = ExamService.bulk_upsert_marks(session, schedule, bulk_in.records)
     session.commit()
-    for res in created_results:
-        session.refresh(res)
-        
-    return created_results
+    return results
+
+# --- Result Processing ---
+
+@router.post("/results/process", response_model=ResultProcessingJob)
+def process_results(
+    *,
+    session: Session = Depends(get_session),
+    request: ResultProcessingRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Roll a semester's graded results into student semester history.
+
+    Runs after the response by default; poll the returned job for progress.
+    """
+    if not session.get(BatchSemester, request.batch_semester_id):
+        raise HTTPException(status_code=404, detail="Batch semester not found")
+
+    job = ResultProcessingJobs.create(request.batch_semester_id, request.exam_id)
+    if request.run_in_background:
+        background_tasks.add_task(ResultProcessingService.run_job, job.job_id)
+        return job
+
+    # A failure is still recorded on the job, and returned as the request's error
+    ResultProcessingService.run_job(job.job_id, session, raise_errors=True)
+    return ResultProcessingJobs.get(job.job_id)
+
+@router.get("/results/process/{job_id}", response_model=ResultProcessingJob)
+def get_result_processing_job(
+    *,
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Status and progress of a result processing job."""
+    job = ResultProcessingJobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Result processing job not found")
+    return job
 
 @router.get("/{exam_schedule_id}/students", response_model=List[Any])
 def get_students_for_exam_schedule(
@@ -190,19 +206,15 @@ def get_student_results(
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """Get all exam results for a student."""
-    results = session.exec(
-        select(ExamResult).where(ExamResult.student_id == student_id)
-    ).all()
-    
-    # Enrich data
-    enriched_results = []
-    for res in results:
-        read_obj = ExamResultRead.model_validate(res)
-        if res.exam_schedule:
-            if res.exam_schedule.exam:
-                read_obj.exam_name = res.exam_schedule.exam.name
-            if res.exam_schedule.subject:
-                read_obj.subject_name = res.exam_schedule.subject.name
-        enriched_results.append(read_obj)
-        
-    return enriched_results
+    return ExamService.get_student_results(session, student_id)
+
+@router.get("/student/{student_id}/transcript", response_model=StudentTranscript)
+def get_student_transcript(
+    *,
+    session: Session = Depends(get_session),
+    student_id: int,
+    exam_type: ExamType = ExamType.FINAL,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Semester-wise transcript with SGPA/CGPA (best attempt per subject)."""
+    return ExamService.get_student_transcript(session, student_id, exam_type)
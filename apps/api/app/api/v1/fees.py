@@ -1,11 +1,12 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlmodel import Session, select
 from datetime import datetime, date
 from decimal import Decimal
 
+from app.config.settings import settings
 from app.db.session import get_session
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, require_permission
 from app.models.user import User
 from app.models.fee import (
     FeeStructure,
@@ -15,6 +16,8 @@ from app.models.fee import (
     FeePayment,
     FeeConcession,
     FeeFine,
+    FeeLedgerEntry,
+    LedgerEntryType,
     PaymentStatus,
 )
 from app.models.student import Student
@@ -22,6 +25,8 @@ from app.schemas.fee import (
     FeeStructureCreate,
     FeeStructureResponse,
     StudentFeeCreate,
+    BulkStudentFeeCreate,
+    BulkStudentFeeResult,
     StudentFeeResponse,
     StudentFeeSummary,
     FeePaymentCreate,
@@ -33,7 +38,13 @@ from app.schemas.fee import (
     FeeFineCreate,
     FeeFineResponse,
     FeeDefaulter,
+    FeeLedgerEntryResponse,
+    FeeOutstandingSummary,
 )
+from app.services.export_service import EXPORT_FORMAT_PATTERN, ExportColumn, ExportService
+from app.services.fee_service import FeeService, to_date, to_money
+from app.services.fee_assignment_service import FeeAssignmentService
+from app.services.fee_ledger_service import FeeLedgerService
 
 router = APIRouter()
 
@@ -45,7 +56,7 @@ router = APIRouter()
 def create_fee_structure(
     data: FeeStructureCreate,
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_permission("fees:write"))
 ):
     """Create a new fee structure with components and installments"""
     # Calculate total amount from components
@@ -125,7 +136,7 @@ def get_fee_structure(
 def assign_fee_to_student(
     data: StudentFeeCreate,
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_permission("fees:write"))
 ):
     """Assign a fee structure to a student"""
     # Verify student exists
@@ -146,11 +157,32 @@ def assign_fee_to_student(
         total_fee=fee_structure.total_amount
     )
     session.add(student_fee)
+    session.flush()
+    FeeLedgerService.open_account(session, student_fee)
     session.commit()
     session.refresh(student_fee)
     
     return student_fee
 
+@router.post("/student-fees/bulk", response_model=BulkStudentFeeResult)
+def bulk_assign_fees(
+    data: BulkStudentFeeCreate,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(require_permission("fees:write"))
+):
+    """
+    Assign a fee structure to every student of a batch or program year
+
+    Scholarship slabs for each student's category are applied as
+    concessions. Students who already have the structure are skipped, so
+    the call can be repeated safely. With dry_run, returns the counts and
+    a preview without writing anything.
+    """
+    result = FeeAssignmentService.bulk_assign(session, data, approved_by=current_user.username)
+    if not data.dry_run:
+        session.commit()
+    return result
+
 @router.get("/student/{student_id}", response_model=StudentFeeSummary)
 def get_student_fee_summary(
     student_id: int,
@@ -172,24 +204,30 @@ def get_student_fee_summary(
     if not student_fee:
         raise HTTPException(status_code=404, detail="Fee record not found for this student")
     
-    # Calculate balance
-    balance = (
-        student_fee.total_fee 
-        - student_fee.concession_amount 
-        + student_fee.fine_amount 
-        - student_fee.paid_amount
-    )
-    
-    # Get installment details
-    fee_structure = session.get(FeeStructure, student_fee.fee_structure_id)
-    installments = []
-    for inst in fee_structure.installments:
-        installments.append({
-            "installment_number": inst.installment_number,
-            "amount": float(inst.amount),
-            "due_date": inst.due_date.isoformat(),
-            "status": "paid" if student_fee.paid_amount >= inst.amount else "pending"
-        })
+    if settings.FEE_LEDGER_ENABLED:
+        # Maintained per posting; installments carry their allocated credits
+        balance = student_fee.balance
+        installments = FeeLedgerService.get_installments(session, student_fee.id)
+    else:
+        balance = (
+            student_fee.total_fee 
+            - student_fee.concession_amount 
+            + student_fee.fine_amount 
+            - student_fee.paid_amount
+        )
+        # Credits cover installments in order, so compare against the running total
+        fee_structure = session.get(FeeStructure, student_fee.fee_structure_id)
+        credited = student_fee.paid_amount + student_fee.concession_amount
+        cumulative = Decimal("0.00")
+        installments = []
+        for inst in sorted(fee_structure.installments, key=lambda i: (i.due_date, i.installment_number)):
+            cumulative += inst.amount
+            installments.append({
+                "installment_number": inst.installment_number,
+                "amount": float(inst.amount),
+                "due_date": inst.due_date.isoformat(),
+                "status": "paid" if credited >= cumulative else "pending"
+            })
     
     # Get payment history
     payments = []
@@ -217,6 +255,37 @@ def get_student_fee_summary(
         payments=payments
     )
 
+@router.get("/ledger/{student_fee_id}", response_model=List[FeeLedgerEntryResponse])
+def get_fee_ledger(
+    student_fee_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Ledger entries of a student's fee account, oldest first, with the balance after each"""
+    if not session.get(StudentFee, student_fee_id):
+        raise HTTPException(status_code=404, detail="Student fee record not found")
+    return session.exec(
+        select(FeeLedgerEntry)
+        .where(FeeLedgerEntry.student_fee_id == student_fee_id)
+        .order_by(FeeLedgerEntry.id)
+        .offset(skip)
+        .limit(limit)
+    ).all()
+
+@router.get("/outstanding", response_model=FeeOutstandingSummary)
+def get_fee_outstanding(
+    academic_year: Optional[str] = None,
+    program_id: Optional[int] = None,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Campus-wide billed, collected and outstanding totals"""
+    return FeeLedgerService.get_outstanding(
+        session, academic_year=academic_year, program_id=program_id, use_ledger=settings.FEE_LEDGER_ENABLED
+    )
+
 # ============================================================================
 # Payment Management
 # ============================================================================
@@ -225,7 +294,7 @@ def get_student_fee_summary(
 def record_fee_payment(
     data: FeePaymentCreate,
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_permission("fees:write"))
 ):
     """Record a fee payment (offline or manual entry)"""
     student_fee = session.get(StudentFee, data.student_fee_id)
@@ -248,6 +317,9 @@ def record_fee_payment(
     # Update student fee paid amount
     student_fee.paid_amount += data.amount
     student_fee.updated_at = datetime.utcnow()
+    session.flush()
+    FeeLedgerService.post(session, student_fee, LedgerEntryType.PAYMENT, data.amount, reference_id=payment.id)
+    FeeService.record_collection(session, payment, student_fee.fee_structure_id)
     
     session.commit()
     session.refresh(payment)
@@ -305,6 +377,10 @@ def payment_webhook(
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
     
+    # Gateways retry webhooks; a settled payment must not be credited twice
+    if payment.payment_status == PaymentStatus.SUCCESS:
+        return {"message": "Webhook already processed"}
+    
     # Update payment status
     if status.upper() == "SUCCESS":
         payment.payment_status = PaymentStatus.SUCCESS
@@ -314,6 +390,8 @@ def payment_webhook(
         student_fee = session.get(StudentFee, payment.student_fee_id)
         student_fee.paid_amount += payment.amount
         student_fee.updated_at = datetime.utcnow()
+        FeeLedgerService.post(session, student_fee, LedgerEntryType.PAYMENT, payment.amount, reference_id=payment.id)
+        FeeService.record_collection(session, payment, student_fee.fee_structure_id)
     else:
         payment.payment_status = PaymentStatus.FAILED
     
@@ -329,7 +407,7 @@ def payment_webhook(
 def apply_fee_concession(
     data: FeeConcessionCreate,
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_permission("fees:approve"))
 ):
     """Apply a fee concession to a student"""
     student_fee = session.get(StudentFee, data.student_fee_id)
@@ -359,6 +437,8 @@ def apply_fee_concession(
     # Update student fee
     student_fee.concession_amount += concession_amount
     student_fee.updated_at = datetime.utcnow()
+    session.flush()
+    FeeLedgerService.post(session, student_fee, LedgerEntryType.CONCESSION, concession_amount, reference_id=concession.id)
     
     session.commit()
     session.refresh(concession)
@@ -373,7 +453,7 @@ def apply_fee_concession(
 def apply_fee_fine(
     data: FeeFineCreate,
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_permission("fees:write"))
 ):
     """Apply a late payment fine"""
     student_fee = session.get(StudentFee, data.student_fee_id)
@@ -392,6 +472,11 @@ def apply_fee_fine(
     # Update student fee
     student_fee.fine_amount += data.fine_amount
     student_fee.updated_at = datetime.utcnow()
+    session.flush()
+    FeeLedgerService.post(
+        session, student_fee, LedgerEntryType.FINE, data.fine_amount,
+        installment_number=data.installment_number, reference_id=fine.id
+    )
     
     session.commit()
     session.refresh(fine)
@@ -402,48 +487,51 @@ def apply_fee_fine(
 # Defaulters Report
 # ============================================================================
 
+DEFAULTER_EXPORT_COLUMNS = [
+    ExportColumn("Admission Number", "admission_number"),
+    ExportColumn("Student Name", "student_name"),
+    ExportColumn("Program", "program"),
+    ExportColumn("Year", "year"),
+    ExportColumn("Total Due", "total_due", to_money),
+    ExportColumn("Overdue Installments", "overdue_installments"),
+    ExportColumn("Days Overdue", "days_overdue"),
+    ExportColumn("Last Payment Date", "last_payment_date", to_date),
+]
+
 @router.get("/defaulters", response_model=List[FeeDefaulter])
 def get_fee_defaulters(
-    academic_year: str = None,
+    academic_year: Optional[str] = None,
+    program_id: Optional[int] = None,
+    overdue_only: bool = Query(False, description="Only students with an installment past its due date"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    format: str = Query("json", pattern=EXPORT_FORMAT_PATTERN),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    """Get list of students with pending fee payments"""
-    query = select(StudentFee).where(
-        StudentFee.paid_amount < (StudentFee.total_fee - StudentFee.concession_amount + StudentFee.fine_amount)
-    )
-    
-    if academic_year:
-        query = query.where(StudentFee.academic_year == academic_year)
-    
-    defaulters = []
-    for student_fee in session.exec(query).all():
-        student = session.get(Student, student_fee.student_id)
-        total_due = (
-            student_fee.total_fee 
-            - student_fee.concession_amount 
-            + student_fee.fine_amount 
-            - student_fee.paid_amount
+    """
+    Get list of students with pending fee payments
+    
+    Dues, overdue installments, days overdue and the last successful
+    payment come from a single aggregated query. CSV/XLSX exports stream
+    every matching defaulter and ignore skip/limit.
+    """
+    if format != "json":
+        stmt = FeeService.defaulters_query(
+            session,
+            academic_year=academic_year,
+            program_id=program_id,
+            overdue_only=overdue_only,
         )
-        
-        # Get last payment date
-        last_payment = session.exec(
-            select(FeePayment)
-            .where(FeePayment.student_fee_id == student_fee.id)
-            .where(FeePayment.payment_status == PaymentStatus.SUCCESS)
-            .order_by(FeePayment.payment_date.desc())
-        ).first()
-        
-        defaulters.append(FeeDefaulter(
-            student_id=student.id,
-            student_name=student.name,
-            admission_number=student.admission_number,
-            program=student.program.name if student.program else "Unknown",
-            year=student.current_year,
-            total_due=total_due,
-            overdue_installments=0,  # TODO: Calculate based on installment due dates
-            last_payment_date=last_payment.payment_date.date() if last_payment and last_payment.payment_date else None,
-            days_overdue=0  # TODO: Calculate based on due dates
-        ))
-    
-    return defaulters
+        return ExportService.stream(
+            session, stmt, DEFAULTER_EXPORT_COLUMNS, format, f"fee_defaulters_{academic_year or 'all'}"
+        )
+    
+    return FeeService.get_defaulters(
+        session,
+        academic_year=academic_year,
+        program_id=program_id,
+        overdue_only=overdue_only,
+        skip=skip,
+        limit=limit,
+    )
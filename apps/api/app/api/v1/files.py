@@ -1,10 +1,12 @@
 """File upload and management API endpoints"""
 from typing import List, Optional
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query
-from sqlmodel import Session, select
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime
 
-from app.db.session import get_session
+from app.db.session import get_async_session
 from app.api.deps import get_current_user
 from app.models.user import User
 from app.models.file_metadata import FileMetadata, FileModule
@@ -28,7 +30,7 @@ async def upload_file(
     entity_id: Optional[int] = Query(None),
     description: Optional[str] = Query(None),
     is_public: bool = Query(False),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -80,8 +82,8 @@ async def upload_file(
     )
     
     session.add(file_metadata)
-    session.commit()
-    session.refresh(file_metadata)
+    await session.commit()
+    await session.refresh(file_metadata)
     
     # Generate download URL
     download_url = storage_service.generate_presigned_download_url(
@@ -104,7 +106,7 @@ async def upload_file(
 @router.post("/presigned-upload-url", response_model=PresignedUploadUrlResponse)
 async def get_presigned_upload_url(
     request: PresignedUploadUrlRequest,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -153,7 +155,7 @@ async def confirm_upload(
     entity_id: Optional[int] = Query(None),
     description: Optional[str] = Query(None),
     is_public: bool = Query(False),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -169,7 +171,7 @@ async def confirm_upload(
         bucket = storage_service.bucket_documents
     
     # Verify file exists in S3
-    if not storage_service.file_exists(file_key, bucket):
+    if not await run_in_threadpool(storage_service.file_exists, file_key, bucket):
         raise HTTPException(status_code=404, detail="File not found in storage")
     
     # Create file metadata record
@@ -188,8 +190,8 @@ async def confirm_upload(
     )
     
     session.add(file_metadata)
-    session.commit()
-    session.refresh(file_metadata)
+    await session.commit()
+    await session.refresh(file_metadata)
     
     # Generate download URL
     download_url = storage_service.generate_presigned_download_url(
@@ -213,7 +215,7 @@ async def confirm_upload(
 async def get_download_url(
     file_id: int,
     expiration: int = Query(300, ge=60, le=86400),  # 1 min to 24 hours
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -222,7 +224,7 @@ async def get_download_url(
     - **file_id**: ID of the file metadata record
     - **expiration**: URL expiration time in seconds (default: 300 = 5 minutes)
     """
-    file_metadata = session.get(FileMetadata, file_id)
+    file_metadata = await session.get(FileMetadata, file_id)
     if not file_metadata:
         raise HTTPException(status_code=404, detail="File not found")
     
@@ -256,7 +258,7 @@ async def list_files(
     entity_id: Optional[int] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -278,14 +280,14 @@ async def list_files(
     if entity_id:
         statement = statement.where(FileMetadata.entity_id == entity_id)
     
-    # Get total count
-    count_statement = statement
-    total = len(session.exec(count_statement).all())
+    # Get total count without loading every row
+    count_statement = select(func.count()).select_from(statement.subquery())
+    total = (await session.exec(count_statement)).one()
     
     # Apply pagination
     statement = statement.offset(skip).limit(limit).order_by(FileMetadata.uploaded_at.desc())
     
-    files = session.exec(statement).all()
+    files = (await session.exec(statement)).all()
     
     # Generate download URLs for each file
     file_responses = []
@@ -316,7 +318,7 @@ async def list_files(
 @router.delete("/{file_id}")
 async def delete_file(
     file_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -324,7 +326,7 @@ async def delete_file(
     
     To permanently delete, use /files/{file_id}/permanent-delete
     """
-    file_metadata = session.get(FileMetadata, file_id)
+    file_metadata = await session.get(FileMetadata, file_id)
     if not file_metadata:
         raise HTTPException(status_code=404, detail="File not found")
     
@@ -334,7 +336,7 @@ async def delete_file(
     # Soft delete
     file_metadata.deleted_at = datetime.utcnow()
     session.add(file_metadata)
-    session.commit()
+    await session.commit()
     
     return {"message": "File deleted successfully", "file_id": file_id}
 
@@ -342,7 +344,7 @@ async def delete_file(
 @router.delete("/{file_id}/permanent")
 async def permanent_delete_file(
     file_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -350,15 +352,15 @@ async def permanent_delete_file(
     
     WARNING: This action cannot be undone!
     """
-    file_metadata = session.get(FileMetadata, file_id)
+    file_metadata = await session.get(FileMetadata, file_id)
     if not file_metadata:
         raise HTTPException(status_code=404, detail="File not found")
     
     # Delete from S3
-    storage_service.delete_file(file_metadata.file_key, file_metadata.bucket_name)
+    await run_in_threadpool(storage_service.delete_file, file_metadata.file_key, file_metadata.bucket_name)
     
     # Delete from database
-    session.delete(file_metadata)
-    session.commit()
+    await session.delete(file_metadata)
+    await session.commit()
     
     return {"message": "File permanently deleted", "file_id": file_id}
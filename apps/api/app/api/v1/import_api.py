@@ -1,13 +1,16 @@
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status
-from sqlmodel import Session
+from sqlmodel import Session, select
 from app.db.session import get_session
 from app.api.deps import get_current_user
 from app.models.user import User
 from app.services.import_service import ImportService
 from app.schemas.import_schema import ImportPreviewResponse, ImportExecuteRequest
+from app.schemas.import_schema import ImportJobStatus, ImportLogRowRead
+from app.models.import_log import ImportLog, ImportLogRow
+from app.workers.import_worker import submit_import_job
 import json
-from typing import List
-from app.schemas.import_schema import ImportPreviewRow
+from typing import List, Optional
+from app.schemas.import_schema import ImportPreviewRow, ImportRowStatus
 
 router = APIRouter()
 
@@ -24,32 +27,147 @@ def check_import_permissions(user: User):
 @router.post("/preview", response_model=ImportPreviewResponse)
 def preview_import(
     file: UploadFile = File(...),
+    limit: int = 100,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """
     Upload and preview student import file.
     Validates structure, types, and duplicates.
+    Returns the counts and the first page of rows; page on with /previews/{log_id}.
     """
     check_import_permissions(current_user)
     service = ImportService(session)
-    return service.preview_import(file, current_user.id) # type: ignore
+    return service.preview_import(file, current_user.id, limit=limit) # type: ignore
+
+@router.get("/previews/{log_id}", response_model=ImportPreviewResponse)
+def get_import_preview(
+    log_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    row_status: Optional[ImportRowStatus] = None,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    A page of a stored preview, e.g. row_status=INVALID to review errors.
+    """
+    check_import_permissions(current_user)
+    return ImportService(session).get_preview(log_id, skip=skip, limit=limit, row_status=row_status)
+
+@router.post("/previews/{log_id}/execute")
+def execute_import_preview(
+    log_id: int,
+    bulk: bool = True,
+    background: bool = True,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Import the VALID rows of a stored preview.
+    Queued as a job by default; poll /jobs/{log_id} for progress.
+    """
+    check_import_permissions(current_user)
+    service = ImportService(session)
+    log = service.queue_preview(log_id, bulk=bulk)
+    if background:
+        submit_import_job(log_id)
+        return {"message": "Import queued", "log_id": log_id, "status": log.status}
+    log = service.run_import_job(log_id) # type: ignore
+    return {"message": "Import completed", "log_id": log_id, "status": log.status}
 
 @router.post("/execute")
 def execute_import(
     preview_data: ImportPreviewResponse,
     file_name: str,
+    bulk: bool = True,
+    background: bool = True,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """
     Execute the import for confirmed valid rows.
+    Queued as a job by default; poll /jobs/{log_id} for progress.
+    Bulk mode inserts in chunks; bulk=false inserts row by row.
     """
     check_import_permissions(current_user)
     service = ImportService(session)
-    log = service.execute_import(preview_data.rows, current_user.id, file_name) # type: ignore
+    if background:
+        log = service.create_import_job(preview_data.rows, current_user.id, file_name, bulk=bulk) # type: ignore
+        submit_import_job(log.id) # type: ignore
+        return {"message": "Import queued", "log_id": log.id, "status": log.status}
+    log = service.execute_import(preview_data.rows, current_user.id, file_name, bulk=bulk) # type: ignore
     return {"message": "Import completed", "log_id": log.id, "status": log.status}
 
+def get_import_log(session: Session, log_id: int) -> ImportLog:
+    log = session.get(ImportLog, log_id)
+    if not log:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return log
+
+@router.get("/jobs/{log_id}", response_model=ImportJobStatus)
+def get_import_job(
+    log_id: int,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Status and progress of an import job.
+    """
+    check_import_permissions(current_user)
+    return get_import_log(session, log_id)
+
+@router.get("/jobs/{log_id}/rows", response_model=List[ImportLogRowRead])
+def get_import_job_rows(
+    log_id: int,
+    row_status: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Row-level outcome of an import job, e.g. row_status=FAILED for the error report.
+    """
+    check_import_permissions(current_user)
+    get_import_log(session, log_id)
+    query = select(ImportLogRow).where(ImportLogRow.import_log_id == log_id)
+    if row_status:
+        query = query.where(ImportLogRow.status == row_status)
+    rows = session.exec(query.order_by(ImportLogRow.row_number).offset(skip).limit(limit)).all()
+    return [
+        ImportLogRowRead(
+            row_number=row.row_number,
+            status=row.status,
+            error=row.error,
+            student_id=row.student_id,
+            admission_number=row.data.get("admission_number"),
+        )
+        for row in rows
+    ]
+
+@router.post("/jobs/{log_id}/resume", response_model=ImportJobStatus)
+def resume_import_job(
+    log_id: int,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Re-queue a FAILED import job; it continues from its last committed chunk.
+    """
+    check_import_permissions(current_user)
+    log = get_import_log(session, log_id)
+    if log.status != "FAILED":
+        raise HTTPException(status_code=400, detail=f"Only failed imports can be resumed (status is {log.status})")
+    log.status = "PENDING"
+    log.error = None
+    log.finished_at = None
+    session.add(log)
+    session.commit()
+    session.refresh(log)
+    submit_import_job(log_id)
+    return log
+
 from fastapi.responses import StreamingResponse
 import io
 import csv
@@ -17,7 +17,8 @@ from app.models.academic.regulation import (
     Regulation,
     RegulationSubject,
     RegulationSemester,
-    RegulationPromotionRule
+    RegulationPromotionRule,
+    RegulationGrade
 )
 from app.schemas.academic.regulation import (
     RegulationCreate,
@@ -30,7 +31,9 @@ from app.schemas.academic.regulation import (
     RegulationSemesterCreate,
     RegulationSemesterRead,
     RegulationPromotionRuleCreate,
-    RegulationPromotionRuleRead
+    RegulationPromotionRuleRead,
+    RegulationGradeCreate,
+    RegulationGradeRead
 )
 
 router = APIRouter()
@@ -424,3 +427,61 @@ def create_regulation_semester(
     session.refresh(semester)
     
     return semester
+
+
+# ============================================================================
+# Regulation Grade Endpoints
+# ============================================================================
+
+@router.get("/regulations/{regulation_id}/grades", response_model=List[RegulationGradeRead], tags=["Regulation Grades"])
+def list_regulation_grades(
+    regulation_id: int,
+    session: Session = Depends(deps.get_session),
+    current_user: User = Depends(deps.get_current_user)
+):
+    """List the grading scale for a regulation (highest grade first)"""
+    regulation = session.get(Regulation, regulation_id)
+    if not regulation:
+        raise HTTPException(status_code=404, detail="Regulation not found")
+    
+    stmt = select(RegulationGrade).where(
+        RegulationGrade.regulation_id == regulation_id
+    ).order_by(RegulationGrade.min_percentage.desc())
+    
+    return session.exec(stmt).all()
+
+
+@router.put("/regulations/{regulation_id}/grades", response_model=List[RegulationGradeRead], tags=["Regulation Grades"])
+def replace_regulation_grades(
+    regulation_id: int,
+    data: List[RegulationGradeCreate],
+    session: Session = Depends(deps.get_session),
+    current_user: User = Depends(deps.get_current_user)
+):
+    """Replace the grading scale for a regulation (admin only, regulation must not be locked)"""
+    check_admin(current_user)
+    
+    regulation = session.get(Regulation, regulation_id)
+    if not regulation:
+        raise HTTPException(status_code=404, detail="Regulation not found")
+    
+    if regulation.is_locked:
+        raise HTTPException(
+            status_code=400,
+            detail="Cannot change grades of locked regulation"
+        )
+    
+    if len({grade.grade for grade in data}) != len(data):
+        raise HTTPException(status_code=400, detail="Duplicate grade in scale")
+    if not any(grade.min_percentage == 0 for grade in data):
+        raise HTTPException(status_code=400, detail="Grading scale must include a grade starting at 0%")
+    
+    for grade in regulation.grades:
+        session.delete(grade)
+    session.flush()
+    
+    grades = [RegulationGrade(**grade.model_dump(), regulation_id=regulation_id) for grade in data]
+    session.add_all(grades)
+    session.commit()
+    
+    return sorted(grades, key=lambda grade: grade.min_percentage, reverse=True)
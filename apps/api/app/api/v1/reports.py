@@ -1,14 +1,17 @@
-from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, Depends, Query
+from typing import List, Literal, Optional, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session, select, func
 from app.api import deps
+from app.config.settings import settings
 from app.models.student import Student
-from app.models.fee import FeePayment
+from app.models.fee import FeePayment, PaymentStatus
 from app.models.attendance import AttendanceRecord
 from app.models.inventory import Asset
 from app.models.lesson import SyllabusTopic
 from app.models.user import User
-from datetime import datetime, timedelta
+from app.schemas.fee import FeeCollectionReport
+from app.services.fee_service import FeeService
+from datetime import date, datetime, timedelta
 
 router = APIRouter()
 
@@ -48,20 +51,52 @@ def get_attendance_summary(
 def get_fee_collection_report(
     session: Session = Depends(deps.get_session)
 ):
-    """Daily fee collection stats for the last 30 days"""
+    """Successful fee collections in the last 30 days"""
     thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    payments = session.exec(
-        select(FeePayment).where(FeePayment.payment_date >= thirty_days_ago)
-    ).all()
-    
-    total_collected = sum(p.amount for p in payments)
+    count, total_collected = session.exec(
+        select(func.count(FeePayment.id), func.coalesce(func.sum(FeePayment.amount), 0))
+        .where(FeePayment.payment_status == PaymentStatus.SUCCESS)
+        .where(FeePayment.payment_date >= thirty_days_ago)
+    ).one()
     
     return {
-        "count": len(payments),
+        "count": count,
         "total_collected": total_collected,
         "currency": "INR"
     }
 
+@router.get("/financial/fee-collection/analytics", response_model=FeeCollectionReport)
+def get_fee_collection_analytics(
+    start_date: Optional[date] = Query(None, description="Defaults to 1 January of end_date's year"),
+    end_date: Optional[date] = Query(None, description="Inclusive; defaults to today"),
+    period: str = Query("day", pattern="^(day|week|month)$"),
+    group_by: List[Literal["payment_mode", "program", "fee_head"]] = Query([]),
+    program_id: Optional[int] = None,
+    academic_year: Optional[str] = None,
+    session: Session = Depends(deps.get_session),
+    current_user: User = Depends(deps.get_current_user)
+):
+    """
+    Successful fee collections per day, week or month
+
+    Optionally split further by payment mode, program and fee head.
+    Reads the daily rollup when FEE_COLLECTION_ROLLUP_ENABLED is set.
+    """
+    end_date = end_date or date.today()
+    start_date = start_date or end_date.replace(month=1, day=1)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    return FeeService.collection_analytics(
+        session,
+        start_date,
+        end_date,
+        period=period,
+        group_by=group_by,
+        program_id=program_id,
+        academic_year=academic_year,
+        use_rollup=settings.FEE_COLLECTION_ROLLUP_ENABLED,
+    )
+
 @router.get("/inventory/stock-status")
 def get_inventory_report(
     session: Session = Depends(deps.get_session)
@@ -7,6 +7,7 @@ from app.models.role import Role
 from app.models.permission import Permission, RolePermission, PermissionAuditLog
 from app.schemas.role import RoleRead, RoleCreate, RoleUpdate, PermissionAuditLogRead
 from app.schemas.permission import PermissionRead, PermissionGroup
+from app.core.rbac import PermissionCache
 
 router = APIRouter()
 
@@ -126,6 +127,14 @@ def update_role(
     session.refresh(db_role)
     return db_role
 
+@router.get("/cache-stats")
+def get_permission_cache_stats(
+    *,
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """Permission cache hit rate and size for this worker process."""
+    return PermissionCache.stats()
+
 @router.get("/audit", response_model=List[PermissionAuditLogRead])
 def get_rbac_audit_logs(
     *,
@@ -9,6 +9,8 @@ from app.schemas.settings import (
     PasswordChange, ProfileUpdate, BulkSettingsUpdate
 )
 from app.core import security
+from app.db.pool_metrics import PoolMetrics
+from app.services.export_service import FILE_FORMAT_PATTERN, ExportColumn, ExportService
 from datetime import datetime
 
 router = APIRouter()
@@ -149,13 +151,8 @@ def update_profile(
     if profile_in.email:
         current_user.email = profile_in.email
     if profile_in.preferences is not None:
-        # Merge preferences
-        if current_user.preferences is None:
-            current_user.preferences = {}
-        current_user.preferences.update(profile_in.preferences)
-        # Force SQLAlchemy to recognize the JSON change
-        from sqlalchemy.orm.attributes import flag_modified
-        flag_modified(current_user, "preferences")
+        # Merge into a new dict; the current one may be shared with the principal cache
+        current_user.preferences = {**(current_user.preferences or {}), **profile_in.preferences}
     
     current_user.updated_at = datetime.utcnow()
     session.add(current_user)
@@ -198,6 +195,67 @@ def get_audit_logs(
     logs = session.exec(statement.order_by(AuditLog.timestamp.desc()).offset(offset).limit(limit)).all()
     return logs
 
+AUDIT_LOG_EXPORT_COLUMNS = [
+    ExportColumn("Timestamp", "timestamp"),
+    ExportColumn("User", "user_email"),
+    ExportColumn("Action", "action"),
+    ExportColumn("Module", "module"),
+    ExportColumn("Description", "description"),
+    ExportColumn("Target", "target_id"),
+    ExportColumn("From", "from_value"),
+    ExportColumn("To", "to_value"),
+    ExportColumn("IP Address", "ip_address"),
+    ExportColumn("User Agent", "user_agent"),
+]
+
+@router.get("/audit-logs/export")
+def export_audit_logs(
+    *,
+    session: Session = Depends(deps.get_session),
+    current_user: User = Depends(deps.get_current_user),
+    module: Optional[str] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    format: str = Query("csv", pattern=FILE_FORMAT_PATTERN)
+):
+    """Export system audit logs as a streamed CSV or XLSX file (Admin/Super Admin only)"""
+    is_admin = any(role.name in ["SUPER_ADMIN", "ADMIN"] for role in current_user.roles)
+    if not is_admin:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    statement = (
+        select(
+            AuditLog.timestamp,
+            User.email.label("user_email"),
+            AuditLog.action,
+            AuditLog.module,
+            AuditLog.description,
+            AuditLog.target_id,
+            AuditLog.from_value,
+            AuditLog.to_value,
+            AuditLog.ip_address,
+            AuditLog.user_agent,
+        )
+        .outerjoin(User, User.id == AuditLog.user_id)
+    )
+    if module:
+        statement = statement.where(AuditLog.module == module)
+    if from_date:
+        statement = statement.where(AuditLog.timestamp >= from_date)
+    if to_date:
+        statement = statement.where(AuditLog.timestamp <= to_date)
+    
+    return ExportService.stream(
+        session, statement.order_by(AuditLog.timestamp.desc()), AUDIT_LOG_EXPORT_COLUMNS, format, "audit_logs"
+    )
+
+@router.get("/db-pool-stats")
+def get_db_pool_stats(
+    current_user: User = Depends(deps.get_current_active_superuser)
+):
+    """Connection pool occupancy and checkout wait/hold times (this worker process only)"""
+    return PoolMetrics.stats()
+
 @router.post("/test-connection")
 def test_connection(
     gateway: str = Query(..., enum=["msg91", "gmail", "easebuzz"]),
@@ -1,13 +1,79 @@
 from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, Query, HTTPException
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select, func
 from app.api.deps import get_current_user, get_session
 from app.models.user import User
 from app.models.student import Student
+from app.models.program import Program
+from app.models.academic.batch import AcademicBatch, BatchSemester
+from app.models.master_data import Section
 from app.schemas.student import StudentResponse, StudentCreate
+from app.services.export_service import FILE_FORMAT_PATTERN, ExportColumn, ExportService
 
 router = APIRouter()
 
+STUDENT_EXPORT_COLUMNS = [
+    ExportColumn("Admission Number", "admission_number"),
+    ExportColumn("Name", "name"),
+    ExportColumn("Program", "program_name"),
+    ExportColumn("Batch", "batch_code"),
+    ExportColumn("Semester", "semester_name"),
+    ExportColumn("Section", "section_name"),
+    ExportColumn("Gender", "gender"),
+    ExportColumn("Phone", "phone"),
+    ExportColumn("Email", "email"),
+    ExportColumn("Scholarship Category", "scholarship_category"),
+    ExportColumn("Status", "status"),
+]
+
+@router.get("/export")
+def export_students(
+    *,
+    session: Session = Depends(get_session),
+    program_id: Optional[int] = None,
+    batch_semester_id: Optional[int] = None,
+    section_id: Optional[int] = None,
+    search: Optional[str] = None,
+    format: str = Query("csv", pattern=FILE_FORMAT_PATTERN),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Export students as a streamed CSV or XLSX file.
+    """
+    query = (
+        select(
+            Student.admission_number,
+            Student.name,
+            Program.name.label("program_name"),
+            AcademicBatch.batch_code,
+            BatchSemester.semester_name,
+            Section.name.label("section_name"),
+            Student.gender,
+            Student.phone,
+            Student.email,
+            Student.scholarship_category,
+            Student.status,
+        )
+        .outerjoin(Program, Program.id == Student.program_id)
+        .outerjoin(AcademicBatch, AcademicBatch.id == Student.batch_id)
+        .outerjoin(BatchSemester, BatchSemester.id == Student.batch_semester_id)
+        .outerjoin(Section, Section.id == Student.section_id)
+    )
+    
+    if program_id:
+        query = query.where(Student.program_id == program_id)
+    if batch_semester_id:
+        query = query.where(Student.batch_semester_id == batch_semester_id)
+    if section_id:
+        query = query.where(Student.section_id == section_id)
+    if search:
+        query = query.where(Student.name.contains(search) | Student.admission_number.contains(search))
+    
+    return ExportService.stream(
+        session, query.order_by(Student.admission_number), STUDENT_EXPORT_COLUMNS, format, "students"
+    )
+
 @router.get("/", response_model=List[StudentResponse])
 def get_students(
     *,
@@ -22,8 +88,8 @@ def get_students(
     """
     Retrieve students.
     """
-    # Build query
-    query = select(Student)
+    # Build query; program names for the whole page come from one extra query
+    query = select(Student).options(selectinload(Student.program))
     
     if program_id:
         query = query.where(Student.program_id == program_id)
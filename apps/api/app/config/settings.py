@@ -22,6 +22,15 @@ class Settings(BaseSettings):
         if v and v.startswith("postgres://"):
             return v.replace("postgres://", "postgresql://", 1)
         return v
+
+    # Connection pool (per engine, per worker process)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: int = 30  # Wait for a free connection before failing
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Reconnect before server/proxy idle timeouts
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # PostgreSQL statement_timeout per connection; 0 disables
+    SQLITE_WAL: bool = True  # journal_mode=WAL + synchronous=NORMAL for file databases
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
     
     # Security
     SECRET_KEY: str = "default_secret_key_CHANGE_IN_PROD"
@@ -66,4 +75,41 @@ class Settings(BaseSettings):
     CDN_BASE_URL: str = ""  # Optional CDN URL
     MAX_UPLOAD_SIZE: int = 10485760  # 10MB in bytes
 
+    # Caching
+    DASHBOARD_CACHE_TTL_SECONDS: int = 300  # Safety net for writes made by other processes
+    PERMISSION_CACHE_TTL_SECONDS: int = 60  # Bounds staleness of role changes made by other processes
+    PERMISSION_CACHE_MAX_USERS: int = 10000
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: int = 30  # Bounds staleness of user/role changes made by other processes
+    AUTH_PRINCIPAL_CACHE_MAX_USERS: int = 5000
+    
+    # Rollups are always maintained on write; their flags only switch reads
+    # to them, so rebuild once after the migration, then enable
+    
+    # Attendance
+    ATTENDANCE_SUMMARY_ENABLED: bool = False  # Read stats from student_attendance_summary (rebuild before enabling)
+    
+    # Fees
+    FEE_LEDGER_ENABLED: bool = False  # Read fee summaries and outstanding totals from fee_ledger_entry (rebuild before enabling)
+    FEE_COLLECTION_ROLLUP_ENABLED: bool = False  # Read collection analytics from fee_collection_daily (rebuild before enabling)
+    
+    # Query instrumentation
+    QUERY_METRICS_ENABLED: bool = True  # Server-Timing header, /metrics and slow-request logging
+    # /metrics exposes per-route traffic and timings, so it is off (404)
+    # unless a token is set; scrape with "Authorization: Bearer <token>"
+    METRICS_TOKEN: str = ""
+    SLOW_REQUEST_MS: int = 1000  # Log requests slower than this
+    SLOW_REQUEST_QUERY_COUNT: int = 50  # Log requests issuing at least this many SQL statements
+    SLOW_QUERIES_LOGGED: int = 5  # Slowest statements included in each slow-request log line
+    
+    # Exports
+    EXPORT_YIELD_PER: int = 1000  # Rows fetched per server-side cursor round trip and written per chunk
+    
+    # Imports
+    IMPORT_PREVIEW_CHUNK_SIZE: int = 5000  # Sheet rows parsed and validated at a time
+    IMPORT_PREVIEW_TTL_HOURS: int = 24  # Stored previews not executed within this are deleted
+    IMPORT_CHUNK_SIZE: int = 500  # Rows per bulk insert; a failing chunk is retried row by row
+    IMPORT_HASH_WORKERS: int = 0  # Processes hashing imported passwords; 0 uses one per CPU
+    IMPORT_JOB_WORKERS: int = 2  # Import jobs run concurrently per API process
+    IMPORT_JOB_STALE_SECONDS: int = 600  # A RUNNING job with no committed chunk for this long is resumed; keep above one chunk's runtime
+
 settings = Settings()
@@ -1 +1,152 @@
 # Domain events and hooks
+"""
+ORM event hooks
+
+Registered once at import time (see app.main). Hooks here must stay cheap:
+they run inside every flush/commit of every session.
+"""
+from typing import Optional, Set
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.models.academic.batch import AcademicBatch, ProgramYear, BatchSemester
+from app.models.master_data import Section, PracticalBatch
+from app.models.program import Program
+from app.models.academic.regulation import Regulation
+from app.models.faculty import Faculty
+from app.models.role import Role
+from app.models.permission import Permission, RolePermission
+from app.models.user import User
+from app.models.user_role import UserRole
+from app.core.rbac import PermissionCache, PrincipalCache
+from app.services.dashboard_service import DashboardSnapshotCache
+
+# Models whose writes change the academic dashboard tree
+DASHBOARD_SCOPED_MODELS = (AcademicBatch, ProgramYear, BatchSemester, Section, PracticalBatch)
+# Models referenced by name from every batch (program/regulation/class teacher)
+DASHBOARD_GLOBAL_MODELS = (Program, Regulation, Faculty)
+
+# Models whose writes change some user's effective permissions
+RBAC_MODELS = (Role, Permission, RolePermission, UserRole)
+
+_DASHBOARD_PENDING_KEY = "dashboard_invalidate"
+_ALL_BATCHES = "all"
+_RBAC_PENDING_KEY = "rbac_invalidate"
+_PRINCIPAL_PENDING_KEY = "principal_evict"
+
+# User columns whose change revokes tokens issued before it
+TOKEN_REVOKING_ATTRIBUTES = ("is_active", "hashed_password")
+
+
+def _affected_batch_id(obj) -> Optional[int]:
+    """Batch a dashboard object belongs to, or None if it cannot be told without a query"""
+    if isinstance(obj, AcademicBatch):
+        return obj.id
+    if isinstance(obj, (ProgramYear, BatchSemester, Section)):
+        return obj.batch_id
+    if isinstance(obj, PracticalBatch):
+        # Only use an already-loaded parent; never lazy-load inside a flush
+        section = obj.__dict__.get("section")
+        return section.batch_id if section is not None else None
+    return None
+
+
+def _collect_dashboard_changes(session: Session):
+    """Return affected batch ids, _ALL_BATCHES, or None if nothing relevant changed"""
+    batch_ids: Set[int] = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, DASHBOARD_GLOBAL_MODELS):
+            return _ALL_BATCHES
+        if isinstance(obj, DASHBOARD_SCOPED_MODELS):
+            batch_id = _affected_batch_id(obj)
+            if batch_id is None:
+                return _ALL_BATCHES
+            batch_ids.add(batch_id)
+    return batch_ids or None
+
+
+def _invalidate_dashboard(changes) -> None:
+    DashboardSnapshotCache.invalidate(None if changes == _ALL_BATCHES else changes)
+
+
+@event.listens_for(Session, "after_flush")
+def invalidate_dashboard_on_flush(session: Session, flush_context) -> None:
+    changes = _collect_dashboard_changes(session)
+    if changes is None:
+        return
+    _invalidate_dashboard(changes)
+
+    # Invalidate again on commit so a snapshot rebuilt from pre-commit
+    # data by a concurrent request does not survive the transaction
+    pending = session.info.get(_DASHBOARD_PENDING_KEY)
+    if pending == _ALL_BATCHES or changes == _ALL_BATCHES:
+        session.info[_DASHBOARD_PENDING_KEY] = _ALL_BATCHES
+    else:
+        session.info[_DASHBOARD_PENDING_KEY] = (pending or set()) | changes
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_dashboard_on_commit(session: Session) -> None:
+    changes = session.info.pop(_DASHBOARD_PENDING_KEY, None)
+    if changes is not None:
+        _invalidate_dashboard(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_dashboard_changes(session: Session) -> None:
+    session.info.pop(_DASHBOARD_PENDING_KEY, None)
+
+
+def _rbac_changed(session: Session) -> bool:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, RBAC_MODELS):
+            return True
+        # Role assignments made through User.roles only show up as a dirty User
+        if isinstance(obj, User) and inspect(obj).attrs.roles.history.has_changes():
+            return True
+    return False
+
+
+@event.listens_for(Session, "after_flush")
+def invalidate_permissions_on_flush(session: Session, flush_context) -> None:
+    if _rbac_changed(session):
+        PermissionCache.invalidate()
+        PrincipalCache.evict()
+        # Again on commit, for permissions reloaded from pre-commit data meanwhile
+        session.info[_RBAC_PENDING_KEY] = True
+        return
+    
+    user_ids = {
+        obj.id for obj in (*session.dirty, *session.deleted)
+        if isinstance(obj, User) and obj.id is not None
+    }
+    if user_ids:
+        PrincipalCache.evict(user_ids)
+        session.info[_PRINCIPAL_PENDING_KEY] = session.info.get(_PRINCIPAL_PENDING_KEY, set()) | user_ids
+
+
+@event.listens_for(Session, "before_flush")
+def revoke_tokens_on_deactivation(session: Session, flush_context, instances) -> None:
+    for obj in session.dirty:
+        if not isinstance(obj, User):
+            continue
+        state = inspect(obj)
+        if any(state.attrs[name].history.has_changes() for name in TOKEN_REVOKING_ATTRIBUTES):
+            obj.token_version = (obj.token_version or 0) + 1
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_permissions_on_commit(session: Session) -> None:
+    if session.info.pop(_RBAC_PENDING_KEY, None):
+        PermissionCache.invalidate()
+        PrincipalCache.evict()
+    user_ids = session.info.pop(_PRINCIPAL_PENDING_KEY, None)
+    if user_ids:
+        PrincipalCache.evict(user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_permission_changes(session: Session) -> None:
+    session.info.pop(_RBAC_PENDING_KEY, None)
+    session.info.pop(_PRINCIPAL_PENDING_KEY, None)
@@ -1,8 +1,14 @@
-from typing import List, Set
-from fastapi import Request
+import threading
+import time
+from collections import OrderedDict
+from typing import FrozenSet, Optional, Set, Tuple
+from sqlalchemy.orm import selectinload
 from sqlmodel import select, Session
+from app.config.settings import settings
+from app.models.user import User
 from app.models.permission import Permission, RolePermission
 from app.models.role import Role
+from app.models.user_role import UserRole
 
 # Standard Permission Seeds
 CORE_PERMISSIONS = {
@@ -42,6 +48,13 @@ CORE_PERMISSIONS = {
     ]
 }
 
+# Granted when these roles are created (and to existing ones by migration
+# a8c3e6f1b4d7) so the permission-gated endpoints work out of the box
+DEFAULT_ROLE_PERMISSIONS = {
+    "ADMIN": ["fees:read", "fees:write", "fees:approve"],
+    "ACCOUNTS": ["fees:read", "fees:write"],
+}
+
 def seed_permissions(session: Session):
     """Seed all core permissions into the database"""
     for module, perms in CORE_PERMISSIONS.items():
@@ -53,35 +66,221 @@ def seed_permissions(session: Session):
                 session.add(perm)
     session.commit()
 
-async def get_user_permissions(session: Session, user_id: int) -> Set[str]:
+def grant_default_permissions(session: Session, role: Role):
+    """Grant a role the permissions DEFAULT_ROLE_PERMISSIONS lists for it, skipping held ones"""
+    names = DEFAULT_ROLE_PERMISSIONS.get(role.name)
+    if not names:
+        return
+    held = set(session.exec(select(RolePermission.permission_id).where(RolePermission.role_id == role.id)).all())
+    for perm in session.exec(select(Permission).where(Permission.name.in_(names))).all():
+        if perm.id not in held:
+            session.add(RolePermission(role_id=role.id, permission_id=perm.id))
+    session.commit()
+
+# Granted to SUPER_ADMIN; satisfies every permission check
+ALL_PERMISSIONS = "*"
+
+
+class PermissionCache:
     """
-    Retrieves all unique permissions for a user across all their roles.
-    Ideally, this would be cached in Redis or a per-request cache.
+    Process-local LRU cache of each user's effective permissions
+    
+    Entries are keyed by (user_id, role_version). The role version is
+    bumped by the ORM hooks in app.core.events whenever a Role, its
+    permissions or a user's roles change, so every cached entry goes stale
+    at once without being scanned. Entries also expire after
+    PERMISSION_CACHE_TTL_SECONDS so changes made by other worker processes
+    are eventually picked up.
+    """
+    _cache: "OrderedDict[Tuple[int, int], Tuple[FrozenSet[str], float]]" = OrderedDict()
+    _role_version = 0
+    _lock = threading.Lock()
+    
+    hits = 0
+    misses = 0
+    invalidations = 0
+
+    @classmethod
+    def get(cls, user_id: int) -> Optional[FrozenSet[str]]:
+        """Return fresh cached permissions, counting the hit or miss"""
+        with cls._lock:
+            key = (user_id, cls._role_version)
+            entry = cls._cache.get(key)
+            if entry and time.monotonic() - entry[1] < settings.PERMISSION_CACHE_TTL_SECONDS:
+                cls._cache.move_to_end(key)
+                cls.hits += 1
+                return entry[0]
+            cls.misses += 1
+            return None
+
+    @classmethod
+    def role_version(cls) -> int:
+        return cls._role_version
+
+    @classmethod
+    def set(cls, user_id: int, permissions: FrozenSet[str], role_version: int) -> None:
+        """Store permissions loaded under role_version; dropped if roles changed meanwhile"""
+        with cls._lock:
+            if role_version != cls._role_version:
+                return
+            key = (user_id, role_version)
+            cls._cache[key] = (permissions, time.monotonic())
+            cls._cache.move_to_end(key)
+            while len(cls._cache) > settings.PERMISSION_CACHE_MAX_USERS:
+                cls._cache.popitem(last=False)
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Bump the role version so every cached entry is stale"""
+        with cls._lock:
+            cls._role_version += 1
+            cls._cache.clear()
+            cls.invalidations += 1
+
+    @classmethod
+    def stats(cls) -> dict:
+        """Counters for the metrics endpoint"""
+        with cls._lock:
+            lookups = cls.hits + cls.misses
+            return {
+                "entries": len(cls._cache),
+                "max_entries": settings.PERMISSION_CACHE_MAX_USERS,
+                "role_version": cls._role_version,
+                "hits": cls.hits,
+                "misses": cls.misses,
+                "hit_rate": round(cls.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": cls.invalidations,
+                "ttl_seconds": settings.PERMISSION_CACHE_TTL_SECONDS,
+            }
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._cache.clear()
+            cls.hits = cls.misses = cls.invalidations = 0
+
+
+def load_user_permissions(session: Session, user_id: int) -> FrozenSet[str]:
+    """
+    All unique permissions for a user across their active roles, in one query
+    
+    User -> UserRole -> Role -> RolePermission -> Permission
     """
-    # Simple join to get all permission names for the user's roles
-    # User -> UserRole -> Role -> RolePermission -> Permission
     statement = (
-        select(Permission.name)
-        .join(RolePermission)
-        .join(Role)
-        .join(Role.users)
-        .where(Role.users.property.mapper.class_.id == user_id)
+        select(Role.name, Permission.name)
+        .select_from(UserRole)
+        .join(Role, Role.id == UserRole.role_id)
+        .outerjoin(RolePermission, RolePermission.role_id == Role.id)
+        .outerjoin(Permission, Permission.id == RolePermission.permission_id)
+        .where(UserRole.user_id == user_id)
+        .where(Role.is_active == True)
     )
-    results = session.exec(statement).all()
-    return set(results)
+    permissions: Set[str] = set()
+    for role_name, permission_name in session.exec(statement).all():
+        if role_name == "SUPER_ADMIN":
+            permissions.add(ALL_PERMISSIONS)
+        if permission_name:
+            permissions.add(permission_name)
+    return frozenset(permissions)
 
-class PermissionCache:
-    """Simple per-request permission cache to avoid redundant DB hits"""
-    _cache = {}
+
+def get_user_permissions(session: Session, user_id: int) -> FrozenSet[str]:
+    """Effective permissions for a user, served from PermissionCache when fresh"""
+    permissions = PermissionCache.get(user_id)
+    if permissions is None:
+        # Read the version before loading so a concurrent change discards this load
+        role_version = PermissionCache.role_version()
+        permissions = load_user_permissions(session, user_id)
+        PermissionCache.set(user_id, permissions, role_version)
+    return permissions
+
+
+def has_permission(permissions: FrozenSet[str], permission: str) -> bool:
+    return ALL_PERMISSIONS in permissions or permission in permissions
+
+
+class PrincipalCache:
+    """
+    Process-local LRU cache of authenticated users with their roles loaded
+    
+    Holds detached User instances that are never attached to a session;
+    get_current_user merges a copy into each request session with
+    load=False, so resolving the user and checking current_user.roles
+    costs no queries on a hit. Users are evicted by the ORM hooks in
+    app.core.events when their row or role assignments change, and every
+    entry is dropped when roles change. Entries expire after
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS to pick up writes from other processes.
+    """
+    _users: "OrderedDict[int, Tuple[User, float]]" = OrderedDict()
+    _generation = 0
+    _lock = threading.Lock()
+    
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def get(cls, user_id: int) -> Optional[User]:
+        with cls._lock:
+            entry = cls._users.get(user_id)
+            if entry and time.monotonic() - entry[1] < settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS:
+                cls._users.move_to_end(user_id)
+                cls.hits += 1
+                return entry[0]
+            cls.misses += 1
+            return None
+
+    @classmethod
+    def load(cls, session: Session, user_id: int) -> Optional[User]:
+        """
+        Load a user with roles in one round trip and cache a detached copy
+        
+        The loaded instances are expunged from session; callers merge the
+        returned user back in.
+        """
+        generation = cls._generation
+        user = session.exec(
+            select(User).options(selectinload(User.roles)).where(User.id == user_id)
+        ).first()
+        if not user:
+            return None
+        for role in user.roles:
+            session.expunge(role)
+        session.expunge(user)
+        
+        with cls._lock:
+            # Skip caching if the user or roles changed while loading
+            if generation == cls._generation:
+                cls._users[user_id] = (user, time.monotonic())
+                cls._users.move_to_end(user_id)
+                while len(cls._users) > settings.AUTH_PRINCIPAL_CACHE_MAX_USERS:
+                    cls._users.popitem(last=False)
+        return user
 
     @classmethod
-    def get(cls, user_id: int):
-        return cls._cache.get(user_id)
+    def evict(cls, user_ids: Optional[Set[int]] = None) -> None:
+        """Drop the given users, or everyone when user_ids is None"""
+        with cls._lock:
+            cls._generation += 1
+            if user_ids is None:
+                cls._users.clear()
+            else:
+                for user_id in user_ids:
+                    cls._users.pop(user_id, None)
 
     @classmethod
-    def set(cls, user_id: int, permissions: Set[str]):
-        cls._cache[user_id] = permissions
+    def stats(cls) -> dict:
+        with cls._lock:
+            lookups = cls.hits + cls.misses
+            return {
+                "entries": len(cls._users),
+                "hits": cls.hits,
+                "misses": cls.misses,
+                "hit_rate": round(cls.hits / lookups, 4) if lookups else 0.0,
+                "ttl_seconds": settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS,
+            }
 
     @classmethod
-    def clear(cls):
-        cls._cache = {}
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._users.clear()
+            cls.hits = cls.misses = 0
@@ -1,4 +1,8 @@
-from typing import Any, Union
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, List, Optional, Union
 from datetime import datetime, timedelta
 from jose import jwt
 from passlib.context import CryptContext
@@ -9,13 +13,25 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 ALGORITHM = settings.ALGORITHM
 
-def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
+def create_access_token(
+    subject: Union[str, Any],
+    expires_delta: timedelta = None,
+    roles: Optional[List[str]] = None,
+    token_version: int = 0
+) -> str:
+    """
+    Access token for a user
+    
+    `roles` are informational claims for clients; authorization always uses
+    the server-side roles. `ver` must match User.token_version or the token
+    is rejected, so bumping it revokes every token issued before.
+    """
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {"exp": expire, "sub": str(subject), "roles": roles or [], "ver": token_version}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -34,3 +50,54 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+# Below this many passwords starting worker processes costs more than it saves
+_PARALLEL_HASH_MIN = 16
+
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_pool_lock = threading.Lock()
+
+def _init_hash_worker(config: str) -> None:
+    """Hash with the parent's context, as configured when the pool started"""
+    global pwd_context
+    pwd_context = CryptContext.from_string(config)
+
+def _get_hash_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    The shared hashing pool, started (with `workers` processes) on first use
+
+    Workers are spawned, not forked: imports run on threads, and forking a
+    threaded process can copy a lock some other thread holds and deadlock.
+    """
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            _hash_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_hash_worker,
+                initargs=(pwd_context.to_string(),),
+            )
+        return _hash_pool
+
+def shutdown_hash_pool() -> None:
+    """Stop the hashing pool's processes; the next bulk hash starts a new one"""
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is not None:
+            _hash_pool.shutdown(wait=False, cancel_futures=True)
+            _hash_pool = None
+
+def get_password_hashes(passwords: List[str], workers: int = 0) -> List[str]:
+    """
+    Hash many passwords, in order, across worker processes
+
+    bcrypt is deliberately slow (~0.25s per hash at the default cost) and
+    holds the GIL, so bulk imports hash in a process pool shared by every
+    import. workers=0 uses one process per CPU.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(passwords) < _PARALLEL_HASH_MIN:
+        return [get_password_hash(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (workers * 4))
+    return list(_get_hash_pool(workers).map(get_password_hash, passwords, chunksize=chunksize))
@@ -0,0 +1,56 @@
+"""add_import_jobs
+
+Revision ID: a3c5e7f9b1d4
+Revises: e4f1a7c3b9d2
+Create Date: 2026-10-16 22:41:09.306215
+
+Tracks background import progress on import_log and adds import_log_row,
+the per-row queue and outcome a resumed import continues from
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c5e7f9b1d4'
+down_revision: Union[str, None] = 'e4f1a7c3b9d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('import_log', sa.Column('bulk', sa.Boolean(), nullable=False, server_default=sa.true()))
+    op.add_column('import_log', sa.Column('processed_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('import_log', sa.Column('started_at', sa.DateTime(), nullable=True))
+    op.add_column('import_log', sa.Column('finished_at', sa.DateTime(), nullable=True))
+    op.add_column('import_log', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+    op.add_column('import_log', sa.Column('error', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+
+    op.create_table(
+        'import_log_row',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('import_log_id', sa.Integer(), nullable=False),
+        sa.Column('row_number', sa.Integer(), nullable=False),
+        sa.Column('data', sa.JSON(), nullable=False),
+        sa.Column('status', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('error', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('student_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['import_log_id'], ['import_log.id']),
+        sa.ForeignKeyConstraint(['student_id'], ['student.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_import_log_row_log_status', 'import_log_row', ['import_log_id', 'status', 'row_number'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_import_log_row_log_status', table_name='import_log_row')
+    op.drop_table('import_log_row')
+    op.drop_column('import_log', 'error')
+    op.drop_column('import_log', 'heartbeat_at')
+    op.drop_column('import_log', 'finished_at')
+    op.drop_column('import_log', 'started_at')
+    op.drop_column('import_log', 'processed_count')
+    op.drop_column('import_log', 'bulk')
@@ -0,0 +1,46 @@
+"""add_attendance_record_unique_index
+
+Revision ID: a3d7e9b1c2f4
+Revises: 4183b9fd3d14
+Create Date: 2026-10-16 10:12:41.208317
+
+Enforces one attendance record per (session_id, student_id) so bulk
+marking can upsert with INSERT ... ON CONFLICT
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d7e9b1c2f4'
+down_revision: Union[str, None] = '4183b9fd3d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Remove duplicates left by the old per-row marking path, keeping the latest record
+    op.execute("""
+        DELETE FROM attendance_record
+        WHERE id NOT IN (
+            SELECT id FROM (
+                SELECT MAX(id) AS id
+                FROM attendance_record
+                GROUP BY session_id, student_id
+            ) AS latest
+        )
+    """)
+    
+    op.create_index(
+        'uq_attendance_record_session_student',
+        'attendance_record',
+        ['session_id', 'student_id'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_attendance_record_session_student', table_name='attendance_record')
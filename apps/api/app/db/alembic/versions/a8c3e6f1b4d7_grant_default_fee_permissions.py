@@ -0,0 +1,67 @@
+"""grant_default_fee_permissions
+
+Revision ID: a8c3e6f1b4d7
+Revises: f5b8d2c7a3e9
+Create Date: 2026-10-18 09:12:37.418206
+
+The fee endpoints check fees:write and fees:approve, which no role held.
+Grants ADMIN fees:read/write/approve and ACCOUNTS fees:read/write
+(app.core.rbac.DEFAULT_ROLE_PERMISSIONS), creating the permissions if the
+app has not seeded them yet. Roles that do not exist are skipped.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c3e6f1b4d7'
+down_revision: Union[str, None] = 'f5b8d2c7a3e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FEE_PERMISSIONS = [
+    ("fees:read", "View fee structures and statuses"),
+    ("fees:write", "Manage fee installments"),
+    ("fees:approve", "Approve fee payments and concessions"),
+]
+GRANTS = {
+    "ADMIN": ["fees:read", "fees:write", "fees:approve"],
+    "ACCOUNTS": ["fees:read", "fees:write"],
+}
+
+
+def upgrade() -> None:
+    for name, description in FEE_PERMISSIONS:
+        op.execute(
+            sa.text("""
+                INSERT INTO permission (name, description, module)
+                SELECT :name, :description, 'Fees'
+                WHERE NOT EXISTS (SELECT 1 FROM permission WHERE name = :name)
+            """).bindparams(name=name, description=description)
+        )
+    for role, permissions in GRANTS.items():
+        op.execute(
+            sa.text("""
+                INSERT INTO role_permission (role_id, permission_id)
+                SELECT r.id, p.id
+                FROM role r JOIN permission p ON p.name IN :permissions
+                WHERE r.name = :role
+                AND NOT EXISTS (
+                    SELECT 1 FROM role_permission rp
+                    WHERE rp.role_id = r.id AND rp.permission_id = p.id
+                )
+            """).bindparams(sa.bindparam('permissions', expanding=True), role=role, permissions=permissions)
+        )
+
+
+def downgrade() -> None:
+    for role, permissions in GRANTS.items():
+        op.execute(
+            sa.text("""
+                DELETE FROM role_permission
+                WHERE role_id IN (SELECT id FROM role WHERE name = :role)
+                AND permission_id IN (SELECT id FROM permission WHERE name IN :permissions)
+            """).bindparams(sa.bindparam('permissions', expanding=True), role=role, permissions=permissions)
+        )
@@ -0,0 +1,57 @@
+"""add_student_attendance_summary
+
+Revision ID: b5e2c8f1a9d3
+Revises: a3d7e9b1c2f4
+Create Date: 2026-10-16 11:02:17.554902
+
+Per-student, per-subject, per-semester attendance counters maintained
+by bulk marking. Backfill with scripts/rebuild_attendance_summary.py
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e2c8f1a9d3'
+down_revision: Union[str, None] = 'a3d7e9b1c2f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'student_attendance_summary',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('subject_id', sa.Integer(), nullable=False),
+        sa.Column('semester', sa.Integer(), nullable=False),
+        sa.Column('total_classes', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('present', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('absent', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('late', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('on_duty', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['student_id'], ['student.id']),
+        sa.ForeignKeyConstraint(['subject_id'], ['subject.id']),
+    )
+    op.create_index(
+        'ix_student_attendance_summary_student_id',
+        'student_attendance_summary',
+        ['student_id'],
+        unique=False
+    )
+    op.create_index(
+        'uq_attendance_summary_student_subject_semester',
+        'student_attendance_summary',
+        ['student_id', 'subject_id', 'semester'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_attendance_summary_student_subject_semester', table_name='student_attendance_summary')
+    op.drop_index('ix_student_attendance_summary_student_id', table_name='student_attendance_summary')
+    op.drop_table('student_attendance_summary')
@@ -0,0 +1,28 @@
+"""add_import_preview_rows
+
+Revision ID: b7d2e9f4c1a6
+Revises: a3c5e7f9b1d4
+Create Date: 2026-10-16 23:58:12.518304
+
+Previews are stored in import_log_row so they can be paged and executed
+without the client sending every row back
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e9f4c1a6'
+down_revision: Union[str, None] = 'a3c5e7f9b1d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('import_log_row', sa.Column('errors', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('import_log_row', 'errors')
@@ -0,0 +1,40 @@
+"""add_hot_path_indexes
+
+Revision ID: c4e8a1f6d2b9
+Revises: b7d2e9f4c1a6
+Create Date: 2026-10-17 09:26:44.105392
+
+Composite indexes for the lookups scripts/explain_hot_queries.py found
+scanning whole tables: per-student attendance and results, timetable slot
+conflicts and audit trails
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a1f6d2b9'
+down_revision: Union[str, None] = 'b7d2e9f4c1a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_attendance_record_student_status', 'attendance_record', ['student_id', 'status']),
+    ('ix_exam_result_student_schedule', 'exam_result', ['student_id', 'exam_schedule_id']),
+    ('ix_timetable_entry_faculty_slot', 'timetable_entry', ['faculty_id', 'day_of_week', 'period_id']),
+    ('ix_timetable_entry_room_slot', 'timetable_entry', ['room_id', 'day_of_week', 'period_id']),
+    ('ix_academic_audit_log_record_history', 'academic_audit_log', ['table_name', 'record_id', 'created_at']),
+    ('ix_audit_log_module_timestamp', 'audit_log', ['module', 'timestamp']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,70 @@
+"""add_regulation_grades_and_exam_result_upsert
+
+Revision ID: c7a4f2e8d1b6
+Revises: b5e2c8f1a9d3
+Create Date: 2026-10-16 12:31:09.417730
+
+Adds per-regulation grading scales, exam_result.grade_point and a
+unique (exam_schedule_id, student_id) index for bulk marks upsert
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a4f2e8d1b6'
+down_revision: Union[str, None] = 'b5e2c8f1a9d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'regulation_grades',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('regulation_id', sa.Integer(), nullable=False),
+        sa.Column('grade', sqlmodel.sql.sqltypes.AutoString(length=5), nullable=False),
+        sa.Column('min_percentage', sa.Integer(), nullable=False),
+        sa.Column('grade_point', sa.Integer(), nullable=False),
+        sa.Column('is_pass', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['regulation_id'], ['regulations.id']),
+        sa.UniqueConstraint('regulation_id', 'grade', name='uq_regulation_grade'),
+    )
+    op.create_index(
+        'ix_regulation_grades_regulation_id',
+        'regulation_grades',
+        ['regulation_id'],
+        unique=False
+    )
+    
+    op.add_column('exam_result', sa.Column('grade_point', sa.Float(), nullable=True))
+    
+    # Remove duplicates left by the old per-row marks entry, keeping the latest result
+    op.execute("""
+        DELETE FROM exam_result
+        WHERE id NOT IN (
+            SELECT id FROM (
+                SELECT MAX(id) AS id
+                FROM exam_result
+                GROUP BY exam_schedule_id, student_id
+            ) AS latest
+        )
+    """)
+    
+    op.create_index(
+        'uq_exam_result_schedule_student',
+        'exam_result',
+        ['exam_schedule_id', 'student_id'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_exam_result_schedule_student', table_name='exam_result')
+    op.drop_column('exam_result', 'grade_point')
+    op.drop_index('ix_regulation_grades_regulation_id', table_name='regulation_grades')
+    op.drop_table('regulation_grades')
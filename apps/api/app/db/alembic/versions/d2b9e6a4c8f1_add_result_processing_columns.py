@@ -0,0 +1,30 @@
+"""add_result_processing_columns
+
+Revision ID: d2b9e6a4c8f1
+Revises: c7a4f2e8d1b6
+Create Date: 2026-10-16 14:02:47.118204
+
+Adds SGPA and backlog subjects to student_semester_history so result
+processing can roll exam results into the semester record
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2b9e6a4c8f1'
+down_revision: Union[str, None] = 'c7a4f2e8d1b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('student_semester_history', sa.Column('sgpa', sa.DECIMAL(4, 2), nullable=True))
+    op.add_column('student_semester_history', sa.Column('backlog_subject_ids', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('student_semester_history', 'backlog_subject_ids')
+    op.drop_column('student_semester_history', 'sgpa')
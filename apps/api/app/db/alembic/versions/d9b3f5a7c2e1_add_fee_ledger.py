@@ -0,0 +1,82 @@
+"""add_fee_ledger
+
+Revision ID: d9b3f5a7c2e1
+Revises: c4e8a1f6d2b9
+Create Date: 2026-10-17 11:04:37.662913
+
+Per-student fee ledger with installment allocation, a running balance on
+student_fee and per-structure outstanding totals. Run
+scripts/rebuild_fee_ledger.py before setting FEE_LEDGER_ENABLED.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9b3f5a7c2e1'
+down_revision: Union[str, None] = 'c4e8a1f6d2b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('student_fee', sa.Column('balance', sa.DECIMAL(10, 2), nullable=False, server_default='0'))
+
+    op.create_table(
+        'student_fee_installment',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('student_fee_id', sa.Integer(), nullable=False),
+        sa.Column('installment_number', sa.Integer(), nullable=False),
+        sa.Column('due_date', sa.Date(), nullable=False),
+        sa.Column('amount', sa.DECIMAL(10, 2), nullable=True),
+        sa.Column('allocated_amount', sa.DECIMAL(10, 2), nullable=True),
+        sa.ForeignKeyConstraint(['student_fee_id'], ['student_fee.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'uq_student_fee_installment_number', 'student_fee_installment',
+        ['student_fee_id', 'installment_number'], unique=True
+    )
+
+    op.create_table(
+        'fee_ledger_entry',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('student_fee_id', sa.Integer(), nullable=False),
+        sa.Column('entry_type', sa.Enum('INSTALLMENT', 'FINE', 'PAYMENT', 'CONCESSION', name='ledgerentrytype'), nullable=False),
+        sa.Column('debit', sa.DECIMAL(10, 2), nullable=True),
+        sa.Column('credit', sa.DECIMAL(10, 2), nullable=True),
+        sa.Column('balance', sa.DECIMAL(10, 2), nullable=True),
+        sa.Column('installment_number', sa.Integer(), nullable=True),
+        sa.Column('reference_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['student_fee_id'], ['student_fee.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_fee_ledger_entry_student_fee', 'fee_ledger_entry', ['student_fee_id', 'id'])
+
+    op.create_table(
+        'fee_outstanding',
+        sa.Column('fee_structure_id', sa.Integer(), nullable=False),
+        sa.Column('billed', sa.DECIMAL(12, 2), nullable=True),
+        sa.Column('credited', sa.DECIMAL(12, 2), nullable=True),
+        sa.Column('outstanding', sa.DECIMAL(12, 2), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['fee_structure_id'], ['fee_structure.id']),
+        sa.PrimaryKeyConstraint('fee_structure_id'),
+    )
+
+    # Same figure the summary endpoint computed on every read
+    op.execute("UPDATE student_fee SET balance = total_fee - concession_amount + fine_amount - paid_amount")
+
+
+def downgrade() -> None:
+    op.drop_table('fee_outstanding')
+    op.drop_index('ix_fee_ledger_entry_student_fee', table_name='fee_ledger_entry')
+    op.drop_table('fee_ledger_entry')
+    sa.Enum(name='ledgerentrytype').drop(op.get_bind(), checkfirst=True)
+    op.drop_index('uq_student_fee_installment_number', table_name='student_fee_installment')
+    op.drop_table('student_fee_installment')
+    op.drop_column('student_fee', 'balance')
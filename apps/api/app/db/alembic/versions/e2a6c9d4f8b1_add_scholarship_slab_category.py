@@ -0,0 +1,31 @@
+"""add_scholarship_slab_category
+
+Revision ID: e2a6c9d4f8b1
+Revises: d9b3f5a7c2e1
+Create Date: 2026-10-17 15:22:08.419305
+
+Student category a scholarship slab is applied to automatically when a
+fee structure is assigned in bulk.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a6c9d4f8b1'
+down_revision: Union[str, None] = 'd9b3f5a7c2e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('scholarship_slab', sa.Column('scholarship_category', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.create_index('ix_scholarship_slab_scholarship_category', 'scholarship_slab', ['scholarship_category'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_scholarship_slab_scholarship_category', table_name='scholarship_slab')
+    op.drop_column('scholarship_slab', 'scholarship_category')
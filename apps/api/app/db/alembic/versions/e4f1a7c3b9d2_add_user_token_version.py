@@ -0,0 +1,28 @@
+"""add_user_token_version
+
+Revision ID: e4f1a7c3b9d2
+Revises: d2b9e6a4c8f1
+Create Date: 2026-10-16 16:20:13.552907
+
+Adds user.token_version, carried in access tokens so deactivation and
+password changes revoke tokens that were already issued
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4f1a7c3b9d2'
+down_revision: Union[str, None] = 'd2b9e6a4c8f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('user', sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('user', 'token_version')
@@ -0,0 +1,51 @@
+"""add_fee_collection_daily
+
+Revision ID: f5b8d2c7a3e9
+Revises: e2a6c9d4f8b1
+Create Date: 2026-10-17 18:40:51.207734
+
+Daily rollup of successful fee payments for collection analytics, and an
+index for reading payments by status and date. Run
+scripts/rebuild_fee_collection.py before setting
+FEE_COLLECTION_ROLLUP_ENABLED.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5b8d2c7a3e9'
+down_revision: Union[str, None] = 'e2a6c9d4f8b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'fee_collection_daily',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('collection_date', sa.Date(), nullable=False),
+        sa.Column('fee_structure_id', sa.Integer(), nullable=False),
+        # paymentmode already exists, from fee_payment
+        sa.Column('payment_mode', postgresql.ENUM('ONLINE', 'CASH', 'CHEQUE', 'DD', 'UPI', name='paymentmode', create_type=False), nullable=False),
+        sa.Column('amount', sa.DECIMAL(14, 2), nullable=True),
+        sa.Column('payment_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['fee_structure_id'], ['fee_structure.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'uq_fee_collection_daily_date_structure_mode', 'fee_collection_daily',
+        ['collection_date', 'fee_structure_id', 'payment_mode'], unique=True
+    )
+    op.create_index('ix_fee_payment_status_date', 'fee_payment', ['payment_status', 'payment_date'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_fee_payment_status_date', table_name='fee_payment')
+    op.drop_index('uq_fee_collection_daily_date_structure_mode', table_name='fee_collection_daily')
+    op.drop_table('fee_collection_daily')
@@ -0,0 +1,125 @@
+"""
+Connection pool metrics
+
+Per-engine counters for how long requests wait to check a connection out
+of the pool and how long they hold it. A rising wait time with the pool
+fully checked out means workers outnumber connections; long hold times
+point at slow requests keeping connections busy. Process-local.
+"""
+import threading
+import time
+import weakref
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+_CHECKED_OUT_AT = "checked_out_at"
+
+
+class PoolMetrics:
+    """Checkout wait and hold times, keyed by the pool's logging name"""
+    _stats: Dict[str, Dict[str, float]] = {}
+    _engines: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+    _lock = threading.Lock()
+
+    @classmethod
+    def _entry(cls, name: str) -> Dict[str, float]:
+        entry = cls._stats.get(name)
+        if entry is None:
+            entry = cls._stats[name] = {
+                "checkouts": 0,
+                "wait_total": 0.0,
+                "wait_max": 0.0,
+                "hold_total": 0.0,
+                "hold_max": 0.0,
+                "checkins": 0,
+            }
+        return entry
+
+    @classmethod
+    def record_wait(cls, name: str, seconds: float) -> None:
+        with cls._lock:
+            entry = cls._entry(name)
+            entry["checkouts"] += 1
+            entry["wait_total"] += seconds
+            entry["wait_max"] = max(entry["wait_max"], seconds)
+
+    @classmethod
+    def record_hold(cls, name: str, seconds: float) -> None:
+        with cls._lock:
+            entry = cls._entry(name)
+            entry["checkins"] += 1
+            entry["hold_total"] += seconds
+            entry["hold_max"] = max(entry["hold_max"], seconds)
+
+    @classmethod
+    def instrument(cls, engine: Engine) -> None:
+        """Track hold times on engine and include its pool state in stats()"""
+        name = engine.pool.logging_name
+
+        @event.listens_for(engine, "checkout")
+        def _checkout(dbapi_connection, connection_record, connection_proxy):
+            connection_record.info[_CHECKED_OUT_AT] = time.perf_counter()
+
+        @event.listens_for(engine, "checkin")
+        def _checkin(dbapi_connection, connection_record):
+            checked_out_at = connection_record.info.pop(_CHECKED_OUT_AT, None)
+            if checked_out_at is not None:
+                cls.record_hold(name, time.perf_counter() - checked_out_at)
+
+        with cls._lock:
+            cls._engines.add(engine)
+
+    @classmethod
+    def stats(cls) -> dict:
+        """Counters for the metrics endpoint, with live pool occupancy"""
+        pools = {}
+        for engine in list(cls._engines):
+            pool = engine.pool
+            state = {"pool_class": type(pool).__name__}
+            if isinstance(pool, QueuePool):
+                state.update(
+                    size=pool.size(),
+                    checked_out=pool.checkedout(),
+                    overflow=pool.overflow(),
+                    idle=pool.checkedin(),
+                )
+            pools[pool.logging_name] = state
+
+        with cls._lock:
+            for name, entry in cls._stats.items():
+                checkouts, checkins = entry["checkouts"], entry["checkins"]
+                pools.setdefault(name, {}).update(
+                    checkouts=int(checkouts),
+                    wait_avg_ms=round(entry["wait_total"] / checkouts * 1000, 3) if checkouts else 0.0,
+                    wait_max_ms=round(entry["wait_max"] * 1000, 3),
+                    hold_avg_ms=round(entry["hold_total"] / checkins * 1000, 3) if checkins else 0.0,
+                    hold_max_ms=round(entry["hold_max"] * 1000, 3),
+                )
+        return pools
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._stats.clear()
+
+
+class _TimedCheckoutMixin:
+    """Times every checkout, including time blocked waiting for a free connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            PoolMetrics.record_wait(self.logging_name, time.perf_counter() - start)
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
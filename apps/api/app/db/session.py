@@ -1,16 +1,90 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import create_engine, Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.config.settings import settings
+from app.db.pool_metrics import PoolMetrics, TimedAsyncAdaptedQueuePool, TimedQueuePool
 
 # Import all models to ensure they're registered
 # This must be at module level, not inside a function
 from app.models import *  # noqa
 
+# Async driver for each sync dialect
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+    "mysql": "aiomysql",
+}
+
+def get_async_database_url(database_url: str) -> str:
+    """The same database addressed through its async driver"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+def engine_options(database_url: str, is_async: bool = False) -> dict:
+    """
+    create_engine keyword arguments for database_url, from Settings
+
+    In-memory SQLite keeps SQLAlchemy's default single-connection pool;
+    everything else gets a sized QueuePool that records checkout wait times.
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    options = {
+        "echo": False,
+        "pool_pre_ping": True,  # Verify connections before using
+        "pool_logging_name": "async" if is_async else "sync",
+    }
+    if backend == "sqlite" and url.database in (None, "", ":memory:"):
+        return options
+
+    options.update(
+        poolclass=TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    )
+    if backend == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS:
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+def configure_engine(engine: Engine) -> Engine:
+    """Apply SQLite pragmas on connect and register pool metrics"""
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            if settings.SQLITE_WAL:
+                # Readers no longer block the writer; NORMAL is durable under WAL except on power loss
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+            cursor.close()
+
+    PoolMetrics.instrument(engine)
+    return engine
+
 # Create database engine
-engine = create_engine(
+engine = configure_engine(create_engine(
     str(settings.DATABASE_URL),
-    echo=False,
-    pool_pre_ping=True,  # Verify connections before using
+    **engine_options(str(settings.DATABASE_URL)),
+))
+
+# Async engine on the same database, for routers doing non-blocking I/O
+async_engine = create_async_engine(
+    get_async_database_url(str(settings.DATABASE_URL)),
+    **engine_options(str(settings.DATABASE_URL), is_async=True),
 )
+configure_engine(async_engine.sync_engine)
 
 def init_db():
     """Initialize database tables"""
@@ -20,3 +94,14 @@ def get_session():
     """Dependency for getting DB session"""
     with Session(engine) as session:
         yield session
+
+async def get_async_session():
+    """
+    Dependency for getting an async DB session
+
+    Attributes are not expired on commit, so objects can still be read
+    (e.g. by the response model) without an implicit lazy load, which
+    async sessions cannot do.
+    """
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
@@ -1,11 +1,18 @@
-from fastapi import FastAPI
+import secrets
+from typing import Optional
+
+from fastapi import FastAPI, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config.settings import settings
 from app.api.v1.router import api_router
 from app.api.v1.roles import router as roles_router
 from app.core.rbac import seed_permissions
-from app.db.session import engine, init_db
+from app.db.session import engine, async_engine, init_db
+from app.core import events  # noqa: F401  # Register ORM event hooks
+from app.middleware.query_metrics import QueryMetricsMiddleware, RouteMetrics
+from app.workers import import_worker
 from sqlmodel import Session
 
 app = FastAPI(
@@ -19,6 +26,16 @@ def on_startup():
     init_db()
     with Session(engine) as session:
         seed_permissions(session)
+    # Continue imports interrupted by a restart
+    import_worker.resume_import_jobs()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    import_worker.shutdown()
+    await async_engine.dispose()
+
+# Per-request SQL statement count and DB time (Server-Timing, /metrics)
+app.add_middleware(QueryMetricsMiddleware)
 
 # Set all CORS enabled origins
 if settings.BACKEND_CORS_ORIGINS:
@@ -36,3 +53,16 @@ app.include_router(roles_router, prefix=f"{settings.API_V1_STR}/roles", tags=["r
 @app.get("/")
 def root():
     return {"message": "Welcome to College ERP API", "docs": "/docs"}
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus scrape endpoint (this worker process only), behind METRICS_TOKEN"""
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not secrets.compare_digest(authorization or "", f"Bearer {settings.METRICS_TOKEN}"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return PlainTextResponse(RouteMetrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,225 @@
+"""
+Per-request SQL instrumentation
+
+QueryMetricsMiddleware opens a RequestQueryStats for every HTTP request and
+cursor hooks registered on all engines add each statement's duration to
+it. Each response carries a Server-Timing header, requests over the
+SLOW_REQUEST_* thresholds are logged with their slowest statements, and
+per-route totals are rendered in Prometheus text format for /metrics.
+"""
+import heapq
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.settings import settings
+from app.db.pool_metrics import PoolMetrics
+
+logger = logging.getLogger(__name__)
+
+_STATEMENT_START_KEY = "query_metrics_start"
+_MAX_STATEMENT_CHARS = 500
+
+REQUEST_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class RequestQueryStats:
+    """SQL statements issued while serving one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.db_seconds = 0.0
+        # Min-heap of (seconds, statement) holding the slowest statements
+        self.slowest: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.db_seconds += seconds
+            entry = (seconds, statement[:_MAX_STATEMENT_CHARS])
+            if len(self.slowest) < settings.SLOW_QUERIES_LOGGED:
+                heapq.heappush(self.slowest, entry)
+            elif entry > self.slowest[0]:
+                heapq.heapreplace(self.slowest, entry)
+
+    def server_timing(self, total_seconds: float) -> str:
+        return (
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.count} queries", '
+            f"app;dur={total_seconds * 1000:.1f}"
+        )
+
+
+_current_request: ContextVar[Optional[RequestQueryStats]] = ContextVar("query_metrics_request", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_request.get() is not None:
+        conn.info.setdefault(_STATEMENT_START_KEY, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_request.get()
+    starts = conn.info.get(_STATEMENT_START_KEY)
+    if stats is not None and starts:
+        stats.record(statement, time.perf_counter() - starts.pop())
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.observations = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += value
+        self.observations += 1
+
+
+class RouteMetrics:
+    """Process-local per-route request, SQL statement and DB time totals"""
+    _routes: Dict[Tuple[str, str], Dict[str, object]] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def observe(cls, method: str, route: str, seconds: float, stats: RequestQueryStats) -> None:
+        with cls._lock:
+            entry = cls._routes.get((method, route))
+            if entry is None:
+                entry = cls._routes[(method, route)] = {
+                    "duration": _Histogram(REQUEST_DURATION_BUCKETS),
+                    "statements": _Histogram(STATEMENT_COUNT_BUCKETS),
+                    "db_seconds": 0.0,
+                    "slow": 0,
+                }
+            entry["duration"].observe(seconds)
+            entry["statements"].observe(stats.count)
+            entry["db_seconds"] += stats.db_seconds
+            if is_slow(seconds, stats):
+                entry["slow"] += 1
+
+    @classmethod
+    def render(cls) -> str:
+        """All metrics in Prometheus text exposition format"""
+        lines: List[str] = []
+        with cls._lock:
+            routes = sorted(cls._routes.items())
+            _render_histogram(lines, "erp_http_request_duration_seconds",
+                              "Request latency by route", routes, "duration")
+            _render_histogram(lines, "erp_db_statements_per_request",
+                              "SQL statements issued per request by route", routes, "statements")
+            lines.append("# HELP erp_db_time_seconds_total Time spent executing SQL by route")
+            lines.append("# TYPE erp_db_time_seconds_total counter")
+            for (method, route), entry in routes:
+                lines.append(f"erp_db_time_seconds_total{_labels(method=method, route=route)} {entry['db_seconds']:.6f}")
+            lines.append("# HELP erp_slow_requests_total Requests over the slow-request thresholds by route")
+            lines.append("# TYPE erp_slow_requests_total counter")
+            for (method, route), entry in routes:
+                lines.append(f"erp_slow_requests_total{_labels(method=method, route=route)} {entry['slow']}")
+
+        pools = PoolMetrics.stats()
+        for metric, key, kind, help_text, scale in (
+            ("erp_db_pool_checked_out", "checked_out", "gauge", "Connections currently checked out", 1),
+            ("erp_db_pool_overflow", "overflow", "gauge", "Connections open beyond pool_size", 1),
+            ("erp_db_pool_checkouts_total", "checkouts", "counter", "Pool checkouts", 1),
+            ("erp_db_pool_wait_max_seconds", "wait_max_ms", "gauge", "Longest wait for a pooled connection", 0.001),
+            ("erp_db_pool_hold_max_seconds", "hold_max_ms", "gauge", "Longest time a connection was held", 0.001),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for pool, state in sorted(pools.items()):
+                if key in state:
+                    lines.append(f"{metric}{_labels(pool=pool)} {state[key] * scale:g}")
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._routes.clear()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _render_histogram(lines: List[str], metric: str, help_text: str, routes, key: str) -> None:
+    lines.append(f"# HELP {metric} {help_text}")
+    lines.append(f"# TYPE {metric} histogram")
+    for (method, route), entry in routes:
+        histogram: _Histogram = entry[key]
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            lines.append(f"{metric}_bucket{_labels(method=method, route=route, le=f'{bound:g}')} {count}")
+        lines.append(f"{metric}_bucket{_labels(method=method, route=route, le='+Inf')} {histogram.observations}")
+        lines.append(f"{metric}_sum{_labels(method=method, route=route)} {histogram.total:.6f}")
+        lines.append(f"{metric}_count{_labels(method=method, route=route)} {histogram.observations}")
+
+
+def is_slow(seconds: float, stats: RequestQueryStats) -> bool:
+    return (
+        seconds * 1000 >= settings.SLOW_REQUEST_MS
+        or stats.count >= settings.SLOW_REQUEST_QUERY_COUNT
+    )
+
+
+class QueryMetricsMiddleware:
+    """
+    ASGI middleware recording SQL statement count and DB time per request
+
+    Pure ASGI rather than BaseHTTPMiddleware so streaming responses are not
+    buffered. The route label is the matched path template, keeping
+    /metrics cardinality bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.QUERY_METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current_request.set(stats)
+        start = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing(time.perf_counter() - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_request.reset(token)
+            elapsed = time.perf_counter() - start
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            RouteMetrics.observe(scope["method"], route, elapsed, stats)
+            if is_slow(elapsed, stats):
+                slowest = "\n".join(
+                    f"  {seconds * 1000:.1f} ms: {statement}"
+                    for seconds, statement in sorted(stats.slowest, reverse=True)
+                )
+                logger.warning(
+                    "Slow request %s %s: %.1f ms, %d queries, %.1f ms in DB\n%s",
+                    scope["method"], scope["path"], elapsed * 1000,
+                    stats.count, stats.db_seconds * 1000, slowest,
+                )
@@ -33,8 +33,12 @@ from .fee import (
     FeePayment,
     FeeConcession,
     FeeFine,
+    StudentFeeInstallment,
+    FeeLedgerEntry,
+    FeeOutstanding,
+    FeeCollectionDaily,
 )
-from .attendance import AttendanceSession, AttendanceRecord
+from .attendance import AttendanceSession, AttendanceRecord, StudentAttendanceSummary
 from .admissions import Application, ApplicationPayment, EntranceExamScore, ApplicationDocument, ApplicationActivityLog
 from .library import Book, BookIssue, LibraryFine
 from .hostel import HostelBlock, HostelRoom, BedAllocation, GatePass, HostelComplaint
@@ -65,7 +69,7 @@ from .master_data import (
     SMSTemplate,
 )
 from .file_metadata import FileMetadata
-from .import_log import ImportLog
+from .import_log import ImportLog, ImportLogRow
 
 __all__ = [
     "User",
@@ -101,6 +105,13 @@ __all__ = [
     "FeePayment",
     "FeeConcession",
     "FeeFine",
+    "StudentFeeInstallment",
+    "FeeLedgerEntry",
+    "FeeOutstanding",
+    "FeeCollectionDaily",
+    "AttendanceSession",
+    "AttendanceRecord",
+    "StudentAttendanceSummary",
     "Application",
     "ApplicationPayment",
     "EntranceExamScore",
@@ -154,4 +165,5 @@ __all__ = [
     "SMSTemplate",
     "FileMetadata",
     "ImportLog",
+    "ImportLogRow",
 ]
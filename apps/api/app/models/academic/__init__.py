@@ -6,7 +6,8 @@ from .regulation import (
     Regulation,
     RegulationSubject,
     RegulationSemester,
-    RegulationPromotionRule
+    RegulationPromotionRule,
+    RegulationGrade
 )
 from .batch import (
     AcademicBatch,
@@ -30,6 +31,7 @@ __all__ = [
     "RegulationSubject", 
     "RegulationSemester",
     "RegulationPromotionRule",
+    "RegulationGrade",
     "AcademicBatch",
     "BatchSubject",
     "BatchSemester",
@@ -90,6 +90,10 @@ class Regulation(SQLModel, table=True):
         sa_relationship_kwargs={"cascade": "all, delete-orphan"}
     )
     batches: List["AcademicBatch"] = Relationship(back_populates="regulation")  # NEW
+    grades: List["RegulationGrade"] = Relationship(
+        back_populates="regulation",
+        sa_relationship_kwargs={"cascade": "all, delete-orphan"}
+    )
 
 
 class RegulationSubject(SQLModel, table=True):
@@ -201,3 +205,31 @@ class RegulationPromotionRule(SQLModel, table=True):
     
     # Relationships
     regulation: "Regulation" = Relationship(back_populates="promotion_rules")
+
+
+class RegulationGrade(SQLModel, table=True):
+    """
+    Grading scale within a regulation
+    
+    A mark earns the grade with the highest min_percentage it reaches.
+    Regulations without grades fall back to DEFAULT_GRADE_SCALE in
+    app.services.grading_service
+    """
+    __tablename__ = "regulation_grades"
+    __table_args__ = (
+        UniqueConstraint('regulation_id', 'grade', name='uq_regulation_grade'),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    regulation_id: int = Field(foreign_key="regulations.id", index=True)
+    
+    grade: str = Field(max_length=5)  # "O", "A+", "F"
+    min_percentage: int = Field(ge=0, le=100)
+    grade_point: int = Field(ge=0, le=10)
+    is_pass: bool = Field(default=True)
+    
+    # Timestamps
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    # Relationships
+    regulation: "Regulation" = Relationship(back_populates="grades")
@@ -6,11 +6,11 @@ CRITICAL CORRECTIONS APPLIED:
 2. Single source of truth for semester progression
 3. Promotion transaction order: History → Logs → Student → Commit
 """
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, List, Optional
 from datetime import datetime
 from decimal import Decimal, ROUND_HALF_UP
 from sqlmodel import SQLModel, Field, Relationship, Column
-from sqlalchemy import DECIMAL, Text, UniqueConstraint
+from sqlalchemy import DECIMAL, JSON, Text, UniqueConstraint
 
 if TYPE_CHECKING:
     from ..student import Student
@@ -51,8 +51,15 @@ class StudentSemesterHistory(SQLModel, table=True):
     earned_credits: int = Field(default=0, ge=0)
     failed_credits: int = Field(default=0, ge=0)
     
+    # Written by result processing (see ResultProcessingService)
+    sgpa: Optional[Decimal] = Field(
+        default=None,
+        sa_column=Column(DECIMAL(4, 2))
+    )
+    backlog_subject_ids: Optional[List[int]] = Field(default=None, sa_column=Column(JSON))
+    
     # Status
-    status: str = Field(max_length=20)  # PROMOTED, DETAINED, REPEAT, READMISSION
+    status: str = Field(max_length=20)  # RESULT_DECLARED, PROMOTED, DETAINED, REPEAT, READMISSION
     
     # Timestamps
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -47,6 +47,12 @@ class AttendanceSession(SQLModel, table=True):
 
 class AttendanceRecord(SQLModel, table=True):
     __tablename__ = "attendance_record"
+    __table_args__ = (
+        # One mark per student per session; also the ON CONFLICT target for bulk marking
+        sa.Index("uq_attendance_record_session_student", "session_id", "student_id", unique=True),
+        # Per-student stats and history; covers the GROUP BY status count
+        sa.Index("ix_attendance_record_student_status", "student_id", "status"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     session_id: int = Field(foreign_key="attendance_session.id", ondelete="CASCADE")
@@ -61,3 +67,31 @@ class AttendanceRecord(SQLModel, table=True):
     # Relationships
     session: AttendanceSession = Relationship(back_populates="attendance_records")
     student: Optional["Student"] = Relationship()
+
+
+class StudentAttendanceSummary(SQLModel, table=True):
+    """
+    Rollup of attendance counts per student, subject and semester
+    
+    Always maintained incrementally by the bulk marking endpoint;
+    ATTENDANCE_SUMMARY_ENABLED only switches stats reads to it. Rebuild
+    with scripts/rebuild_attendance_summary.py once after the migration,
+    before turning it on.
+    """
+    __tablename__ = "student_attendance_summary"
+    __table_args__ = (
+        sa.Index("uq_attendance_summary_student_subject_semester", "student_id", "subject_id", "semester", unique=True),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    student_id: int = Field(foreign_key="student.id", index=True)
+    subject_id: int = Field(foreign_key="subject.id")
+    semester: int
+    
+    total_classes: int = Field(default=0)
+    present: int = Field(default=0)
+    absent: int = Field(default=0)
+    late: int = Field(default=0)
+    on_duty: int = Field(default=0)
+    
+    updated_at: datetime = Field(default_factory=datetime.now, sa_column_kwargs={"onupdate": datetime.now})
@@ -4,7 +4,7 @@ Audit Log Model - Track all changes to academic entities
 from typing import Optional, Any
 from datetime import datetime
 from sqlmodel import SQLModel, Field, Column
-from sqlalchemy import JSON, Text
+from sqlalchemy import Index, JSON, Text
 
 class AuditLog(SQLModel, table=True):
     """
@@ -12,6 +12,10 @@ class AuditLog(SQLModel, table=True):
     Tracks CREATE, UPDATE, DELETE operations with full context
     """
     __tablename__ = "academic_audit_log"
+    __table_args__ = (
+        # A record's history, newest first
+        Index("ix_academic_audit_log_record_history", "table_name", "record_id", "created_at"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     
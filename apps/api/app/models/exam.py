@@ -1,6 +1,7 @@
 from typing import TYPE_CHECKING, List, Optional
 from datetime import date, time
 from enum import Enum
+import sqlalchemy as sa
 from sqlmodel import SQLModel, Field, Relationship
 
 if TYPE_CHECKING:
@@ -59,12 +60,19 @@ class ExamSchedule(SQLModel, table=True):
 class ExamResult(SQLModel, table=True):
     """Marks obtained by a student in a specific exam schedule"""
     __tablename__ = "exam_result"
+    __table_args__ = (
+        # One result per student per schedule; also the ON CONFLICT target for bulk marks entry
+        sa.Index("uq_exam_result_schedule_student", "exam_schedule_id", "student_id", unique=True),
+        # A student's results across schedules
+        sa.Index("ix_exam_result_student_schedule", "student_id", "exam_schedule_id"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     exam_schedule_id: int = Field(foreign_key="exam_schedule.id")
     student_id: int = Field(foreign_key="student.id")
     marks_obtained: float
     grade: Optional[str] = None
+    grade_point: Optional[float] = None  # Computed server-side from the regulation grading scale
     remarks: Optional[str] = None
     is_absent: bool = Field(default=False)
     
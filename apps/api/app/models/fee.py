@@ -3,7 +3,7 @@ from datetime import datetime, date
 from enum import Enum
 from decimal import Decimal
 from sqlmodel import SQLModel, Field, Relationship, Column
-from sqlalchemy import DECIMAL
+from sqlalchemy import DECIMAL, Index
 
 if TYPE_CHECKING:
     from .student import Student
@@ -31,6 +31,13 @@ class PaymentStatus(str, Enum):
     FAILED = "FAILED"
     REFUNDED = "REFUNDED"
 
+class LedgerEntryType(str, Enum):
+    """Fee ledger entry types; installments and fines are debits, the rest credits"""
+    INSTALLMENT = "INSTALLMENT"
+    FINE = "FINE"
+    PAYMENT = "PAYMENT"
+    CONCESSION = "CONCESSION"
+
 class FeeStructure(SQLModel, table=True):
     """Fee structure for a program and academic year"""
     __tablename__ = "fee_structure"
@@ -90,6 +97,7 @@ class StudentFee(SQLModel, table=True):
     concession_amount: Decimal = Field(default=Decimal("0.00"), sa_column=Column(DECIMAL(10, 2)))
     fine_amount: Decimal = Field(default=Decimal("0.00"), sa_column=Column(DECIMAL(10, 2)))
     paid_amount: Decimal = Field(default=Decimal("0.00"), sa_column=Column(DECIMAL(10, 2)))
+    balance: Decimal = Field(default=Decimal("0.00"), sa_column=Column(DECIMAL(10, 2), nullable=False, server_default="0"))  # Ledger running balance
     
     is_blocked: bool = Field(default=False)  # Block exam/promotion if dues pending
     
@@ -106,6 +114,9 @@ class StudentFee(SQLModel, table=True):
 class FeePayment(SQLModel, table=True):
     """Individual payment transactions"""
     __tablename__ = "fee_payment"
+    __table_args__ = (
+        Index("ix_fee_payment_status_date", "payment_status", "payment_date"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     student_fee_id: int = Field(foreign_key="student_fee.id", index=True)
@@ -169,3 +180,79 @@ class FeeFine(SQLModel, table=True):
     
     # Relationships
     student_fee: "StudentFee" = Relationship(back_populates="fines")
+
+class StudentFeeInstallment(SQLModel, table=True):
+    """
+    One installment of a student's fee and the credits allocated to it
+    
+    Payments and concessions are allocated to the earliest-due
+    installments first, so an installment is paid once allocated_amount
+    reaches amount.
+    """
+    __tablename__ = "student_fee_installment"
+    __table_args__ = (
+        Index("uq_student_fee_installment_number", "student_fee_id", "installment_number", unique=True),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    student_fee_id: int = Field(foreign_key="student_fee.id")
+    installment_number: int
+    due_date: date
+    amount: Decimal = Field(sa_column=Column(DECIMAL(10, 2)))
+    allocated_amount: Decimal = Field(default=Decimal("0.00"), sa_column=Column(DECIMAL(10, 2)))
+
+class FeeLedgerEntry(SQLModel, table=True):
+    """
+    Debit or credit on a student's fee account
+    
+    Append-only; balance is the account balance after the entry, so the
+    latest entry (or StudentFee.balance) answers "what is owed" without
+    summing history. Always maintained by the fee endpoints;
+    FEE_LEDGER_ENABLED only switches summaries to it. Rebuild with
+    scripts/rebuild_fee_ledger.py once before turning it on.
+    """
+    __tablename__ = "fee_ledger_entry"
+    __table_args__ = (
+        Index("ix_fee_ledger_entry_student_fee", "student_fee_id", "id"),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    student_fee_id: int = Field(foreign_key="student_fee.id")
+    entry_type: LedgerEntryType
+    debit: Decimal = Field(default=Decimal("0.00"), sa_column=Column(DECIMAL(10, 2)))
+    credit: Decimal = Field(default=Decimal("0.00"), sa_column=Column(DECIMAL(10, 2)))
+    balance: Decimal = Field(sa_column=Column(DECIMAL(10, 2)))
+    installment_number: Optional[int] = None  # Installment billed, or fined for
+    reference_id: Optional[int] = None  # fee_payment, fee_concession or fee_fine id
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class FeeOutstanding(SQLModel, table=True):
+    """Running ledger totals per fee structure, for campus-wide outstanding figures"""
+    __tablename__ = "fee_outstanding"
+    
+    fee_structure_id: int = Field(foreign_key="fee_structure.id", primary_key=True)
+    billed: Decimal = Field(default=Decimal("0.00"), sa_column=Column(DECIMAL(12, 2)))
+    credited: Decimal = Field(default=Decimal("0.00"), sa_column=Column(DECIMAL(12, 2)))
+    outstanding: Decimal = Field(default=Decimal("0.00"), sa_column=Column(DECIMAL(12, 2)))
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class FeeCollectionDaily(SQLModel, table=True):
+    """
+    Successful payments per day, fee structure and payment mode
+    
+    Always maintained as payments succeed; collection analytics read it
+    instead of fee_payment when FEE_COLLECTION_ROLLUP_ENABLED is set.
+    Rebuild with scripts/rebuild_fee_collection.py once before turning it on.
+    """
+    __tablename__ = "fee_collection_daily"
+    __table_args__ = (
+        Index("uq_fee_collection_daily_date_structure_mode", "collection_date", "fee_structure_id", "payment_mode", unique=True),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    collection_date: date
+    fee_structure_id: int = Field(foreign_key="fee_structure.id")
+    payment_mode: PaymentMode
+    amount: Decimal = Field(default=Decimal("0.00"), sa_column=Column(DECIMAL(14, 2)))
+    payment_count: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,5 +1,6 @@
 from typing import Optional
 from datetime import datetime
+from sqlalchemy import Column, Index, JSON
 from sqlmodel import SQLModel, Field, Relationship
 
 class ImportLog(SQLModel, table=True):
@@ -15,8 +16,40 @@ class ImportLog(SQLModel, table=True):
     failed_count: int = Field(default=0)
     duplicate_count: int = Field(default=0)
     ip_address: Optional[str] = None
-    status: str = Field(default="PENDING") # PENDING, SUCCESS, PARTIAL, FAILED
+    status: str = Field(default="PENDING") # PENDING, RUNNING, SUCCESS, PARTIAL, FAILED
     
     # Metadata
     module: str = Field(default="STUDENT") # STUDENT, FACULTY, etc.
     error_report_path: Optional[str] = None
+    
+    # Background job progress
+    bulk: bool = Field(default=True)
+    processed_count: int = Field(default=0)  # Rows in committed chunks
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None  # Bumped per committed chunk; a stale RUNNING job is resumed
+    error: Optional[str] = None
+
+class ImportLogRow(SQLModel, table=True):
+    """
+    One row submitted for import and its outcome
+    
+    A PREVIEW log's rows hold their validation result (VALID, INVALID,
+    DUPLICATE); queueing the preview turns its VALID rows PENDING.
+    PENDING rows are the job's remaining work: a chunk's rows change status
+    in the same transaction as its inserts, so a resumed job picks up
+    exactly where the last committed chunk ended.
+    """
+    __tablename__ = "import_log_row"
+    __table_args__ = (
+        Index('ix_import_log_row_log_status', 'import_log_id', 'status', 'row_number'),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    import_log_id: int = Field(foreign_key="import_log.id")
+    row_number: int
+    data: dict = Field(sa_column=Column(JSON, nullable=False))  # StudentImportRow, or sheet values if invalid
+    status: str = Field(default="PENDING") # VALID, INVALID, DUPLICATE, PENDING, IMPORTED, FAILED
+    errors: Optional[list] = Field(default=None, sa_column=Column(JSON))  # Preview ImportErrorDetails
+    error: Optional[str] = None
+    student_id: Optional[int] = Field(default=None, foreign_key="student.id")
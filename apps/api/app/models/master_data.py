@@ -203,6 +203,7 @@ class ScholarshipSlab(SQLModel, table=True):
     
     academic_year_id: Optional[int] = Field(default=None, foreign_key="academic_year.id")
     program_id: Optional[int] = Field(default=None, foreign_key="program.id")
+    scholarship_category: Optional[str] = Field(default=None, index=True)  # Applied automatically to this student category (SC, ST, ...)
     
     is_active: bool = Field(default=True)
     
@@ -1,5 +1,6 @@
 from typing import Optional, Any
 from datetime import datetime
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Column, JSON
 from enum import Enum
 
@@ -36,6 +37,10 @@ class AuditLogAction(str, Enum):
 class AuditLog(SQLModel, table=True):
     """System-wide audit trail for compliance and security"""
     __tablename__ = "audit_log"
+    __table_args__ = (
+        # Per-module export, newest first
+        Index("ix_audit_log_module_timestamp", "module", "timestamp"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     timestamp: datetime = Field(default_factory=datetime.utcnow, index=True)
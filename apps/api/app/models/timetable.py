@@ -1,5 +1,6 @@
 from enum import Enum
 from typing import Optional, List, TYPE_CHECKING
+import sqlalchemy as sa
 from sqlmodel import SQLModel, Field, Relationship
 from datetime import date, time
 
@@ -60,6 +61,11 @@ class TimetableTemplate(SQLModel, table=True):
 class ClassSchedule(SQLModel, table=True):
     """The actual Timetable entries"""
     __tablename__ = "timetable_entry"
+    __table_args__ = (
+        # Slot conflict checks; faculty/room leads so the per-faculty schedule can use it too
+        sa.Index("ix_timetable_entry_faculty_slot", "faculty_id", "day_of_week", "period_id"),
+        sa.Index("ix_timetable_entry_room_slot", "room_id", "day_of_week", "period_id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     academic_year_id: int
@@ -18,6 +18,7 @@ class User(SQLModel, table=True):
     hashed_password: str
     is_active: bool = Field(default=True)
     is_superuser: bool = Field(default=False)
+    token_version: int = Field(default=0)  # Bumped on deactivation/password change to revoke issued tokens
     
     # Password reset fields
     password_reset_token: Optional[str] = None
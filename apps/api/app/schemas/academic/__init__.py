@@ -11,7 +11,9 @@ from .regulation import (
     RegulationSemesterCreate,
     RegulationSemesterRead,
     RegulationPromotionRuleCreate,
-    RegulationPromotionRuleRead
+    RegulationPromotionRuleRead,
+    RegulationGradeCreate,
+    RegulationGradeRead
 )
 from .batch import (
     AcademicBatchCreate,
@@ -34,6 +36,8 @@ __all__ = [
     "RegulationSemesterRead",
     "RegulationPromotionRuleCreate",
     "RegulationPromotionRuleRead",
+    "RegulationGradeCreate",
+    "RegulationGradeRead",
     "AcademicBatchCreate",
     "AcademicBatchUpdate",
     "AcademicBatchRead",
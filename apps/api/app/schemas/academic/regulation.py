@@ -220,6 +220,33 @@ class RegulationPromotionRuleRead(RegulationPromotionRuleBase):
         from_attributes = True
 
 
+# ============================================================================
+# Regulation Grade Schemas
+# ============================================================================
+
+class RegulationGradeBase(BaseModel):
+    """Base grade fields"""
+    grade: str = Field(..., max_length=5)
+    min_percentage: int = Field(..., ge=0, le=100)
+    grade_point: int = Field(..., ge=0, le=10)
+    is_pass: bool = True
+
+
+class RegulationGradeCreate(RegulationGradeBase):
+    """Create grade (regulation comes from the path)"""
+    pass
+
+
+class RegulationGradeRead(RegulationGradeBase):
+    """Read grade"""
+    id: int
+    regulation_id: int
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
 # ============================================================================
 # Composite Schemas
 # ============================================================================
@@ -229,6 +256,7 @@ class RegulationWithDetails(RegulationRead):
     subjects: List[RegulationSubjectRead] = []
     semesters: List[RegulationSemesterRead] = []
     promotion_rules: List[RegulationPromotionRuleRead] = []
+    grades: List[RegulationGradeRead] = []
     
     class Config:
         from_attributes = True
@@ -1,7 +1,7 @@
 """
 Student History Pydantic Schemas
 """
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from decimal import Decimal
 from pydantic import BaseModel, Field
@@ -25,7 +25,10 @@ class StudentSemesterHistoryBase(BaseModel):
     earned_credits: int = Field(default=0, ge=0)
     failed_credits: int = Field(default=0, ge=0)
     
-    status: str = Field(..., max_length=20)  # PROMOTED, DETAINED, REPEAT, READMISSION
+    sgpa: Optional[Decimal] = None
+    backlog_subject_ids: Optional[List[int]] = None
+    
+    status: str = Field(..., max_length=20)  # RESULT_DECLARED, PROMOTED, DETAINED, REPEAT, READMISSION
 
 
 class StudentSemesterHistoryCreate(StudentSemesterHistoryBase):
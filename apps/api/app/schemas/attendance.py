@@ -60,3 +60,24 @@ class AttendanceStats(BaseModel):
     late: int
     on_duty: int
     attendance_percentage: float
+
+# Shortage Report
+class SubjectAttendanceSummary(BaseModel):
+    subject_id: int
+    subject_code: str
+    subject_name: str
+    total_classes: int
+    attended: int
+    attendance_percentage: float
+    is_short: bool
+
+class StudentAttendanceReportRow(BaseModel):
+    student_id: int
+    admission_number: str
+    name: str
+    section_id: Optional[int] = None
+    total_classes: int
+    attended: int
+    attendance_percentage: float
+    is_short: bool  # Overall or any subject below the threshold
+    subjects: List[SubjectAttendanceSummary] = []
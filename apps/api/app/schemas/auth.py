@@ -13,6 +13,8 @@ class TokenPayload(BaseModel):
     sub: Optional[int] = None  # user_id
     exp: Optional[int] = None
     type: Optional[str] = "access"
+    roles: List[str] = []
+    ver: int = 0  # Must match User.token_version
 
 # Login Schemas
 class LoginRequest(BaseModel):
@@ -1,5 +1,5 @@
 from typing import List, Optional
-from datetime import date, time
+from datetime import date, datetime, time
 from pydantic import BaseModel
 from app.models.exam import ExamType, ExamStatus
 
@@ -74,6 +74,63 @@ class BulkMarksEntry(BaseModel):
 
 class ExamResultRead(ExamResultBase):
     id: int
+    grade_point: Optional[float] = None
     student_name: Optional[str] = None # Enriched
     subject_name: Optional[str] = None # Enriched
     exam_name: Optional[str] = None # Enriched
+
+# --- Transcript Schemas ---
+
+class TranscriptSubject(BaseModel):
+    subject_id: int
+    subject_code: str
+    subject_name: str
+    credits: int
+    marks_obtained: float
+    max_marks: int
+    grade: Optional[str] = None
+    grade_point: Optional[float] = None
+
+class TranscriptSemester(BaseModel):
+    batch_semester_id: int
+    semester_no: int
+    semester_name: str
+    total_credits: int
+    earned_credits: int
+    sgpa: float
+    cgpa: float  # Cumulative up to and including this semester
+    subjects: List[TranscriptSubject] = []
+
+class StudentTranscript(BaseModel):
+    student_id: int
+    exam_type: ExamType
+    semesters: List[TranscriptSemester] = []
+    cgpa: float
+
+# --- Result Processing Schemas ---
+
+class ResultProcessingRequest(BaseModel):
+    batch_semester_id: int
+    exam_id: Optional[int] = None  # Default: every FINAL exam of the semester
+    run_in_background: bool = True
+
+class ResultProcessingSummary(BaseModel):
+    batch_semester_id: int
+    academic_year_id: int
+    students_processed: int
+    students_with_backlogs: int
+    histories_created: int
+    histories_updated: int
+    average_sgpa: Optional[float] = None
+
+class ResultProcessingJob(BaseModel):
+    job_id: str
+    batch_semester_id: int
+    exam_id: Optional[int] = None
+    status: str  # QUEUED, RUNNING, COMPLETED, FAILED
+    processed: int = 0
+    total: int = 0
+    summary: Optional[ResultProcessingSummary] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
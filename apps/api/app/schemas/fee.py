@@ -2,7 +2,7 @@ from typing import Optional, List
 from datetime import date, datetime
 from decimal import Decimal
 from pydantic import BaseModel, Field
-from app.models.fee import FeeCategory, PaymentMode, PaymentStatus
+from app.models.fee import FeeCategory, LedgerEntryType, PaymentMode, PaymentStatus
 
 # ============================================================================
 # Fee Structure Schemas
@@ -93,6 +93,42 @@ class StudentFeeResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class BulkStudentFeeCreate(BaseModel):
+    """Schema for assigning a fee structure to a whole batch or program year"""
+    fee_structure_id: int
+    batch_id: Optional[int] = None
+    program_year_id: Optional[int] = None
+    dry_run: bool = False  # Preview the assignment without writing it
+    preview_limit: int = Field(50, ge=0, le=1000)
+
+class BulkStudentFeeRow(BaseModel):
+    """One student the structure is (or would be) assigned to"""
+    student_id: int
+    admission_number: str
+    student_name: str
+    scholarship_category: str
+    total_fee: Decimal
+    concession_amount: Decimal
+    concession_type: Optional[str] = None  # Scholarship slab applied
+
+class BulkStudentFeeCategory(BaseModel):
+    """New assignments per scholarship category"""
+    scholarship_category: str
+    students: int
+    concession_amount: Decimal
+
+class BulkStudentFeeResult(BaseModel):
+    """Outcome (or preview, on a dry run) of a bulk fee assignment"""
+    fee_structure_id: int
+    dry_run: bool
+    matched_count: int  # Students in scope
+    assigned_count: int  # New fee records
+    already_assigned_count: int  # Skipped: structure already assigned
+    total_fee: Decimal
+    total_concession: Decimal
+    categories: List[BulkStudentFeeCategory]
+    preview: List[BulkStudentFeeRow]  # First preview_limit new assignments
+
 class StudentFeeSummary(BaseModel):
     """Detailed fee summary for a student"""
     student_id: int
@@ -108,6 +144,26 @@ class StudentFeeSummary(BaseModel):
     installments: List[dict]  # Installment details with payment status
     payments: List[dict]  # Payment history
 
+class FeeLedgerEntryResponse(BaseModel):
+    """One debit or credit on a student's fee account"""
+    id: int
+    entry_type: LedgerEntryType
+    debit: Decimal
+    credit: Decimal
+    balance: Decimal
+    installment_number: Optional[int]
+    reference_id: Optional[int]
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class FeeOutstandingSummary(BaseModel):
+    """Campus-wide fee totals"""
+    billed: Decimal  # Fees and fines
+    credited: Decimal  # Payments and concessions
+    outstanding: Decimal
+
 # ============================================================================
 # Payment Schemas
 # ============================================================================
@@ -225,3 +281,27 @@ class FeeDefaulter(BaseModel):
     overdue_installments: int
     last_payment_date: Optional[date]
     days_overdue: int
+
+# ============================================================================
+# Collection Analytics Schemas
+# ============================================================================
+
+class FeeCollectionRow(BaseModel):
+    """Collections in one period bucket, for the requested dimensions"""
+    period_start: date
+    payment_mode: Optional[PaymentMode] = None
+    program_id: Optional[int] = None
+    program_name: Optional[str] = None
+    fee_head: Optional[str] = None  # Share of each payment by component amounts, else "Unallocated"
+    amount: Decimal
+    payment_count: int
+
+class FeeCollectionReport(BaseModel):
+    """Successful fee payments over a date range"""
+    start_date: date
+    end_date: date
+    period: str
+    group_by: List[str]
+    total_amount: Decimal
+    payment_count: int
+    rows: List[FeeCollectionRow]
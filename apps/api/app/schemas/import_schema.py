@@ -1,7 +1,7 @@
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Union
 from enum import Enum
 from pydantic import BaseModel, EmailStr, Field, validator
-from datetime import date
+from datetime import date, datetime
 from app.models.student import Gender, BloodGroup, ScholarshipCategory
 
 class ImportRowStatus(str, Enum):
@@ -69,16 +69,48 @@ class ImportErrorDetail(BaseModel):
 
 class ImportPreviewRow(BaseModel):
     row_number: int
-    data: StudentImportRow
+    # Rows that fail validation carry the normalized sheet values instead
+    data: Union[StudentImportRow, Dict[str, Any]] = Field(union_mode="left_to_right")
     status: ImportRowStatus
     errors: List[ImportErrorDetail] = []
 
 class ImportPreviewResponse(BaseModel):
+    log_id: Optional[int] = None  # Stored preview; rows is then one page of it
     total_rows: int
     valid_count: int
     invalid_count: int
     duplicate_count: int
+    skip: int = 0
+    limit: Optional[int] = None
     rows: List[ImportPreviewRow]
 
 class ImportExecuteRequest(BaseModel):
     file_token: str # Token referencing uploaded temporary file
+
+class ImportJobStatus(BaseModel):
+    """Progress of an import job, for polling"""
+    id: int
+    file_name: str
+    status: str
+    total_rows: int
+    processed_count: int
+    imported_count: int
+    failed_count: int
+    duplicate_count: int
+    timestamp: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class ImportLogRowRead(BaseModel):
+    row_number: int
+    status: str
+    error: Optional[str] = None
+    student_id: Optional[int] = None
+    admission_number: Optional[str] = None
+
+    class Config:
+        from_attributes = True
@@ -5,6 +5,7 @@ from typing import List, Optional, Any
 from datetime import datetime, date
 from decimal import Decimal
 from pydantic import BaseModel, Field
+from app.models.student import ScholarshipCategory
 
 # ============================================================================
 # Academic Year Schemas
@@ -234,6 +235,7 @@ class ScholarshipSlabBase(BaseModel):
     applicable_fee_heads: List[str] = []
     academic_year_id: Optional[int] = None
     program_id: Optional[int] = None
+    scholarship_category: Optional[ScholarshipCategory] = None
     is_active: bool = True
 
 class ScholarshipSlabCreate(ScholarshipSlabBase):
@@ -248,6 +250,7 @@ class ScholarshipSlabUpdate(BaseModel):
     discount_value: Optional[Decimal] = None
     max_discount_amount: Optional[Decimal] = None
     applicable_fee_heads: Optional[List[str]] = None
+    scholarship_category: Optional[ScholarshipCategory] = None
     is_active: Optional[bool] = None
 
 class ScholarshipSlabRead(ScholarshipSlabBase):
@@ -1,10 +1,29 @@
 """Activity logging service for tracking application changes"""
 from typing import Optional
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.admissions import ApplicationActivityLog, ActivityType
 from datetime import datetime
 import json
 
+def _build_log_entry(
+    application_id: int,
+    activity_type: ActivityType,
+    description: str,
+    performed_by: Optional[int],
+    ip_address: Optional[str],
+    extra_data: Optional[dict]
+) -> ApplicationActivityLog:
+    return ApplicationActivityLog(
+        application_id=application_id,
+        activity_type=activity_type,
+        description=description,
+        performed_by=performed_by,
+        ip_address=ip_address,
+        extra_data=json.dumps(extra_data) if extra_data else None,
+        created_at=datetime.utcnow()
+    )
+
 def log_activity(
     session: Session,
     application_id: int,
@@ -29,17 +48,30 @@ def log_activity(
     Returns:
         Created activity log entry
     """
-    log_entry = ApplicationActivityLog(
-        application_id=application_id,
-        activity_type=activity_type,
-        description=description,
-        performed_by=performed_by,
-        ip_address=ip_address,
-        extra_data=json.dumps(extra_data) if extra_data else None,
-        created_at=datetime.utcnow()
+    log_entry = _build_log_entry(
+        application_id, activity_type, description, performed_by, ip_address, extra_data
     )
     
     session.add(log_entry)
     session.flush()  # Don't commit, let the caller handle transaction
     
     return log_entry
+
+async def log_activity_async(
+    session: AsyncSession,
+    application_id: int,
+    activity_type: ActivityType,
+    description: str,
+    performed_by: Optional[int] = None,
+    ip_address: Optional[str] = None,
+    extra_data: Optional[dict] = None
+) -> ApplicationActivityLog:
+    """log_activity for an async session; the caller commits"""
+    log_entry = _build_log_entry(
+        application_id, activity_type, description, performed_by, ip_address, extra_data
+    )
+    
+    session.add(log_entry)
+    await session.flush()
+    
+    return log_entry
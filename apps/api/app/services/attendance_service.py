@@ -0,0 +1,495 @@
+"""
+Attendance Service
+Set-based attendance marking and the per-student summary rollup
+"""
+from datetime import datetime
+from typing import Iterator, List, Dict, Any, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import insert, update, delete, case
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.sql import Select
+from sqlmodel import Session, select, func
+
+from app.config.settings import settings
+from app.models.attendance import (
+    AttendanceSession,
+    AttendanceRecord,
+    AttendanceStatus,
+    StudentAttendanceSummary,
+)
+from app.models.academic.batch import BatchSemester
+from app.models.master_data import Section
+from app.models.student import Student
+from app.models.subject import Subject
+from app.schemas.attendance import (
+    AttendanceRecordCreate,
+    AttendanceStats,
+    StudentAttendanceReportRow,
+    SubjectAttendanceSummary,
+)
+
+# Columns returned to the client for each marked record
+RECORD_COLUMNS = (
+    AttendanceRecord.id,
+    AttendanceRecord.session_id,
+    AttendanceRecord.student_id,
+    AttendanceRecord.status,
+    AttendanceRecord.remarks,
+)
+
+# Summary counter column for each status
+STATUS_COUNTERS = {
+    AttendanceStatus.PRESENT: "present",
+    AttendanceStatus.ABSENT: "absent",
+    AttendanceStatus.LATE: "late",
+    AttendanceStatus.ON_DUTY: "on_duty",
+}
+SUMMARY_COUNTERS = ("total_classes", *STATUS_COUNTERS.values())
+# Statuses counted as attended
+ATTENDED_STATUSES = (AttendanceStatus.PRESENT, AttendanceStatus.LATE, AttendanceStatus.ON_DUTY)
+
+
+class AttendanceService:
+    """Service for attendance marking"""
+
+    @staticmethod
+    def mark_bulk(
+        session: Session,
+        attendance_session: AttendanceSession,
+        records: List[AttendanceRecordCreate]
+    ) -> List[Dict[str, Any]]:
+        """
+        Insert or update attendance for many students in a fixed number of statements
+
+        Existing records for the session are prefetched in one query. On
+        PostgreSQL the write is a single INSERT ... ON CONFLICT
+        (session_id, student_id) DO UPDATE ... RETURNING; other dialects
+        use one executemany UPDATE, one executemany INSERT and one
+        re-select of the affected rows.
+
+        The caller owns the transaction and must commit.
+
+        Returns:
+            Marked records as dicts, in request order
+        """
+        # Last entry wins when a student appears more than once in a payload
+        marks = {record.student_id: record for record in records}
+        if not marks:
+            return []
+
+        existing = {
+            row.student_id: (row.id, row.status)
+            for row in session.exec(
+                select(AttendanceRecord.id, AttendanceRecord.student_id, AttendanceRecord.status)
+                .where(AttendanceRecord.session_id == attendance_session.id)
+                .where(AttendanceRecord.student_id.in_(list(marks)))
+            ).all()
+        }
+
+        now = datetime.now()
+        if session.get_bind().dialect.name == "postgresql":
+            rows = AttendanceService._upsert_postgresql(session, attendance_session.id, marks, now)
+        else:
+            rows = AttendanceService._upsert_executemany(
+                session, attendance_session.id, marks,
+                {student_id: record_id for student_id, (record_id, _) in existing.items()},
+                now
+            )
+
+        AttendanceService._apply_summary_deltas(
+            session,
+            attendance_session,
+            AttendanceService._summary_deltas(marks, {
+                student_id: status for student_id, (_, status) in existing.items()
+            }),
+            now
+        )
+
+        by_student = {row["student_id"]: row for row in rows}
+        return [by_student[student_id] for student_id in marks]
+
+    @staticmethod
+    def _upsert_postgresql(
+        session: Session,
+        session_id: int,
+        marks: Dict[int, AttendanceRecordCreate],
+        now: datetime
+    ) -> List[Dict[str, Any]]:
+        stmt = pg_insert(AttendanceRecord).values([
+            {
+                "session_id": session_id,
+                "student_id": student_id,
+                "status": record.status,
+                "remarks": record.remarks,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for student_id, record in marks.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AttendanceRecord.session_id, AttendanceRecord.student_id],
+            set_={
+                "status": stmt.excluded.status,
+                "remarks": stmt.excluded.remarks,
+                "updated_at": stmt.excluded.updated_at,
+            }
+        ).returning(*RECORD_COLUMNS)
+        return [dict(row) for row in session.execute(stmt).mappings()]
+
+    @staticmethod
+    def _upsert_executemany(
+        session: Session,
+        session_id: int,
+        marks: Dict[int, AttendanceRecordCreate],
+        existing: Dict[int, int],
+        now: datetime
+    ) -> List[Dict[str, Any]]:
+        updates = [
+            {"id": existing[student_id], "status": record.status, "remarks": record.remarks, "updated_at": now}
+            for student_id, record in marks.items()
+            if student_id in existing
+        ]
+        inserts = [
+            {
+                "session_id": session_id,
+                "student_id": student_id,
+                "status": record.status,
+                "remarks": record.remarks,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for student_id, record in marks.items()
+            if student_id not in existing
+        ]
+
+        if updates:
+            # ORM bulk UPDATE by primary key -> executemany
+            session.execute(update(AttendanceRecord), updates)
+        if inserts:
+            session.execute(insert(AttendanceRecord), inserts)
+
+        rows = session.execute(
+            select(*RECORD_COLUMNS)
+            .where(AttendanceRecord.session_id == session_id)
+            .where(AttendanceRecord.student_id.in_(list(marks)))
+        ).mappings()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def _summary_deltas(
+        marks: Dict[int, AttendanceRecordCreate],
+        previous: Dict[int, AttendanceStatus]
+    ) -> Dict[int, Dict[str, int]]:
+        """Counter changes per student given the previous status of each mark"""
+        deltas = {}
+        for student_id, record in marks.items():
+            old_status = previous.get(student_id)
+            if old_status == record.status:
+                continue
+            delta = dict.fromkeys(SUMMARY_COUNTERS, 0)
+            if old_status is None:
+                delta["total_classes"] = 1
+            else:
+                delta[STATUS_COUNTERS[old_status]] -= 1
+            delta[STATUS_COUNTERS[record.status]] += 1
+            deltas[student_id] = delta
+        return deltas
+
+    @staticmethod
+    def _apply_summary_deltas(
+        session: Session,
+        attendance_session: AttendanceSession,
+        deltas: Dict[int, Dict[str, int]],
+        now: datetime
+    ) -> None:
+        """
+        Add counter deltas to student_attendance_summary in one upsert
+
+        Relative increments on conflict, so two first marks of a student
+        racing to create the row both count instead of one failing on the
+        unique index.
+        """
+        if not deltas:
+            return
+
+        table = StudentAttendanceSummary.__table__
+        rows = [
+            {
+                "student_id": student_id,
+                "subject_id": attendance_session.subject_id,
+                "semester": attendance_session.semester,
+                "updated_at": now,
+                **delta,
+            }
+            for student_id, delta in deltas.items()
+        ]
+
+        dialect = session.get_bind().dialect.name
+        if dialect in ("mysql", "mariadb"):
+            stmt = mysql_insert(table).values(rows)
+            stmt = stmt.on_duplicate_key_update(
+                **{name: table.c[name] + stmt.inserted[name] for name in SUMMARY_COUNTERS},
+                updated_at=stmt.inserted.updated_at,
+            )
+        else:
+            # PostgreSQL and SQLite share INSERT ... ON CONFLICT DO UPDATE
+            stmt = (pg_insert if dialect == "postgresql" else sqlite_insert)(table).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.student_id, table.c.subject_id, table.c.semester],
+                set_={
+                    **{name: table.c[name] + stmt.excluded[name] for name in SUMMARY_COUNTERS},
+                    "updated_at": stmt.excluded.updated_at,
+                }
+            )
+        session.execute(stmt)
+
+    @staticmethod
+    def get_student_stats(
+        session: Session,
+        student_id: int,
+        use_summary: bool = False
+    ) -> AttendanceStats:
+        """
+        Overall attendance breakdown for a student
+        
+        Reads the summary rollup when use_summary is set, otherwise
+        aggregates attendance_record with a single GROUP BY status.
+        """
+        counts = dict.fromkeys(SUMMARY_COUNTERS, 0)
+        
+        if use_summary:
+            row = session.exec(
+                select(*[func.coalesce(func.sum(getattr(StudentAttendanceSummary, name)), 0) for name in SUMMARY_COUNTERS])
+                .where(StudentAttendanceSummary.student_id == student_id)
+            ).one()
+            counts.update(zip(SUMMARY_COUNTERS, row))
+        else:
+            for status, count in session.exec(
+                select(AttendanceRecord.status, func.count())
+                .where(AttendanceRecord.student_id == student_id)
+                .group_by(AttendanceRecord.status)
+            ).all():
+                counts[STATUS_COUNTERS[status]] = count
+                counts["total_classes"] += count
+        
+        total_classes = counts["total_classes"]
+        # Consider PRESENT, LATE, and ON_DUTY as present for calculation
+        effective_present = counts["present"] + counts["late"] + counts["on_duty"]
+        percentage = (effective_present / total_classes * 100) if total_classes > 0 else 0.0
+        
+        return AttendanceStats(
+            total_classes=total_classes,
+            present=counts["present"],
+            absent=counts["absent"],
+            late=counts["late"],
+            on_duty=counts["on_duty"],
+            attendance_percentage=round(percentage, 2)
+        )
+
+    @staticmethod
+    def rebuild_summary(
+        session: Session,
+        student_ids: Optional[List[int]] = None
+    ) -> int:
+        """
+        Recompute student_attendance_summary from attendance_record
+        
+        Deletes the affected rollup rows and repopulates them with one
+        INSERT ... SELECT grouped by student, subject and semester.
+        The caller owns the transaction and must commit.
+        
+        Returns:
+            Number of summary rows written
+        """
+        table = StudentAttendanceSummary.__table__
+        
+        clear = delete(table)
+        if student_ids is not None:
+            clear = clear.where(table.c.student_id.in_(student_ids))
+        session.execute(clear)
+        
+        source = (
+            select(
+                AttendanceRecord.student_id,
+                AttendanceSession.subject_id,
+                AttendanceSession.semester,
+                func.count().label("total_classes"),
+                *[
+                    func.sum(case((AttendanceRecord.status == status, 1), else_=0)).label(name)
+                    for status, name in STATUS_COUNTERS.items()
+                ],
+                func.max(AttendanceRecord.updated_at).label("updated_at"),
+            )
+            .join(AttendanceSession, AttendanceSession.id == AttendanceRecord.session_id)
+            .group_by(
+                AttendanceRecord.student_id,
+                AttendanceSession.subject_id,
+                AttendanceSession.semester,
+            )
+        )
+        if student_ids is not None:
+            source = source.where(AttendanceRecord.student_id.in_(student_ids))
+        
+        columns = ["student_id", "subject_id", "semester", *SUMMARY_COUNTERS, "updated_at"]
+        session.execute(insert(table).from_select(columns, source))
+        
+        count_query = select(func.count()).select_from(table)
+        if student_ids is not None:
+            count_query = count_query.where(table.c.student_id.in_(student_ids))
+        return session.exec(count_query).one()
+
+    @staticmethod
+    def shortage_report_query(
+        session: Session,
+        batch_semester_id: Optional[int] = None,
+        section_id: Optional[int] = None,
+        use_summary: bool = False
+    ) -> Select:
+        """
+        Attendance counts for every student in a semester or section, for iter_shortage_report
+        
+        One row per (student, subject) from one aggregated query, read from
+        the summary rollup when use_summary is set. Students with no
+        attendance yet get a single row without a subject. Ordered by
+        admission number, then subject code.
+        """
+        if section_id:
+            section = session.get(Section, section_id)
+            if not section:
+                raise HTTPException(status_code=404, detail="Section not found")
+            batch_semester_id = section.batch_semester_id
+        if not batch_semester_id:
+            raise HTTPException(status_code=400, detail="batch_semester_id or section_id is required")
+        
+        batch_semester = session.get(BatchSemester, batch_semester_id)
+        if not batch_semester:
+            raise HTTPException(status_code=404, detail="Batch semester not found")
+        
+        if use_summary:
+            counts = (
+                select(
+                    StudentAttendanceSummary.student_id,
+                    StudentAttendanceSummary.subject_id,
+                    StudentAttendanceSummary.total_classes.label("total_classes"),
+                    (
+                        StudentAttendanceSummary.present
+                        + StudentAttendanceSummary.late
+                        + StudentAttendanceSummary.on_duty
+                    ).label("attended"),
+                )
+                .where(StudentAttendanceSummary.semester == batch_semester.semester_no)
+            )
+        else:
+            counts = (
+                select(
+                    AttendanceRecord.student_id,
+                    AttendanceSession.subject_id,
+                    func.count().label("total_classes"),
+                    func.sum(
+                        case((AttendanceRecord.status.in_(ATTENDED_STATUSES), 1), else_=0)
+                    ).label("attended"),
+                )
+                .join(AttendanceSession, AttendanceSession.id == AttendanceRecord.session_id)
+                .where(AttendanceSession.program_year_id == batch_semester.program_year_id)
+                .where(AttendanceSession.semester == batch_semester.semester_no)
+                .group_by(AttendanceRecord.student_id, AttendanceSession.subject_id)
+            )
+        counts = counts.subquery()
+        
+        query = (
+            select(
+                Student.id,
+                Student.admission_number,
+                Student.name,
+                Student.section_id,
+                counts.c.subject_id,
+                Subject.code,
+                Subject.name.label("subject_name"),
+                counts.c.total_classes,
+                counts.c.attended,
+            )
+            .outerjoin(counts, counts.c.student_id == Student.id)
+            .outerjoin(Subject, Subject.id == counts.c.subject_id)
+            .where(Student.batch_semester_id == batch_semester.id)
+            .order_by(Student.admission_number, Subject.code)
+        )
+        if section_id:
+            query = query.where(Student.section_id == section_id)
+        return query
+    
+    @staticmethod
+    def shortage_report_subjects(session: Session, query: Select) -> List[Tuple[int, str]]:
+        """(subject_id, subject_code) of every subject with classes in a shortage report, by code"""
+        rows = query.order_by(None).subquery()
+        return [
+            (subject_id, code or "")
+            for subject_id, code in session.exec(
+                select(rows.c.subject_id, rows.c.code)
+                .where(rows.c.total_classes > 0)
+                .distinct()
+                .order_by(rows.c.code)
+            ).all()
+        ]
+    
+    @staticmethod
+    def iter_shortage_report(
+        bind, query: Select, threshold: float = 75.0, shortage_only: bool = False
+    ) -> Iterator[StudentAttendanceReportRow]:
+        """
+        Subject-wise and overall attendance per student, in admission number order
+        
+        Folds shortage_report_query's rows into one report row per student
+        as they arrive. A student is short if the overall or any subject
+        percentage is below the threshold.
+        
+        Rows are fetched EXPORT_YIELD_PER at a time, as in
+        ExportService._iter_rows, on a session of its own because request
+        dependencies are closed before a StreamingResponse is iterated.
+        """
+        def finish(student: StudentAttendanceReportRow) -> Optional[StudentAttendanceReportRow]:
+            if student.total_classes > 0:
+                student.attendance_percentage = round(student.attended / student.total_classes * 100, 2)
+                student.is_short = (
+                    student.attendance_percentage < threshold
+                    or any(subject.is_short for subject in student.subjects)
+                )
+            return student if student.is_short or not shortage_only else None
+        
+        current: Optional[StudentAttendanceReportRow] = None
+        with Session(bind) as session:
+            result = session.execute(query.execution_options(yield_per=settings.EXPORT_YIELD_PER))
+            for row in result:
+                if current is None or current.student_id != row.id:
+                    if current is not None and finish(current):
+                        yield current
+                    current = StudentAttendanceReportRow(
+                        student_id=row.id,
+                        admission_number=row.admission_number,
+                        name=row.name,
+                        section_id=row.section_id,
+                        total_classes=0,
+                        attended=0,
+                        attendance_percentage=0.0,
+                        is_short=False,
+                    )
+                if row.subject_id is None or not row.total_classes:
+                    continue
+                
+                attended = int(row.attended or 0)
+                percentage = round(attended / row.total_classes * 100, 2)
+                current.subjects.append(SubjectAttendanceSummary(
+                    subject_id=row.subject_id,
+                    subject_code=row.code or "",
+                    subject_name=row.subject_name or "",
+                    total_classes=row.total_classes,
+                    attended=attended,
+                    attendance_percentage=percentage,
+                    is_short=percentage < threshold,
+                ))
+                current.total_classes += row.total_classes
+                current.attended += attended
+        if current is not None and finish(current):
+            yield current
@@ -2,7 +2,11 @@
 Academic Dashboard Service
 Aggregates academic structure data for dashboard view
 """
-from typing import List, Dict, Any, Optional
+import hashlib
+import threading
+import time
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Set, Tuple
 from sqlmodel import Session, select
 from sqlalchemy.orm import selectinload
 
@@ -11,6 +15,7 @@ from app.models.master_data import Section, PracticalBatch
 from app.models.program import Program
 from app.models.academic.regulation import Regulation
 from app.models.faculty import Faculty
+from app.config.settings import settings
 from app.schemas.dashboard import (
     AcademicDashboardResponse,
     DashboardBatch,
@@ -21,6 +26,94 @@ from app.schemas.dashboard import (
 )
 
 
+class DashboardSnapshotCache:
+    """
+    Process-local cache of serialized dashboard snapshots
+    
+    Keyed by (program_id, batch_id) as passed to get_dashboard_data.
+    Entries are dropped by the ORM hooks in app.core.events whenever an
+    AcademicBatch, ProgramYear, BatchSemester, Section or PracticalBatch
+    is written, and expire after DASHBOARD_CACHE_TTL_SECONDS so writes
+    made by other worker processes are eventually picked up.
+    """
+    _snapshots: Dict[Tuple[Optional[int], Optional[int]], Tuple[str, bytes, float]] = {}
+    _generation = 0
+    _lock = threading.Lock()
+    
+    hits = 0
+    misses = 0
+    invalidations = 0
+
+    @classmethod
+    def get(cls, key: Tuple[Optional[int], Optional[int]]) -> Optional[Tuple[str, bytes]]:
+        """Return (etag, body) for a fresh snapshot, counting the hit or miss"""
+        with cls._lock:
+            entry = cls._snapshots.get(key)
+            if entry and time.monotonic() - entry[2] < settings.DASHBOARD_CACHE_TTL_SECONDS:
+                cls.hits += 1
+                return entry[0], entry[1]
+            cls.misses += 1
+            return None
+
+    @classmethod
+    def generation(cls) -> int:
+        return cls._generation
+
+    @classmethod
+    def set(
+        cls,
+        key: Tuple[Optional[int], Optional[int]],
+        etag: str,
+        body: bytes,
+        generation: int
+    ) -> None:
+        """Store a snapshot unless an invalidation happened while it was built"""
+        with cls._lock:
+            if generation == cls._generation:
+                cls._snapshots[key] = (etag, body, time.monotonic())
+
+    @classmethod
+    def invalidate(cls, batch_ids: Optional[Set[int]] = None) -> None:
+        """
+        Drop snapshots affected by a write
+        
+        With batch_ids, only snapshots for those batches and unscoped
+        (all batches / whole program) snapshots are dropped. Without it,
+        the whole cache is cleared.
+        """
+        with cls._lock:
+            cls._generation += 1
+            cls.invalidations += 1
+            if batch_ids is None:
+                cls._snapshots = {}
+                return
+            cls._snapshots = {
+                key: entry for key, entry in cls._snapshots.items()
+                if key[1] is not None and key[1] not in batch_ids
+            }
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        with cls._lock:
+            lookups = cls.hits + cls.misses
+            return {
+                "hits": cls.hits,
+                "misses": cls.misses,
+                "hit_rate": round(cls.hits / lookups * 100, 2) if lookups > 0 else 0,
+                "invalidations": cls.invalidations,
+                "entries": len(cls._snapshots),
+            }
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._snapshots = {}
+            cls._generation += 1
+            cls.hits = 0
+            cls.misses = 0
+            cls.invalidations = 0
+
+
 class AcademicDashboardService:
     """Service for academic dashboard operations"""
     
@@ -64,9 +157,14 @@ class AcademicDashboardService:
         total_sections = 0
         total_labs = 0
         
+        # Load the full structure for all batches in a fixed number of queries
+        hierarchy = AcademicDashboardService._load_hierarchy(
+            session, [batch.id for batch in batches]
+        )
+        
         for batch in batches:
             dashboard_batch = AcademicDashboardService._build_batch_hierarchy(
-                session, batch
+                batch, hierarchy
             )
             dashboard_batches.append(dashboard_batch)
             
@@ -99,65 +197,125 @@ class AcademicDashboardService:
         )
     
     @staticmethod
-    def _build_batch_hierarchy(
+    def get_dashboard_snapshot(
         session: Session,
-        batch: AcademicBatch
-    ) -> DashboardBatch:
-        """Build complete hierarchy for a batch"""
+        program_id: Optional[int] = None,
+        batch_id: Optional[int] = None
+    ) -> Tuple[str, bytes]:
+        """
+        Get the serialized dashboard and its ETag, served from cache when fresh
+        
+        Returns:
+            (etag, JSON body) tuple
+        """
+        key = (program_id, batch_id)
+        cached = DashboardSnapshotCache.get(key)
+        if cached:
+            return cached
         
-        # Get program years
+        generation = DashboardSnapshotCache.generation()
+        data = AcademicDashboardService.get_dashboard_data(
+            session=session,
+            program_id=program_id,
+            batch_id=batch_id
+        )
+        body = data.model_dump_json().encode()
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        DashboardSnapshotCache.set(key, etag, body, generation)
+        return etag, body
+    
+    @staticmethod
+    def _load_hierarchy(
+        session: Session,
+        batch_ids: List[int]
+    ) -> Dict[str, Dict[int, list]]:
+        """
+        Load every level below the given batches in a fixed number of queries
+
+        Returns lookup maps keyed by parent id:
+            years: batch_id -> [ProgramYear]
+            semesters: program_year_id -> [BatchSemester]
+            sections: batch_semester_id -> [(Section, faculty_name)]
+            labs: section_id -> [PracticalBatch]
+        """
+        hierarchy: Dict[str, Dict[int, list]] = {
+            "years": defaultdict(list),
+            "semesters": defaultdict(list),
+            "sections": defaultdict(list),
+            "labs": defaultdict(list),
+        }
+        if not batch_ids:
+            return hierarchy
+
         program_years = session.exec(
             select(ProgramYear)
-            .where(ProgramYear.batch_id == batch.id)
+            .where(ProgramYear.batch_id.in_(batch_ids))
             .order_by(ProgramYear.year_no)
         ).all()
+        for program_year in program_years:
+            hierarchy["years"][program_year.batch_id].append(program_year)
+
+        semesters = session.exec(
+            select(BatchSemester)
+            .where(BatchSemester.batch_id.in_(batch_ids))
+            .order_by(BatchSemester.semester_no)
+        ).all()
+        for semester in semesters:
+            hierarchy["semesters"][semester.program_year_id].append(semester)
+
+        # Faculty name is resolved in the same round trip via an outer join
+        sections = session.exec(
+            select(Section, Faculty.name)
+            .join(BatchSemester, BatchSemester.id == Section.batch_semester_id)
+            .outerjoin(Faculty, Faculty.id == Section.faculty_id)
+            .where(BatchSemester.batch_id.in_(batch_ids))
+            .where(Section.is_active == True)
+            .order_by(Section.code)
+        ).all()
+        for section, faculty_name in sections:
+            hierarchy["sections"][section.batch_semester_id].append(
+                (section, faculty_name)
+            )
+
+        lab_groups = session.exec(
+            select(PracticalBatch)
+            .join(Section, Section.id == PracticalBatch.section_id)
+            .join(BatchSemester, BatchSemester.id == Section.batch_semester_id)
+            .where(BatchSemester.batch_id.in_(batch_ids))
+            .where(Section.is_active == True)
+            .where(PracticalBatch.is_active == True)
+            .order_by(PracticalBatch.code)
+        ).all()
+        for lab in lab_groups:
+            hierarchy["labs"][lab.section_id].append(lab)
+
+        return hierarchy
+
+    @staticmethod
+    def _build_batch_hierarchy(
+        batch: AcademicBatch,
+        hierarchy: Dict[str, Dict[int, list]]
+    ) -> DashboardBatch:
+        """Build complete hierarchy for a batch from preloaded lookup maps"""
         
         dashboard_years = []
         batch_total_students = 0
         batch_total_capacity = 0
         
-        for program_year in program_years:
-            # Get semesters for this year
-            semesters = session.exec(
-                select(BatchSemester)
-                .where(BatchSemester.batch_id == batch.id)
-                .where(BatchSemester.program_year_id == program_year.id)
-                .order_by(BatchSemester.semester_no)
-            ).all()
-            
+        for program_year in hierarchy["years"].get(batch.id, []):
             dashboard_semesters = []
             year_total_students = 0
             year_total_capacity = 0
             
-            for semester in semesters:
-                # Get sections for this semester
-                sections = session.exec(
-                    select(Section)
-                    .where(Section.batch_semester_id == semester.id)
-                    .where(Section.is_active == True)
-                    .order_by(Section.code)
-                ).all()
+            for semester in hierarchy["semesters"].get(program_year.id, []):
+                if semester.batch_id != batch.id:
+                    continue
                 
                 dashboard_sections = []
                 semester_total_students = 0
                 semester_total_capacity = 0
                 
-                for section in sections:
-                    # Get faculty name if assigned
-                    faculty_name = None
-                    if section.faculty_id:
-                        faculty = session.get(Faculty, section.faculty_id)
-                        if faculty:
-                            faculty_name = faculty.name
-                    
-                    # Get lab groups for this section
-                    lab_groups = session.exec(
-                        select(PracticalBatch)
-                        .where(PracticalBatch.section_id == section.id)
-                        .where(PracticalBatch.is_active == True)
-                        .order_by(PracticalBatch.code)
-                    ).all()
-                    
+                for section, faculty_name in hierarchy["sections"].get(semester.id, []):
                     dashboard_labs = [
                         DashboardLabGroup(
                             id=lab.id,
@@ -171,7 +329,7 @@ class AcademicDashboardService:
                                 2
                             )
                         )
-                        for lab in lab_groups
+                        for lab in hierarchy["labs"].get(section.id, [])
                     ]
                     
                     dashboard_sections.append(
@@ -0,0 +1,279 @@
+"""
+Exam Service
+Set-based marks entry with server-side grading
+"""
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import insert, update, case, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, select, func
+
+from app.models.exam import Exam, ExamSchedule, ExamResult, ExamType
+from app.models.academic.batch import AcademicBatch, BatchSemester
+from app.models.student import Student
+from app.models.subject import Subject
+from app.schemas.exam import (
+    ExamResultCreate,
+    ExamResultRead,
+    StudentTranscript,
+    TranscriptSemester,
+    TranscriptSubject,
+)
+from app.services.grading_service import GradingScale
+
+# Columns returned to the client for each result
+RESULT_COLUMNS = (
+    ExamResult.id,
+    ExamResult.exam_schedule_id,
+    ExamResult.student_id,
+    ExamResult.marks_obtained,
+    ExamResult.grade,
+    ExamResult.grade_point,
+    ExamResult.remarks,
+    ExamResult.is_absent,
+)
+
+
+class ExamService:
+    """Service for exam marks operations"""
+
+    @staticmethod
+    def get_grading_scale(session: Session, schedule: ExamSchedule) -> GradingScale:
+        """Grading scale of the regulation the schedule's batch is bound to"""
+        regulation_id = session.exec(
+            select(AcademicBatch.regulation_id)
+            .join(BatchSemester, BatchSemester.batch_id == AcademicBatch.id)
+            .join(Exam, Exam.batch_semester_id == BatchSemester.id)
+            .where(Exam.id == schedule.exam_id)
+        ).first()
+        return GradingScale.for_regulation(session, regulation_id)
+
+    @staticmethod
+    def bulk_upsert_marks(
+        session: Session,
+        schedule: ExamSchedule,
+        records: List[ExamResultCreate]
+    ) -> List[Dict[str, Any]]:
+        """
+        Grade and write marks for many students in a fixed number of statements
+
+        Grades and grade points are computed here from the regulation's
+        grading scale; any grade sent by the client is ignored. On
+        PostgreSQL the write is a single INSERT ... ON CONFLICT
+        (exam_schedule_id, student_id) ... RETURNING. Elsewhere existing
+        results are prefetched in one query, then written with executemany
+        UPDATE/INSERT and read back with one re-select.
+
+        The caller owns the transaction and must commit.
+
+        Returns:
+            Results as dicts, in request order
+        """
+        # Last entry wins when a student appears more than once in a payload
+        marks = {
+            record.student_id: record
+            for record in records
+            if record.exam_schedule_id == schedule.id
+        }
+        if not marks:
+            return []
+
+        invalid = [
+            student_id for student_id, record in marks.items()
+            if not record.is_absent and not 0 <= record.marks_obtained <= schedule.max_marks
+        ]
+        if invalid:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Marks must be between 0 and {schedule.max_marks} (students: {invalid[:10]})"
+            )
+
+        student_ids = list(marks)
+        entries = list(marks.values())
+        graded = ExamService.get_grading_scale(session, schedule).grade(
+            marks=np.fromiter((0.0 if r.is_absent else r.marks_obtained for r in entries), dtype=float, count=len(entries)),
+            max_marks=schedule.max_marks,
+            passing_marks=schedule.passing_marks,
+            absent=np.fromiter((r.is_absent for r in entries), dtype=bool, count=len(entries)),
+        )
+
+        rows = [
+            {
+                "exam_schedule_id": schedule.id,
+                "student_id": student_id,
+                "marks_obtained": 0.0 if record.is_absent else record.marks_obtained,
+                "grade": grade,
+                "grade_point": float(grade_point),
+                "remarks": record.remarks,
+                "is_absent": record.is_absent,
+            }
+            for student_id, record, grade, grade_point
+            in zip(student_ids, entries, graded.grades, graded.grade_points)
+        ]
+
+        if session.get_bind().dialect.name == "postgresql":
+            stmt = pg_insert(ExamResult).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ExamResult.exam_schedule_id, ExamResult.student_id],
+                set_={
+                    name: stmt.excluded[name]
+                    for name in ("marks_obtained", "grade", "grade_point", "remarks", "is_absent")
+                }
+            ).returning(*RESULT_COLUMNS)
+            results = [dict(row) for row in session.execute(stmt).mappings()]
+        else:
+            existing = dict(session.exec(
+                select(ExamResult.student_id, ExamResult.id)
+                .where(ExamResult.exam_schedule_id == schedule.id)
+                .where(ExamResult.student_id.in_(student_ids))
+            ).all())
+
+            updates = [
+                {"id": existing[row["student_id"]], **row}
+                for row in rows if row["student_id"] in existing
+            ]
+            inserts = [row for row in rows if row["student_id"] not in existing]
+
+            if updates:
+                # ORM bulk UPDATE by primary key -> executemany
+                session.execute(update(ExamResult), updates)
+            if inserts:
+                session.execute(insert(ExamResult), inserts)
+
+            results = [dict(row) for row in session.execute(
+                select(*RESULT_COLUMNS)
+                .where(ExamResult.exam_schedule_id == schedule.id)
+                .where(ExamResult.student_id.in_(student_ids))
+            ).mappings()]
+
+        by_student = {result["student_id"]: result for result in results}
+        return [by_student[student_id] for student_id in student_ids]
+
+    @staticmethod
+    def get_student_results(session: Session, student_id: int) -> List[ExamResultRead]:
+        """All results of a student with exam, subject and student names, in one query"""
+        rows = session.exec(
+            select(
+                *RESULT_COLUMNS,
+                Exam.name.label("exam_name"),
+                Subject.name.label("subject_name"),
+                Student.name.label("student_name"),
+            )
+            .join(ExamSchedule, ExamSchedule.id == ExamResult.exam_schedule_id)
+            .join(Exam, Exam.id == ExamSchedule.exam_id)
+            .outerjoin(Subject, Subject.id == ExamSchedule.subject_id)
+            .outerjoin(Student, Student.id == ExamResult.student_id)
+            .where(ExamResult.student_id == student_id)
+            .order_by(Exam.start_date, ExamSchedule.exam_date)
+        ).mappings().all()
+        return [ExamResultRead(**row) for row in rows]
+
+    @staticmethod
+    def get_student_transcript(
+        session: Session,
+        student_id: int,
+        exam_type: ExamType = ExamType.FINAL
+    ) -> StudentTranscript:
+        """
+        Semester-wise transcript with SGPA and CGPA computed in SQL
+        
+        Only graded results of the given exam type count. When a subject
+        was attempted more than once in a semester the best grade point is
+        used. SGPA is sum(grade_point * credits) / sum(credits) within the
+        semester; CGPA is the same ratio cumulated over semesters in order,
+        both as window functions over a single query.
+        """
+        attempts = (
+            select(
+                Exam.batch_semester_id,
+                ExamSchedule.subject_id,
+                ExamSchedule.max_marks,
+                ExamResult.marks_obtained,
+                ExamResult.grade,
+                ExamResult.grade_point,
+                and_(
+                    ExamResult.is_absent == False,
+                    ExamResult.marks_obtained >= ExamSchedule.passing_marks,
+                    ExamResult.grade_point > 0,
+                ).label("passed"),
+                func.row_number().over(
+                    partition_by=(Exam.batch_semester_id, ExamSchedule.subject_id),
+                    order_by=(ExamResult.grade_point.desc(), ExamResult.marks_obtained.desc()),
+                ).label("attempt_rank"),
+            )
+            .join(ExamSchedule, ExamSchedule.id == ExamResult.exam_schedule_id)
+            .join(Exam, Exam.id == ExamSchedule.exam_id)
+            .where(ExamResult.student_id == student_id)
+            .where(Exam.exam_type == exam_type)
+            .where(ExamResult.grade_point.is_not(None))
+            .subquery()
+        )
+        
+        points = attempts.c.grade_point * Subject.credits
+        earned = case((attempts.c.passed, Subject.credits), else_=0)
+        semester_window = {"partition_by": attempts.c.batch_semester_id}
+        cumulative_window = {"order_by": BatchSemester.semester_no}
+        
+        rows = session.exec(
+            select(
+                attempts.c.batch_semester_id,
+                BatchSemester.semester_no,
+                BatchSemester.semester_name,
+                attempts.c.subject_id,
+                Subject.code.label("subject_code"),
+                Subject.name.label("subject_name"),
+                Subject.credits,
+                attempts.c.marks_obtained,
+                attempts.c.max_marks,
+                attempts.c.grade,
+                attempts.c.grade_point,
+                func.sum(Subject.credits).over(**semester_window).label("total_credits"),
+                func.sum(earned).over(**semester_window).label("earned_credits"),
+                (
+                    func.sum(points).over(**semester_window)
+                    / func.nullif(func.sum(Subject.credits).over(**semester_window), 0)
+                ).label("sgpa"),
+                (
+                    func.sum(points).over(**cumulative_window)
+                    / func.nullif(func.sum(Subject.credits).over(**cumulative_window), 0)
+                ).label("cgpa"),
+            )
+            .join(Subject, Subject.id == attempts.c.subject_id)
+            .join(BatchSemester, BatchSemester.id == attempts.c.batch_semester_id)
+            .where(attempts.c.attempt_rank == 1)
+            .order_by(BatchSemester.semester_no, Subject.code)
+        ).mappings().all()
+        
+        semesters: List[TranscriptSemester] = []
+        current: Optional[TranscriptSemester] = None
+        for row in rows:
+            if current is None or current.batch_semester_id != row["batch_semester_id"]:
+                current = TranscriptSemester(
+                    batch_semester_id=row["batch_semester_id"],
+                    semester_no=row["semester_no"],
+                    semester_name=row["semester_name"],
+                    total_credits=row["total_credits"] or 0,
+                    earned_credits=row["earned_credits"] or 0,
+                    sgpa=round(row["sgpa"] or 0, 2),
+                    cgpa=round(row["cgpa"] or 0, 2),
+                )
+                semesters.append(current)
+            current.subjects.append(TranscriptSubject(
+                subject_id=row["subject_id"],
+                subject_code=row["subject_code"],
+                subject_name=row["subject_name"],
+                credits=row["credits"],
+                marks_obtained=row["marks_obtained"],
+                max_marks=row["max_marks"],
+                grade=row["grade"],
+                grade_point=row["grade_point"],
+            ))
+        
+        return StudentTranscript(
+            student_id=student_id,
+            exam_type=exam_type,
+            semesters=semesters,
+            cgpa=semesters[-1].cgpa if semesters else 0.0,
+        )
@@ -0,0 +1,345 @@
+"""
+Fee Assignment Service
+Assigns a fee structure to every student of a batch or program year in one
+statement, with category scholarship slabs applied as concessions
+"""
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import DECIMAL, case, exists, insert, literal
+from sqlalchemy.sql import Select
+from sqlmodel import Session, select, func
+
+from app.models.academic.batch import AcademicBatch, ProgramYear
+from app.models.fee import FeeComponent, FeeConcession, FeeStructure, StudentFee
+from app.models.master_data import AcademicYear, FeeHead, ScholarshipSlab
+from app.models.student import ScholarshipCategory, Student, StudentStatus
+from app.schemas.fee import (
+    BulkStudentFeeCategory,
+    BulkStudentFeeCreate,
+    BulkStudentFeeResult,
+    BulkStudentFeeRow,
+)
+from app.services.fee_ledger_service import FeeLedgerService
+
+ZERO = Decimal("0.00")
+CONCESSION_BATCH_SIZE = 1000
+# Students who have left are never billed
+EXCLUDED_STATUSES = [StudentStatus.INACTIVE, StudentStatus.ALUMNI]
+
+
+class FeeAssignmentService:
+    """Service for bulk fee assignment"""
+
+    @staticmethod
+    def category_slabs(session: Session, structure: FeeStructure) -> Dict[ScholarshipCategory, ScholarshipSlab]:
+        """
+        The active scholarship slab for each student category
+
+        A slab applies when its program and academic year are unset or
+        match the structure; a program- or year-specific slab wins over a
+        general one.
+        """
+        academic_year_id = session.exec(
+            select(AcademicYear.id).where(AcademicYear.name == structure.academic_year)
+        ).first()
+        slabs = session.exec(
+            select(ScholarshipSlab)
+            .where(ScholarshipSlab.is_active == True)  # noqa: E712
+            .where(ScholarshipSlab.scholarship_category.is_not(None))
+        ).all()
+        eligible = [
+            s for s in slabs
+            if s.program_id in (None, structure.program_id) and s.academic_year_id in (None, academic_year_id)
+        ]
+        by_category = {}
+        for slab in sorted(eligible, key=lambda s: (s.program_id is not None, s.academic_year_id is not None, s.id)):
+            by_category[ScholarshipCategory(slab.scholarship_category)] = slab
+        return by_category
+
+    @staticmethod
+    def slab_concession(session: Session, structure: FeeStructure, slab: ScholarshipSlab) -> Decimal:
+        """
+        Concession a slab gives on a structure
+
+        Percentage slabs apply to the components named by the slab's fee
+        heads (the whole fee when it names none), capped at
+        max_discount_amount. Never more than the fee itself.
+        """
+        if slab.discount_type == "FIXED":
+            amount = slab.discount_value
+        else:
+            base = structure.total_amount
+            if slab.applicable_fee_heads:
+                heads = session.exec(
+                    select(FeeHead.name).where(FeeHead.code.in_(slab.applicable_fee_heads))
+                ).all()
+                base = session.exec(
+                    select(func.coalesce(func.sum(FeeComponent.amount), 0))
+                    .where(FeeComponent.fee_structure_id == structure.id)
+                    .where(FeeComponent.name.in_(heads))
+                ).one()
+            amount = Decimal(base) * slab.discount_value / 100
+        if slab.max_discount_amount is not None:
+            amount = min(amount, slab.max_discount_amount)
+        return min(Decimal(amount), structure.total_amount).quantize(ZERO)
+
+    @staticmethod
+    def assignment_query(
+        structure: FeeStructure,
+        concessions: Dict[ScholarshipCategory, Decimal],
+        slab_names: Dict[ScholarshipCategory, str],
+        batch_id: Optional[int] = None,
+        program_year_id: Optional[int] = None,
+        new_only: bool = True
+    ) -> Select:
+        """
+        Students in scope with the fee they would be assigned, as one SELECT
+
+        In scope: the structure's program and year of study, within the
+        batch and/or program year, not inactive or alumni. With new_only,
+        students already holding this structure are left out, which makes
+        re-running an assignment a no-op.
+        """
+        money = DECIMAL(10, 2)
+        concession = (
+            case(
+                {category: literal(amount, money) for category, amount in concessions.items()},
+                value=Student.scholarship_category,
+                else_=literal(ZERO, money),
+            )
+            if concessions else literal(ZERO, money)
+        )
+        concession_type = (
+            case(slab_names, value=Student.scholarship_category, else_=None)
+            if slab_names else literal(None)
+        )
+        stmt = (
+            select(
+                Student.id.label("student_id"),
+                Student.admission_number,
+                Student.name.label("student_name"),
+                Student.scholarship_category,
+                literal(structure.total_amount, money).label("total_fee"),
+                concession.label("concession_amount"),
+                concession_type.label("concession_type"),
+            )
+            .join(ProgramYear, ProgramYear.id == Student.program_year_id)
+            .where(Student.program_id == structure.program_id)
+            .where(ProgramYear.year_no == structure.year)
+            .where(Student.status.notin_(EXCLUDED_STATUSES))
+        )
+        if batch_id:
+            stmt = stmt.where(Student.batch_id == batch_id)
+        if program_year_id:
+            stmt = stmt.where(Student.program_year_id == program_year_id)
+        if new_only:
+            stmt = stmt.where(~exists().where(
+                StudentFee.student_id == Student.id,
+                StudentFee.fee_structure_id == structure.id,
+            ))
+        return stmt.order_by(Student.id)
+
+    @staticmethod
+    def bulk_assign(
+        session: Session,
+        request: BulkStudentFeeCreate,
+        approved_by: Optional[str] = None,
+        now: Optional[datetime] = None
+    ) -> BulkStudentFeeResult:
+        """
+        Assign a fee structure to a batch or program year
+
+        Counts and a preview of the new assignments are computed first; on
+        a dry run nothing is written. Otherwise the fee records are created
+        with one INSERT ... SELECT, slab concessions are recorded the same
+        way, and their ledgers are opened. The caller commits.
+        """
+        now = now or datetime.utcnow()
+        structure = session.get(FeeStructure, request.fee_structure_id)
+        if not structure:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Fee structure not found")
+        FeeAssignmentService._check_scope(session, structure, request.batch_id, request.program_year_id)
+
+        slabs = FeeAssignmentService.category_slabs(session, structure)
+        concessions = {
+            category: FeeAssignmentService.slab_concession(session, structure, slab)
+            for category, slab in slabs.items()
+        }
+        slab_names = {category: slab.name for category, slab in slabs.items()}
+        percentages = {
+            category: slab.discount_value for category, slab in slabs.items()
+            if slab.discount_type != "FIXED"
+        }
+        scope = dict(batch_id=request.batch_id, program_year_id=request.program_year_id)
+        source = FeeAssignmentService.assignment_query(structure, concessions, slab_names, **scope)
+
+        matched = session.exec(
+            select(func.count()).select_from(
+                FeeAssignmentService.assignment_query(structure, {}, {}, new_only=False, **scope).subquery()
+            )
+        ).one()
+        pending = source.subquery()
+        categories = [
+            BulkStudentFeeCategory(
+                scholarship_category=category.value if isinstance(category, ScholarshipCategory) else category,
+                students=students,
+                concession_amount=Decimal(amount).quantize(ZERO),
+            )
+            for category, students, amount in session.exec(
+                select(
+                    pending.c.scholarship_category,
+                    func.count(),
+                    func.coalesce(func.sum(pending.c.concession_amount), 0),
+                )
+                .group_by(pending.c.scholarship_category)
+                .order_by(pending.c.scholarship_category)
+            ).all()
+        ]
+        assigned = sum(c.students for c in categories)
+        preview = [
+            BulkStudentFeeRow(
+                student_id=row.student_id,
+                admission_number=row.admission_number,
+                student_name=row.student_name,
+                scholarship_category=row.scholarship_category.value,
+                total_fee=row.total_fee,
+                concession_amount=row.concession_amount,
+                concession_type=row.concession_type,
+            )
+            for row in session.exec(source.limit(request.preview_limit)).all()
+        ] if request.preview_limit else []
+
+        if not request.dry_run and assigned:
+            FeeAssignmentService._insert(session, structure, source, slab_names, percentages, approved_by, now)
+
+        return BulkStudentFeeResult(
+            fee_structure_id=structure.id,
+            dry_run=request.dry_run,
+            matched_count=matched,
+            assigned_count=assigned,
+            already_assigned_count=matched - assigned,
+            total_fee=(structure.total_amount * assigned).quantize(ZERO),
+            total_concession=sum((c.concession_amount for c in categories), ZERO),
+            categories=categories,
+            preview=preview,
+        )
+
+    @staticmethod
+    def _check_scope(
+        session: Session, structure: FeeStructure, batch_id: Optional[int], program_year_id: Optional[int]
+    ) -> None:
+        """The batch and program year must exist and belong to the structure's program and year"""
+        if not batch_id and not program_year_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Either batch_id or program_year_id is required"
+            )
+        if batch_id:
+            batch = session.get(AcademicBatch, batch_id)
+            if not batch:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Batch not found")
+            if batch.program_id != structure.program_id:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Batch belongs to a different program than the fee structure"
+                )
+        if program_year_id:
+            program_year = session.get(ProgramYear, program_year_id)
+            if not program_year:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Program year not found")
+            if batch_id and program_year.batch_id != batch_id:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Program year does not belong to the batch"
+                )
+            if program_year.year_no != structure.year:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Fee structure is for year {structure.year}, program year is year {program_year.year_no}"
+                )
+
+    @staticmethod
+    def _insert(
+        session: Session,
+        structure: FeeStructure,
+        source: Select,
+        slab_names: Dict[ScholarshipCategory, str],
+        percentages: Dict[ScholarshipCategory, Decimal],
+        approved_by: Optional[str],
+        now: datetime
+    ) -> List[int]:
+        """Create the fee records, their concessions and ledgers; returns the new ids"""
+        rows = source.order_by(None).subquery()
+        table = StudentFee.__table__
+        stmt = insert(table).from_select(
+            [
+                "student_id", "fee_structure_id", "academic_year", "total_fee", "concession_amount",
+                "fine_amount", "paid_amount", "balance", "is_blocked", "created_at", "updated_at",
+            ],
+            select(
+                rows.c.student_id,
+                literal(structure.id),
+                literal(structure.academic_year),
+                rows.c.total_fee,
+                rows.c.concession_amount,
+                literal(ZERO, DECIMAL(10, 2)),
+                literal(ZERO, DECIMAL(10, 2)),
+                literal(ZERO, DECIMAL(10, 2)),
+                literal(False),
+                literal(now),
+                literal(now),
+            )
+        )
+        if session.get_bind().dialect.insert_returning:
+            fee_ids = session.execute(stmt.returning(table.c.id)).scalars().all()
+        else:
+            # No INSERT ... RETURNING (MySQL): read the ids back by student.
+            # source skips students who have this fee, so read them first
+            student_ids = session.execute(select(rows.c.student_id)).scalars().all()
+            session.execute(stmt)
+            fee_ids = session.execute(
+                select(table.c.id)
+                .where(table.c.fee_structure_id == structure.id)
+                .where(table.c.student_id.in_(student_ids))
+                .order_by(table.c.id)
+            ).scalars().all()
+
+        if slab_names:
+            # Keyed on the student again: source no longer matches once the fees exist
+            concession_type = case(slab_names, value=Student.scholarship_category, else_=None)
+            percentage = (
+                case(
+                    {category: literal(value, DECIMAL(5, 2)) for category, value in percentages.items()},
+                    value=Student.scholarship_category,
+                    else_=None,
+                )
+                if percentages else literal(None)
+            )
+            concession_table = FeeConcession.__table__
+            for start in range(0, len(fee_ids), CONCESSION_BATCH_SIZE):
+                batch = fee_ids[start:start + CONCESSION_BATCH_SIZE]
+                session.execute(insert(concession_table).from_select(
+                    [
+                        "student_fee_id", "concession_type", "amount", "percentage",
+                        "approved_by", "approved_at", "remarks", "created_at",
+                    ],
+                    select(
+                        StudentFee.id,
+                        concession_type,
+                        StudentFee.concession_amount,
+                        percentage,
+                        literal(approved_by),
+                        literal(now),
+                        literal("Scholarship slab applied on bulk assignment"),
+                        literal(now),
+                    )
+                    .join(Student, Student.id == StudentFee.student_id)
+                    .where(StudentFee.id.in_(batch))
+                    .where(StudentFee.concession_amount > 0)
+                ))
+
+        FeeLedgerService.open_accounts(session, structure.id, fee_ids, now)
+        return fee_ids
@@ -0,0 +1,491 @@
+"""
+Fee Ledger Service
+Per-student fee accounts: ledger postings, installment allocation and the
+per-structure outstanding rollup
+"""
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import DECIMAL, bindparam, case, delete, insert, literal, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, select, func
+
+from app.models.fee import (
+    FeeConcession,
+    FeeFine,
+    FeeInstallment,
+    FeeLedgerEntry,
+    FeeOutstanding,
+    FeePayment,
+    FeeStructure,
+    LedgerEntryType,
+    PaymentStatus,
+    StudentFee,
+    StudentFeeInstallment,
+)
+
+ZERO = Decimal("0.00")
+CREDIT_TYPES = {LedgerEntryType.PAYMENT, LedgerEntryType.CONCESSION}
+REBUILD_BATCH_SIZE = 1000
+
+
+def _allocate(installments: Iterable, amount: Decimal) -> Decimal:
+    """Apply a credit to installments in due-date order; returns the unallocated rest"""
+    for installment in sorted(installments, key=lambda i: (i.due_date, i.installment_number)):
+        if amount <= 0:
+            break
+        applied = min(installment.amount - installment.allocated_amount, amount)
+        if applied > 0:
+            installment.allocated_amount += applied
+            amount -= applied
+    return amount
+
+
+class FeeLedgerService:
+    """Service for fee ledger postings and balances"""
+
+    @staticmethod
+    def open_account(session: Session, student_fee: StudentFee, now: Optional[datetime] = None) -> None:
+        """
+        Bill a newly assigned fee
+
+        Copies the structure's installment schedule to the student and
+        debits each installment, plus any part of total_fee the schedule
+        does not cover. student_fee must be flushed; the caller commits.
+        """
+        now = now or datetime.utcnow()
+        schedule = session.exec(
+            select(FeeInstallment)
+            .where(FeeInstallment.fee_structure_id == student_fee.fee_structure_id)
+            .order_by(FeeInstallment.installment_number)
+        ).all()
+        for installment in schedule:
+            session.add(StudentFeeInstallment(
+                student_fee_id=student_fee.id,
+                installment_number=installment.installment_number,
+                due_date=installment.due_date,
+                amount=installment.amount,
+                allocated_amount=ZERO,
+            ))
+            FeeLedgerService.post(
+                session, student_fee, LedgerEntryType.INSTALLMENT, installment.amount,
+                installment_number=installment.installment_number, now=now
+            )
+        unscheduled = student_fee.total_fee - sum((i.amount for i in schedule), ZERO)
+        if unscheduled > 0:
+            FeeLedgerService.post(session, student_fee, LedgerEntryType.INSTALLMENT, unscheduled, now=now)
+
+    @staticmethod
+    def open_accounts(
+        session: Session, fee_structure_id: int, student_fee_ids: List[int], now: Optional[datetime] = None
+    ) -> None:
+        """
+        Bill newly inserted fees of one structure and post their concessions
+
+        The set-based open_account for bulk assignment: per batch, each
+        installment is copied and billed with one INSERT ... SELECT, the
+        concessions already recorded (at most one per fee) are credited
+        and allocated to the earliest-due installments, and balances are
+        set with one UPDATE. Only these accounts' totals are added to the
+        outstanding rollup. The caller commits.
+        """
+        now = now or datetime.utcnow()
+        schedule = session.exec(
+            select(FeeInstallment)
+            .where(FeeInstallment.fee_structure_id == fee_structure_id)
+            .order_by(FeeInstallment.installment_number)
+        ).all()
+        # Credits allocated to earlier-due installments before each one
+        allocated_before, running = {}, ZERO
+        for installment in sorted(schedule, key=lambda i: (i.due_date, i.installment_number)):
+            allocated_before[installment.installment_number] = running
+            running += installment.amount
+        scheduled = literal(running, DECIMAL(10, 2))
+
+        fee = StudentFee.__table__
+        ledger = FeeLedgerEntry.__table__
+        concession = FeeConcession.__table__
+        entry_columns = [
+            "student_fee_id", "entry_type", "debit", "credit", "balance",
+            "installment_number", "reference_id", "created_at",
+        ]
+        billed = case((fee.c.total_fee > scheduled, fee.c.total_fee), else_=scheduled)
+        billed_total = credited_total = ZERO
+        for start in range(0, len(student_fee_ids), REBUILD_BATCH_SIZE):
+            batch = student_fee_ids[start:start + REBUILD_BATCH_SIZE]
+            balance = ZERO
+            for installment in schedule:
+                amount = literal(installment.amount, DECIMAL(10, 2))
+                before = allocated_before[installment.installment_number]
+                balance += installment.amount
+                session.execute(insert(StudentFeeInstallment.__table__).from_select(
+                    ["student_fee_id", "installment_number", "due_date", "amount", "allocated_amount"],
+                    select(
+                        fee.c.id,
+                        literal(installment.installment_number),
+                        literal(installment.due_date),
+                        amount,
+                        case(
+                            (fee.c.concession_amount <= before, literal(ZERO, DECIMAL(10, 2))),
+                            (fee.c.concession_amount >= before + installment.amount, amount),
+                            else_=fee.c.concession_amount - before,
+                        ),
+                    ).where(fee.c.id.in_(batch))
+                ))
+                session.execute(insert(ledger).from_select(entry_columns, select(
+                    fee.c.id,
+                    literal(LedgerEntryType.INSTALLMENT, ledger.c.entry_type.type),
+                    amount,
+                    literal(ZERO, DECIMAL(10, 2)),
+                    literal(balance, DECIMAL(10, 2)),
+                    literal(installment.installment_number),
+                    literal(None),
+                    literal(now),
+                ).where(fee.c.id.in_(batch))))
+            # Whatever part of total_fee the schedule does not cover
+            session.execute(insert(ledger).from_select(entry_columns, select(
+                fee.c.id,
+                literal(LedgerEntryType.INSTALLMENT, ledger.c.entry_type.type),
+                fee.c.total_fee - scheduled,
+                literal(ZERO, DECIMAL(10, 2)),
+                fee.c.total_fee,
+                literal(None),
+                literal(None),
+                literal(now),
+            ).where(fee.c.id.in_(batch)).where(fee.c.total_fee > scheduled)))
+            session.execute(insert(ledger).from_select(entry_columns, select(
+                fee.c.id,
+                literal(LedgerEntryType.CONCESSION, ledger.c.entry_type.type),
+                literal(ZERO, DECIMAL(10, 2)),
+                concession.c.amount,
+                billed - concession.c.amount,
+                literal(None),
+                concession.c.id,
+                literal(now),
+            ).join(concession, concession.c.student_fee_id == fee.c.id).where(fee.c.id.in_(batch))))
+            session.execute(
+                update(fee).where(fee.c.id.in_(batch)).values(balance=billed - fee.c.concession_amount)
+            )
+            batch_billed, batch_credited = session.execute(
+                select(
+                    func.coalesce(func.sum(billed), 0),
+                    func.coalesce(func.sum(fee.c.concession_amount), 0),
+                ).where(fee.c.id.in_(batch))
+            ).one()
+            billed_total += Decimal(batch_billed).quantize(ZERO)
+            credited_total += Decimal(batch_credited).quantize(ZERO)
+
+        if student_fee_ids:
+            FeeLedgerService._add_to_outstanding(session, fee_structure_id, billed_total, credited_total, now)
+
+    @staticmethod
+    def post(
+        session: Session,
+        student_fee: StudentFee,
+        entry_type: LedgerEntryType,
+        amount: Decimal,
+        installment_number: Optional[int] = None,
+        reference_id: Optional[int] = None,
+        now: Optional[datetime] = None
+    ) -> FeeLedgerEntry:
+        """
+        Append a ledger entry and update everything derived from it
+
+        The balance moves with a relative UPDATE ... RETURNING, or on
+        dialects without it (MySQL) a SELECT ... FOR UPDATE, the update and
+        a read back. Either way the account row is locked, so concurrent
+        postings to one student serialize and each entry records the
+        balance after it.
+        Credits are allocated to installments, and the structure's
+        outstanding total moves by the same amount. The caller commits.
+        """
+        now = now or datetime.utcnow()
+        is_credit = entry_type in CREDIT_TYPES
+        delta = -amount if is_credit else amount
+
+        session.flush()
+        table = StudentFee.__table__
+        stmt = update(table).where(table.c.id == student_fee.id).values(balance=table.c.balance + delta)
+        if session.get_bind().dialect.update_returning:
+            balance = session.execute(stmt.returning(table.c.balance)).scalar_one()
+        else:
+            # No UPDATE ... RETURNING (MySQL): lock the row so the balance
+            # read back is the one this update produced
+            session.execute(select(table.c.id).where(table.c.id == student_fee.id).with_for_update())
+            session.execute(stmt)
+            balance = session.execute(select(table.c.balance).where(table.c.id == student_fee.id)).scalar_one()
+        session.expire(student_fee, ["balance"])
+
+        entry = FeeLedgerEntry(
+            student_fee_id=student_fee.id,
+            entry_type=entry_type,
+            debit=ZERO if is_credit else amount,
+            credit=amount if is_credit else ZERO,
+            balance=balance,
+            installment_number=installment_number,
+            reference_id=reference_id,
+            created_at=now,
+        )
+        session.add(entry)
+
+        if is_credit:
+            installments = session.exec(
+                select(StudentFeeInstallment)
+                .where(StudentFeeInstallment.student_fee_id == student_fee.id)
+                .where(StudentFeeInstallment.allocated_amount < StudentFeeInstallment.amount)
+            ).all()
+            _allocate(installments, amount)
+
+        FeeLedgerService._add_to_outstanding(
+            session, student_fee.fee_structure_id, entry.debit, entry.credit, now
+        )
+        return entry
+
+    @staticmethod
+    def _add_to_outstanding(
+        session: Session, fee_structure_id: int, debit: Decimal, credit: Decimal, now: datetime
+    ) -> None:
+        """Move a structure's running totals with relative updates"""
+        table = FeeOutstanding.__table__
+        row = {
+            "fee_structure_id": fee_structure_id,
+            "billed": debit,
+            "credited": credit,
+            "outstanding": debit - credit,
+            "updated_at": now,
+        }
+        result = session.execute(
+            update(table)
+            .where(table.c.fee_structure_id == fee_structure_id)
+            .values(
+                billed=table.c.billed + debit,
+                credited=table.c.credited + credit,
+                outstanding=table.c.outstanding + (debit - credit),
+                updated_at=now,
+            )
+        )
+        if result.rowcount:
+            return
+        if session.get_bind().dialect.name == "postgresql":
+            # Another transaction may have created the row since the update
+            stmt = pg_insert(table).values(row)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.fee_structure_id],
+                set_={
+                    "billed": table.c.billed + stmt.excluded.billed,
+                    "credited": table.c.credited + stmt.excluded.credited,
+                    "outstanding": table.c.outstanding + stmt.excluded.outstanding,
+                    "updated_at": stmt.excluded.updated_at,
+                }
+            )
+            session.execute(stmt)
+            return
+        session.execute(insert(table), [row])
+
+    @staticmethod
+    def get_installments(session: Session, student_fee_id: int) -> List[dict]:
+        """A student's installments with allocated amounts and status, in due-date order"""
+        installments = session.exec(
+            select(StudentFeeInstallment)
+            .where(StudentFeeInstallment.student_fee_id == student_fee_id)
+            .order_by(StudentFeeInstallment.due_date, StudentFeeInstallment.installment_number)
+        ).all()
+        return [
+            {
+                "installment_number": i.installment_number,
+                "amount": float(i.amount),
+                "due_date": i.due_date.isoformat(),
+                "paid_amount": float(i.allocated_amount),
+                "status": (
+                    "paid" if i.allocated_amount >= i.amount
+                    else "partial" if i.allocated_amount > 0
+                    else "pending"
+                ),
+            }
+            for i in installments
+        ]
+
+    @staticmethod
+    def get_outstanding(
+        session: Session,
+        academic_year: Optional[str] = None,
+        program_id: Optional[int] = None,
+        use_ledger: bool = False
+    ) -> Dict[str, Decimal]:
+        """
+        Billed, credited and outstanding totals across the campus
+
+        From the fee_outstanding rollup (one row per fee structure) when
+        use_ledger is set, otherwise summed over every student's fee.
+        """
+        if use_ledger:
+            stmt = select(
+                func.coalesce(func.sum(FeeOutstanding.billed), 0),
+                func.coalesce(func.sum(FeeOutstanding.credited), 0),
+                func.coalesce(func.sum(FeeOutstanding.outstanding), 0),
+            ).join(FeeStructure, FeeStructure.id == FeeOutstanding.fee_structure_id)
+        else:
+            stmt = select(
+                func.coalesce(func.sum(StudentFee.total_fee + StudentFee.fine_amount), 0),
+                func.coalesce(func.sum(StudentFee.paid_amount + StudentFee.concession_amount), 0),
+                func.coalesce(func.sum(
+                    StudentFee.total_fee - StudentFee.concession_amount
+                    + StudentFee.fine_amount - StudentFee.paid_amount
+                ), 0),
+            ).join(FeeStructure, FeeStructure.id == StudentFee.fee_structure_id)
+        if academic_year:
+            stmt = stmt.where(FeeStructure.academic_year == academic_year)
+        if program_id:
+            stmt = stmt.where(FeeStructure.program_id == program_id)
+        billed, credited, outstanding = session.exec(stmt).one()
+        return {
+            "billed": Decimal(billed).quantize(ZERO),
+            "credited": Decimal(credited).quantize(ZERO),
+            "outstanding": Decimal(outstanding).quantize(ZERO),
+        }
+
+    @staticmethod
+    def rebuild(session: Session, student_fee_ids: Optional[List[int]] = None) -> int:
+        """
+        Recompute ledgers, allocations and balances from fee records
+
+        Each account is billed at its creation, then successful payments,
+        concessions and unwaived fines are replayed in time order. The
+        outstanding rollup of every affected structure is then re-summed
+        from the ledger. The caller owns the transaction and must commit.
+
+        Returns:
+            Number of ledger entries written
+        """
+        fee_query = select(StudentFee.id).order_by(StudentFee.id)
+        if student_fee_ids is not None:
+            fee_query = fee_query.where(StudentFee.id.in_(student_fee_ids))
+        fee_ids = session.exec(fee_query).all()
+
+        schedules: Dict[int, List[FeeInstallment]] = defaultdict(list)
+        for installment in session.exec(select(FeeInstallment).order_by(FeeInstallment.installment_number)):
+            schedules[installment.fee_structure_id].append(installment)
+
+        written = 0
+        structure_ids = set()
+        for start in range(0, len(fee_ids), REBUILD_BATCH_SIZE):
+            batch = fee_ids[start:start + REBUILD_BATCH_SIZE]
+            session.execute(delete(FeeLedgerEntry).where(FeeLedgerEntry.student_fee_id.in_(batch)))
+            session.execute(delete(StudentFeeInstallment).where(StudentFeeInstallment.student_fee_id.in_(batch)))
+            fees = session.exec(select(StudentFee).where(StudentFee.id.in_(batch))).all()
+            events = FeeLedgerService._credit_and_fine_events(session, batch)
+
+            entries, installment_rows, balances = [], [], []
+            for fee in fees:
+                structure_ids.add(fee.fee_structure_id)
+                installments = [
+                    StudentFeeInstallment(
+                        student_fee_id=fee.id, installment_number=i.installment_number,
+                        due_date=i.due_date, amount=i.amount, allocated_amount=ZERO,
+                    )
+                    for i in schedules[fee.fee_structure_id]
+                ]
+                balance = ZERO
+                billed = [(i.amount, i.installment_number) for i in installments]
+                unscheduled = fee.total_fee - sum((i.amount for i in installments), ZERO)
+                if unscheduled > 0:
+                    billed.append((unscheduled, None))
+                for amount, number in billed:
+                    balance += amount
+                    entries.append(_entry_row(fee.id, LedgerEntryType.INSTALLMENT, amount, balance, number, None, fee.created_at))
+                for when, entry_type, amount, number, reference_id in sorted(events.get(fee.id, []), key=lambda e: (e[0], e[4])):
+                    if entry_type in CREDIT_TYPES:
+                        balance -= amount
+                        _allocate(installments, amount)
+                    else:
+                        balance += amount
+                    entries.append(_entry_row(fee.id, entry_type, amount, balance, number, reference_id, when))
+                installment_rows.extend(
+                    {c: getattr(i, c) for c in ("student_fee_id", "installment_number", "due_date", "amount", "allocated_amount")}
+                    for i in installments
+                )
+                balances.append({"b_id": fee.id, "b_balance": balance})
+
+            if entries:
+                session.execute(insert(FeeLedgerEntry.__table__), entries)
+            if installment_rows:
+                session.execute(insert(StudentFeeInstallment.__table__), installment_rows)
+            if balances:
+                table = StudentFee.__table__
+                session.execute(
+                    update(table).where(table.c.id == bindparam("b_id")).values(balance=bindparam("b_balance")),
+                    balances
+                )
+            session.expire_all()
+            written += len(entries)
+
+        FeeLedgerService._rebuild_outstanding(session, structure_ids)
+        return written
+
+    @staticmethod
+    def _credit_and_fine_events(session: Session, fee_ids: List[int]) -> Dict[int, List[tuple]]:
+        """(time, type, amount, installment_number, reference_id) per account"""
+        events: Dict[int, List[tuple]] = defaultdict(list)
+        for p in session.exec(
+            select(FeePayment)
+            .where(FeePayment.student_fee_id.in_(fee_ids))
+            .where(FeePayment.payment_status == PaymentStatus.SUCCESS)
+        ):
+            events[p.student_fee_id].append((p.payment_date or p.created_at, LedgerEntryType.PAYMENT, p.amount, None, p.id))
+        for c in session.exec(select(FeeConcession).where(FeeConcession.student_fee_id.in_(fee_ids))):
+            events[c.student_fee_id].append((c.approved_at or c.created_at, LedgerEntryType.CONCESSION, c.amount, None, c.id))
+        for f in session.exec(
+            select(FeeFine).where(FeeFine.student_fee_id.in_(fee_ids)).where(FeeFine.waived == False)  # noqa: E712
+        ):
+            events[f.student_fee_id].append((f.created_at, LedgerEntryType.FINE, f.fine_amount, f.installment_number, f.id))
+        return events
+
+    @staticmethod
+    def _rebuild_outstanding(session: Session, structure_ids: Iterable[int]) -> None:
+        """Re-sum fee_outstanding for the given structures from the ledger"""
+        structure_ids = list(structure_ids)
+        if not structure_ids:
+            return
+        table = FeeOutstanding.__table__
+        session.execute(delete(table).where(table.c.fee_structure_id.in_(structure_ids)))
+        billed = func.coalesce(func.sum(FeeLedgerEntry.debit), 0)
+        credited = func.coalesce(func.sum(FeeLedgerEntry.credit), 0)
+        source = (
+            select(
+                StudentFee.fee_structure_id,
+                billed,
+                credited,
+                billed - credited,
+                func.max(FeeLedgerEntry.created_at),
+            )
+            .join(FeeLedgerEntry, FeeLedgerEntry.student_fee_id == StudentFee.id)
+            .where(StudentFee.fee_structure_id.in_(structure_ids))
+            .group_by(StudentFee.fee_structure_id)
+        )
+        session.execute(insert(table).from_select(
+            ["fee_structure_id", "billed", "credited", "outstanding", "updated_at"], source
+        ))
+
+
+def _entry_row(
+    student_fee_id: int,
+    entry_type: LedgerEntryType,
+    amount: Decimal,
+    balance: Decimal,
+    installment_number: Optional[int],
+    reference_id: Optional[int],
+    created_at: datetime
+) -> dict:
+    is_credit = entry_type in CREDIT_TYPES
+    return {
+        "student_fee_id": student_fee_id,
+        "entry_type": entry_type.name,
+        "debit": ZERO if is_credit else amount,
+        "credit": amount if is_credit else ZERO,
+        "balance": balance,
+        "installment_number": installment_number,
+        "reference_id": reference_id,
+        "created_at": created_at,
+    }
@@ -0,0 +1,380 @@
+"""
+Fee Service
+Aggregated fee reports and the daily collection rollup
+"""
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import List, Optional, Sequence
+
+from sqlalchemy import Date, Integer, and_, case, cast, delete, insert, literal, literal_column, type_coerce, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.sql import Select
+from sqlmodel import Session, select, func
+
+from app.models.fee import (
+    FeeCollectionDaily,
+    FeeComponent,
+    FeeStructure,
+    FeeInstallment,
+    StudentFee,
+    FeePayment,
+    PaymentStatus,
+)
+from app.models.program import Program
+from app.models.student import Student
+from app.schemas.fee import FeeCollectionReport, FeeCollectionRow, FeeDefaulter
+
+COLLECTION_PERIODS = ("day", "week", "month")
+# Fee head for payments on structures with no components to split across
+UNALLOCATED_FEE_HEAD = "Unallocated"
+
+
+def _days_between(session: Session, later: date, earlier):
+    """Whole days from a date column to a fixed date, in the bound dialect"""
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        # date - date is an integer number of days
+        return literal(later) - earlier
+    if dialect in ("mysql", "mariadb"):
+        return func.datediff(literal(later), earlier)
+    # SQLite
+    return cast(func.julianday(later.isoformat()) - func.julianday(earlier), Integer)
+
+
+def _period_start(session: Session, column, period: str):
+    """First day of the day, week (from Monday) or month a date or timestamp column falls in"""
+    # Inlined rather than bound so GROUP BY matches the selected expression
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        if period == "day":
+            return cast(column, Date)
+        return cast(func.date_trunc(literal_column(f"'{period}'"), column), Date)
+    if dialect in ("mysql", "mariadb"):
+        start = func.date(column)
+        if period == "week":
+            # WEEKDAY() is 0 on Monday
+            start = func.subdate(start, func.weekday(column))
+        elif period == "month":
+            start = func.subdate(start, func.dayofmonth(column) - literal_column("1"))
+        return type_coerce(start, Date)
+    # SQLite date modifiers
+    modifiers = {"day": [], "week": ["'weekday 0'", "'-6 days'"], "month": ["'start of month'"]}[period]
+    return type_coerce(func.date(column, *[literal_column(m) for m in modifiers]), Date)
+
+
+def to_money(value) -> Decimal:
+    return Decimal(str(value or 0)).quantize(Decimal("0.01"))
+
+
+def to_date(value: Optional[datetime]) -> Optional[date]:
+    return value.date() if value else None
+
+
+class FeeService:
+    """Service for fee reporting and collection analytics"""
+
+    @staticmethod
+    def defaulters_query(
+        session: Session,
+        academic_year: Optional[str] = None,
+        program_id: Optional[int] = None,
+        overdue_only: bool = False,
+        as_of: Optional[date] = None
+    ) -> Select:
+        """
+        Students with a pending balance, as one statement
+
+        Payments (plus concessions) are applied to installments in order,
+        so an installment is overdue when its due date has passed and the
+        running total up to it is not yet covered. Days overdue count from
+        the oldest such installment. Most overdue students come first.
+        """
+        as_of = as_of or date.today()
+
+        installments = select(
+            FeeInstallment.fee_structure_id,
+            FeeInstallment.due_date,
+            func.sum(FeeInstallment.amount).over(
+                partition_by=FeeInstallment.fee_structure_id,
+                order_by=FeeInstallment.installment_number,
+            ).label("cumulative_amount"),
+        ).subquery()
+
+        overdue = (
+            select(
+                StudentFee.id.label("student_fee_id"),
+                func.count().label("overdue_installments"),
+                func.min(installments.c.due_date).label("oldest_due_date"),
+            )
+            .join(installments, installments.c.fee_structure_id == StudentFee.fee_structure_id)
+            .where(installments.c.due_date < as_of)
+            .where(installments.c.cumulative_amount > StudentFee.paid_amount + StudentFee.concession_amount)
+            .group_by(StudentFee.id)
+            .subquery()
+        )
+
+        last_payments = (
+            select(
+                FeePayment.student_fee_id,
+                func.max(FeePayment.payment_date).label("last_payment_date"),
+            )
+            .where(FeePayment.payment_status == PaymentStatus.SUCCESS)
+            .group_by(FeePayment.student_fee_id)
+            .subquery()
+        )
+
+        total_due = (
+            StudentFee.total_fee
+            - StudentFee.concession_amount
+            + StudentFee.fine_amount
+            - StudentFee.paid_amount
+        )
+        days_overdue = func.coalesce(_days_between(session, as_of, overdue.c.oldest_due_date), 0)
+
+        stmt = (
+            select(
+                Student.id.label("student_id"),
+                Student.name.label("student_name"),
+                Student.admission_number,
+                func.coalesce(Program.name, "Unknown").label("program"),
+                FeeStructure.year,
+                total_due.label("total_due"),
+                func.coalesce(overdue.c.overdue_installments, 0).label("overdue_installments"),
+                last_payments.c.last_payment_date,
+                days_overdue.label("days_overdue"),
+            )
+            .select_from(StudentFee)
+            .join(Student, Student.id == StudentFee.student_id)
+            .join(FeeStructure, FeeStructure.id == StudentFee.fee_structure_id)
+            .outerjoin(Program, Program.id == Student.program_id)
+            .outerjoin(overdue, overdue.c.student_fee_id == StudentFee.id)
+            .outerjoin(last_payments, last_payments.c.student_fee_id == StudentFee.id)
+            .where(total_due > 0)
+        )
+        if academic_year:
+            stmt = stmt.where(StudentFee.academic_year == academic_year)
+        if program_id:
+            stmt = stmt.where(Student.program_id == program_id)
+        if overdue_only:
+            stmt = stmt.where(overdue.c.overdue_installments > 0)
+
+        return stmt.order_by(days_overdue.desc(), total_due.desc(), Student.id)
+
+    @staticmethod
+    def get_defaulters(
+        session: Session,
+        academic_year: Optional[str] = None,
+        program_id: Optional[int] = None,
+        overdue_only: bool = False,
+        as_of: Optional[date] = None,
+        skip: int = 0,
+        limit: Optional[int] = None
+    ) -> List[FeeDefaulter]:
+        """One page of defaulters_query, most overdue first"""
+        stmt = FeeService.defaulters_query(
+            session,
+            academic_year=academic_year,
+            program_id=program_id,
+            overdue_only=overdue_only,
+            as_of=as_of,
+        ).offset(skip)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+
+        return [
+            FeeDefaulter(
+                **{
+                    **row,
+                    "total_due": to_money(row["total_due"]),
+                    "last_payment_date": to_date(row["last_payment_date"]),
+                }
+            )
+            for row in session.exec(stmt).mappings()
+        ]
+
+    @staticmethod
+    def record_collection(
+        session: Session, payment: FeePayment, fee_structure_id: int, now: Optional[datetime] = None
+    ) -> None:
+        """Add a successful payment to fee_collection_daily with a relative update; the caller commits"""
+        now = now or datetime.utcnow()
+        table = FeeCollectionDaily.__table__
+        collection_date = (payment.payment_date or now).date()
+        result = session.execute(
+            update(table)
+            .where(table.c.collection_date == collection_date)
+            .where(table.c.fee_structure_id == fee_structure_id)
+            .where(table.c.payment_mode == payment.payment_mode)
+            .values(
+                amount=table.c.amount + payment.amount,
+                payment_count=table.c.payment_count + 1,
+                updated_at=now,
+            )
+        )
+        if result.rowcount:
+            return
+        row = {
+            "collection_date": collection_date,
+            "fee_structure_id": fee_structure_id,
+            "payment_mode": payment.payment_mode,
+            "amount": payment.amount,
+            "payment_count": 1,
+            "updated_at": now,
+        }
+        if session.get_bind().dialect.name == "postgresql":
+            # Another transaction may have created the row since the update
+            stmt = pg_insert(table).values(row)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.collection_date, table.c.fee_structure_id, table.c.payment_mode],
+                set_={
+                    "amount": table.c.amount + stmt.excluded.amount,
+                    "payment_count": table.c.payment_count + stmt.excluded.payment_count,
+                    "updated_at": stmt.excluded.updated_at,
+                }
+            )
+            session.execute(stmt)
+            return
+        session.execute(insert(table), [row])
+
+    @staticmethod
+    def rebuild_collection_rollup(
+        session: Session, start_date: Optional[date] = None, end_date: Optional[date] = None
+    ) -> int:
+        """
+        Recompute fee_collection_daily from successful payments
+
+        Only days between start_date and end_date (inclusive, either open)
+        are replaced. The caller owns the transaction and must commit.
+
+        Returns:
+            Number of rollup rows written
+        """
+        table = FeeCollectionDaily.__table__
+        day = _period_start(session, FeePayment.payment_date, "day")
+        cleared = delete(table)
+        source = (
+            select(
+                day,
+                StudentFee.fee_structure_id,
+                FeePayment.payment_mode,
+                func.sum(FeePayment.amount),
+                func.count(FeePayment.id),
+                literal(datetime.utcnow()),
+            )
+            .join(StudentFee, StudentFee.id == FeePayment.student_fee_id)
+            .where(FeePayment.payment_status == PaymentStatus.SUCCESS)
+            .where(FeePayment.payment_date.is_not(None))
+            .group_by(day, StudentFee.fee_structure_id, FeePayment.payment_mode)
+        )
+        if start_date:
+            cleared = cleared.where(table.c.collection_date >= start_date)
+            source = source.where(FeePayment.payment_date >= datetime.combine(start_date, time.min))
+        if end_date:
+            cleared = cleared.where(table.c.collection_date <= end_date)
+            source = source.where(FeePayment.payment_date < datetime.combine(end_date + timedelta(days=1), time.min))
+        session.execute(cleared)
+        result = session.execute(insert(table).from_select(
+            ["collection_date", "fee_structure_id", "payment_mode", "amount", "payment_count", "updated_at"], source
+        ))
+        return result.rowcount
+
+    @staticmethod
+    def collection_analytics(
+        session: Session,
+        start_date: date,
+        end_date: date,
+        period: str = "day",
+        group_by: Sequence[str] = (),
+        program_id: Optional[int] = None,
+        academic_year: Optional[str] = None,
+        use_rollup: bool = False
+    ) -> FeeCollectionReport:
+        """
+        Successful payments between two dates (inclusive), bucketed by period
+
+        group_by adds any of payment_mode, program and fee_head to the
+        buckets. A payment is split across fee heads in proportion to its
+        structure's component amounts; payments on structures without
+        components (or with a zero total) fall under "Unallocated". Sums fee_collection_daily when
+        use_rollup is set, otherwise fee_payment directly. Two statements:
+        the buckets and the overall totals.
+        """
+        if use_rollup:
+            day = FeeCollectionDaily.collection_date
+            structure_id = FeeCollectionDaily.fee_structure_id
+            mode = FeeCollectionDaily.payment_mode
+            amount = FeeCollectionDaily.amount
+            payments = func.sum(FeeCollectionDaily.payment_count)
+            source, joins = FeeCollectionDaily, []
+            conditions = [day >= start_date, day <= end_date]
+        else:
+            day = FeePayment.payment_date
+            structure_id = StudentFee.fee_structure_id
+            mode = FeePayment.payment_mode
+            amount = FeePayment.amount
+            payments = func.count(FeePayment.id)
+            source, joins = FeePayment, [(StudentFee, StudentFee.id == FeePayment.student_fee_id)]
+            conditions = [
+                FeePayment.payment_status == PaymentStatus.SUCCESS,
+                day >= datetime.combine(start_date, time.min),
+                day < datetime.combine(end_date + timedelta(days=1), time.min),
+            ]
+        joins.append((FeeStructure, FeeStructure.id == structure_id))
+        if program_id:
+            conditions.append(FeeStructure.program_id == program_id)
+        if academic_year:
+            conditions.append(FeeStructure.academic_year == academic_year)
+
+        def query(columns, extra_joins=(), outer_joins=()):
+            stmt = select(*columns).select_from(source)
+            for target, onclause in [*joins, *extra_joins]:
+                stmt = stmt.join(target, onclause)
+            for target, onclause in outer_joins:
+                stmt = stmt.outerjoin(target, onclause)
+            return stmt.where(*conditions)
+
+        dimensions = [_period_start(session, day, period).label("period_start")]
+        extra_joins, outer_joins = [], []
+        share = amount
+        if "payment_mode" in group_by:
+            dimensions.append(mode.label("payment_mode"))
+        if "program" in group_by:
+            extra_joins.append((Program, Program.id == FeeStructure.program_id))
+            dimensions += [Program.id.label("program_id"), Program.name.label("program_name")]
+        if "fee_head" in group_by:
+            # Outer join so payments with nothing to split keep their whole amount
+            outer_joins.append((FeeComponent, and_(
+                FeeComponent.fee_structure_id == FeeStructure.id,
+                FeeStructure.total_amount > 0,
+            )))
+            # Inlined like _period_start so GROUP BY matches the selected expression
+            unallocated = literal_column(f"'{UNALLOCATED_FEE_HEAD}'")
+            dimensions.append(func.coalesce(FeeComponent.name, unallocated).label("fee_head"))
+            share = case(
+                (FeeComponent.id.is_(None), amount),
+                else_=amount * FeeComponent.amount / func.nullif(FeeStructure.total_amount, 0),
+            )
+
+        buckets = (
+            query(
+                [*dimensions, func.sum(share).label("amount"), payments.label("payment_count")],
+                extra_joins, outer_joins,
+            )
+            .group_by(*dimensions)
+            .order_by(*dimensions)
+        )
+        rows = [
+            FeeCollectionRow(**{**row, "amount": to_money(row["amount"]), "payment_count": int(row["payment_count"])})
+            for row in session.exec(buckets).mappings()
+        ]
+        total_amount, payment_count = session.exec(query([func.sum(amount), payments])).one()
+
+        return FeeCollectionReport(
+            start_date=start_date,
+            end_date=end_date,
+            period=period,
+            group_by=list(group_by),
+            total_amount=to_money(total_amount),
+            payment_count=int(payment_count or 0),
+            rows=rows,
+        )
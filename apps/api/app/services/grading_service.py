@@ -0,0 +1,93 @@
+"""
+Grading Service
+Server-side grade computation from a regulation grading scale
+"""
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+from sqlmodel import Session, select
+
+from app.models.academic.regulation import RegulationGrade
+
+# Used when a regulation has no grades configured (10-point scale)
+DEFAULT_GRADE_SCALE = [
+    # (grade, min_percentage, grade_point, is_pass)
+    ("O", 90, 10, True),
+    ("A+", 80, 9, True),
+    ("A", 70, 8, True),
+    ("B+", 60, 7, True),
+    ("B", 50, 6, True),
+    ("C", 40, 5, True),
+    ("F", 0, 0, False),
+]
+
+ABSENT_GRADE = "AB"
+
+
+class GradedMarks(NamedTuple):
+    """Column-wise grading output, aligned with the input arrays"""
+    grades: List[str]
+    grade_points: np.ndarray
+    passed: np.ndarray
+
+
+class GradingScale:
+    """A grading scale prepared for vectorized bucketing"""
+
+    def __init__(self, grades: List[tuple]):
+        # Sort ascending by lower bound so searchsorted can bucket percentages
+        ordered = sorted(grades, key=lambda grade: grade[1])
+        self.labels = np.array([grade[0] for grade in ordered], dtype=object)
+        self.min_percentages = np.array([grade[1] for grade in ordered], dtype=float)
+        self.grade_points = np.array([grade[2] for grade in ordered], dtype=float)
+        self.is_pass = np.array([grade[3] for grade in ordered], dtype=bool)
+
+        failing = np.flatnonzero(~self.is_pass)
+        # Grade given to anyone below the schedule's passing marks
+        self.fail_index = int(failing[-1]) if failing.size else 0
+
+    @classmethod
+    def for_regulation(cls, session: Session, regulation_id: Optional[int]) -> "GradingScale":
+        """Load a regulation's scale, falling back to DEFAULT_GRADE_SCALE"""
+        rows = []
+        if regulation_id:
+            rows = session.exec(
+                select(
+                    RegulationGrade.grade,
+                    RegulationGrade.min_percentage,
+                    RegulationGrade.grade_point,
+                    RegulationGrade.is_pass,
+                ).where(RegulationGrade.regulation_id == regulation_id)
+            ).all()
+        return cls([tuple(row) for row in rows] or DEFAULT_GRADE_SCALE)
+
+    def grade(
+        self,
+        marks: np.ndarray,
+        max_marks: float,
+        passing_marks: float,
+        absent: np.ndarray
+    ) -> GradedMarks:
+        """
+        Bucket every mark into a grade in one pass
+
+        Marks below passing_marks get the highest failing grade whatever
+        their percentage; absentees get ABSENT_GRADE with zero grade points.
+        """
+        marks = np.asarray(marks, dtype=float)
+        absent = np.asarray(absent, dtype=bool)
+
+        percentages = marks / max_marks * 100 if max_marks > 0 else np.zeros_like(marks)
+        index = np.searchsorted(self.min_percentages, percentages, side="right") - 1
+        index = np.clip(index, 0, len(self.labels) - 1)
+        index = np.where(marks < passing_marks, np.minimum(index, self.fail_index), index)
+
+        grades = self.labels[index]
+        grade_points = self.grade_points[index]
+        passed = self.is_pass[index] & (marks >= passing_marks)
+
+        grades = np.where(absent, ABSENT_GRADE, grades)
+        grade_points = np.where(absent, 0.0, grade_points)
+        passed = passed & ~absent
+
+        return GradedMarks(grades=grades.tolist(), grade_points=grade_points, passed=passed)
@@ -1,125 +1,267 @@
-from typing import List, Dict, Any
+import warnings
+from collections import Counter
+from typing import Iterator, List, Dict, Any, Optional
+from dataclasses import dataclass
 import pandas as pd
-from io import BytesIO
-from datetime import datetime
+from datetime import date, datetime, timedelta
+from sqlalchemy import and_, delete, func, insert, or_, update
 from sqlmodel import Session, select
 from fastapi import UploadFile, HTTPException
+from email_validator import EmailNotValidError, validate_email
+from openpyxl import load_workbook
+from pydantic import ValidationError
 
 from app.models.student import Student, Gender, BloodGroup, ScholarshipCategory, StudentStatus
 from app.models.program import Program
 from app.models.parent import Parent
 from app.models.user import User
-from app.models.import_log import ImportLog
+from app.models.import_log import ImportLog, ImportLogRow
+from app.models.academic.batch import AcademicBatch, BatchSemester, ProgramYear
+from app.models.master_data import Section
 from app.schemas.import_schema import (
     StudentImportRow, ImportPreviewResponse, ImportPreviewRow, 
     ImportRowStatus, ImportErrorDetail
 )
-from app.core.security import get_password_hash
+from app.core.security import get_password_hashes
+from app.config.settings import settings
+
+_ENUM_FIELDS = {"gender": Gender, "blood_group": BloodGroup, "scholarship_category": ScholarshipCategory}
+
+# Plain ASCII addresses; anything else is left to EmailStr
+_EMAIL_PATTERN = (
+    r"^(?P<local>[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+)*)"
+    r"@(?P<domain>(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+[A-Za-z]{2,63})$"
+)
+
+
+def _normalized_emails(emails: pd.Series) -> pd.Series:
+    """
+    Addresses as EmailStr would store them, or NaN where unsure
+
+    The syntax check is a regex; the expensive domain checks run once per
+    distinct domain rather than once per row.
+    """
+    parts = emails.str.extract(_EMAIL_PATTERN)
+    domain = parts["domain"].str.lower()
+    plain = domain.notna() & (parts["local"].str.len() <= 64) & (emails.str.len() <= 254)
+    accepted = {}
+    for name in domain[plain].unique():
+        try:
+            validate_email(f"a@{name}", check_deliverability=False)
+            accepted[name] = True
+        except EmailNotValidError:
+            accepted[name] = False
+    plain &= domain.map(accepted).eq(True)
+    return (parts["local"] + "@" + domain).where(plain)
+
+
+def _passes_field_checks(frame: pd.DataFrame) -> pd.Series:
+    """
+    Rows certain to pass StudentImportRow validation
+
+    Errs on the side of False: those rows are validated by the model.
+    Normalizes email in place to the form EmailStr produces.
+    """
+    admission = frame["admission_number"]
+    mobile = frame["mobile"]
+    email = frame["email"]
+    normalized_email = _normalized_emails(email.astype("string"))
+    ok = admission.notna() & admission.str.isdigit().eq(True)
+    ok &= mobile.isna() | mobile.str.len().between(10, 15)
+    ok &= email.isna() | normalized_email.notna()
+    for field, enum in _ENUM_FIELDS.items():
+        ok &= frame[field].isna() | frame[field].isin([e.value for e in enum])
+    frame["email"] = normalized_email.astype(object).where(normalized_email.notna(), email)
+    return ok
+
 
 class ImportService:
     def __init__(self, session: Session):
         self.session = session
 
-    def parse_file(self, file: UploadFile) -> List[Dict[str, Any]]:
+    def read_chunks(self, file: UploadFile, chunk_size: int = None) -> Iterator[pd.DataFrame]:
+        """
+        The upload as DataFrames of up to chunk_size rows, headers normalized
+
+        Reads from the upload's spooled temporary file (Starlette moves
+        anything over 1 MB to disk), so a sheet is never held in memory
+        whole. CSV cells are read as text; .xlsx rows come from openpyxl's
+        read-only iterator. Legacy .xls has no streaming reader and is
+        loaded at once.
+        """
+        chunk_size = chunk_size or settings.IMPORT_PREVIEW_CHUNK_SIZE
+        name = file.filename or ""
+        if not name.endswith(('.csv', '.xls', '.xlsx')):
+            raise HTTPException(status_code=400, detail="Invalid file format")
         try:
-            contents = file.file.read()
-            if file.filename.endswith('.csv'):
-                df = pd.read_csv(BytesIO(contents))
-            elif file.filename.endswith(('.xls', '.xlsx')):
-                df = pd.read_excel(BytesIO(contents))
+            if name.endswith('.csv'):
+                for df in pd.read_csv(file.file, dtype=str, chunksize=chunk_size):
+                    yield _normalize_headers(df)
+            elif name.endswith('.xlsx'):
+                yield from _read_xlsx_chunks(file.file, chunk_size)
             else:
-                raise HTTPException(status_code=400, detail="Invalid file format")
-            
-            # Normalize columns
-            df.columns = [c.lower().replace(' ', '_').strip() for c in df.columns]
-            return df.to_dict('records')
+                df = _normalize_headers(pd.read_excel(file.file))
+                for start in range(0, len(df), chunk_size):
+                    yield df.iloc[start:start + chunk_size]
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Error parsing file: {str(e)}")
 
-    def validate_row(self, row: Dict[str, Any], programs_map: Dict[str, int], existing_admissions: set, default_program_code: str = None) -> ImportPreviewRow:
-        errors = []
-        valid_data = None
-        status = ImportRowStatus.VALID
+    @staticmethod
+    def normalize_frame(df: pd.DataFrame, default_program_code: str = None) -> pd.DataFrame:
+        """
+        Sheet columns mapped to StudentImportRow fields, column by column
 
-        # check duplicate in DB
-        if str(row.get('admission_number')) in existing_admissions:
-            status = ImportRowStatus.DUPLICATE
-            errors.append(ImportErrorDetail(field="admission_number", message="Student already exists"))
+        Blank cells become None, numbers read as floats (mobiles, Aadhaar)
+        lose their ".0", dates in any common format are parsed and
+        missing values get the same defaults as a hand-filled row.
+        """
+        def column(name: str) -> pd.Series:
+            if name not in df:
+                return pd.Series(pd.NA, index=df.index, dtype="string")
+            text = df[name].astype("string").str.strip()
+            return text.mask(text == "")
 
-        # Pydantic validation
-        try:
-            # Handle DOB dynamically
-            raw_dob = row.get('dob')
-            dob_obj = None
-            if raw_dob and str(raw_dob) != 'nan':
+        def digits(name: str) -> pd.Series:
+            return column(name).str.replace(r"\..*$", "", regex=True)
+
+        def whole_number(name: str) -> pd.Series:
+            number = pd.to_numeric(column(name), errors="coerce")
+            return number.where((number >= 1) & (number % 1 == 0)).fillna(1).astype(int)
+
+        def yes_no(name: str) -> pd.Series:
+            flag = column(name).str.upper()
+            return flag.where(flag.isin(["YES", "NO"]), "NO")
+
+        raw_dob = column("dob")
+        with warnings.catch_warnings():
+            # Format is inferred from the first value; the rest are retried one by one below
+            warnings.simplefilter("ignore", UserWarning)
+            dob = pd.to_datetime(raw_dob, errors="coerce")
+        retry = dob.isna() & raw_dob.notna()
+        if retry.any():
+            dob[retry] = pd.to_datetime(raw_dob[retry], errors="coerce", format="mixed")
+
+        frame = pd.DataFrame({
+            "admission_number": column("admission_number").str.replace(r"\.0+$", "", regex=True),
+            "name": column("full_name").fillna("Unknown Student"),
+            "gender": column("gender").str.upper().fillna("MALE"),
+            "dob": dob.dt.date,
+            "mobile": digits("mobile"),
+            "email": column("email"),
+            "aadhaar": digits("aadhaar"),
+            "blood_group": column("blood_group").str.upper(),
+            "course_code": column("course").fillna(default_program_code or "BTECH-CS"),
+            "academic_year": whole_number("year"),
+            "semester": whole_number("semester"),
+            "section": column("section").fillna("A"),
+            "batch": column("batch").fillna("2024-2028"),
+            "father_name": column("father_name").fillna("Unknown"),
+            "father_mobile": digits("father_mobile").fillna("9999999999"),
+            "mother_name": column("mother_name"),
+            "guardian_mobile": digits("guardian_mobile"),
+            "hostel_required": yes_no("hostel_required"),
+            "transport_required": yes_no("transport_required"),
+            "scholarship_category": column("scholarship_category").str.upper(),
+            "lateral_entry": yes_no("lateral_entry"),
+        })
+        return frame.astype(object).where(frame.notna(), None)
+
+    def validate_frame(
+        self,
+        df: pd.DataFrame,
+        programs_map: Dict[str, int],
+        existing_admissions: set,
+        default_program_code: str = None,
+        seen_admissions: Dict[str, int] = None,
+        first_row_number: int = 1,
+    ) -> List[ImportPreviewRow]:
+        """
+        Preview rows for a sheet (or one chunk of it)
+
+        Normalization, field checks, course mapping and duplicate detection
+        run on whole columns. Rows passing every column check are built
+        with StudentImportRow.model_construct; only the rest go through
+        full model validation, which decides them and supplies the error
+        messages. seen_admissions maps admission number to the row it first
+        appeared on and carries over between chunks, so repeats within the
+        file are caught across chunk boundaries.
+        """
+        frame = self.normalize_frame(df, default_program_code)
+        row_numbers = list(range(first_row_number, first_row_number + len(frame)))
+        seen_admissions = {} if seen_admissions is None else seen_admissions
+
+        course_known = frame["course_code"].isin(programs_map.keys())
+        if default_program_code:
+            # Relaxed: unknown courses fall back to the default program
+            frame.loc[~course_known, "course_code"] = default_program_code
+            course_known[:] = True
+
+        admission = frame["admission_number"]
+        numbers = pd.Series(row_numbers, index=frame.index)
+        present = admission.notna()
+        in_db = admission.isin(existing_admissions)
+        first = present & ~admission.duplicated() & ~admission.isin(seen_admissions.keys())
+        seen_admissions.update(zip(admission[first], numbers[first]))
+        first_seen = admission.map(seen_admissions)
+        repeated = present & ~first & (first_seen != numbers)
+
+        fast = _passes_field_checks(frame)
+        for field, enum in _ENUM_FIELDS.items():
+            # Unknown values stay as they are for the model to report
+            members = {e.value: e for e in enum}
+            frame[field] = frame[field].map(lambda value: members.get(value, value))
+
+        columns = list(frame.columns)
+        preview_rows = []
+        for values, row_number, is_fast, is_in_db, is_repeat, first_row, is_known in zip(
+            zip(*(frame[c].tolist() for c in columns)),
+            row_numbers, fast.tolist(), in_db.tolist(), repeated.tolist(), first_seen.tolist(), course_known.tolist()
+        ):
+            record = {k: v for k, v in zip(columns, values) if v is not None}
+            errors = []
+            valid_data = None
+            if is_in_db:
+                errors.append(ImportErrorDetail(field="admission_number", message="Student already exists"))
+            if is_repeat:
+                errors.append(ImportErrorDetail(field="admission_number", message=f"Duplicate of row {int(first_row)}"))
+
+            if is_fast:
+                valid_data = StudentImportRow.model_construct(**record)
+            else:
                 try:
-                    dob_obj = pd.to_datetime(raw_dob).date()
-                except:
-                    pass # Leave as None
-
-            # Map excel values to schema
-            mapped_data = {
-                "admission_number": str(row.get('admission_number', '')),
-                "name": str(row.get('full_name')) if row.get('full_name') and str(row.get('full_name')) != 'nan' else "Unknown Student",
-                "gender": row.get('gender', 'MALE').upper() if row.get('gender') and str(row.get('gender')) != 'nan' else "MALE",
-                "dob": dob_obj,
-                "mobile": str(row.get('mobile', '')).split('.')[0] if row.get('mobile') and str(row.get('mobile')) != 'nan' else None, 
-                "email": row.get('email'),
-                "aadhaar": str(row.get('aadhaar', '')).split('.')[0] if row.get('aadhaar') and str(row.get('aadhaar')) != 'nan' else None,
-                "blood_group": row.get('blood_group'),
-                "course_code": row.get('course', '') or default_program_code or "BTECH-CS",
-                "academic_year": int(row.get('year', 1)) if str(row.get('year', '')).isdigit() else 1,
-                "semester": int(row.get('semester', 1)) if str(row.get('semester', '')).isdigit() else 1,
-                "section": str(row.get('section', 'A')),
-                "batch": str(row.get('batch', '2024-2028')),
-                "father_name": str(row.get('father_name', 'Unknown')),
-                "father_mobile": str(row.get('father_mobile', '9999999999')).split('.')[0],
-                "mother_name": row.get('mother_name'),
-                "guardian_mobile": str(row.get('guardian_mobile', '')).split('.')[0] if row.get('guardian_mobile') else None,
-                "hostel_required": str(row.get('hostel_required', 'NO')),
-                "transport_required": str(row.get('transport_required', 'NO')),
-                "scholarship_category": row.get('scholarship_category'),
-                "lateral_entry": str(row.get('lateral_entry', 'NO'))
-            }
-            
-            # Remove None/NaN values to let optional Pydantic fields handle it
-            cleaned_data = {}
-            for k, v in mapped_data.items():
-                if v is not None and str(v) != 'nan':
-                     cleaned_data[k] = v
-            
-            valid_data = StudentImportRow(**cleaned_data)
-            
-            # Master Data Logic Validation
-            # Relaxed: if course not found, warn or use default? 
-            # We used default_program_code above. If still fails:
-            if valid_data.course_code not in programs_map:
-                # Fallback to ANY program?
-                if default_program_code:
-                     valid_data.course_code = default_program_code
-                else:
-                    errors.append(ImportErrorDetail(field="course", message=f"Course '{valid_data.course_code}' not found"))
-                    status = ImportRowStatus.INVALID
+                    valid_data = StudentImportRow(**record)
+                except ValidationError as e:
+                    for err in e.errors():
+                        errors.append(ImportErrorDetail(field=str(err['loc'][0]), message=err['msg']))
+            if not is_known:
+                errors.append(ImportErrorDetail(field="course", message=f"Course '{record['course_code']}' not found"))
 
-        except Exception as e:
-            status = ImportRowStatus.INVALID
-            # Rough parsing of validation errors
-            if hasattr(e, 'errors'):
-                for err in e.errors(): # type: ignore
-                    errors.append(ImportErrorDetail(field=str(err['loc'][0]), message=err['msg']))
+            if valid_data is None or not is_known:
+                status = ImportRowStatus.INVALID
+            elif is_in_db or is_repeat:
+                status = ImportRowStatus.DUPLICATE
             else:
-                errors.append(ImportErrorDetail(field="row", message=str(e)))
+                status = ImportRowStatus.VALID
+            preview_rows.append(ImportPreviewRow.model_construct(
+                row_number=row_number,
+                data=valid_data or record,
+                status=status,
+                errors=errors
+            ))
+        return preview_rows
 
-        return ImportPreviewRow(
-            row_number=0, # Set later
-            data=valid_data or {}, # type: ignore
-            status=status,
-            errors=errors
-        )
+    def preview_import(self, file: UploadFile, user_id: int, limit: int = 100) -> ImportPreviewResponse:
+        """
+        Validate an upload chunk by chunk and keep the result as a PREVIEW log
+
+        Each chunk's preview rows are stored in import_log_row as soon as
+        they are validated, so memory stays bounded by the chunk size. The
+        response carries the counts and the first page of rows; the rest
+        are read with get_preview, and execute_preview queues the VALID
+        rows without the client sending them back.
+        """
+        self.purge_expired_previews()
 
-    def preview_import(self, file: UploadFile, user_id: int) -> ImportPreviewResponse:
-        rows = self.parse_file(file)
-        
         # Prefetch Master Data
         programs = self.session.exec(select(Program)).all()
         programs_map = {p.code: p.id for p in programs}
@@ -129,132 +271,447 @@ class ImportService:
         existing_students = self.session.exec(select(Student.admission_number)).all()
         existing_admissions = set(existing_students)
         
-        preview_rows = []
-        valid_count = 0
-        invalid_count = 0
-        duplicate_count = 0
-        
-        for i, row in enumerate(rows):
-            preview_row = self.validate_row(row, programs_map, existing_admissions, default_program_code)
-            preview_row.row_number = i + 1
-            
-            if preview_row.status == ImportRowStatus.VALID:
-                valid_count += 1
-            elif preview_row.status == ImportRowStatus.DUPLICATE:
-                duplicate_count += 1
-            else:
-                invalid_count += 1
-                
-            preview_rows.append(preview_row)
-            
-        # Log basic attempt
         log = ImportLog(
             file_name=file.filename or "unknown",
             uploaded_by_id=user_id,
-            total_rows=len(rows),
+            timestamp=datetime.utcnow(),
             status="PREVIEW"
         )
         self.session.add(log)
+        self.session.flush()
+
+        counts = Counter()
+        seen_admissions: Dict[str, int] = {}
+        next_row = 1
+        for df in self.read_chunks(file):
+            preview_rows = self.validate_frame(
+                df, programs_map, existing_admissions, default_program_code,
+                seen_admissions=seen_admissions, first_row_number=next_row
+            )
+            next_row += len(preview_rows)
+            counts.update(row.status for row in preview_rows)
+            if preview_rows:
+                self.session.execute(insert(ImportLogRow.__table__), [
+                    {
+                        "import_log_id": log.id,
+                        "row_number": row.row_number,
+                        "data": _jsonable(row.data),
+                        "status": row.status.value,
+                        "errors": [e.model_dump() for e in row.errors] or None,
+                    }
+                    for row in preview_rows
+                ])
+
+        log.total_rows = next_row - 1
+        log.duplicate_count = counts[ImportRowStatus.DUPLICATE]
+        self.session.add(log)
         self.session.commit()
-        
+        return self.get_preview(log.id, limit=limit)  # type: ignore
+
+    def purge_expired_previews(self) -> int:
+        """
+        Delete previews never executed within IMPORT_PREVIEW_TTL_HOURS, with their rows
+
+        Run on every new preview, so abandoned uploads do not accumulate.
+        Returns how many previews were deleted.
+        """
+        cutoff = datetime.utcnow() - timedelta(hours=settings.IMPORT_PREVIEW_TTL_HOURS)
+        expired = select(ImportLog.id).where(ImportLog.status == "PREVIEW").where(ImportLog.timestamp < cutoff)
+        self.session.execute(delete(ImportLogRow).where(ImportLogRow.import_log_id.in_(expired)))
+        result = self.session.execute(delete(ImportLog).where(ImportLog.id.in_(expired)))
+        self.session.commit()
+        return result.rowcount
+
+    def get_preview(
+        self, log_id: int, skip: int = 0, limit: int = 100, row_status: Optional[ImportRowStatus] = None
+    ) -> ImportPreviewResponse:
+        """Counts and one page of a stored preview's rows, optionally of one status"""
+        log = self.session.get(ImportLog, log_id)
+        if not log or log.status != "PREVIEW":
+            raise HTTPException(status_code=404, detail="Import preview not found")
+        counts = dict(self.session.exec(
+            select(ImportLogRow.status, func.count())
+            .where(ImportLogRow.import_log_id == log_id)
+            .group_by(ImportLogRow.status)
+        ).all())
+        query = select(ImportLogRow).where(ImportLogRow.import_log_id == log_id)
+        if row_status:
+            query = query.where(ImportLogRow.status == row_status.value)
+        log_rows = self.session.exec(query.order_by(ImportLogRow.row_number).offset(skip).limit(limit)).all()
         return ImportPreviewResponse(
-            total_rows=len(rows),
-            valid_count=valid_count,
-            invalid_count=invalid_count,
-            duplicate_count=duplicate_count,
-            rows=preview_rows
+            log_id=log_id,
+            total_rows=log.total_rows,
+            valid_count=counts.get(ImportRowStatus.VALID.value, 0),
+            invalid_count=counts.get(ImportRowStatus.INVALID.value, 0),
+            duplicate_count=counts.get(ImportRowStatus.DUPLICATE.value, 0),
+            skip=skip,
+            limit=limit,
+            rows=[
+                ImportPreviewRow(
+                    row_number=r.row_number,
+                    data=r.data,
+                    status=r.status,
+                    errors=r.errors or [],
+                )
+                for r in log_rows
+            ]
         )
 
-    def execute_import(self, preview_rows: List[ImportPreviewRow], user_id: int, file_name: str) -> ImportLog:
-        # Pre-fetch maps again just to be safe in context
-        programs = self.session.exec(select(Program)).all()
-        programs_map = {p.code: p.id for p in programs}
-        
-        imported_count = 0
-        failed_count = 0
-        
-        for row in preview_rows:
-            if row.status != ImportRowStatus.VALID:
-                continue
-                
-            try:
-                # Row-level transaction
-                # Row-level transaction
-                with self.session.begin_nested():
-                    data = row.data
-                    # Defaults for missing data
-                    username = data.admission_number
-                    # If DOB missing, use default 01012000 for password and 2000-01-01 for DB
-                    dob_str = str(data.dob) if data.dob else "2000-01-01"
-                    password = data.dob.strftime('%d%m%Y') if data.dob else "01012000"
-                    
-                    user = User(
-                        username=username,
-                        email=data.email, # Optional in DB? If unique index, None is usually safe in Postgres
-                        full_name=data.name or "Unknown",
-                        hashed_password=get_password_hash(password),
-                        is_active=True, 
-                        is_superuser=False
-                    )
-                    self.session.add(user)
-                    self.session.flush() # get ID
-                    
-                    # Create Student
-                    student = Student(
-                        admission_number=data.admission_number,
-                        name=data.name or "Unknown",
-                        dob=dob_str,
-                        phone=data.mobile or "0000000000",
-                        email=data.email,
-                        user_id=user.id,
-                        program_id=programs_map[data.course_code],
-                        current_year=data.academic_year or 1,
-                        current_semester=data.semester or 1,
-                        section=data.section or "A",
-                        batch=data.batch or "2024-2028",
-                        gender=data.gender or Gender.MALE,
-                        aadhaar_number=data.aadhaar,
-                        blood_group=data.blood_group,
-                        hostel_required=(data.hostel_required == "YES"),
-                        transport_required=(data.transport_required == "YES"),
-                        scholarship_category=data.scholarship_category or ScholarshipCategory.GENERAL,
-                        lateral_entry=(data.lateral_entry == "YES"),
-                        status=StudentStatus.IMPORTED_PENDING_VERIFICATION
-                    )
-                    self.session.add(student)
-                    self.session.flush()
-                    
-                    # Create Parent
-                    parent = Parent(
-                        linked_student_id=student.id, # type: ignore
-                        father_name=data.father_name or "Unknown",
-                        father_mobile=data.father_mobile or "9999999999",
-                        mother_name=data.mother_name,
-                        guardian_mobile=data.guardian_mobile
-                    )
-                    self.session.add(parent)
-                    
-                    imported_count += 1
-            
-            except Exception as e:
-                print(f"Failed to import row {row.row_number}: {e}")
-                failed_count += 1
-                # Transaction rolls back automatically for this nested block
-        
-        self.session.commit()
-        
-        # Create final log
+    def _academic_structure(self, program_ids: List[int]) -> Dict[str, Dict]:
+        """Batch, year, semester and section ids for the programs being imported into"""
+        batches = self.session.exec(
+            select(AcademicBatch).where(AcademicBatch.program_id.in_(program_ids))
+        ).all() if program_ids else []
+        batch_ids = [b.id for b in batches]
+        years = self.session.exec(
+            select(ProgramYear).where(ProgramYear.batch_id.in_(batch_ids))
+        ).all() if batch_ids else []
+        semesters = self.session.exec(
+            select(BatchSemester).where(BatchSemester.batch_id.in_(batch_ids)).order_by(BatchSemester.semester_no)
+        ).all() if batch_ids else []
+        sections = self.session.exec(
+            select(Section).where(Section.batch_semester_id.in_([s.id for s in semesters]))
+        ).all() if semesters else []
+
+        structure = {"batches": {}, "years": {}, "semesters": {}, "sections": {}}
+        for b in batches:
+            # Sheets carry either the batch code or its "2024-2028" span
+            structure["batches"][(b.program_id, b.batch_code)] = b.id
+            structure["batches"].setdefault((b.program_id, f"{b.start_year}-{b.end_year}"), b.id)
+        for y in years:
+            structure["years"][(y.batch_id, y.year_no)] = y.id
+        for sem in semesters:
+            structure["semesters"].setdefault((sem.batch_id, sem.year_no), []).append(sem)
+        for sec in sections:
+            structure["sections"][(sec.batch_semester_id, sec.code)] = sec.id
+        return structure
+
+    def _prepare_row(self, row: ImportPreviewRow, program_id: int, structure: Dict[str, Dict]) -> "_PreparedRow":
+        """Unsaved User, Student and Parent for a valid row; ValueError if it has no place in the structure"""
+        data = row.data
+        batch_id = structure["batches"].get((program_id, data.batch))
+        if batch_id is None:
+            raise ValueError(f"Batch '{data.batch}' not found for course '{data.course_code}'")
+        year_no = data.academic_year or 1
+        program_year_id = structure["years"].get((batch_id, year_no))
+        if program_year_id is None:
+            raise ValueError(f"Year {year_no} not found in batch '{data.batch}'")
+        # Semester may be numbered across the program (1-8) or within the year (1-2)
+        year_semesters = structure["semesters"].get((batch_id, year_no), [])
+        semester_no = data.semester or 1
+        batch_semester = next((sem for sem in year_semesters if sem.semester_no == semester_no), None)
+        if batch_semester is None and 1 <= semester_no <= len(year_semesters):
+            batch_semester = year_semesters[semester_no - 1]
+        if batch_semester is None:
+            raise ValueError(f"Semester {semester_no} not found in year {year_no} of batch '{data.batch}'")
+
+        # If DOB missing, use default 01012000 for password and 2000-01-01 for DB
+        password = data.dob.strftime('%d%m%Y') if data.dob else "01012000"
+        user = User(
+            username=data.admission_number,
+            email=data.email,  # Optional in DB? If unique index, None is usually safe in Postgres
+            full_name=data.name or "Unknown",
+            hashed_password="",  # Set from the batch hash
+            is_active=True,
+            is_superuser=False
+        )
+        student = Student(
+            admission_number=data.admission_number,
+            name=data.name or "Unknown",
+            dob=str(data.dob) if data.dob else "2000-01-01",
+            phone=data.mobile or "0000000000",
+            email=data.email,
+            program_id=program_id,
+            batch_id=batch_id,
+            program_year_id=program_year_id,
+            batch_semester_id=batch_semester.id,
+            section_id=structure["sections"].get((batch_semester.id, data.section or "A")),  # Else assigned later
+            gender=data.gender or Gender.MALE,
+            aadhaar_number=data.aadhaar,
+            blood_group=data.blood_group,
+            hostel_required=(data.hostel_required == "YES"),
+            transport_required=(data.transport_required == "YES"),
+            scholarship_category=data.scholarship_category or ScholarshipCategory.GENERAL,
+            lateral_entry=(data.lateral_entry == "YES"),
+            status=StudentStatus.IMPORTED_PENDING_VERIFICATION
+        )
+        parent = Parent(
+            linked_student_id=0,  # Set once the student is inserted
+            father_name=data.father_name or "Unknown",
+            father_mobile=data.father_mobile or "9999999999",
+            mother_name=data.mother_name,
+            guardian_mobile=data.guardian_mobile
+        )
+        return _PreparedRow(row.row_number, password, user, student, parent)
+
+    def _insert_ids(self, model, rows: List[Dict[str, Any]], key: str) -> List[int]:
+        """Bulk insert rows and return their new ids, in order"""
+        table = model.__table__
+        if self.session.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+            result = self.session.execute(
+                insert(table).returning(table.c.id, sort_by_parameter_order=True), rows
+            )
+            return list(result.scalars())
+        # No executemany RETURNING (MySQL): read the ids back by the unique key
+        self.session.execute(insert(table), rows)
+        keys = [row[key] for row in rows]
+        ids = dict(self.session.execute(select(table.c[key], table.c.id).where(table.c[key].in_(keys))).all())
+        return [ids[k] for k in keys]
+
+    def _insert_chunk(self, chunk: List["_PreparedRow"]) -> List[int]:
+        """Users, students and parents for a chunk, one statement per table; returns student ids"""
+        user_ids = self._insert_ids(
+            User, [r.user.model_dump(exclude={"id"}) for r in chunk], "username"
+        )
+        students = []
+        for r, user_id in zip(chunk, user_ids):
+            students.append({**r.student.model_dump(exclude={"id"}), "user_id": user_id})
+        student_ids = self._insert_ids(Student, students, "admission_number")
+        self.session.execute(insert(Parent.__table__), [
+            {**r.parent.model_dump(exclude={"id"}), "linked_student_id": student_id}
+            for r, student_id in zip(chunk, student_ids)
+        ])
+        return student_ids
+
+    def _insert_row(self, prepared: "_PreparedRow") -> int:
+        self.session.add(prepared.user)
+        self.session.flush()  # get ID
+        prepared.student.user_id = prepared.user.id
+        self.session.add(prepared.student)
+        self.session.flush()
+        prepared.parent.linked_student_id = prepared.student.id  # type: ignore
+        self.session.add(prepared.parent)
+        self.session.flush()
+        return prepared.student.id  # type: ignore
+
+    def create_import_job(
+        self, preview_rows: List[ImportPreviewRow], user_id: int, file_name: str, bulk: bool = True
+    ) -> ImportLog:
+        """Queue the VALID preview rows as a PENDING import for run_import_job"""
         log = ImportLog(
             file_name=file_name,
             uploaded_by_id=user_id,
             timestamp=datetime.utcnow(),
             total_rows=len(preview_rows),
-            imported_count=imported_count,
-            failed_count=failed_count,
             duplicate_count=len([r for r in preview_rows if r.status == ImportRowStatus.DUPLICATE]),
-            status="SUCCESS" if failed_count == 0 else "PARTIAL"
+            status="PENDING",
+            bulk=bulk
         )
         self.session.add(log)
+        self.session.flush()
+        rows = [
+            {"import_log_id": log.id, "row_number": r.row_number, "data": r.data.model_dump(mode="json"), "status": "PENDING"}
+            for r in preview_rows if r.status == ImportRowStatus.VALID
+        ]
+        if rows:
+            self.session.execute(insert(ImportLogRow.__table__), rows)
         self.session.commit()
-        
         return log
+
+    def queue_preview(self, log_id: int, bulk: bool = True) -> ImportLog:
+        """
+        Turn a stored preview into a PENDING import job
+
+        The VALID rows become the job's PENDING rows in place; INVALID and
+        DUPLICATE rows stay on the log for the error report. Like
+        claim_import_job the status change is one conditional UPDATE, so
+        of two concurrent calls only one queues the preview.
+        """
+        result = self.session.execute(
+            update(ImportLog)
+            .where(ImportLog.id == log_id)
+            .where(ImportLog.status == "PREVIEW")
+            .values(status="PENDING", bulk=bulk)
+        )
+        if result.rowcount != 1:
+            self.session.rollback()
+            log = self.session.get(ImportLog, log_id)
+            if not log:
+                raise HTTPException(status_code=404, detail="Import preview not found")
+            raise HTTPException(status_code=400, detail=f"Preview was already executed (status is {log.status})")
+        self.session.execute(
+            update(ImportLogRow)
+            .where(ImportLogRow.import_log_id == log_id)
+            .where(ImportLogRow.status == ImportRowStatus.VALID.value)
+            .values(status="PENDING")
+        )
+        self.session.commit()
+        return self.session.get(ImportLog, log_id)  # type: ignore
+
+    def claim_import_job(self, log_id: int) -> bool:
+        """
+        Mark a job RUNNING for this worker
+
+        Succeeds for a PENDING job, or a RUNNING one whose worker has not
+        committed a chunk for IMPORT_JOB_STALE_SECONDS (it died mid-import).
+        """
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=settings.IMPORT_JOB_STALE_SECONDS)
+        result = self.session.execute(
+            update(ImportLog)
+            .where(ImportLog.id == log_id)
+            .where(or_(
+                ImportLog.status == "PENDING",
+                and_(ImportLog.status == "RUNNING", or_(ImportLog.heartbeat_at.is_(None), ImportLog.heartbeat_at < stale)),
+            ))
+            .values(status="RUNNING", heartbeat_at=now, started_at=func.coalesce(ImportLog.started_at, now))
+        )
+        self.session.commit()
+        return result.rowcount == 1
+
+    def _import_chunk(self, log: ImportLog, log_rows: List[ImportLogRow], programs_map: Dict[str, int], structure: Dict[str, Dict]) -> None:
+        """Import one chunk of PENDING rows and record each row's outcome; the caller commits"""
+        prepared = []
+        for log_row in log_rows:
+            try:
+                row = ImportPreviewRow(row_number=log_row.row_number, data=StudentImportRow(**log_row.data), status=ImportRowStatus.VALID)
+                if row.data.course_code not in programs_map:
+                    raise ValueError(f"Course '{row.data.course_code}' not found")
+                p = self._prepare_row(row, programs_map[row.data.course_code], structure)
+                p.log_row = log_row
+                prepared.append(p)
+            except ValueError as e:
+                _row_failed(log_row, e)
+
+        hashes = get_password_hashes([p.password for p in prepared], settings.IMPORT_HASH_WORKERS)
+        for p, hashed_password in zip(prepared, hashes):
+            p.user.hashed_password = hashed_password
+
+        retry = prepared
+        if log.bulk and prepared:
+            try:
+                with self.session.begin_nested():
+                    student_ids = self._insert_chunk(prepared)
+                for p, student_id in zip(prepared, student_ids):
+                    p.log_row.status, p.log_row.student_id = "IMPORTED", student_id
+                retry = []
+            except Exception as e:
+                print(f"Bulk insert failed for rows {prepared[0].row_number}-{prepared[-1].row_number}, retrying row by row: {e}")
+
+        for p in retry:
+            try:
+                # Row-level transaction
+                with self.session.begin_nested():
+                    student_id = self._insert_row(p)
+                p.log_row.status, p.log_row.student_id = "IMPORTED", student_id
+            except Exception as e:
+                # Transaction rolls back automatically for this nested block
+                _row_failed(p.log_row, e)
+
+        imported = sum(1 for r in log_rows if r.status == "IMPORTED")
+        log.imported_count += imported
+        log.failed_count += len(log_rows) - imported
+        log.processed_count += len(log_rows)
+        log.heartbeat_at = datetime.utcnow()
+        self.session.add_all(log_rows)
+        self.session.add(log)
+
+    def run_import_job(self, log_id: int) -> Optional[ImportLog]:
+        """
+        Import a queued job's PENDING rows, IMPORT_CHUNK_SIZE at a time
+
+        Passwords are hashed per chunk in a process pool. In bulk mode a
+        chunk is inserted with one statement per table inside a savepoint,
+        and only a chunk that fails is retried row by row, so one bad row
+        costs its chunk a slow path, not the import. Each chunk commits
+        with its rows' outcomes and the job counters, so after a crash the
+        job resumes from the last committed chunk.
+
+        Returns None if the job is finished or another worker holds it.
+        """
+        if not self.claim_import_job(log_id):
+            return None
+
+        try:
+            # Pre-fetch maps again just to be safe in context
+            programs = self.session.exec(select(Program)).all()
+            programs_map = {p.code: p.id for p in programs}
+            structure = self._academic_structure(list(programs_map.values()))
+
+            while True:
+                log = self.session.get(ImportLog, log_id)
+                log_rows = self.session.exec(
+                    select(ImportLogRow)
+                    .where(ImportLogRow.import_log_id == log_id)
+                    .where(ImportLogRow.status == "PENDING")
+                    .order_by(ImportLogRow.row_number)
+                    .limit(settings.IMPORT_CHUNK_SIZE)
+                ).all()
+                if not log_rows:
+                    break
+                self._import_chunk(log, log_rows, programs_map, structure)
+                self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            print(f"Import job {log_id} failed: {e}")
+            log = self.session.get(ImportLog, log_id)
+            log.status = "FAILED"
+            log.error = str(e)
+            log.finished_at = datetime.utcnow()
+            self.session.add(log)
+            self.session.commit()
+            return log
+
+        log.status = "SUCCESS" if log.failed_count == 0 else "PARTIAL"
+        log.finished_at = datetime.utcnow()
+        self.session.add(log)
+        self.session.commit()
+        return log
+
+    def execute_import(
+        self, preview_rows: List[ImportPreviewRow], user_id: int, file_name: str, bulk: bool = True
+    ) -> ImportLog:
+        """Create User, Student and Parent records for the VALID preview rows, in this thread"""
+        log = self.create_import_job(preview_rows, user_id, file_name, bulk=bulk)
+        return self.run_import_job(log.id)  # type: ignore
+
+
+def _normalize_headers(df: pd.DataFrame) -> pd.DataFrame:
+    df.columns = [str(c).lower().replace(' ', '_').strip() for c in df.columns]
+    return df
+
+
+def _read_xlsx_chunks(stream, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """First worksheet of an .xlsx in DataFrames of chunk_size rows"""
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(c) if c is not None else f"column_{i}" for i, c in enumerate(header)]
+        chunk = []
+        for values in rows:
+            if all(v is None for v in values):
+                continue
+            chunk.append(values[:len(columns)])
+            if len(chunk) == chunk_size:
+                yield _normalize_headers(pd.DataFrame.from_records(chunk, columns=columns))
+                chunk = []
+        if chunk:
+            yield _normalize_headers(pd.DataFrame.from_records(chunk, columns=columns))
+    finally:
+        workbook.close()
+
+
+def _jsonable(data: Any) -> Dict[str, Any]:
+    """Preview row data for the JSON column"""
+    if isinstance(data, StudentImportRow):
+        return data.model_dump(mode="json")
+    return {k: v.isoformat() if isinstance(v, date) else v for k, v in data.items()}
+
+
+def _row_failed(log_row: ImportLogRow, error: Exception) -> None:
+    print(f"Failed to import row {log_row.row_number}: {error}")
+    log_row.status = "FAILED"
+    log_row.error = str(getattr(error, "orig", None) or error)[:500]
+
+
+@dataclass
+class _PreparedRow:
+    row_number: int
+    password: str
+    user: User
+    student: Student
+    parent: Parent
+    log_row: Optional[ImportLogRow] = None
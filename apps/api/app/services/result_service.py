@@ -0,0 +1,314 @@
+"""
+Result Processing Service
+Rolls graded exam results into StudentSemesterHistory for a whole semester
+"""
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Dict, List, Any, Optional
+
+import pandas as pd
+from fastapi import HTTPException
+from sqlalchemy import insert, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, select
+
+from app.db.session import engine
+from app.models.academic.batch import AcademicBatch, BatchSemester
+from app.models.academic.student_history import StudentSemesterHistory
+from app.models.exam import Exam, ExamSchedule, ExamResult, ExamType
+from app.models.master_data import AcademicYear
+from app.models.subject import Subject
+from app.schemas.exam import ResultProcessingJob, ResultProcessingSummary
+
+# Status given to history rows created by result processing; promotion
+# decisions made later are never overwritten when results are reprocessed
+RESULT_DECLARED = "RESULT_DECLARED"
+
+# History rows written per statement; progress is reported after each chunk
+HISTORY_CHUNK_SIZE = 500
+
+# Columns refreshed when a semester is reprocessed
+HISTORY_RESULT_COLUMNS = (
+    "total_credits", "earned_credits", "failed_credits", "sgpa", "backlog_subject_ids", "updated_at"
+)
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class ResultProcessingJobs:
+    """
+    Process-local registry of result processing jobs and their progress
+
+    Only the most recent MAX_JOBS jobs are kept. Readers get copies so a
+    job can be updated from a worker thread while it is being polled.
+    """
+    MAX_JOBS = 100
+
+    _jobs: "OrderedDict[str, ResultProcessingJob]" = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def create(cls, batch_semester_id: int, exam_id: Optional[int] = None) -> ResultProcessingJob:
+        job = ResultProcessingJob(
+            job_id=uuid.uuid4().hex,
+            batch_semester_id=batch_semester_id,
+            exam_id=exam_id,
+            status="QUEUED",
+            created_at=datetime.utcnow(),
+        )
+        with cls._lock:
+            cls._jobs[job.job_id] = job
+            while len(cls._jobs) > cls.MAX_JOBS:
+                cls._jobs.popitem(last=False)
+        return job.model_copy()
+
+    @classmethod
+    def get(cls, job_id: str) -> Optional[ResultProcessingJob]:
+        with cls._lock:
+            job = cls._jobs.get(job_id)
+            return job.model_copy() if job else None
+
+    @classmethod
+    def update(cls, job_id: str, **changes) -> None:
+        with cls._lock:
+            job = cls._jobs.get(job_id)
+            if job:
+                cls._jobs[job_id] = job.model_copy(update=changes)
+
+
+class ResultProcessingService:
+    """Service for semester result processing"""
+
+    @staticmethod
+    def _load_results(session: Session, batch_semester_id: int, exam_id: Optional[int]) -> pd.DataFrame:
+        """Every graded result of the semester's exams as one frame"""
+        stmt = (
+            select(
+                ExamResult.student_id,
+                ExamSchedule.subject_id,
+                Subject.credits,
+                ExamResult.marks_obtained,
+                ExamSchedule.passing_marks,
+                ExamResult.grade_point,
+                ExamResult.is_absent,
+                Exam.academic_year,
+                Exam.start_date,
+            )
+            .join(ExamSchedule, ExamSchedule.id == ExamResult.exam_schedule_id)
+            .join(Exam, Exam.id == ExamSchedule.exam_id)
+            .join(Subject, Subject.id == ExamSchedule.subject_id)
+            .where(Exam.batch_semester_id == batch_semester_id)
+            .where(ExamResult.grade_point.is_not(None))
+        )
+        if exam_id is not None:
+            stmt = stmt.where(Exam.id == exam_id)
+        else:
+            stmt = stmt.where(Exam.exam_type == ExamType.FINAL)
+
+        return pd.DataFrame(
+            session.exec(stmt).all(),
+            columns=[
+                "student_id", "subject_id", "credits", "marks_obtained", "passing_marks",
+                "grade_point", "is_absent", "academic_year", "start_date",
+            ],
+        )
+
+    @staticmethod
+    def compute_semester_results(results: pd.DataFrame) -> pd.DataFrame:
+        """
+        Per-student credits, SGPA and backlogs in one vectorized pass
+
+        The best attempt per (student, subject) counts, so a cleared
+        supplementary replaces the original failure. A subject is passed
+        when the student was present, reached passing marks and got a
+        non-zero grade point.
+
+        Returns:
+            Frame indexed by student_id with total_credits, earned_credits,
+            failed_credits, sgpa and backlog_subject_ids
+        """
+        results = results.assign(
+            passed=(
+                ~results["is_absent"].astype(bool)
+                & (results["marks_obtained"] >= results["passing_marks"])
+                & (results["grade_point"] > 0)
+            )
+        )
+        best = (
+            results.sort_values(["grade_point", "marks_obtained"], ascending=False, kind="stable")
+            .drop_duplicates(["student_id", "subject_id"])
+        )
+        best = best.assign(
+            points=best["grade_point"] * best["credits"],
+            earned=best["credits"].where(best["passed"], 0),
+        )
+
+        totals = best.groupby("student_id").agg(
+            total_credits=("credits", "sum"),
+            earned_credits=("earned", "sum"),
+            points=("points", "sum"),
+        )
+        totals["failed_credits"] = totals["total_credits"] - totals["earned_credits"]
+        totals["sgpa"] = (totals["points"] / totals["total_credits"].where(totals["total_credits"] > 0)).round(2)
+
+        backlogs = best.loc[~best["passed"]].sort_values("subject_id").groupby("student_id")["subject_id"].agg(list)
+        totals["backlog_subject_ids"] = backlogs.reindex(totals.index)
+        totals["backlog_subject_ids"] = totals["backlog_subject_ids"].apply(
+            lambda subject_ids: subject_ids if isinstance(subject_ids, list) else []
+        )
+        return totals.drop(columns="points")
+
+    @staticmethod
+    def process_semester(
+        session: Session,
+        batch_semester_id: int,
+        exam_id: Optional[int] = None,
+        progress: Optional[ProgressCallback] = None
+    ) -> ResultProcessingSummary:
+        """
+        Compute and write semester history for every student with results
+
+        Uses every FINAL exam of the semester, or only exam_id when given.
+        Results are read in one query and aggregated with pandas; history
+        rows are written HISTORY_CHUNK_SIZE at a time (INSERT ... ON
+        CONFLICT on PostgreSQL, executemany UPDATE/INSERT elsewhere).
+        Reprocessing refreshes credits, SGPA and backlogs but keeps the
+        status of existing rows.
+
+        The caller owns the transaction and must commit.
+        """
+        semester = session.get(BatchSemester, batch_semester_id)
+        if not semester:
+            raise HTTPException(status_code=404, detail="Batch semester not found")
+        batch = session.get(AcademicBatch, semester.batch_id)
+
+        if exam_id is not None:
+            exam = session.get(Exam, exam_id)
+            if not exam or exam.batch_semester_id != batch_semester_id:
+                raise HTTPException(status_code=404, detail="Exam not found for this semester")
+
+        results = ResultProcessingService._load_results(session, batch_semester_id, exam_id)
+        if results.empty:
+            raise HTTPException(status_code=400, detail="No graded results to process for this semester")
+
+        # The semester belongs to the academic year of its first sitting
+        academic_year = results["academic_year"].iloc[results["start_date"].argmin()]
+        academic_year_id = session.exec(
+            select(AcademicYear.id).where(AcademicYear.name == academic_year)
+        ).first()
+        if academic_year_id is None:
+            raise HTTPException(status_code=400, detail=f"Academic year {academic_year} not found")
+
+        totals = ResultProcessingService.compute_semester_results(results)
+        student_ids = totals.index.tolist()
+        if progress:
+            progress(0, len(student_ids))
+
+        existing = dict(session.exec(
+            select(StudentSemesterHistory.student_id, StudentSemesterHistory.id)
+            .where(StudentSemesterHistory.academic_year_id == academic_year_id)
+            .where(StudentSemesterHistory.semester_no == semester.semester_no)
+            .where(StudentSemesterHistory.student_id.in_(student_ids))
+        ).all())
+
+        now = datetime.utcnow()
+        rows: List[Dict[str, Any]] = [
+            {
+                "student_id": int(student_id),
+                "batch_id": semester.batch_id,
+                "academic_year_id": academic_year_id,
+                "regulation_id": batch.regulation_id,
+                "program_year": semester.year_no,
+                "semester_no": semester.semester_no,
+                "total_credits": int(row.total_credits),
+                "earned_credits": int(row.earned_credits),
+                "failed_credits": int(row.failed_credits),
+                "sgpa": None if pd.isna(row.sgpa) else Decimal(str(row.sgpa)),
+                "backlog_subject_ids": [int(subject_id) for subject_id in row.backlog_subject_ids],
+                "status": RESULT_DECLARED,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for student_id, row in zip(student_ids, totals.itertuples(index=False))
+        ]
+
+        is_postgresql = session.get_bind().dialect.name == "postgresql"
+        for start in range(0, len(rows), HISTORY_CHUNK_SIZE):
+            chunk = rows[start:start + HISTORY_CHUNK_SIZE]
+            if is_postgresql:
+                stmt = pg_insert(StudentSemesterHistory).values(chunk)
+                stmt = stmt.on_conflict_do_update(
+                    constraint="uq_student_semester",
+                    set_={name: stmt.excluded[name] for name in HISTORY_RESULT_COLUMNS}
+                )
+                session.execute(stmt)
+            else:
+                updates = [
+                    {"id": existing[row["student_id"]], **{name: row[name] for name in HISTORY_RESULT_COLUMNS}}
+                    for row in chunk if row["student_id"] in existing
+                ]
+                inserts = [row for row in chunk if row["student_id"] not in existing]
+                if updates:
+                    # ORM bulk UPDATE by primary key -> executemany
+                    session.execute(update(StudentSemesterHistory), updates)
+                if inserts:
+                    session.execute(insert(StudentSemesterHistory), inserts)
+            if progress:
+                progress(start + len(chunk), len(rows))
+
+        return ResultProcessingSummary(
+            batch_semester_id=batch_semester_id,
+            academic_year_id=academic_year_id,
+            students_processed=len(rows),
+            students_with_backlogs=int((totals["failed_credits"] > 0).sum()),
+            histories_created=len(rows) - len(existing),
+            histories_updated=len(existing),
+            average_sgpa=None if totals["sgpa"].isna().all() else round(float(totals["sgpa"].mean()), 2),
+        )
+
+    @staticmethod
+    def run_job(job_id: str, session: Optional[Session] = None, raise_errors: bool = False) -> None:
+        """
+        Run a queued job, recording progress in ResultProcessingJobs
+
+        Opens its own session unless one is given, so it can be handed to
+        FastAPI BackgroundTasks after the request session is closed. A
+        failure is recorded on the job; with raise_errors it is also
+        re-raised, so a caller running the job inline can report it.
+        """
+        job = ResultProcessingJobs.get(job_id)
+        if not job:
+            return
+        if session is None:
+            with Session(engine) as own_session:
+                return ResultProcessingService.run_job(job_id, own_session, raise_errors)
+
+        ResultProcessingJobs.update(job_id, status="RUNNING")
+        try:
+            summary = ResultProcessingService.process_semester(
+                session,
+                job.batch_semester_id,
+                job.exam_id,
+                progress=lambda processed, total: ResultProcessingJobs.update(
+                    job_id, processed=processed, total=total
+                ),
+            )
+            session.commit()
+        except HTTPException as e:
+            session.rollback()
+            ResultProcessingJobs.update(job_id, status="FAILED", error=str(e.detail), finished_at=datetime.utcnow())
+            if raise_errors:
+                raise
+            return
+        except Exception as e:
+            session.rollback()
+            print(f"Result processing job {job_id} failed: {e}")
+            ResultProcessingJobs.update(job_id, status="FAILED", error=str(e), finished_at=datetime.utcnow())
+            if raise_errors:
+                raise
+            return
+
+        ResultProcessingJobs.update(job_id, status="COMPLETED", summary=summary, finished_at=datetime.utcnow())
@@ -7,6 +7,7 @@ import boto3
 from botocore.client import Config
 from botocore.exceptions import ClientError
 from fastapi import UploadFile, HTTPException
+from starlette.concurrency import run_in_threadpool
 
 # Make python-magic optional (requires libmagic system library)
 try:
@@ -152,8 +153,9 @@ class StorageService:
         s3_key = self._generate_unique_key(prefix, file.filename)
         
         try:
-            # Upload to S3
-            self.s3_client.put_object(
+            # Upload to S3; boto3 blocks, so keep it off the event loop
+            await run_in_threadpool(
+                self.s3_client.put_object,
                 Bucket=bucket,
                 Key=s3_key,
                 Body=contents,
@@ -0,0 +1,498 @@
+"""
+Synthetic campus data generator for benchmarks and load tests
+
+A campus is programs x batches x sections x students, with a semester of
+attendance for every section, exam cycles with results and fee
+assignments with payments. All ids are planned up front by plan_campus,
+so a load script can address students, sections and sessions without
+reading the database, and every random choice is seeded per entity, so a
+given CampusSize always produces the same rows.
+
+Rows are generated lazily and written in chunks: COPY on PostgreSQL,
+executemany INSERT elsewhere. The target tables must be empty.
+"""
+import csv
+import io
+import itertools
+import random
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, Iterator, List
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.engine import Connection
+
+from app.models.academic.batch import AcademicBatch, BatchSemester, ProgramYear
+from app.models.academic.regulation import Regulation
+from app.models.attendance import AttendanceRecord, AttendanceSession, AttendanceStatus, SessionStatus
+from app.models.department import Department
+from app.models.exam import Exam, ExamResult, ExamSchedule, ExamStatus, ExamType
+from app.models.faculty import Faculty
+from app.models.fee import (
+    FeeCategory, FeeInstallment, FeePayment, FeeStructure, PaymentMode, PaymentStatus, StudentFee
+)
+from app.models.master_data import Section
+from app.models.program import Program, ProgramStatus, ProgramType
+from app.models.student import Gender, ScholarshipCategory, Student, StudentStatus
+from app.models.subject import Subject
+
+YEARS_PER_BATCH = 4
+SEMESTERS_PER_YEAR = 2
+CURRENT_YEAR = 2024
+SEMESTER_START = date(2024, 7, 1)
+INSTALLMENTS = 3
+INSTALLMENT_AMOUNT = Decimal("25000.00")
+CREATED_AT = datetime(2024, 6, 1)
+
+# Exam cycles held in the current semester, in order, by exams_per_semester
+EXAM_CYCLES = (ExamType.FINAL, ExamType.MID_TERM, ExamType.INTERNAL, ExamType.PRACTICAL)
+
+# Weighted attendance outcome for each mark
+ATTENDANCE_WEIGHTS = (
+    (AttendanceStatus.PRESENT, 80),
+    (AttendanceStatus.ABSENT, 12),
+    (AttendanceStatus.LATE, 6),
+    (AttendanceStatus.ON_DUTY, 2),
+)
+
+
+@dataclass(frozen=True)
+class CampusSize:
+    programs: int = 2
+    batches_per_program: int = 1  # Batch k joined k years ago and is in semester 2k + 1
+    sections_per_batch: int = 25
+    students_per_section: int = 100
+    subjects_per_semester: int = 5
+    teaching_days: int = 60  # Weekdays of attendance in the current semester
+    sessions_per_day: int = 2  # Per section; subjects rotate through the slots
+    exams_per_semester: int = 1
+    paid_ratio: float = 0.7  # Share of students who paid at least one installment
+    seed: int = 2024
+
+    @property
+    def batches(self) -> int:
+        return self.programs * self.batches_per_program
+
+    @property
+    def sections(self) -> int:
+        return self.batches * self.sections_per_batch
+
+    @property
+    def students(self) -> int:
+        return self.sections * self.students_per_section
+
+
+PRESETS: Dict[str, CampusSize] = {
+    # Query budgets on every test run
+    "small": CampusSize(sections_per_batch=5, students_per_section=50, teaching_days=10),
+    # 5,000 students, 600k attendance marks
+    "benchmark": CampusSize(),
+    # 20,000 students over 4 programs x 4 live batches, 3.6M attendance marks
+    "large": CampusSize(
+        programs=4, batches_per_program=4, sections_per_batch=10, students_per_section=125,
+        teaching_days=90, exams_per_semester=2,
+    ),
+}
+
+
+@dataclass
+class SectionPlan:
+    id: int
+    code: str
+    program_id: int
+    batch_id: int
+    program_year_id: int
+    batch_semester_id: int
+    year_no: int
+    semester_no: int
+    subject_ids: List[int]
+    student_ids: range
+    session_ids: range  # Completed sessions with attendance marked
+    open_session_id: int  # A scheduled session with nothing marked yet
+    exam_schedule_ids: List[int]
+    fee_structure_id: int
+
+
+@dataclass
+class CampusPlan:
+    size: CampusSize
+    program_ids: List[int] = field(default_factory=list)
+    batch_ids: List[int] = field(default_factory=list)
+    sections: List[SectionPlan] = field(default_factory=list)
+    row_counts: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def section_ids(self) -> List[int]:
+        return [section.id for section in self.sections]
+
+
+def _batch_id(size: CampusSize, program_id: int, age: int) -> int:
+    return (program_id - 1) * size.batches_per_program + age + 1
+
+
+def _subject_id(size: CampusSize, program_id: int, semester_no: int, index: int) -> int:
+    semesters = YEARS_PER_BATCH * SEMESTERS_PER_YEAR
+    return ((program_id - 1) * semesters + semester_no - 1) * size.subjects_per_semester + index + 1
+
+
+def _exam_id(size: CampusSize, batch_id: int, cycle: int) -> int:
+    return (batch_id - 1) * size.exams_per_semester + cycle + 1
+
+
+def plan_campus(size: CampusSize) -> CampusPlan:
+    """Every id the generator will write, without touching a database"""
+    plan = CampusPlan(size=size)
+    sessions_per_section = size.teaching_days * size.sessions_per_day + 1
+    section_ids = itertools.count(1)
+    next_student = 1
+
+    for program_id in range(1, size.programs + 1):
+        plan.program_ids.append(program_id)
+        for age in range(size.batches_per_program):
+            batch_id = _batch_id(size, program_id, age)
+            plan.batch_ids.append(batch_id)
+            year_no = age + 1
+            semester_no = age * SEMESTERS_PER_YEAR + 1
+            subject_ids = [
+                _subject_id(size, program_id, semester_no, index)
+                for index in range(size.subjects_per_semester)
+            ]
+            exam_schedule_ids = [
+                (_exam_id(size, batch_id, cycle) - 1) * size.subjects_per_semester + index + 1
+                for cycle in range(size.exams_per_semester)
+                for index in range(size.subjects_per_semester)
+            ]
+            for c in range(size.sections_per_batch):
+                section_id = next(section_ids)
+                first_session = (section_id - 1) * sessions_per_section + 1
+                plan.sections.append(SectionPlan(
+                    id=section_id,
+                    code=f"S{c + 1:02d}",
+                    program_id=program_id,
+                    batch_id=batch_id,
+                    program_year_id=(batch_id - 1) * YEARS_PER_BATCH + year_no,
+                    batch_semester_id=(batch_id - 1) * YEARS_PER_BATCH * SEMESTERS_PER_YEAR + semester_no,
+                    year_no=year_no,
+                    semester_no=semester_no,
+                    subject_ids=subject_ids,
+                    student_ids=range(next_student, next_student + size.students_per_section),
+                    session_ids=range(first_session, first_session + sessions_per_section - 1),
+                    open_session_id=first_session + sessions_per_section - 1,
+                    exam_schedule_ids=exam_schedule_ids,
+                    fee_structure_id=(program_id - 1) * YEARS_PER_BATCH + year_no,
+                ))
+                next_student += size.students_per_section
+    return plan
+
+
+def _rng(size: CampusSize, kind: str, entity_id: int) -> random.Random:
+    """Independent stream per entity, so rows do not depend on generation order"""
+    return random.Random(f"{size.seed}:{kind}:{entity_id}")
+
+
+def _teaching_date(day: int) -> date:
+    """day-th weekday of the semester"""
+    return SEMESTER_START + timedelta(days=day // 5 * 7 + day % 5)
+
+
+# --- Row generators, in foreign key order ---
+
+def _structure_rows(plan: CampusPlan) -> Iterator[tuple]:
+    size = plan.size
+    yield Department, [{"id": 1, "name": "Hospitality", "code": "HOS"}]
+    yield Faculty, [
+        {"id": f, "name": f"Faculty {f}", "max_weekly_hours": 20}
+        for f in range(1, size.subjects_per_semester + 1)
+    ]
+    yield Program, [
+        {
+            "id": p, "code": f"P{p}", "short_name": f"P{p}", "name": f"Program {p}", "department_id": 1,
+            "program_type": ProgramType.UG.name, "status": ProgramStatus.ACTIVE.name,
+            "duration_years": YEARS_PER_BATCH, "semester_system": True, "rnet_required": False,
+            "is_active": True, "created_at": CREATED_AT, "updated_at": CREATED_AT,
+        }
+        for p in plan.program_ids
+    ]
+    yield Regulation, [
+        {"id": p, "regulation_code": f"R{p}", "regulation_name": f"Regulation {p}", "program_id": p}
+        for p in plan.program_ids
+    ]
+    yield Subject, [
+        {
+            "id": _subject_id(size, p, semester_no, index),
+            "code": f"P{p}S{semester_no}{index + 1:02d}",
+            "name": f"Program {p} Semester {semester_no} Subject {index + 1}",
+            "credits": 4 if index < 2 else 3, "faculty_id": index + 1,
+        }
+        for p in plan.program_ids
+        for semester_no in range(1, YEARS_PER_BATCH * SEMESTERS_PER_YEAR + 1)
+        for index in range(size.subjects_per_semester)
+    ]
+
+    batches, years, semesters = [], [], []
+    for p in plan.program_ids:
+        for age in range(size.batches_per_program):
+            batch_id = _batch_id(size, p, age)
+            joining_year = CURRENT_YEAR - age
+            batches.append({
+                "id": batch_id, "batch_code": f"P{p}-{joining_year}-{joining_year + YEARS_PER_BATCH}",
+                "batch_name": f"Program {p} Batch {joining_year}", "program_id": p, "regulation_id": p,
+                "joining_year": joining_year, "start_year": joining_year,
+                "end_year": joining_year + YEARS_PER_BATCH,
+            })
+            for year_no in range(1, YEARS_PER_BATCH + 1):
+                year_id = (batch_id - 1) * YEARS_PER_BATCH + year_no
+                years.append({"id": year_id, "batch_id": batch_id, "year_no": year_no, "year_name": f"Year {year_no}"})
+                for semester_no in range(year_no * 2 - 1, year_no * 2 + 1):
+                    semesters.append({
+                        "id": (batch_id - 1) * YEARS_PER_BATCH * SEMESTERS_PER_YEAR + semester_no,
+                        "batch_id": batch_id, "program_year_id": year_id, "year_no": year_no,
+                        "semester_no": semester_no, "semester_name": f"Semester {semester_no}",
+                    })
+    yield AcademicBatch, batches
+    yield ProgramYear, years
+    yield BatchSemester, semesters
+    yield Section, [
+        {
+            "id": section.id, "name": f"Section {section.code}", "code": section.code,
+            "batch_semester_id": section.batch_semester_id, "batch_id": section.batch_id, "faculty_id": 1,
+            "max_strength": size.students_per_section + 10, "current_strength": size.students_per_section,
+            "is_active": True,
+        }
+        for section in plan.sections
+    ]
+
+
+def _student_rows(plan: CampusPlan) -> Iterator[dict]:
+    for section in plan.sections:
+        rng = _rng(plan.size, "students", section.id)
+        joining_year = CURRENT_YEAR - section.year_no + 1
+        for student_id in section.student_ids:
+            yield {
+                "id": student_id, "admission_number": f"ADM{joining_year}{student_id:06d}",
+                "name": f"Student {student_id}", "phone": f"9{student_id:09d}",
+                "email": f"student{student_id}@campus.example", "program_id": section.program_id,
+                "batch_id": section.batch_id, "program_year_id": section.program_year_id,
+                "batch_semester_id": section.batch_semester_id, "section_id": section.id,
+                "gender": rng.choice((Gender.MALE, Gender.FEMALE)).name,
+                "hostel_required": rng.random() < 0.3, "transport_required": rng.random() < 0.2,
+                "scholarship_category": ScholarshipCategory.GENERAL.name, "lateral_entry": False,
+                "status": StudentStatus.ACTIVE.name,
+            }
+
+
+def _attendance_session_rows(plan: CampusPlan) -> Iterator[dict]:
+    size = plan.size
+    for section in plan.sections:
+        def row(session_id: int, slot_index: int, session_date: date, status: SessionStatus) -> dict:
+            subject = slot_index % len(section.subject_ids)
+            slot = slot_index % size.sessions_per_day
+            return {
+                "id": session_id, "subject_id": section.subject_ids[subject], "faculty_id": subject + 1,
+                "program_id": section.program_id, "program_year_id": section.program_year_id,
+                "semester": section.semester_no, "section": section.code, "session_date": session_date,
+                "start_time": time(9 + slot), "end_time": time(10 + slot), "status": status.name,
+                "created_at": CREATED_AT, "updated_at": CREATED_AT,
+            }
+
+        for slot_index, session_id in enumerate(section.session_ids):
+            yield row(session_id, slot_index, _teaching_date(slot_index // size.sessions_per_day), SessionStatus.COMPLETED)
+        yield row(section.open_session_id, 0, _teaching_date(size.teaching_days), SessionStatus.SCHEDULED)
+
+
+def _attendance_record_rows(plan: CampusPlan) -> Iterator[dict]:
+    statuses = [status.name for status, _ in ATTENDANCE_WEIGHTS]
+    weights = list(itertools.accumulate(weight for _, weight in ATTENDANCE_WEIGHTS))
+    for section in plan.sections:
+        rng = _rng(plan.size, "attendance", section.id)
+        students = len(section.student_ids)
+        for session_id in section.session_ids:
+            marks = rng.choices(statuses, cum_weights=weights, k=students)
+            for student_id, status in zip(section.student_ids, marks):
+                yield {
+                    "session_id": session_id, "student_id": student_id, "status": status,
+                    "created_at": CREATED_AT, "updated_at": CREATED_AT,
+                }
+
+
+def _exam_rows(plan: CampusPlan) -> Iterator[tuple]:
+    size = plan.size
+    exams, schedules = [], []
+    first_section = {}
+    for section in plan.sections:
+        first_section.setdefault(section.batch_id, section)
+    for batch_id, section in first_section.items():
+        for cycle in range(size.exams_per_semester):
+            exam_id = _exam_id(size, batch_id, cycle)
+            exam_type = EXAM_CYCLES[cycle % len(EXAM_CYCLES)]
+            start = SEMESTER_START + timedelta(days=120 - 30 * cycle)
+            exams.append({
+                "id": exam_id, "name": f"Batch {batch_id} Semester {section.semester_no} {exam_type.value}",
+                "exam_type": exam_type.name, "academic_year": f"{CURRENT_YEAR}-{CURRENT_YEAR + 1}",
+                "batch_semester_id": section.batch_semester_id, "start_date": start,
+                "end_date": start + timedelta(days=10), "status": ExamStatus.COMPLETED.name,
+            })
+            for index, subject_id in enumerate(section.subject_ids):
+                schedules.append({
+                    "id": (exam_id - 1) * size.subjects_per_semester + index + 1, "exam_id": exam_id,
+                    "subject_id": subject_id, "exam_date": start + timedelta(days=index),
+                    "start_time": time(10), "end_time": time(13), "max_marks": 100, "passing_marks": 40,
+                })
+    yield Exam, exams
+    yield ExamSchedule, schedules
+
+
+def _exam_result_rows(plan: CampusPlan) -> Iterator[dict]:
+    for section in plan.sections:
+        rng = _rng(plan.size, "results", section.id)
+        for schedule_id in section.exam_schedule_ids:
+            for student_id in section.student_ids:
+                yield {
+                    "exam_schedule_id": schedule_id, "student_id": student_id,
+                    "marks_obtained": max(0, min(100, round(rng.gauss(62, 15)))), "is_absent": False,
+                }
+
+
+def _fee_rows(plan: CampusPlan) -> Iterator[tuple]:
+    structures, installments = [], []
+    for p in plan.program_ids:
+        for year_no in range(1, YEARS_PER_BATCH + 1):
+            structure_id = (p - 1) * YEARS_PER_BATCH + year_no
+            structures.append({
+                "id": structure_id, "program_id": p, "academic_year": f"{CURRENT_YEAR}-{CURRENT_YEAR + 1}",
+                "year": year_no, "category": FeeCategory.GENERAL.name,
+                "total_amount": INSTALLMENT_AMOUNT * INSTALLMENTS,
+                "created_at": CREATED_AT, "updated_at": CREATED_AT,
+            })
+            for n in range(1, INSTALLMENTS + 1):
+                installments.append({
+                    "fee_structure_id": structure_id, "installment_number": n, "amount": INSTALLMENT_AMOUNT,
+                    "due_date": SEMESTER_START + timedelta(days=60 * (n - 1)),
+                })
+    yield FeeStructure, structures
+    yield FeeInstallment, installments
+
+
+def _installments_paid(plan: CampusPlan, section: SectionPlan) -> Dict[int, int]:
+    rng = _rng(plan.size, "fees", section.id)
+    return {
+        student_id: rng.randint(1, INSTALLMENTS) if rng.random() < plan.size.paid_ratio else 0
+        for student_id in section.student_ids
+    }
+
+
+def _student_fee_rows(plan: CampusPlan) -> Iterator[dict]:
+    for section in plan.sections:
+        for student_id, paid in _installments_paid(plan, section).items():
+            yield {
+                "id": student_id, "student_id": student_id, "fee_structure_id": section.fee_structure_id,
+                "academic_year": f"{CURRENT_YEAR}-{CURRENT_YEAR + 1}",
+                "total_fee": INSTALLMENT_AMOUNT * INSTALLMENTS, "concession_amount": Decimal("0.00"),
+                "fine_amount": Decimal("0.00"), "paid_amount": INSTALLMENT_AMOUNT * paid,
+                "balance": INSTALLMENT_AMOUNT * (INSTALLMENTS - paid),
+                "is_blocked": False, "created_at": CREATED_AT, "updated_at": CREATED_AT,
+            }
+
+
+def _fee_payment_rows(plan: CampusPlan) -> Iterator[dict]:
+    modes = [mode.name for mode in PaymentMode]
+    for section in plan.sections:
+        rng = _rng(plan.size, "payments", section.id)
+        for student_id, paid in _installments_paid(plan, section).items():
+            for n in range(paid):
+                paid_at = datetime.combine(SEMESTER_START + timedelta(days=60 * n + rng.randint(0, 20)), time(11))
+                yield {
+                    "student_fee_id": student_id, "amount": INSTALLMENT_AMOUNT, "payment_mode": rng.choice(modes),
+                    "payment_status": PaymentStatus.SUCCESS.name, "transaction_id": f"TXN{student_id:07d}{n + 1}",
+                    "payment_date": paid_at, "created_at": paid_at,
+                }
+
+
+# --- Writer ---
+
+def _chunks(rows: Iterable[dict], chunk_size: int) -> Iterator[List[dict]]:
+    iterator = iter(rows)
+    while chunk := list(itertools.islice(iterator, chunk_size)):
+        yield chunk
+
+
+class _BulkWriter:
+    """Writes row dicts with COPY on PostgreSQL and executemany elsewhere"""
+
+    def __init__(self, connection: Connection, chunk_size: int, progress: Callable[[str, int], None]):
+        self.connection = connection
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.use_copy = connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg2"
+        self.explicit_ids = []
+
+    def write(self, model, rows: Iterable[dict], plan: CampusPlan) -> None:
+        table = model.__table__
+        written = 0
+        for chunk in _chunks(rows, self.chunk_size):
+            if self.use_copy:
+                self._copy(table, chunk)
+            else:
+                self.connection.execute(insert(table), chunk)
+            written += len(chunk)
+            self.progress(table.name, written)
+        plan.row_counts[table.name] = written
+        if written and "id" in chunk[0]:
+            self.explicit_ids.append(table)
+
+    def _copy(self, table, chunk: List[dict]) -> None:
+        columns = list(chunk[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in chunk:
+            # An unquoted empty field is NULL in COPY csv format
+            writer.writerow(["" if row[name] is None else row[name] for name in columns])
+        buffer.seek(0)
+        column_list = ", ".join(f'"{name}"' for name in columns)
+        cursor = self.connection.connection.dbapi_connection.cursor()
+        cursor.copy_expert(f'COPY "{table.name}" ({column_list}) FROM STDIN WITH (FORMAT csv)', buffer)
+        cursor.close()
+
+    def reset_sequences(self) -> None:
+        """Move serial sequences past ids written explicitly (PostgreSQL)"""
+        if self.connection.dialect.name != "postgresql":
+            return
+        for table in self.explicit_ids:
+            max_id = self.connection.execute(select(func.max(table.c.id))).scalar()
+            self.connection.execute(
+                text("SELECT setval(pg_get_serial_sequence(:table, 'id'), :max_id)"),
+                {"table": f'"{table.name}"', "max_id": max_id},
+            )
+
+
+def generate_campus(
+    connection: Connection,
+    size: CampusSize,
+    chunk_size: int = 20000,
+    progress: Callable[[str, int], None] = lambda table, rows: None,
+) -> CampusPlan:
+    """
+    Write a campus of the given size into empty tables
+
+    The caller owns the transaction. progress(table, rows_written) is
+    called after every chunk.
+    """
+    plan = plan_campus(size)
+    writer = _BulkWriter(connection, chunk_size, progress)
+
+    for model, rows in _structure_rows(plan):
+        writer.write(model, rows, plan)
+    writer.write(Student, _student_rows(plan), plan)
+    writer.write(AttendanceSession, _attendance_session_rows(plan), plan)
+    writer.write(AttendanceRecord, _attendance_record_rows(plan), plan)
+    for model, rows in _exam_rows(plan):
+        writer.write(model, rows, plan)
+    writer.write(ExamResult, _exam_result_rows(plan), plan)
+    for model, rows in _fee_rows(plan):
+        writer.write(model, rows, plan)
+    writer.write(StudentFee, _student_fee_rows(plan), plan)
+    writer.write(FeePayment, _fee_payment_rows(plan), plan)
+
+    writer.reset_sequences()
+    return plan
@@ -0,0 +1,71 @@
+"""
+In-process runner for student import jobs
+
+Jobs live in import_log / import_log_row, so the queue survives restarts:
+on startup every unfinished job is handed to the pool again, and a job a
+crashed worker left RUNNING is claimed once its heartbeat goes stale.
+Several API processes can resume the same jobs safely; claiming is an
+atomic UPDATE, so only one of them runs each job.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlmodel import Session, select
+
+from app.config.settings import settings
+from app.core.security import shutdown_hash_pool
+from app.db.session import engine
+from app.models.import_log import ImportLog
+from app.services.import_service import ImportService
+
+_executor = ThreadPoolExecutor(max_workers=settings.IMPORT_JOB_WORKERS, thread_name_prefix="import-job")
+
+
+def _run(log_id: int) -> None:
+    with Session(engine) as session:
+        ImportService(session).run_import_job(log_id)
+
+
+def _resume(log_id: int) -> None:
+    """
+    Run a job left unfinished
+
+    If another worker holds it, check again once its heartbeat could have
+    gone stale. The wait is a timer rather than a sleep so it does not tie
+    up a pool thread.
+    """
+    with Session(engine) as session:
+        if ImportService(session).run_import_job(log_id) is not None:
+            return
+        log = session.get(ImportLog, log_id)
+        if log is None or log.status != "RUNNING" or log.heartbeat_at is None:
+            return
+        stale_at = log.heartbeat_at + timedelta(seconds=settings.IMPORT_JOB_STALE_SECONDS)
+    timer = threading.Timer(
+        max(1.0, (stale_at - datetime.utcnow()).total_seconds()), _executor.submit, args=(_resume, log_id)
+    )
+    timer.daemon = True
+    timer.start()
+
+
+def submit_import_job(log_id: int) -> None:
+    """Run a PENDING import job in the background"""
+    _executor.submit(_run, log_id)
+
+
+def resume_import_jobs() -> int:
+    """Queue every PENDING or RUNNING import job; returns how many"""
+    with Session(engine) as session:
+        log_ids = session.exec(
+            select(ImportLog.id).where(ImportLog.status.in_(["PENDING", "RUNNING"]))
+        ).all()
+    for log_id in log_ids:
+        _executor.submit(_resume, log_id)
+    return len(log_ids)
+
+
+def shutdown() -> None:
+    """Stop taking jobs; a job cut off mid-chunk resumes on next startup"""
+    _executor.shutdown(wait=False, cancel_futures=True)
+    shutdown_hash_pool()
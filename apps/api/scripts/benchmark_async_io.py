@@ -0,0 +1,166 @@
+"""
+Async I/O Benchmark
+
+Compares request throughput of the old blocking pattern (sync Session and
+boto3 calls inside an `async def` route) against the async session with
+storage calls moved to the threadpool, under N concurrent clients.
+
+Both routes load one admission application with its payments and then make
+a simulated object-storage call of --storage-latency-ms, which stands in
+for the boto3 HEAD request in /files/confirm-upload. The clients run on the
+same event loop as the app (httpx ASGITransport), so a route that blocks
+the loop stalls every other in-flight request, as it would under uvicorn.
+
+Defaults to a temporary SQLite file; pass a PostgreSQL URL to measure the
+real asyncpg path.
+
+Usage:
+    python scripts/benchmark_async_io.py [--clients 200] [--requests 2000]
+        [--storage-latency-ms 20] [--database-url postgresql://...]
+"""
+import sys
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+import httpx
+from fastapi import FastAPI, Depends
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import selectinload
+from sqlmodel import SQLModel, Session, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.models  # noqa: F401
+from app.db.session import get_async_database_url
+from app.models.admissions import Application, ApplicationPayment, ApplicationPaymentStatus
+
+APPLICATIONS = 100
+
+
+def seed(engine) -> None:
+    """Create APPLICATIONS applications with one payment each"""
+    SQLModel.metadata.drop_all(engine, tables=[ApplicationPayment.__table__, Application.__table__])
+    SQLModel.metadata.create_all(engine, tables=[Application.__table__, ApplicationPayment.__table__])
+    with Session(engine) as session:
+        for i in range(1, APPLICATIONS + 1):
+            session.add(Application(
+                id=i, application_number=f"APP-BENCH-{i:04d}", name=f"Applicant {i}",
+                email=f"applicant{i}@example.com", phone="9000000000", gender="FEMALE",
+                program_id=1, state="Telangana", board="State", group_of_study="MPC",
+            ))
+            session.add(ApplicationPayment(
+                application_id=i, transaction_id=f"TXN-{i}", amount=500,
+                status=ApplicationPaymentStatus.SUCCESS,
+            ))
+        session.commit()
+
+
+def build_app(database_url: str, storage_latency: float) -> FastAPI:
+    engine = create_engine(database_url)
+    async_engine = create_async_engine(get_async_database_url(database_url))
+
+    def storage_call():
+        time.sleep(storage_latency)
+
+    async def get_async_session():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    def statement(id: int):
+        return (
+            select(Application)
+            .where(Application.id == id)
+            .options(selectinload(Application.payments))
+        )
+
+    bench = FastAPI()
+
+    @bench.get("/blocking/{id}")
+    async def blocking(id: int):
+        with Session(engine) as session:
+            application = session.exec(statement(id)).first()
+            paid = sum(p.amount for p in application.payments)
+        storage_call()
+        return {"id": application.id, "paid": paid}
+
+    @bench.get("/async/{id}")
+    async def non_blocking(id: int, session: AsyncSession = Depends(get_async_session)):
+        application = (await session.exec(statement(id))).first()
+        paid = sum(p.amount for p in application.payments)
+        await run_in_threadpool(storage_call)
+        return {"id": application.id, "paid": paid}
+
+    bench.state.engines = (engine, async_engine)
+    return bench
+
+
+async def load(bench: FastAPI, path: str, clients: int, total: int) -> dict:
+    """Issue total requests to path from clients concurrent workers"""
+    latencies = []
+    remaining = iter(range(total))
+
+    async def worker(client: httpx.AsyncClient):
+        for n in remaining:
+            start = time.perf_counter()
+            response = await client.get(f"{path}/{n % APPLICATIONS + 1}")
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    transport = httpx.ASGITransport(app=bench)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "route": path,
+        "rps": total / elapsed,
+        "median_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+async def run(database_url: str, clients: int, total: int, storage_latency: float) -> list:
+    bench = build_app(database_url, storage_latency)
+    engine, async_engine = bench.state.engines
+    seed(engine)
+
+    results = []
+    for path in ("/blocking", "/async"):
+        # Warm up connection pools before measuring
+        await load(bench, path, min(clients, 10), 20)
+        results.append(await load(bench, path, clients, total))
+
+    await async_engine.dispose()
+    engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark blocking vs async I/O in async routes")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--storage-latency-ms", type=float, default=20.0)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        results = asyncio.run(run(database_url, args.clients, args.requests, args.storage_latency_ms / 1000))
+
+    print(f"{args.clients} clients, {args.requests} requests, {args.storage_latency_ms:g} ms storage latency")
+    print(f"{'route':>10} {'req/s':>8} {'median ms':>10} {'p95 ms':>8}")
+    for result in results:
+        print(f"{result['route']:>10} {result['rps']:>8.1f} {result['median_ms']:>10.1f} {result['p95_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
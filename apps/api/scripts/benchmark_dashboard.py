@@ -0,0 +1,164 @@
+"""
+Academic Dashboard Benchmark
+
+Seeds an in-memory SQLite database with N fully set-up batches
+(4 years, 8 semesters, 2 sections per semester, 3 labs per section)
+and reports SQL statement count and latency of
+AcademicDashboardService.get_dashboard_data for 1, 10 and 50 batches.
+
+Usage:
+    python scripts/benchmark_dashboard.py [--runs 5] [--sizes 1 10 50]
+"""
+import sys
+import os
+import time
+import argparse
+import statistics
+
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session, create_engine
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.models  # noqa: F401
+from app.models.department import Department
+from app.models.program import Program
+from app.models.faculty import Faculty
+from app.models.academic.regulation import Regulation
+from app.models.academic.batch import AcademicBatch, ProgramYear, BatchSemester
+from app.models.master_data import Section, PracticalBatch
+from app.services.dashboard_service import AcademicDashboardService
+
+YEARS_PER_BATCH = 4
+SECTIONS_PER_SEMESTER = 2
+LABS_PER_SECTION = 3
+
+
+def seed(session: Session, batch_count: int) -> None:
+    """Create batch_count complete batch hierarchies"""
+    department = Department(name="Hospitality", code="HOS")
+    session.add(department)
+    session.flush()
+
+    program = Program(code="BHM", name="Bachelor of Hotel Management", department_id=department.id)
+    session.add(program)
+    session.flush()
+
+    regulation = Regulation(regulation_code="R24", regulation_name="R2024", program_id=program.id)
+    faculty = Faculty(name="Class Teacher")
+    session.add(regulation)
+    session.add(faculty)
+    session.flush()
+
+    for b in range(batch_count):
+        joining_year = 2000 + b
+        batch = AcademicBatch(
+            batch_code=f"{joining_year}-{joining_year + YEARS_PER_BATCH}",
+            batch_name=f"Batch {joining_year}-{joining_year + YEARS_PER_BATCH}",
+            program_id=program.id,
+            regulation_id=regulation.id,
+            joining_year=joining_year,
+            start_year=joining_year,
+            end_year=joining_year + YEARS_PER_BATCH,
+        )
+        session.add(batch)
+        session.flush()
+
+        for year_no in range(1, YEARS_PER_BATCH + 1):
+            year = ProgramYear(batch_id=batch.id, year_no=year_no, year_name=f"Year {year_no}")
+            session.add(year)
+            session.flush()
+
+            for semester_no in (year_no * 2 - 1, year_no * 2):
+                semester = BatchSemester(
+                    batch_id=batch.id,
+                    program_year_id=year.id,
+                    year_no=year_no,
+                    semester_no=semester_no,
+                    semester_name=f"Semester {semester_no}",
+                )
+                session.add(semester)
+                session.flush()
+
+                for s in range(SECTIONS_PER_SEMESTER):
+                    code = chr(ord("A") + s)
+                    section = Section(
+                        name=f"Section {code}",
+                        code=code,
+                        batch_semester_id=semester.id,
+                        batch_id=batch.id,
+                        faculty_id=faculty.id,
+                        max_strength=60,
+                        current_strength=45,
+                    )
+                    session.add(section)
+                    session.flush()
+
+                    for lab_no in range(1, LABS_PER_SECTION + 1):
+                        session.add(PracticalBatch(
+                            name=f"P{lab_no}",
+                            code=f"{code}-P{lab_no}",
+                            section_id=section.id,
+                            max_strength=20,
+                            current_strength=15,
+                        ))
+    session.commit()
+
+
+def run(batch_count: int, runs: int) -> dict:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        seed(session, batch_count)
+
+    statements = {"count": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements["count"] += 1
+
+    timings = []
+    queries = 0
+    for _ in range(runs):
+        with Session(engine) as session:
+            statements["count"] = 0
+            start = time.perf_counter()
+            data = AcademicDashboardService.get_dashboard_data(session)
+            timings.append((time.perf_counter() - start) * 1000)
+            queries = statements["count"]
+
+    engine.dispose()
+    return {
+        "batches": batch_count,
+        "sections": data.summary["total_sections"],
+        "labs": data.summary["total_labs"],
+        "queries": queries,
+        "median_ms": statistics.median(timings),
+        "min_ms": min(timings),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the academic dashboard builder")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50])
+    args = parser.parse_args()
+
+    print(f"{'batches':>8} {'sections':>9} {'labs':>6} {'queries':>8} {'median ms':>10} {'min ms':>8}")
+    for size in args.sizes:
+        result = run(size, args.runs)
+        print(
+            f"{result['batches']:>8} {result['sections']:>9} {result['labs']:>6} "
+            f"{result['queries']:>8} {result['median_ms']:>10.1f} {result['min_ms']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Student Import Preview Benchmark
+
+Writes a synthetic admission sheet of N rows and times
+ImportService.preview_import on it against an in-memory SQLite campus.
+The sheet mixes the messiness of real uploads: mobiles and Aadhaar numbers
+read as floats, lower-case genders, several date formats, blank cells,
+unknown courses, bad emails and admission numbers repeated within the
+file.
+
+Usage:
+    python scripts/benchmark_import_preview.py [--rows 50000] [--runs 3] [--xlsx]
+"""
+import sys
+import os
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+import pandas as pd
+from fastapi import UploadFile
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session, create_engine
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.models  # noqa: F401
+from app.models.user import User
+from app.services.import_service import ImportService
+from app.utils.campus_generator import PRESETS, generate_campus
+
+
+def build_sheet(rows: int, seed: int = 7) -> pd.DataFrame:
+    rng = random.Random(seed)
+    records = []
+    for i in range(rows):
+        # ~1% repeat an earlier row's number
+        if rng.random() < 0.01 and i:
+            admission = records[rng.randrange(i)]["Admission Number"]
+        else:
+            admission = f"{2024000000 + i}"
+        dob = f"{rng.randint(2003, 2007)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        if rng.random() < 0.2:
+            dob = pd.Timestamp(dob).strftime("%d/%m/%Y")
+        records.append({
+            "Admission Number": admission,
+            "Full Name": f"Student {i}" if rng.random() > 0.01 else None,
+            "Gender": rng.choice(["MALE", "female", "Male", "FEMALE", "OTHER", None]),
+            "DOB": dob if rng.random() > 0.05 else None,
+            "Mobile": float(9000000000 + i) if rng.random() > 0.1 else None,
+            "Email": f"student{i}@example.com" if rng.random() > 0.02 else "not-an-email",
+            "Aadhaar": float(100000000000 + i) if rng.random() > 0.3 else None,
+            "Blood Group": rng.choice(["O+", "A+", "B+", "AB-", None]),
+            "Course": rng.choice(["P1", "P2", "P1", "P9", None]),
+            "Year": rng.choice([1, 1, 2]),
+            "Semester": rng.choice([1, 2]),
+            "Section": rng.choice(["S01", "S02", None]),
+            "Batch": "2024-2028",
+            "Father Name": f"Parent {i}",
+            "Father Mobile": float(8000000000 + i),
+            "Mother Name": None,
+            "Hostel Required": rng.choice(["YES", "no", None]),
+            "Transport Required": rng.choice(["YES", "NO"]),
+            "Scholarship Category": rng.choice(["GENERAL", "SC", "ST", None]),
+            "Lateral Entry": "NO",
+        })
+    return pd.DataFrame.from_records(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Student import preview benchmark")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--xlsx", action="store_true", help="Upload as .xlsx instead of .csv")
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        generate_campus(connection, PRESETS["small"])
+        connection.execute(User.__table__.insert(), [{
+            "id": 1, "username": "admin", "email": "admin@college.edu", "hashed_password": "x",
+            "is_active": True, "is_superuser": True, "token_version": 0,
+        }])
+
+    suffix = ".xlsx" if args.xlsx else ".csv"
+    sheet = build_sheet(args.rows)
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        path = tmp.name
+    if args.xlsx:
+        sheet.to_excel(path, index=False)
+    else:
+        sheet.to_csv(path, index=False)
+    print(f"📄 {args.rows} rows, {os.path.getsize(path) / 1e6:.1f} MB {suffix}")
+
+    timings = []
+    try:
+        for _ in range(args.runs):
+            with Session(engine) as session, open(path, "rb") as f:
+                start = time.perf_counter()
+                preview = ImportService(session).preview_import(UploadFile(file=f, filename=f"students{suffix}"), 1)
+                timings.append(time.perf_counter() - start)
+    finally:
+        os.unlink(path)
+
+    print(f"   valid {preview.valid_count}, invalid {preview.invalid_count}, duplicate {preview.duplicate_count}")
+    median = statistics.median(timings)
+    print(f"⏱  median {median:.2f}s, min {min(timings):.2f}s ({args.rows / median:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
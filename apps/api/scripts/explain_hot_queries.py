@@ -0,0 +1,204 @@
+"""
+Query Plan Check for Hot Endpoints
+
+Calls the hot endpoints in-process, captures every SELECT, UPDATE and
+DELETE they send to the database, and prints its plan: EXPLAIN (ANALYZE)
+on PostgreSQL, EXPLAIN QUERY PLAN on SQLite. A sequential scan of a table
+holding at least --min-rows rows is flagged, and the script exits 1 if
+anything was flagged, so it can gate index changes.
+
+Ids come from plan_campus, so the database must have been filled by
+scripts/generate_campus.py with the same preset (or pass --generate to
+build an in-memory SQLite campus instead). Everything runs inside one
+transaction that is rolled back; POST endpoints leave no trace.
+
+Usage:
+    python scripts/explain_hot_queries.py [--preset small|benchmark|large]
+        [--generate] [--min-rows 1000] [--verbose]
+
+Reads DATABASE_URL unless --generate is given.
+"""
+import sys
+import os
+import re
+import json
+import argparse
+from types import SimpleNamespace
+from typing import Dict, List, Tuple
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.models  # noqa: F401
+from app.api.deps import get_current_user, get_session
+from app.main import app
+from app.utils.campus_generator import PRESETS, CampusPlan, generate_campus, plan_campus
+
+API = "/api/v1"
+EXPLAINED = ("SELECT", "WITH", "UPDATE", "DELETE")
+_SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?(?: USING (?:COVERING )?INDEX (\w+))?")
+
+
+def hot_requests(plan: CampusPlan) -> List[Tuple[str, str, str, dict]]:
+    """(name, method, url, json body) for each endpoint checked"""
+    section = plan.sections[0]
+    student_id = section.student_ids[0]
+    schedule_id = section.exam_schedule_ids[0]
+    return [
+        ("student list", "GET", f"{API}/students/?limit=100", None),
+        ("attendance stats", "GET", f"{API}/attendance/student/{student_id}/stats", None),
+        ("attendance history", "GET", f"{API}/attendance/student/{student_id}/history", None),
+        ("attendance mark", "POST", f"{API}/attendance/mark", {
+            "session_id": section.open_session_id,
+            "records": [{"student_id": s, "status": "PRESENT"} for s in section.student_ids],
+        }),
+        ("marks bulk", "POST", f"{API}/exams/marks/bulk", {
+            "exam_schedule_id": schedule_id,
+            "records": [
+                {"exam_schedule_id": schedule_id, "student_id": s, "marks_obtained": 60}
+                for s in section.student_ids
+            ],
+        }),
+        ("student results", "GET", f"{API}/exams/student/{student_id}/results", None),
+        ("student fees", "GET", f"{API}/fees/student/{student_id}", None),
+        ("fee defaulters", "GET", f"{API}/fees/defaulters?limit=100", None),
+        ("fee collection analytics", "GET",
+         f"{API}/reports/financial/fee-collection/analytics?start_date=2000-01-01&period=month&group_by=payment_mode", None),
+        ("academic dashboard", "GET", f"{API}/academic-setup/dashboard/", None),
+        ("timetable conflicts", "POST", f"{API}/timetable/validate", {
+            "academic_year_id": 1, "semester_id": section.batch_semester_id, "section_id": section.id,
+            "day_of_week": "MONDAY", "period_id": 1, "faculty_id": 1, "room_id": 1,
+        }),
+        ("faculty timetable", "GET", f"{API}/timetable/faculty/1", None),
+        ("record audit trail", "GET", f"{API}/audit-logs/?table_name=section&record_id={section.id}", None),
+        ("system audit export", "GET", f"{API}/settings/audit-logs/export?module=FEES", None),
+    ]
+
+
+def capture_statements(connection, plan: CampusPlan) -> List[Tuple[str, str, object]]:
+    """Run the hot requests on connection; returns (request, statement, parameters)"""
+    captured: List[Tuple[str, str, object]] = []
+    current = {"name": None}
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(EXPLAINED):
+            captured.append((current["name"], statement, parameters))
+
+    def override_get_session():
+        # Endpoint commits release a savepoint; the outer transaction is rolled back
+        with Session(bind=connection, join_transaction_mode="create_savepoint") as session:
+            yield session
+
+    app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(
+        id=1, email="explain@campus.example", roles=[SimpleNamespace(name="SUPER_ADMIN")],
+        is_superuser=True, is_active=True,
+    )
+    event.listen(connection, "before_cursor_execute", record)
+    client = TestClient(app)
+    try:
+        for name, method, url, body in hot_requests(plan):
+            current["name"] = name
+            response = client.request(method, url, json=body)
+            if response.status_code >= 400:
+                print(f"⚠️  {name}: HTTP {response.status_code} {response.text[:120]}")
+    finally:
+        event.remove(connection, "before_cursor_execute", record)
+        app.dependency_overrides.clear()
+    return captured
+
+
+def explain(connection, statement: str, parameters) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """Plan lines and (table, detail) of every sequential scan"""
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        if connection.dialect.name == "postgresql":
+            cursor.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {statement}", parameters)
+            plan = cursor.fetchone()[0]
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            lines, scans = [], []
+            _walk_postgres(plan[0]["Plan"], 0, lines, scans)
+            return lines, scans
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        lines, scans = [], []
+        for row in cursor.fetchall():
+            detail = row[-1]
+            lines.append(detail)
+            match = _SQLITE_SCAN.match(detail)
+            if match and not match.group(2):
+                scans.append((match.group(1), detail))
+        return lines, scans
+    finally:
+        cursor.close()
+
+
+def _walk_postgres(node: dict, depth: int, lines: List[str], scans: List[Tuple[str, str]]) -> None:
+    relation = node.get("Relation Name")
+    label = node["Node Type"] + (f" on {relation}" if relation else "")
+    if "Index Name" in node:
+        label += f" using {node['Index Name']}"
+    detail = f"{label} (rows={node.get('Actual Rows')}, removed={node.get('Rows Removed by Filter', 0)})"
+    lines.append("  " * depth + detail)
+    if node["Node Type"] == "Seq Scan":
+        scans.append((relation, detail))
+    for child in node.get("Plans", []):
+        _walk_postgres(child, depth + 1, lines, scans)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN the hot endpoint queries and flag sequential scans")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    parser.add_argument("--generate", action="store_true", help="Build the campus in in-memory SQLite")
+    parser.add_argument("--min-rows", type=int, default=1000, help="Ignore scans of tables smaller than this")
+    parser.add_argument("--verbose", action="store_true", help="Print every plan, not just flagged ones")
+    args = parser.parse_args()
+
+    plan = plan_campus(PRESETS[args.preset])
+    if args.generate:
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        SQLModel.metadata.create_all(engine)
+        with engine.begin() as connection:
+            generate_campus(connection, PRESETS[args.preset])
+    else:
+        from app.db.session import engine
+
+    table_rows: Dict[str, int] = {}
+    flagged = 0
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            captured = capture_statements(connection, plan)
+            print(f"🔎 {len(captured)} statements from {len(hot_requests(plan))} endpoints "
+                  f"({connection.dialect.name}, {plan.size.students} students)\n")
+            for name, statement, parameters in captured:
+                lines, scans = explain(connection, statement, parameters)
+                for table, _ in scans:
+                    if table not in table_rows and table in inspect(connection).get_table_names():
+                        table_rows[table] = connection.execute(text(f'SELECT count(*) FROM "{table}"')).scalar()
+                big_scans = [(t, d) for t, d in scans if table_rows.get(t, 0) >= args.min_rows]
+                flagged += len(big_scans)
+                if not big_scans and not args.verbose:
+                    continue
+                marker = "❌" if big_scans else "✅"
+                print(f"{marker} [{name}] {' '.join(statement.split())[:300]}")
+                for line in lines:
+                    print(f"     {line}")
+                for table, _ in big_scans:
+                    print(f"     ↳ sequential scan of {table} ({table_rows[table]:,} rows)")
+                print()
+        finally:
+            transaction.rollback()
+
+    if flagged:
+        print(f"❌ {flagged} sequential scans of tables with {args.min_rows:,}+ rows")
+        sys.exit(1)
+    print(f"✅ No sequential scans of tables with {args.min_rows:,}+ rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Generate a synthetic campus for load testing
+
+Fills an empty database with programs, batches, sections, students, a
+semester of attendance, exam results and fee payments using
+app.utils.campus_generator. The "large" preset is a 20,000-student campus
+(about 3.6M attendance marks); on PostgreSQL rows are loaded with COPY.
+The same preset and seed always produce the same rows, so
+scripts/locustfile.py can address them without reading the database.
+
+Usage:
+    python scripts/generate_campus.py [--preset small|benchmark|large]
+        [--students-per-section N] [--teaching-days N] [--seed N]
+        [--create-tables] [--admin-password secret]
+
+Writes to DATABASE_URL.
+"""
+import sys
+import os
+import time
+import argparse
+import dataclasses
+
+from sqlalchemy import func, select
+from sqlmodel import Session, SQLModel
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.models  # noqa: F401
+from app.core.security import get_password_hash
+from app.db.session import engine
+from app.models.role import Role
+from app.models.student import Student
+from app.models.user import User
+from app.models.user_role import UserRole
+from app.utils.campus_generator import PRESETS, generate_campus
+
+LOAD_TEST_USER = "loadtest"
+
+
+def create_load_test_user(password: str) -> None:
+    """Superuser the load script logs in as"""
+    with Session(engine) as session:
+        role = session.execute(select(Role).where(Role.name == "SUPER_ADMIN")).scalars().first()
+        if not role:
+            role = Role(name="SUPER_ADMIN", description="Super Administrator", is_system=True)
+            session.add(role)
+            session.flush()
+        user = User(
+            username=LOAD_TEST_USER,
+            email=f"{LOAD_TEST_USER}@campus.example",
+            full_name="Load Test",
+            hashed_password=get_password_hash(password),
+            is_superuser=True,
+        )
+        session.add(user)
+        session.flush()
+        session.add(UserRole(user_id=user.id, role_id=role.id))
+        session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic campus")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="large")
+    parser.add_argument("--programs", type=int)
+    parser.add_argument("--batches-per-program", type=int)
+    parser.add_argument("--sections-per-batch", type=int)
+    parser.add_argument("--students-per-section", type=int)
+    parser.add_argument("--teaching-days", type=int)
+    parser.add_argument("--exams-per-semester", type=int)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--chunk-size", type=int, default=20000)
+    parser.add_argument("--create-tables", action="store_true", help="Create missing tables first")
+    parser.add_argument("--admin-password", help=f"Also create superuser '{LOAD_TEST_USER}'")
+    args = parser.parse_args()
+
+    overrides = {
+        name: getattr(args, name)
+        for name in (
+            "programs", "batches_per_program", "sections_per_batch", "students_per_section",
+            "teaching_days", "exams_per_semester", "seed",
+        )
+        if getattr(args, name) is not None
+    }
+    size = dataclasses.replace(PRESETS[args.preset], **overrides)
+
+    if args.create_tables:
+        SQLModel.metadata.create_all(engine)
+    with engine.connect() as connection:
+        existing = connection.execute(select(func.count()).select_from(Student)).scalar()
+    if existing:
+        print(f"❌ Database already has {existing} students; generate into an empty database")
+        sys.exit(1)
+
+    print(f"🏫 Generating campus: {size.students} students in {size.sections} sections, "
+          f"{size.teaching_days} teaching days, seed {size.seed}")
+    start = time.perf_counter()
+
+    def progress(table: str, rows: int) -> None:
+        print(f"\r   {table:<20} {rows:>10,}   ", end="", flush=True)
+
+    with engine.begin() as connection:
+        plan = generate_campus(connection, size, chunk_size=args.chunk_size, progress=progress)
+    print("\r" + " " * 40 + "\r", end="")
+
+    if args.admin_password:
+        create_load_test_user(args.admin_password)
+        print(f"👤 Created superuser '{LOAD_TEST_USER}'")
+
+    elapsed = time.perf_counter() - start
+    total = sum(plan.row_counts.values())
+    print(f"\n✅ {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+    for table, rows in plan.row_counts.items():
+        print(f"   {table:<20} {rows:>10,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Load test against a generated campus
+
+Simulates staff browsing students, marking attendance and entering marks
+on a campus created by scripts/generate_campus.py. Ids come from
+plan_campus, so CAMPUS_PRESET (and CAMPUS_SEED, if overridden) must match
+the generate run. Requires locust (pip install locust).
+
+Usage:
+    python scripts/generate_campus.py --preset large --admin-password secret
+    CAMPUS_PRESET=large LOADTEST_PASSWORD=secret \\
+        locust -f scripts/locustfile.py --host http://localhost:8000
+"""
+import sys
+import os
+import random
+import dataclasses
+
+from locust import HttpUser, between, task
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.campus_generator import PRESETS, plan_campus
+
+API = "/api/v1"
+
+size = PRESETS[os.environ.get("CAMPUS_PRESET", "large")]
+if os.environ.get("CAMPUS_SEED"):
+    size = dataclasses.replace(size, seed=int(os.environ["CAMPUS_SEED"]))
+PLAN = plan_campus(size)
+
+
+class CampusStaff(HttpUser):
+    """One staff member working across random sections"""
+    wait_time = between(1, 3)
+
+    def on_start(self):
+        response = self.client.post(f"{API}/auth/login", data={
+            "username": os.environ.get("LOADTEST_USER", "loadtest"),
+            "password": os.environ["LOADTEST_PASSWORD"],
+        })
+        response.raise_for_status()
+        self.client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+    @task(10)
+    def student_list(self):
+        skip = random.randrange(0, size.students, 100)
+        self.client.get(f"{API}/students/?skip={skip}&limit=100", name=f"{API}/students/")
+
+    @task(8)
+    def student_attendance_stats(self):
+        student_id = random.randint(1, size.students)
+        self.client.get(f"{API}/attendance/student/{student_id}/stats",
+                        name=f"{API}/attendance/student/[id]/stats")
+
+    @task(5)
+    def dashboard(self):
+        self.client.get(f"{API}/academic-setup/dashboard/")
+
+    @task(3)
+    def mark_attendance(self):
+        section = random.choice(PLAN.sections)
+        self.client.post(f"{API}/attendance/mark", json={
+            "session_id": section.open_session_id,
+            "records": [
+                {"student_id": student_id, "status": random.choice(("PRESENT", "PRESENT", "PRESENT", "ABSENT"))}
+                for student_id in section.student_ids
+            ],
+        })
+
+    @task(2)
+    def fee_defaulters(self):
+        self.client.get(f"{API}/fees/defaulters?limit=100")
+
+    @task(1)
+    def enter_marks(self):
+        section = random.choice(PLAN.sections)
+        schedule_id = random.choice(section.exam_schedule_ids)
+        self.client.post(f"{API}/exams/marks/bulk", json={
+            "exam_schedule_id": schedule_id,
+            "records": [
+                {"exam_schedule_id": schedule_id, "student_id": student_id, "marks_obtained": random.randint(30, 95)}
+                for student_id in section.student_ids
+            ],
+        })
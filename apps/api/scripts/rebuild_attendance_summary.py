@@ -0,0 +1,38 @@
+"""
+Rebuild the student_attendance_summary rollup from attendance_record
+
+Run once after the migration (before setting ATTENDANCE_SUMMARY_ENABLED)
+and whenever attendance records are changed outside the marking endpoint.
+
+Usage:
+    python scripts/rebuild_attendance_summary.py [--student-id 12 --student-id 13]
+"""
+import sys
+import os
+import argparse
+from sqlmodel import Session
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import engine
+from app.services.attendance_service import AttendanceService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild attendance summary counters")
+    parser.add_argument(
+        "--student-id", type=int, action="append", dest="student_ids",
+        help="Only rebuild these students (repeatable). Default: everyone"
+    )
+    args = parser.parse_args()
+
+    print("🔄 Rebuilding student_attendance_summary...")
+    with Session(engine) as session:
+        rows = AttendanceService.rebuild_summary(session, student_ids=args.student_ids)
+        session.commit()
+    print(f"✅ Wrote {rows} summary rows.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Rebuild the fee_collection_daily rollup from fee_payment
+
+Run once after the migration (before setting FEE_COLLECTION_ROLLUP_ENABLED)
+and whenever payments are changed outside the fee endpoints.
+
+Usage:
+    python scripts/rebuild_fee_collection.py [--from 2025-04-01] [--to 2025-04-30]
+"""
+import sys
+import os
+import argparse
+from datetime import date
+from sqlmodel import Session
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import engine
+from app.services.fee_service import FeeService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild daily fee collection totals")
+    parser.add_argument("--from", type=date.fromisoformat, dest="start_date",
+                        help="First day to rebuild (YYYY-MM-DD). Default: all history")
+    parser.add_argument("--to", type=date.fromisoformat, dest="end_date",
+                        help="Last day to rebuild (YYYY-MM-DD). Default: all history")
+    args = parser.parse_args()
+
+    print("🔄 Rebuilding fee_collection_daily...")
+    with Session(engine) as session:
+        rows = FeeService.rebuild_collection_rollup(session, start_date=args.start_date, end_date=args.end_date)
+        session.commit()
+    print(f"✅ Wrote {rows} rollup rows.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Rebuild fee ledgers, installment allocations and outstanding totals
+
+Replays every student fee's billing, successful payments, concessions and
+unwaived fines into fee_ledger_entry. Run once after the migration (before
+setting FEE_LEDGER_ENABLED) and whenever fee records are changed outside
+the fee endpoints.
+
+Usage:
+    python scripts/rebuild_fee_ledger.py [--student-fee-id 12 --student-fee-id 13]
+"""
+import sys
+import os
+import argparse
+from sqlmodel import Session
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import engine
+from app.services.fee_ledger_service import FeeLedgerService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild fee ledgers")
+    parser.add_argument(
+        "--student-fee-id", type=int, action="append", dest="student_fee_ids",
+        help="Only rebuild these student fee accounts (repeatable). Default: everyone"
+    )
+    args = parser.parse_args()
+
+    print("🔄 Rebuilding fee_ledger_entry...")
+    with Session(engine) as session:
+        entries = FeeLedgerService.rebuild(session, student_fee_ids=args.student_fee_ids)
+        session.commit()
+    print(f"✅ Wrote {entries} ledger entries.")
+
+
+if __name__ == "__main__":
+    main()
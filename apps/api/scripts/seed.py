@@ -9,6 +9,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from sqlmodel import Session, select
 from app.db.session import engine
 from app.core.security import get_password_hash
+from app.core.rbac import grant_default_permissions, seed_permissions
 from app.models.user import User
 from app.models.role import Role
 from app.models.user_role import UserRole
@@ -36,6 +37,8 @@ def get_or_create_role(session, role_name):
         session.add(role)
         session.commit()
         session.refresh(role)
+        seed_permissions(session)
+        grant_default_permissions(session, role)
     return role
 
 def create_user(session, email, full_name, password, role_name, mobile=None):
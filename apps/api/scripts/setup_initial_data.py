@@ -14,6 +14,7 @@ from app.models.user import User
 from app.models.role import Role
 from app.models.user_role import UserRole
 from app.core.security import get_password_hash
+from app.core.rbac import grant_default_permissions, seed_permissions
 
 def create_initial_data():
     """Create initial roles and admin user"""
@@ -31,6 +32,7 @@ def create_initial_data():
                 {"name": "STUDENT", "description": "Student"},
                 {"name": "PARENT", "description": "Parent/Guardian"},
                 {"name": "STAFF", "description": "Administrative Staff"},
+                {"name": "ACCOUNTS", "description": "Accounts Office"},
             ]
             
             for role_data in roles_data:
@@ -38,6 +40,11 @@ def create_initial_data():
                 session.add(role)
             
             session.commit()
+            
+            # Default grants, e.g. fees:write for ADMIN and ACCOUNTS
+            seed_permissions(session)
+            for role in session.exec(select(Role)).all():
+                grant_default_permissions(session, role)
             print("✓ Created default roles")
         
         # Check if admin user exists
@@ -0,0 +1,96 @@
+"""
+Benchmark suite fixtures
+
+The campus is generated once per test session into an in-memory SQLite
+database. By default it is the "small" preset so query budgets are checked
+on every run; set BENCHMARK_FULL=1 for the 5,000-student "benchmark"
+preset and meaningful latencies, or BENCHMARK_PRESET to any other preset.
+"""
+import os
+import statistics
+import time
+from typing import Callable, Dict, List
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.main import app
+from app.api.deps import get_current_user, get_session
+from app.utils.campus_generator import PRESETS, CampusSize, generate_campus
+
+# (name, median ms, min ms, statements) per measured endpoint, for the summary
+RESULTS: List[Dict] = []
+
+
+def campus_size() -> CampusSize:
+    default = "benchmark" if os.environ.get("BENCHMARK_FULL") else "small"
+    return PRESETS[os.environ.get("BENCHMARK_PRESET", default)]
+
+
+@pytest.fixture(scope="session")
+def campus_engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        engine.campus = generate_campus(connection, campus_size())
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def campus(campus_engine):
+    """Planned campus ids, with the API wired to the campus database"""
+    def override_get_session():
+        with Session(campus_engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_current_user] = lambda: None
+    yield campus_engine.campus
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def benchmark(count_queries):
+    """
+    Time a callable over several runs and record its statement count
+
+    Returns the last run's result. The median and minimum latency are
+    reported in the terminal summary.
+    """
+    def run(name: str, call: Callable, runs: int = 5):
+        timings = []
+        for _ in range(runs):
+            with count_queries() as statements:
+                start = time.perf_counter()
+                result = call()
+                timings.append((time.perf_counter() - start) * 1000)
+        RESULTS.append({
+            "name": name,
+            "median_ms": statistics.median(timings),
+            "min_ms": min(timings),
+            "statements": len(statements),
+        })
+        return result
+
+    return run
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not RESULTS:
+        return
+    size = campus_size()
+    terminalreporter.section(
+        f"endpoint benchmarks ({size.students} students, {size.sections} sections, "
+        f"{size.teaching_days} teaching days)"
+    )
+    terminalreporter.write_line(f"{'endpoint':<40} {'queries':>8} {'median ms':>10} {'min ms':>8}")
+    for result in RESULTS:
+        terminalreporter.write_line(
+            f"{result['name']:<40} {result['statements']:>8} {result['median_ms']:>10.1f} {result['min_ms']:>8.1f}"
+        )
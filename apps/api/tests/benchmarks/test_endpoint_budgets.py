@@ -0,0 +1,133 @@
+"""
+Endpoint Benchmarks - Query Budgets
+Each hot endpoint must stay within a fixed SQL statement budget regardless
+of campus size; latencies are reported in the terminal summary.
+"""
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.main import app
+from app.api.v1 import reports
+from app.services.dashboard_service import DashboardSnapshotCache
+from app.services.fee_service import FeeService
+
+client = TestClient(app)
+
+
+def _ok(response):
+    assert response.status_code == 200, response.text
+    return response
+
+
+class TestDashboardBudget:
+    """Test the academic dashboard"""
+
+    def test_cold_build(self, campus, benchmark, assert_max_queries):
+        def build():
+            DashboardSnapshotCache.clear()
+            return _ok(client.get("/api/v1/academic-setup/dashboard/"))
+
+        with assert_max_queries(7):
+            build()
+        data = benchmark("dashboard (cold)", build).json()
+        assert data["summary"]["total_sections"] == len(campus.section_ids)
+
+    def test_cached(self, campus, benchmark, assert_max_queries):
+        _ok(client.get("/api/v1/academic-setup/dashboard/"))
+
+        with assert_max_queries(0):
+            _ok(client.get("/api/v1/academic-setup/dashboard/"))
+        benchmark("dashboard (cached)", lambda: _ok(client.get("/api/v1/academic-setup/dashboard/")))
+
+
+class TestAttendanceBudget:
+    """Test attendance marking and stats"""
+
+    def test_mark_section(self, campus, benchmark, assert_max_queries):
+        section = campus.sections[0]
+        payload = {
+            "session_id": section.open_session_id,
+            "records": [
+                {"student_id": student_id, "status": "PRESENT"}
+                for student_id in section.student_ids
+            ],
+        }
+
+        # Session, prefetch, insert, re-select, summary prefetch and summary insert
+        with assert_max_queries(6):
+            marked = _ok(client.post("/api/v1/attendance/mark", json=payload)).json()
+        assert len(marked) == len(payload["records"])
+        benchmark(f"attendance mark ({len(marked)} students)",
+                  lambda: _ok(client.post("/api/v1/attendance/mark", json=payload)))
+
+    def test_student_stats(self, campus, benchmark, assert_max_queries):
+        student_id = campus.sections[0].student_ids[0]
+        url = f"/api/v1/attendance/student/{student_id}/stats"
+
+        with assert_max_queries(1):
+            stats = _ok(client.get(url)).json()
+        assert stats["total_classes"] > 0
+        benchmark("attendance student stats", lambda: _ok(client.get(url)))
+
+
+class TestMarksBudget:
+    """Test bulk marks entry"""
+
+    def test_bulk_marks_section(self, campus, benchmark, assert_max_queries):
+        section = campus.sections[-1]
+        schedule_id = section.exam_schedule_ids[0]
+        payload = {
+            "exam_schedule_id": schedule_id,
+            "records": [
+                {"exam_schedule_id": schedule_id, "student_id": student_id, "marks_obtained": 72}
+                for student_id in section.student_ids
+            ],
+        }
+
+        with assert_max_queries(6):
+            results = _ok(client.post("/api/v1/exams/marks/bulk", json=payload)).json()
+        assert {r["grade"] for r in results} == {results[0]["grade"]}
+        benchmark(f"marks bulk ({len(results)} students)",
+                  lambda: _ok(client.post("/api/v1/exams/marks/bulk", json=payload)))
+
+
+class TestFeesBudget:
+    """Test the fee defaulters report"""
+
+    def test_defaulters(self, campus, benchmark, assert_max_queries):
+        url = "/api/v1/fees/defaulters?limit=1000"
+
+        with assert_max_queries(1):
+            defaulters = _ok(client.get(url)).json()
+        assert defaulters
+        benchmark("fee defaulters (1000)", lambda: _ok(client.get(url)))
+
+    def test_collection_analytics(self, campus, campus_engine, benchmark, assert_max_queries, monkeypatch):
+        url = ("/api/v1/reports/financial/fee-collection/analytics"
+               "?start_date=2000-01-01&period=month&group_by=payment_mode&group_by=program")
+
+        with assert_max_queries(2):
+            collected = _ok(client.get(url)).json()
+        assert collected["payment_count"]
+        benchmark("fee collection by month (payments)", lambda: _ok(client.get(url)))
+
+        with Session(campus_engine) as session:
+            FeeService.rebuild_collection_rollup(session)
+            session.commit()
+        monkeypatch.setattr(reports.settings, "FEE_COLLECTION_ROLLUP_ENABLED", True)
+        with assert_max_queries(2):
+            assert _ok(client.get(url)).json() == collected
+        benchmark("fee collection by month (rollup)", lambda: _ok(client.get(url)))
+
+
+class TestStudentListBudget:
+    """Test the student list"""
+
+    def test_page(self, campus, benchmark, assert_max_queries):
+        url = "/api/v1/students/?limit=100"
+
+        with assert_max_queries(2):
+            students = _ok(client.get(url)).json()
+        assert len(students) == 100
+        assert all(s["program_name"].startswith("Program") for s in students)
+        benchmark("student list (100)", lambda: _ok(client.get(url)))
@@ -0,0 +1,141 @@
+"""
+Shared test fixtures
+"""
+import asyncio
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Iterator, List
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.main import app
+from app.api.deps import get_current_active_superuser, get_current_user, get_session
+from app.db.session import get_async_session
+
+SUPERUSER = SimpleNamespace(id=1, username="admin", email="admin@college.edu", full_name="Admin",
+                            roles=[], is_superuser=True, is_active=True)
+
+
+@pytest.fixture
+def sqlite_engine():
+    """Empty in-memory database with every table, one connection shared by all sessions"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def sqlite_session(sqlite_engine):
+    """Session on the in-memory database"""
+    with Session(sqlite_engine) as session:
+        yield session
+
+
+@pytest.fixture
+def async_sqlite_engine():
+    """Async engine on an empty in-memory database with every table"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    async def create_all():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+
+    asyncio.run(create_all())
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def api_client(sqlite_engine):
+    """
+    Client for the app on the in-memory database, signed in as `user`
+
+    Pass user=None for endpoints that ignore the caller, and async_engine
+    for routes on the async session.
+
+    Usage:
+        client = api_client(user=ADMIN)
+        client.get("/api/v1/fees/outstanding")
+    """
+    def connect(user=SUPERUSER, async_engine=None) -> TestClient:
+        def override_get_session():
+            with Session(sqlite_engine) as session:
+                yield session
+
+        app.dependency_overrides[get_session] = override_get_session
+        app.dependency_overrides[get_current_user] = lambda: user
+        if getattr(user, "is_superuser", False):
+            app.dependency_overrides[get_current_active_superuser] = lambda: user
+        if async_engine is not None:
+            async def override_get_async_session():
+                async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                    yield session
+
+            app.dependency_overrides[get_async_session] = override_get_async_session
+        return TestClient(app)
+
+    yield connect
+    app.dependency_overrides.clear()
+
+
+@contextmanager
+def _count_queries() -> Iterator[List[str]]:
+    """Collect every SQL statement issued on any engine inside the block"""
+    statements: List[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def count_queries():
+    """
+    Collect the SQL statements issued inside a block
+
+    Usage:
+        with count_queries() as statements:
+            client.get("/api/v1/students/")
+    """
+    return _count_queries
+
+
+@pytest.fixture
+def assert_max_queries():
+    """
+    Fail the test if a block issues more than `budget` SQL statements
+
+    Usage:
+        with assert_max_queries(3):
+            client.get("/api/v1/students/")
+    """
+    @contextmanager
+    def check(budget: int) -> Iterator[List[str]]:
+        with _count_queries() as statements:
+            yield statements
+        assert len(statements) <= budget, (
+            f"{len(statements)} SQL statements, budget {budget}:\n" + "\n".join(statements)
+        )
+
+    return check
@@ -0,0 +1,92 @@
+"""
+Admissions - Integration Tests
+Runs the admissions router on the async session, checking that every
+relationship ApplicationRead serializes is loaded without a lazy load
+"""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.main import app
+from app.models.admissions import (
+    Application, ApplicationPayment, ApplicationPaymentStatus, ApplicationStatus, FeeMode
+)
+from app.models.role import Role
+from app.models.user import User
+
+client = TestClient(app)
+
+ADMIN = User(id=1, username="admin", email="admin@example.com", full_name="Admin",
+             hashed_password="x", is_superuser=True, roles=[Role(id=1, name="ADMIN")])
+
+
+@pytest.fixture
+def admissions_db(async_sqlite_engine, api_client):
+    """In-memory async database with one online and one offline application"""
+    async def seed():
+        async with AsyncSession(async_sqlite_engine) as session:
+            applicant = dict(phone="9000000000", gender="FEMALE", program_id=1,
+                             state="Telangana", board="State", group_of_study="MPC")
+            session.add_all([
+                Application(id=1, application_number="APP-2025-0001", name="Asha",
+                            email="asha@example.com", status=ApplicationStatus.PAID, **applicant),
+                Application(id=2, application_number="APP-2025-0002", name="Ravi",
+                            email="ravi@example.com", fee_mode=FeeMode.OFFLINE, **applicant),
+                ApplicationPayment(application_id=1, transaction_id="TXN-1", amount=500,
+                                   status=ApplicationPaymentStatus.SUCCESS),
+            ])
+            await session.commit()
+
+    asyncio.run(seed())
+    api_client(user=ADMIN, async_engine=async_sqlite_engine)
+    return async_sqlite_engine
+
+
+class TestApplications:
+    """Test reading and updating applications"""
+
+    def test_get_application_includes_payments(self, admissions_db):
+        response = client.get("/api/v1/admissions/1")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["application_number"] == "APP-2025-0001"
+        assert [p["transaction_id"] for p in data["payments"]] == ["TXN-1"]
+        assert data["documents"] == []
+
+    def test_list_applications_filters_by_status(self, admissions_db):
+        response = client.get("/api/v1/admissions/", params={"status": "PAID"})
+
+        assert response.status_code == 200
+        assert [a["id"] for a in response.json()] == [1]
+
+    def test_update_completes_form_and_logs_activity(self, admissions_db):
+        response = client.put("/api/v1/admissions/1", json={
+            "aadhaar_number": "123412341234",
+            "father_name": "Ramesh",
+            "address": "Hyderabad",
+        })
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "FORM_COMPLETED"
+
+        timeline = client.get("/api/v1/admissions/1/timeline").json()
+        assert [entry["activity_type"] for entry in timeline] == ["FORM_COMPLETED"]
+
+    def test_offline_payment_verification(self, admissions_db):
+        response = client.post("/api/v1/admissions/2/payment/offline-verify", json={
+            "payment_proof_url": "receipts/2.pdf",
+            "verified": True,
+        })
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "PAID"
+        assert data["offline_payment_verified"] is True
+
+    def test_missing_application_returns_404(self, admissions_db):
+        response = client.get("/api/v1/admissions/99")
+
+        assert response.status_code == 404
@@ -0,0 +1,62 @@
+"""
+Attendance Summary - Unit Tests
+Counter deltas applied to the per-student summary rollup
+"""
+from datetime import datetime
+from types import SimpleNamespace
+
+from sqlalchemy import create_mock_engine, insert
+from sqlalchemy.dialects import mysql
+from sqlmodel import Session, select
+
+from app.models.attendance import StudentAttendanceSummary
+from app.services.attendance_service import AttendanceService
+
+LECTURE = SimpleNamespace(subject_id=1, semester=1)
+NOW = datetime(2025, 3, 3, 9, 0)
+
+
+def _delta(present=0, absent=0):
+    return {"total_classes": present + absent, "present": present, "absent": absent, "late": 0, "on_duty": 0}
+
+
+def _counts(session):
+    return {
+        s.student_id: (s.total_classes, s.present, s.absent)
+        for s in session.exec(select(StudentAttendanceSummary)).all()
+    }
+
+
+class TestSummaryDeltas:
+    def test_adds_to_existing_rows_and_inserts_missing(self, sqlite_session):
+        AttendanceService._apply_summary_deltas(sqlite_session, LECTURE, {1: _delta(present=1)}, NOW)
+        AttendanceService._apply_summary_deltas(sqlite_session, LECTURE, {1: _delta(absent=1), 2: _delta(present=1)}, NOW)
+
+        assert _counts(sqlite_session) == {1: (2, 1, 1), 2: (1, 1, 0)}
+
+    def test_row_created_by_a_concurrent_mark_is_added_to(self, sqlite_session, sqlite_engine, count_queries):
+        # Another request's first mark commits the row this request has not seen
+        with Session(sqlite_engine) as other:
+            other.execute(insert(StudentAttendanceSummary.__table__).values(
+                student_id=1, subject_id=1, semester=1, updated_at=NOW, **_delta(present=1)
+            ))
+            other.commit()
+
+        with count_queries() as statements:
+            AttendanceService._apply_summary_deltas(sqlite_session, LECTURE, {1: _delta(absent=1), 2: _delta(present=1)}, NOW)
+
+        assert len(statements) == 1
+        assert "ON CONFLICT" in statements[0]
+        assert _counts(sqlite_session) == {1: (2, 1, 1), 2: (1, 1, 0)}
+
+    def test_mysql_upserts_in_one_statement(self):
+        statements = []
+        engine = create_mock_engine("mysql+pymysql://", lambda *args, **kwargs: None)
+        session = SimpleNamespace(get_bind=lambda: engine, execute=statements.append)
+
+        AttendanceService._apply_summary_deltas(session, LECTURE, {1: _delta(present=1)}, NOW)
+
+        [stmt] = statements
+        sql = str(stmt.compile(dialect=mysql.dialect()))
+        assert "ON DUPLICATE KEY UPDATE" in sql
+        assert "total_classes = (student_attendance_summary.total_classes + VALUES(total_classes))" in sql
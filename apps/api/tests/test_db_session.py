@@ -0,0 +1,92 @@
+"""
+Database Session - Unit Tests
+Engine options from Settings, SQLite pragmas and pool checkout metrics
+"""
+import pytest
+from sqlalchemy import text
+from sqlmodel import create_engine
+
+from app.config.settings import settings
+from app.db.pool_metrics import PoolMetrics, TimedQueuePool
+from app.db.session import configure_engine, engine_options, get_async_database_url
+
+
+class TestEngineOptions:
+    """Test create_engine arguments per database"""
+
+    def test_in_memory_sqlite_keeps_default_pool(self):
+        options = engine_options("sqlite://")
+
+        assert "poolclass" not in options
+        assert "pool_size" not in options
+
+    def test_file_database_gets_sized_pool(self):
+        options = engine_options("sqlite:///./college_erp.db")
+
+        assert options["poolclass"] is TimedQueuePool
+        assert options["pool_size"] == settings.DB_POOL_SIZE
+        assert options["max_overflow"] == settings.DB_MAX_OVERFLOW
+        assert options["pool_recycle"] == settings.DB_POOL_RECYCLE_SECONDS
+        assert "connect_args" not in options
+
+    def test_postgresql_sets_statement_timeout(self):
+        url = "postgresql://erp:secret@db/college_erp"
+
+        sync_options = engine_options(url)
+        async_options = engine_options(url, is_async=True)
+
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        assert sync_options["connect_args"] == {"options": f"-c statement_timeout={timeout}"}
+        assert async_options["connect_args"] == {"server_settings": {"statement_timeout": timeout}}
+
+
+class TestAsyncDatabaseUrl:
+    """Test mapping DATABASE_URL to its async driver"""
+
+    def test_sync_driver_is_replaced(self):
+        assert get_async_database_url("mysql+pymysql://erp:secret@db:3306/college_erp") == (
+            "mysql+aiomysql://erp:secret@db:3306/college_erp"
+        )
+        assert get_async_database_url("postgresql://erp:secret@db/college_erp") == (
+            "postgresql+asyncpg://erp:secret@db/college_erp"
+        )
+
+    def test_unsupported_backend_is_rejected(self):
+        with pytest.raises(ValueError, match="No async driver configured for oracle"):
+            get_async_database_url("oracle://erp:secret@db/college_erp")
+
+
+class TestSqlitePragmas:
+    """Test pragmas applied to every new SQLite connection"""
+
+    def test_file_database_uses_wal(self, tmp_path):
+        url = f"sqlite:///{tmp_path / 'erp.db'}"
+        engine = configure_engine(create_engine(url, **engine_options(url)))
+
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            # NORMAL == 1
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == settings.SQLITE_BUSY_TIMEOUT_MS
+        engine.dispose()
+
+
+class TestPoolMetrics:
+    """Test checkout wait and hold time counters"""
+
+    def test_checkouts_are_counted(self, tmp_path):
+        url = f"sqlite:///{tmp_path / 'erp.db'}"
+        options = engine_options(url)
+        options["pool_logging_name"] = "test"
+        engine = configure_engine(create_engine(url, **options))
+        PoolMetrics.clear()
+
+        for _ in range(3):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+
+        stats = PoolMetrics.stats()["test"]
+        assert stats["checkouts"] == 3
+        assert stats["checked_out"] == 0
+        assert stats["hold_avg_ms"] >= 0
+        engine.dispose()
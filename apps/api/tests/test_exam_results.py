@@ -0,0 +1,197 @@
+"""
+Exam Results - Integration Tests
+Locks in the single-query student results and transcript endpoints,
+and semester result processing into student semester history
+"""
+from datetime import date, time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.main import app
+from app.models.academic.batch import AcademicBatch, BatchSemester
+from app.models.academic.student_history import StudentSemesterHistory
+from app.models.exam import Exam, ExamSchedule, ExamResult, ExamType
+from app.models.master_data import AcademicYear
+from app.models.student import Student
+from app.models.subject import Subject
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def exam_db(sqlite_engine, api_client):
+    """In-memory database with two semesters of graded FINAL results for one student"""
+    with Session(sqlite_engine) as session:
+        session.add_all([
+            AcademicYear(id=1, name="2024-2025", start_date=date(2024, 6, 1), end_date=date(2025, 5, 31)),
+            AcademicBatch(id=1, batch_code="2024-2027", batch_name="Batch 2024-2027", program_id=1,
+                          regulation_id=1, joining_year=2024, start_year=2024, end_year=2027),
+            BatchSemester(id=1, batch_id=1, program_year_id=1, year_no=1, semester_no=1, semester_name="Semester 1"),
+            BatchSemester(id=2, batch_id=1, program_year_id=1, year_no=1, semester_no=2, semester_name="Semester 2"),
+            Student(id=1, admission_number="ADM001", name="Asha", program_id=1,
+                    batch_id=1, program_year_id=1, batch_semester_id=2),
+            Subject(id=1, code="HM101", name="Food Production", credits=4),
+            Subject(id=2, code="HM102", name="Front Office", credits=2),
+            Subject(id=3, code="HM201", name="Housekeeping", credits=3),
+            Exam(id=1, name="Sem 1 Finals", exam_type=ExamType.FINAL, academic_year="2024-2025",
+                 batch_semester_id=1, start_date=date(2024, 11, 1), end_date=date(2024, 11, 10)),
+            Exam(id=2, name="Sem 1 Supplementary", exam_type=ExamType.FINAL, academic_year="2024-2025",
+                 batch_semester_id=1, start_date=date(2025, 1, 5), end_date=date(2025, 1, 6)),
+            Exam(id=3, name="Sem 2 Finals", exam_type=ExamType.FINAL, academic_year="2024-2025",
+                 batch_semester_id=2, start_date=date(2025, 4, 1), end_date=date(2025, 4, 10)),
+            Exam(id=4, name="Sem 2 Mid-Term", exam_type=ExamType.MID_TERM, academic_year="2024-2025",
+                 batch_semester_id=2, start_date=date(2025, 2, 1), end_date=date(2025, 2, 3)),
+        ])
+        schedule = dict(exam_date=date(2024, 11, 1), start_time=time(9), end_time=time(12),
+                        max_marks=100, passing_marks=40)
+        session.add_all([
+            ExamSchedule(id=1, exam_id=1, subject_id=1, **schedule),
+            ExamSchedule(id=2, exam_id=1, subject_id=2, **schedule),
+            ExamSchedule(id=3, exam_id=2, subject_id=2, **schedule),
+            ExamSchedule(id=4, exam_id=3, subject_id=3, **schedule),
+            ExamSchedule(id=5, exam_id=4, subject_id=3, **schedule),
+        ])
+        session.add_all([
+            ExamResult(exam_schedule_id=1, student_id=1, marks_obtained=85, grade="A+", grade_point=9),
+            # Failed then cleared in the supplementary exam; the best attempt counts
+            ExamResult(exam_schedule_id=2, student_id=1, marks_obtained=30, grade="F", grade_point=0),
+            ExamResult(exam_schedule_id=3, student_id=1, marks_obtained=62, grade="B+", grade_point=7),
+            ExamResult(exam_schedule_id=4, student_id=1, marks_obtained=55, grade="B", grade_point=6),
+            # Mid-term results do not count towards the FINAL transcript
+            ExamResult(exam_schedule_id=5, student_id=1, marks_obtained=95, grade="O", grade_point=10),
+        ])
+        session.commit()
+
+    api_client(user=None)
+    return sqlite_engine
+
+
+class TestStudentResults:
+    """Test the student results endpoint"""
+
+    def test_results_are_enriched(self, exam_db):
+        response = client.get("/api/v1/exams/student/1/results")
+
+        assert response.status_code == 200
+        results = response.json()
+        assert len(results) == 5
+        first = results[0]
+        assert first["exam_name"] == "Sem 1 Finals"
+        assert first["subject_name"] == "Food Production"
+        assert first["student_name"] == "Asha"
+
+    def test_results_use_single_query(self, exam_db, count_queries):
+        with count_queries() as statements:
+            response = client.get("/api/v1/exams/student/1/results")
+
+        assert response.status_code == 200
+        assert len(statements) == 1, statements
+
+
+class TestTranscript:
+    """Test the semester-grouped transcript endpoint"""
+
+    def test_transcript_computes_sgpa_and_cgpa(self, exam_db):
+        response = client.get("/api/v1/exams/student/1/transcript")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [s["semester_no"] for s in data["semesters"]] == [1, 2]
+
+        semester_1, semester_2 = data["semesters"]
+        # (9 * 4 + 7 * 2) / 6
+        assert semester_1["sgpa"] == pytest.approx(8.33, abs=0.01)
+        assert semester_1["cgpa"] == pytest.approx(8.33, abs=0.01)
+        assert semester_1["total_credits"] == 6
+        assert semester_1["earned_credits"] == 6
+        assert [s["subject_code"] for s in semester_1["subjects"]] == ["HM101", "HM102"]
+        assert semester_1["subjects"][1]["grade"] == "B+"
+
+        assert semester_2["sgpa"] == pytest.approx(6.0)
+        # (9 * 4 + 7 * 2 + 6 * 3) / 9
+        assert semester_2["cgpa"] == pytest.approx(7.56, abs=0.01)
+        assert data["cgpa"] == semester_2["cgpa"]
+
+    def test_transcript_uses_single_query(self, exam_db, count_queries):
+        with count_queries() as statements:
+            response = client.get("/api/v1/exams/student/1/transcript")
+
+        assert response.status_code == 200
+        assert len(statements) == 1, statements
+
+
+class TestResultProcessing:
+    """Test rolling semester results into student semester history"""
+
+    def test_process_semester_writes_history(self, exam_db):
+        response = client.post(
+            "/api/v1/exams/results/process",
+            json={"batch_semester_id": 1, "run_in_background": False},
+        )
+
+        assert response.status_code == 200
+        job = response.json()
+        assert job["status"] == "COMPLETED"
+        assert job["processed"] == job["total"] == 1
+        assert job["summary"]["histories_created"] == 1
+
+        with Session(exam_db) as session:
+            history = session.exec(select(StudentSemesterHistory)).one()
+        assert history.semester_no == 1
+        assert history.academic_year_id == 1
+        assert history.total_credits == 6
+        assert history.earned_credits == 6
+        assert history.failed_credits == 0
+        assert float(history.sgpa) == pytest.approx(8.33)
+        assert history.backlog_subject_ids == []
+        assert history.status == "RESULT_DECLARED"
+
+    def test_inline_failure_returns_its_status(self, exam_db):
+        # Exam 3 belongs to semester 2
+        response = client.post(
+            "/api/v1/exams/results/process",
+            json={"batch_semester_id": 1, "exam_id": 3, "run_in_background": False},
+        )
+
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Exam not found for this semester"
+        with Session(exam_db) as session:
+            assert session.exec(select(StudentSemesterHistory)).all() == []
+
+    def test_reprocessing_keeps_status_and_reports_backlogs(self, exam_db):
+        with Session(exam_db) as session:
+            session.add(StudentSemesterHistory(
+                student_id=1, batch_id=1, academic_year_id=1, regulation_id=1,
+                program_year=1, semester_no=1, status="PROMOTED",
+            ))
+            session.commit()
+
+        # Only the first sitting, where HM102 was failed
+        response = client.post(
+            "/api/v1/exams/results/process",
+            json={"batch_semester_id": 1, "exam_id": 1, "run_in_background": False},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["summary"]["histories_updated"] == 1
+        with Session(exam_db) as session:
+            history = session.exec(select(StudentSemesterHistory)).one()
+        assert history.status == "PROMOTED"
+        assert history.earned_credits == 4
+        assert history.failed_credits == 2
+        assert history.backlog_subject_ids == [2]
+
+    def test_background_job_reports_progress(self, exam_db, monkeypatch):
+        # Background jobs open their own session on the application engine
+        monkeypatch.setattr("app.services.result_service.engine", exam_db)
+        response = client.post("/api/v1/exams/results/process", json={"batch_semester_id": 2})
+
+        assert response.status_code == 200
+        job_id = response.json()["job_id"]
+        # TestClient runs background tasks before returning the response
+        job = client.get(f"/api/v1/exams/results/process/{job_id}").json()
+        assert job["status"] == "COMPLETED"
+        assert job["processed"] == job["total"] == 1
+        assert job["summary"]["average_sgpa"] == pytest.approx(6.0)
@@ -0,0 +1,185 @@
+"""
+Bulk Fee Assignment - Integration Tests
+Batch-wide assignment with category scholarship slabs, dry-run previews
+and idempotent re-runs
+"""
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, func, select
+
+from app.main import app
+from app.models.academic.batch import AcademicBatch, ProgramYear
+from app.models.fee import (
+    FeeComponent,
+    FeeConcession,
+    FeeInstallment,
+    FeeLedgerEntry,
+    FeeOutstanding,
+    FeeStructure,
+    StudentFee,
+    StudentFeeInstallment,
+)
+from app.models.master_data import FeeHead, ScholarshipSlab
+from app.models.student import ScholarshipCategory, Student, StudentStatus
+
+client = TestClient(app)
+
+ADMIN = SimpleNamespace(id=1, username="accounts", email="accounts@college.edu", roles=[], is_superuser=True, is_active=True)
+
+
+@pytest.fixture
+def fee_db(sqlite_engine, api_client):
+    """
+    Batch 1 of program 1 with four first-years (GENERAL, SC, ST and an
+    inactive SC student) and one second-year, a 30,000 first-year
+    structure and slabs for SC (50% of tuition) and ST (fixed 20,000)
+    """
+    with Session(sqlite_engine) as session:
+        first_year = dict(program_id=1, batch_id=1, program_year_id=1, batch_semester_id=1, status=StudentStatus.ACTIVE)
+        session.add_all([
+            AcademicBatch(id=1, batch_code="2024-2028", batch_name="Batch 2024-2028", program_id=1,
+                          regulation_id=1, joining_year=2024, start_year=2024, end_year=2028),
+            ProgramYear(id=1, batch_id=1, year_no=1, year_name="1st Year"),
+            ProgramYear(id=2, batch_id=1, year_no=2, year_name="2nd Year"),
+            Student(id=1, admission_number="ADM001", name="Asha", **first_year),
+            Student(id=2, admission_number="ADM002", name="Ravi", scholarship_category=ScholarshipCategory.SC, **first_year),
+            Student(id=3, admission_number="ADM003", name="Meena", scholarship_category=ScholarshipCategory.ST, **first_year),
+            Student(id=4, admission_number="ADM004", name="Kiran", scholarship_category=ScholarshipCategory.SC,
+                    **{**first_year, "status": StudentStatus.INACTIVE}),
+            Student(id=5, admission_number="ADM005", name="Dev", program_id=1, batch_id=1, program_year_id=2,
+                    batch_semester_id=3, status=StudentStatus.ACTIVE),
+            FeeStructure(id=1, program_id=1, academic_year="2024-2025", year=1, total_amount=Decimal("30000.00")),
+            FeeComponent(fee_structure_id=1, name="Tuition Fee", amount=Decimal("25000.00")),
+            FeeComponent(fee_structure_id=1, name="Library Fee", amount=Decimal("5000.00")),
+            FeeInstallment(fee_structure_id=1, installment_number=1, amount=Decimal("15000.00"), due_date=date(2024, 7, 1)),
+            FeeInstallment(fee_structure_id=1, installment_number=2, amount=Decimal("15000.00"), due_date=date(2025, 1, 1)),
+            FeeHead(name="Tuition Fee", code="TF"),
+            ScholarshipSlab(name="SC Tuition Waiver", code="SC-TW", discount_type="PERCENTAGE",
+                            discount_value=Decimal("50.00"), applicable_fee_heads=["TF"], scholarship_category="SC"),
+            ScholarshipSlab(name="ST Grant", code="ST-G", discount_type="FIXED",
+                            discount_value=Decimal("20000.00"), scholarship_category="ST"),
+            # Another program's slab never applies
+            ScholarshipSlab(name="ST Grant P2", code="ST-P2", discount_type="FIXED",
+                            discount_value=Decimal("1.00"), scholarship_category="ST", program_id=2),
+        ])
+        session.commit()
+
+    api_client(user=ADMIN)
+    return sqlite_engine
+
+
+def _bulk(**body):
+    return client.post("/api/v1/fees/student-fees/bulk", json={"fee_structure_id": 1, **body})
+
+
+class TestBulkAssignment:
+    def test_dry_run_previews_without_writing(self, fee_db):
+        response = _bulk(batch_id=1, dry_run=True)
+
+        assert response.status_code == 200, response.text
+        result = response.json()
+        assert (result["matched_count"], result["assigned_count"], result["already_assigned_count"]) == (3, 3, 0)
+        assert Decimal(result["total_fee"]) == Decimal("90000.00")
+        assert Decimal(result["total_concession"]) == Decimal("32500.00")
+        assert [(r["student_id"], Decimal(r["concession_amount"]), r["concession_type"]) for r in result["preview"]] == [
+            (1, Decimal("0.00"), None),
+            (2, Decimal("12500.00"), "SC Tuition Waiver"),
+            (3, Decimal("20000.00"), "ST Grant"),
+        ]
+        with Session(fee_db) as session:
+            assert session.exec(select(func.count()).select_from(StudentFee)).one() == 0
+
+    def test_assigns_with_slab_concessions(self, fee_db):
+        result = _bulk(program_year_id=1).json()
+
+        assert result["assigned_count"] == 3
+        with Session(fee_db) as session:
+            fees_by_student = {
+                f.student_id: (f.total_fee, f.concession_amount)
+                for f in session.exec(select(StudentFee)).all()
+            }
+            assert fees_by_student == {
+                1: (Decimal("30000.00"), Decimal("0.00")),
+                2: (Decimal("30000.00"), Decimal("12500.00")),
+                3: (Decimal("30000.00"), Decimal("20000.00")),
+            }
+            concessions = session.exec(select(FeeConcession).order_by(FeeConcession.amount)).all()
+            assert [(c.concession_type, c.amount, c.percentage, c.approved_by) for c in concessions] == [
+                ("SC Tuition Waiver", Decimal("12500.00"), Decimal("50.00"), "accounts"),
+                ("ST Grant", Decimal("20000.00"), None, "accounts"),
+            ]
+
+    def test_rerun_is_a_no_op(self, fee_db):
+        _bulk(batch_id=1)
+        result = _bulk(batch_id=1).json()
+
+        assert (result["matched_count"], result["assigned_count"], result["already_assigned_count"]) == (3, 0, 3)
+        assert result["preview"] == []
+        with Session(fee_db) as session:
+            assert session.exec(select(func.count()).select_from(StudentFee)).one() == 3
+            assert session.exec(select(func.count()).select_from(FeeConcession)).one() == 2
+
+    def test_opens_ledgers(self, fee_db):
+        _bulk(batch_id=1)
+
+        with Session(fee_db) as session:
+            sc_fee = session.exec(select(StudentFee).where(StudentFee.student_id == 2)).one()
+            assert sc_fee.balance == Decimal("17500.00")
+            entries = session.exec(
+                select(FeeLedgerEntry.entry_type, FeeLedgerEntry.balance)
+                .where(FeeLedgerEntry.student_fee_id == sc_fee.id)
+                .order_by(FeeLedgerEntry.id)
+            ).all()
+            assert [(e.value, balance) for e, balance in entries] == [
+                ("INSTALLMENT", Decimal("15000.00")),
+                ("INSTALLMENT", Decimal("30000.00")),
+                ("CONCESSION", Decimal("17500.00")),
+            ]
+
+    def test_ledgers_add_to_existing_rollup(self, fee_db):
+        with Session(fee_db) as session:
+            # Billed before bulk assignment; the rollup is not re-summed
+            session.add(FeeOutstanding(fee_structure_id=1, billed=Decimal("1000.00"), outstanding=Decimal("1000.00")))
+            session.commit()
+
+        _bulk(batch_id=1)
+
+        with Session(fee_db) as session:
+            rollup = session.get(FeeOutstanding, 1)
+            assert (rollup.billed, rollup.credited, rollup.outstanding) == (
+                Decimal("91000.00"), Decimal("32500.00"), Decimal("58500.00"),
+            )
+            allocated = session.exec(
+                select(StudentFee.student_id, StudentFeeInstallment.allocated_amount)
+                .join(StudentFeeInstallment, StudentFeeInstallment.student_fee_id == StudentFee.id)
+                .order_by(StudentFee.student_id, StudentFeeInstallment.installment_number)
+            ).all()
+            assert [(student_id, amount) for student_id, amount in allocated] == [
+                (1, Decimal("0.00")), (1, Decimal("0.00")),
+                (2, Decimal("12500.00")), (2, Decimal("0.00")),
+                (3, Decimal("15000.00")), (3, Decimal("5000.00")),
+            ]
+
+    def test_reads_ids_back_without_insert_returning(self, fee_db, monkeypatch, count_queries):
+        # MySQL has no INSERT ... RETURNING; the new fees are selected by student
+        monkeypatch.setattr(fee_db.dialect, "insert_returning", False)
+        with count_queries() as statements:
+            result = _bulk(batch_id=1).json()
+
+        assert result["assigned_count"] == 3
+        assert not [s for s in statements if s.startswith("INSERT") and "RETURNING" in s]
+        with Session(fee_db) as session:
+            assert session.exec(select(func.count()).select_from(FeeConcession)).one() == 2
+            assert session.exec(
+                select(func.count(func.distinct(FeeLedgerEntry.student_fee_id)))
+            ).one() == 3
+
+    def test_rejects_program_year_of_another_year(self, fee_db):
+        response = _bulk(program_year_id=2)
+
+        assert response.status_code == 400
+        assert "year 1" in response.json()["detail"]
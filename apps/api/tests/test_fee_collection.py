@@ -0,0 +1,238 @@
+"""
+Fee Collection Analytics - Integration Tests
+Date-bucketed collection totals from fee_payment and from the daily
+rollup, which must agree
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_mock_engine
+from sqlmodel import Session, select
+
+from app.main import app
+from app.api.v1 import reports
+from app.models.fee import (
+    FeeCollectionDaily,
+    FeeComponent,
+    FeePayment,
+    FeeStructure,
+    PaymentMode,
+    PaymentStatus,
+    StudentFee,
+)
+from app.models.program import Program
+from app.services.fee_service import FeeService, _period_start
+
+client = TestClient(app)
+
+ADMIN = SimpleNamespace(id=1, username="accounts", email="accounts@college.edu", roles=[], is_superuser=True, is_active=True)
+URL = "/api/v1/reports/financial/fee-collection/analytics"
+
+
+def _payment(student_fee_id, amount, mode, paid_at, status=PaymentStatus.SUCCESS):
+    return FeePayment(student_fee_id=student_fee_id, amount=Decimal(amount), payment_mode=mode,
+                      payment_status=status, payment_date=paid_at, created_at=paid_at)
+
+
+@pytest.fixture
+def fee_db(sqlite_engine, api_client):
+    """
+    Two programs' structures (30,000 = 24,000 tuition + 6,000 library, and
+    10,000 tuition) with payments across two weeks of March 2025 and one
+    in April, plus a failed and a pending payment that never count
+    """
+    with Session(sqlite_engine) as session:
+        session.add_all([
+            Program(id=1, code="BHM", name="Hotel Management", department_id=1),
+            Program(id=2, code="BBA", name="Business Administration", department_id=1),
+            FeeStructure(id=1, program_id=1, academic_year="2024-2025", year=1, total_amount=Decimal("30000.00")),
+            FeeStructure(id=2, program_id=2, academic_year="2024-2025", year=1, total_amount=Decimal("10000.00")),
+            FeeComponent(fee_structure_id=1, name="Tuition Fee", amount=Decimal("24000.00")),
+            FeeComponent(fee_structure_id=1, name="Library Fee", amount=Decimal("6000.00")),
+            FeeComponent(fee_structure_id=2, name="Tuition Fee", amount=Decimal("10000.00")),
+            StudentFee(id=1, student_id=1, fee_structure_id=1, academic_year="2024-2025", total_fee=Decimal("30000.00")),
+            StudentFee(id=2, student_id=2, fee_structure_id=1, academic_year="2024-2025", total_fee=Decimal("30000.00")),
+            StudentFee(id=3, student_id=3, fee_structure_id=2, academic_year="2024-2025", total_fee=Decimal("10000.00")),
+            # Mon 3 and Sun 9 March fall in one week; Mon 10 March starts the next
+            _payment(1, "10000.00", PaymentMode.CASH, datetime(2025, 3, 3, 10)),
+            _payment(2, "5000.00", PaymentMode.UPI, datetime(2025, 3, 3, 15)),
+            _payment(3, "2500.00", PaymentMode.UPI, datetime(2025, 3, 9, 23, 30)),
+            _payment(1, "7500.00", PaymentMode.ONLINE, datetime(2025, 3, 10, 9)),
+            _payment(2, "3000.00", PaymentMode.CASH, datetime(2025, 4, 2, 12)),
+            _payment(3, "9999.00", PaymentMode.ONLINE, datetime(2025, 3, 4), status=PaymentStatus.FAILED),
+            _payment(3, "8888.00", PaymentMode.ONLINE, datetime(2025, 3, 5), status=PaymentStatus.PENDING),
+        ])
+        session.commit()
+
+    api_client(user=ADMIN)
+    return sqlite_engine
+
+
+def _report(params):
+    response = client.get(URL, params={"start_date": "2025-03-01", "end_date": "2025-04-30", **params})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _buckets(report, *keys):
+    return {tuple(row[k] for k in keys): Decimal(row["amount"]) for row in report["rows"]}
+
+
+class TestCollectionAnalytics:
+    def test_totals_count_only_successful_payments(self, fee_db):
+        report = _report({})
+
+        assert Decimal(report["total_amount"]) == Decimal("28000.00")
+        assert report["payment_count"] == 5
+        assert _buckets(report, "period_start") == {
+            ("2025-03-03",): Decimal("15000.00"),
+            ("2025-03-09",): Decimal("2500.00"),
+            ("2025-03-10",): Decimal("7500.00"),
+            ("2025-04-02",): Decimal("3000.00"),
+        }
+
+    def test_weeks_start_on_monday_and_months_on_the_first(self, fee_db):
+        assert _buckets(_report({"period": "week"}), "period_start") == {
+            ("2025-03-03",): Decimal("17500.00"),
+            ("2025-03-10",): Decimal("7500.00"),
+            ("2025-03-31",): Decimal("3000.00"),
+        }
+        assert _buckets(_report({"period": "month"}), "period_start") == {
+            ("2025-03-01",): Decimal("25000.00"),
+            ("2025-04-01",): Decimal("3000.00"),
+        }
+
+    def test_group_by_mode_and_program(self, fee_db):
+        report = _report({"period": "month", "group_by": ["payment_mode", "program"]})
+
+        assert _buckets(report, "period_start", "payment_mode", "program_name") == {
+            ("2025-03-01", "CASH", "Hotel Management"): Decimal("10000.00"),
+            ("2025-03-01", "UPI", "Hotel Management"): Decimal("5000.00"),
+            ("2025-03-01", "UPI", "Business Administration"): Decimal("2500.00"),
+            ("2025-03-01", "ONLINE", "Hotel Management"): Decimal("7500.00"),
+            ("2025-04-01", "CASH", "Hotel Management"): Decimal("3000.00"),
+        }
+
+    def test_fee_heads_split_payments_by_component(self, fee_db):
+        report = _report({"period": "month", "group_by": ["fee_head"], "program_id": 1})
+
+        assert _buckets(report, "period_start", "fee_head") == {
+            ("2025-03-01", "Library Fee"): Decimal("4500.00"),
+            ("2025-03-01", "Tuition Fee"): Decimal("18000.00"),
+            ("2025-04-01", "Library Fee"): Decimal("600.00"),
+            ("2025-04-01", "Tuition Fee"): Decimal("2400.00"),
+        }
+        assert report["payment_count"] == 4
+
+    def test_payments_without_components_are_unallocated(self, fee_db):
+        with Session(fee_db) as session:
+            # Generated campuses create structures with no components
+            session.add_all([
+                FeeStructure(id=3, program_id=2, academic_year="2024-2025", year=2, total_amount=Decimal("8000.00")),
+                FeeStructure(id=4, program_id=2, academic_year="2024-2025", year=3, total_amount=Decimal("0.00")),
+                FeeComponent(fee_structure_id=4, name="Tuition Fee", amount=Decimal("0.00")),
+                StudentFee(id=4, student_id=4, fee_structure_id=3, academic_year="2024-2025", total_fee=Decimal("8000.00")),
+                StudentFee(id=5, student_id=5, fee_structure_id=4, academic_year="2024-2025", total_fee=Decimal("0.00")),
+                _payment(4, "4000.00", PaymentMode.CASH, datetime(2025, 3, 12)),
+                _payment(5, "100.00", PaymentMode.CASH, datetime(2025, 3, 12)),
+            ])
+            session.commit()
+
+        report = _report({"period": "month", "group_by": ["fee_head"], "program_id": 2})
+
+        assert _buckets(report, "period_start", "fee_head") == {
+            ("2025-03-01", "Tuition Fee"): Decimal("2500.00"),
+            ("2025-03-01", "Unallocated"): Decimal("4100.00"),
+        }
+        assert sum(Decimal(row["amount"]) for row in report["rows"]) == Decimal(report["total_amount"])
+
+    def test_rejects_reversed_range(self, fee_db):
+        response = client.get(URL, params={"start_date": "2025-04-01", "end_date": "2025-03-01"})
+        assert response.status_code == 400
+
+
+class TestCollectionRollup:
+    @pytest.mark.parametrize("params", [
+        {},
+        {"period": "week", "group_by": ["payment_mode"]},
+        {"period": "month", "group_by": ["program", "fee_head"]},
+        {"start_date": "2025-03-04", "end_date": "2025-03-10", "academic_year": "2024-2025"},
+    ])
+    def test_rollup_matches_payments(self, fee_db, monkeypatch, params):
+        expected = _report(params)
+        with Session(fee_db) as session:
+            assert FeeService.rebuild_collection_rollup(session) == 5
+            session.commit()
+
+        monkeypatch.setattr(reports.settings, "FEE_COLLECTION_ROLLUP_ENABLED", True)
+        assert _report(params) == expected
+
+    def test_recorded_payments_update_rollup(self, fee_db):
+        with Session(fee_db) as session:
+            FeeService.rebuild_collection_rollup(session)
+            session.add(FeePayment(student_fee_id=3, amount=Decimal("1500.00"), payment_mode=PaymentMode.ONLINE,
+                                   transaction_id="TXN-R1"))
+            session.commit()
+
+        for _ in range(2):
+            response = client.post("/api/v1/fees/payments", json={
+                "student_fee_id": 1, "amount": "1000.00", "payment_mode": "CASH",
+            })
+            assert response.status_code == 201, response.text
+        client.post("/api/v1/fees/payments/webhook?transaction_id=TXN-R1&status=SUCCESS&amount=1500")
+
+        with Session(fee_db) as session:
+            incremental = sorted(
+                (r.collection_date, r.fee_structure_id, r.payment_mode, r.amount, r.payment_count)
+                for r in session.exec(select(FeeCollectionDaily)).all()
+            )
+            today = [r for r in incremental if r[0] == date.today()]
+            assert [(r[2], r[3], r[4]) for r in today] == [
+                (PaymentMode.CASH, Decimal("2000.00"), 2),
+                (PaymentMode.ONLINE, Decimal("1500.00"), 1),
+            ]
+
+            FeeService.rebuild_collection_rollup(session)
+            session.commit()
+            rebuilt = sorted(
+                (r.collection_date, r.fee_structure_id, r.payment_mode, r.amount, r.payment_count)
+                for r in session.exec(select(FeeCollectionDaily)).all()
+            )
+        assert rebuilt == incremental
+
+    def test_partial_rebuild_keeps_other_days(self, fee_db):
+        with Session(fee_db) as session:
+            FeeService.rebuild_collection_rollup(session)
+            assert FeeService.rebuild_collection_rollup(session, date(2025, 4, 1), date(2025, 4, 30)) == 1
+            session.commit()
+            assert len(session.exec(select(FeeCollectionDaily)).all()) == 5
+
+
+def test_legacy_report_ignores_unsuccessful_payments(fee_db):
+    with Session(fee_db) as session:
+        for payment in session.exec(select(FeePayment)).all():
+            payment.payment_date = datetime.utcnow()
+            session.add(payment)
+        session.commit()
+
+    report = client.get("/api/v1/reports/financial/fee-collection").json()
+    assert report["count"] == 5
+    assert Decimal(str(report["total_collected"])) == Decimal("28000.00")
+
+
+@pytest.mark.parametrize("url, period, expected", [
+    ("mysql+pymysql://", "day", "date(fee_payment.payment_date)"),
+    ("mysql+pymysql://", "week", "subdate(date(fee_payment.payment_date), weekday(fee_payment.payment_date))"),
+    ("mysql+pymysql://", "month", "subdate(date(fee_payment.payment_date), dayofmonth(fee_payment.payment_date) - 1)"),
+    ("sqlite://", "week", "date(fee_payment.payment_date, 'weekday 0', '-6 days')"),
+    ("sqlite://", "month", "date(fee_payment.payment_date, 'start of month')"),
+])
+def test_period_start_compiles_per_dialect(url, period, expected):
+    engine = create_mock_engine(url, lambda *args, **kwargs: None)
+    with Session(engine) as session:
+        expression = _period_start(session, FeePayment.payment_date, period)
+
+    assert str(expression.compile(dialect=engine.dialect)).lower() == expected
@@ -0,0 +1,283 @@
+"""
+Fee Ledger - Integration Tests
+Installment allocation, running balances, the outstanding rollup and
+rebuilding ledgers from fee records
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_mock_engine
+from sqlmodel import Session, select
+
+from app.main import app
+from app.api.v1 import fees
+from app.core.rbac import PermissionCache, grant_default_permissions, seed_permissions
+from app.models.fee import (
+    FeeInstallment,
+    FeeLedgerEntry,
+    FeeOutstanding,
+    FeePayment,
+    FeeStructure,
+    LedgerEntryType,
+    PaymentMode,
+    PaymentStatus,
+    StudentFee,
+)
+from app.models.role import Role
+from app.models.student import Student
+from app.models.user_role import UserRole
+from app.services.fee_ledger_service import FeeLedgerService
+from app.services.fee_service import FeeService
+
+client = TestClient(app)
+
+ADMIN = SimpleNamespace(id=1, username="admin", email="admin@college.edu", roles=[], is_superuser=True, is_active=True)
+
+
+@pytest.fixture
+def fee_db(sqlite_engine, api_client, monkeypatch):
+    """In-memory database with a 3-installment structure and two students, ledger enabled"""
+    with Session(sqlite_engine) as session:
+        session.add_all([
+            Student(id=1, admission_number="ADM001", name="Asha", program_id=1,
+                    batch_id=1, program_year_id=1, batch_semester_id=1),
+            Student(id=2, admission_number="ADM002", name="Ravi", program_id=1,
+                    batch_id=1, program_year_id=1, batch_semester_id=1),
+            FeeStructure(id=1, program_id=1, academic_year="2024-2025", year=1, total_amount=Decimal("30000.00")),
+            # Listed out of order: allocation follows due dates, not numbers
+            FeeInstallment(fee_structure_id=1, installment_number=2, amount=Decimal("10000.00"), due_date=date(2024, 10, 1)),
+            FeeInstallment(fee_structure_id=1, installment_number=1, amount=Decimal("10000.00"), due_date=date(2024, 7, 1)),
+            FeeInstallment(fee_structure_id=1, installment_number=3, amount=Decimal("10000.00"), due_date=date(2025, 1, 1)),
+        ])
+        session.commit()
+
+    monkeypatch.setattr(fees.settings, "FEE_LEDGER_ENABLED", True)
+    api_client(user=ADMIN)
+    return sqlite_engine
+
+
+def _assign(student_id: int) -> int:
+    response = client.post("/api/v1/fees/student-fees", json={
+        "student_id": student_id, "fee_structure_id": 1, "academic_year": "2024-2025",
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def _pay(student_fee_id: int, amount: str) -> None:
+    response = client.post("/api/v1/fees/payments", json={
+        "student_fee_id": student_fee_id, "amount": amount, "payment_mode": "CASH",
+    })
+    assert response.status_code == 201, response.text
+
+
+def _ledger(engine, student_fee_id: int):
+    with Session(engine) as session:
+        return [
+            (e.entry_type, e.debit, e.credit, e.balance)
+            for e in session.exec(
+                select(FeeLedgerEntry).where(FeeLedgerEntry.student_fee_id == student_fee_id).order_by(FeeLedgerEntry.id)
+            )
+        ]
+
+
+class TestPostings:
+    def test_assignment_bills_each_installment(self, fee_db):
+        fee_id = _assign(1)
+
+        ledger = _ledger(fee_db, fee_id)
+        assert [entry[0] for entry in ledger] == [LedgerEntryType.INSTALLMENT] * 3
+        assert [entry[3] for entry in ledger] == [Decimal("10000.00"), Decimal("20000.00"), Decimal("30000.00")]
+
+    def test_credits_allocate_to_earliest_due_installment(self, fee_db):
+        fee_id = _assign(1)
+        _pay(fee_id, "12500.00")
+
+        summary = client.get("/api/v1/fees/student/1").json()
+        statuses = {i["installment_number"]: (i["status"], i["paid_amount"]) for i in summary["installments"]}
+        assert statuses == {1: ("paid", 10000.0), 2: ("partial", 2500.0), 3: ("pending", 0.0)}
+        assert Decimal(summary["balance"]) == Decimal("17500.00")
+
+    def test_running_balance_after_every_entry(self, fee_db):
+        fee_id = _assign(1)
+        _pay(fee_id, "5000.00")
+        client.post("/api/v1/fees/fines", json={
+            "student_fee_id": fee_id, "installment_number": 1, "fine_amount": "200.00", "reason": "Late",
+        })
+        client.post("/api/v1/fees/concessions", json={
+            "student_fee_id": fee_id, "concession_type": "Merit", "percentage": "10",
+        })
+
+        ledger = client.get(f"/api/v1/fees/ledger/{fee_id}").json()
+        assert [(e["entry_type"], Decimal(e["balance"])) for e in ledger[3:]] == [
+            ("PAYMENT", Decimal("25000.00")),
+            ("FINE", Decimal("25200.00")),
+            ("CONCESSION", Decimal("22200.00")),
+        ]
+        with Session(fee_db) as session:
+            assert session.get(StudentFee, fee_id).balance == Decimal("22200.00")
+
+    def test_balance_read_back_without_update_returning(self, fee_db, monkeypatch, count_queries):
+        # MySQL has no UPDATE ... RETURNING; the row is locked and re-read instead
+        monkeypatch.setattr(fee_db.dialect, "update_returning", False)
+        with count_queries() as statements:
+            fee_id = _assign(1)
+            _pay(fee_id, "12500.00")
+
+        assert not [s for s in statements if s.startswith("UPDATE") and "RETURNING" in s]
+        assert [entry[3] for entry in _ledger(fee_db, fee_id)] == [
+            Decimal("10000.00"), Decimal("20000.00"), Decimal("30000.00"), Decimal("17500.00"),
+        ]
+        with Session(fee_db) as session:
+            assert session.get(StudentFee, fee_id).balance == Decimal("17500.00")
+
+    def test_outstanding_rollup_tracks_postings(self, fee_db):
+        _pay(_assign(1), "10000.00")
+        _assign(2)
+
+        outstanding = client.get("/api/v1/fees/outstanding?academic_year=2024-2025").json()
+        assert {k: Decimal(v) for k, v in outstanding.items()} == {
+            "billed": Decimal("60000.00"), "credited": Decimal("10000.00"), "outstanding": Decimal("50000.00"),
+        }
+
+    def test_webhook_retry_is_not_credited_twice(self, fee_db):
+        fee_id = _assign(1)
+        with Session(fee_db) as session:
+            session.add(FeePayment(
+                student_fee_id=fee_id, amount=Decimal("4000.00"), payment_mode=PaymentMode.ONLINE,
+                transaction_id="TXN1",
+            ))
+            session.commit()
+
+        for _ in range(2):
+            response = client.post("/api/v1/fees/payments/webhook?transaction_id=TXN1&status=SUCCESS&amount=4000")
+            assert response.status_code == 200
+
+        with Session(fee_db) as session:
+            student_fee = session.get(StudentFee, fee_id)
+            assert student_fee.paid_amount == Decimal("4000.00")
+            assert student_fee.balance == Decimal("26000.00")
+        assert [e[0] for e in _ledger(fee_db, fee_id)].count(LedgerEntryType.PAYMENT) == 1
+
+
+class TestRebuild:
+    def test_rebuild_matches_incremental_postings(self, fee_db):
+        fee_id = _assign(1)
+        _pay(fee_id, "12500.00")
+        client.post("/api/v1/fees/fines", json={
+            "student_fee_id": fee_id, "installment_number": 2, "fine_amount": "300.00", "reason": "Late",
+        })
+        _pay(_assign(2), "30000.00")
+
+        with Session(fee_db) as session:
+            incremental = {
+                fid: _ledger(fee_db, fid) for fid in session.exec(select(StudentFee.id)).all()
+            }
+            rollup = session.get(FeeOutstanding, 1)
+            totals = (rollup.billed, rollup.credited, rollup.outstanding)
+            installments = FeeLedgerService.get_installments(session, fee_id)
+
+            written = FeeLedgerService.rebuild(session)
+            session.commit()
+
+        assert written == sum(len(entries) for entries in incremental.values())
+        for fid, entries in incremental.items():
+            assert _ledger(fee_db, fid) == entries
+        with Session(fee_db) as session:
+            rollup = session.get(FeeOutstanding, 1)
+            assert (rollup.billed, rollup.credited, rollup.outstanding) == totals
+            assert FeeLedgerService.get_installments(session, fee_id) == installments
+
+    def test_rebuild_skips_unsettled_payments(self, fee_db):
+        with Session(fee_db) as session:
+            session.add(StudentFee(id=7, student_id=1, fee_structure_id=1, academic_year="2024-2025",
+                                   total_fee=Decimal("30000.00"), paid_amount=Decimal("1000.00"),
+                                   created_at=datetime(2024, 6, 1)))
+            session.add_all([
+                FeePayment(student_fee_id=7, amount=Decimal("1000.00"), payment_mode=PaymentMode.CASH,
+                           payment_status=PaymentStatus.SUCCESS, payment_date=datetime(2024, 6, 2)),
+                FeePayment(student_fee_id=7, amount=Decimal("9000.00"), payment_mode=PaymentMode.ONLINE,
+                           payment_status=PaymentStatus.FAILED),
+            ])
+            session.commit()
+
+            FeeLedgerService.rebuild(session, student_fee_ids=[7])
+            session.commit()
+
+            assert session.get(StudentFee, 7).balance == Decimal("29000.00")
+            assert FeeLedgerService.get_outstanding(session, use_ledger=True)["outstanding"] == Decimal("29000.00")
+
+
+class TestPermissions:
+    """Non-superusers reach the fee endpoints through their roles' default grants"""
+
+    @pytest.fixture
+    def staff(self, fee_db, api_client):
+        with Session(fee_db) as session:
+            seed_permissions(session)
+            for user_id, name in [(2, "ADMIN"), (3, "ACCOUNTS"), (4, "FACULTY")]:
+                role = Role(name=name)
+                session.add(role)
+                session.commit()
+                grant_default_permissions(session, role)
+                session.add(UserRole(user_id=user_id, role_id=role.id))
+            session.commit()
+        PermissionCache.clear()
+
+        def sign_in(user_id: int):
+            api_client(user=SimpleNamespace(id=user_id, username=f"user{user_id}", roles=[], is_superuser=False))
+
+        yield sign_in
+        PermissionCache.clear()
+
+    def test_accounts_can_assign_and_collect(self, staff):
+        staff(3)
+        fee_id = _assign(1)
+        _pay(fee_id, "1000.00")
+
+        response = client.post("/api/v1/fees/concessions", json={
+            "student_fee_id": fee_id, "concession_type": "Merit", "percentage": "10",
+        })
+        assert response.status_code == 403
+
+    def test_admin_can_approve_concessions(self, staff):
+        staff(2)
+        response = client.post("/api/v1/fees/concessions", json={
+            "student_fee_id": _assign(1), "concession_type": "Merit", "percentage": "10",
+        })
+        assert response.status_code == 201, response.text
+
+    def test_roles_without_grants_are_refused(self, staff):
+        staff(4)
+        response = client.post("/api/v1/fees/student-fees", json={
+            "student_id": 1, "fee_structure_id": 1, "academic_year": "2024-2025",
+        })
+        assert response.status_code == 403
+
+
+def test_defaulter_export_matches_json(fee_db):
+    _pay(_assign(1), "12345.678")
+
+    [defaulter] = client.get("/api/v1/fees/defaulters").json()
+    lines = client.get("/api/v1/fees/defaulters?format=csv").text.splitlines()
+
+    row = dict(zip(lines[0].split(","), lines[1].split(",")))
+    assert (row["Total Due"], row["Last Payment Date"]) == (defaulter["total_due"], defaulter["last_payment_date"])
+    assert row["Last Payment Date"] == date.today().isoformat()
+
+
+@pytest.mark.parametrize("url, days_overdue", [
+    ("mysql+pymysql://", "datediff("),
+    ("postgresql://", "- anon_1.oldest_due_date"),
+    ("sqlite://", "julianday("),
+])
+def test_defaulters_query_compiles_per_dialect(url, days_overdue):
+    engine = create_mock_engine(url, lambda *args, **kwargs: None)
+    with Session(engine) as session:
+        sql = str(FeeService.defaulters_query(session, as_of=date(2025, 1, 31)).compile(dialect=engine.dialect)).lower()
+
+    assert days_overdue in sql
+    assert ("julianday" in sql) == url.startswith("sqlite")
@@ -0,0 +1,341 @@
+"""
+Student Import - Unit Tests
+Sheet preview and bulk/row-by-row execution of import rows
+"""
+import io
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException, UploadFile
+import pandas as pd
+from passlib.context import CryptContext
+from sqlmodel import Session, func, select
+
+from app.core import security
+from app.models.import_log import ImportLog, ImportLogRow
+from app.models.parent import Parent
+from app.models.student import Student, StudentStatus
+from app.models.user import User
+from app.schemas.import_schema import ImportPreviewRow, ImportRowStatus, StudentImportRow
+from app.services import import_service
+from app.services.import_service import ImportService
+from app.utils.campus_generator import CampusSize, generate_campus
+
+# One program (P1) with batch 2024-2028, a section S01 and students 1-2
+CAMPUS = CampusSize(programs=1, sections_per_batch=1, students_per_section=2, teaching_days=1)
+
+
+@pytest.fixture
+def session(sqlite_engine, monkeypatch):
+    with sqlite_engine.begin() as connection:
+        generate_campus(connection, CAMPUS)
+        connection.execute(User.__table__.insert(), [{
+            "id": 1, "username": "admin", "email": "admin@college.edu", "hashed_password": "x",
+            "is_active": True, "is_superuser": True, "token_version": 0,
+        }])
+    # bcrypt is covered by TestPasswordHashes
+    monkeypatch.setattr(import_service, "get_password_hashes", lambda passwords, workers: [f"hashed:{p}" for p in passwords])
+    with Session(sqlite_engine) as session:
+        yield session
+
+
+def _row(n: int, **overrides) -> ImportPreviewRow:
+    data = {
+        "admission_number": f"{9000 + n}",
+        "name": f"Imported {n}",
+        "email": f"imported{n}@example.com",
+        "course_code": "P1",
+        "batch": "2024-2028",
+        "section": "S01",
+        **overrides,
+    }
+    return ImportPreviewRow(row_number=n, data=StudentImportRow(**data), status=ImportRowStatus.VALID)
+
+
+def _count(session, model) -> int:
+    return session.exec(select(func.count()).select_from(model)).one()
+
+
+def _sheet(*rows) -> pd.DataFrame:
+    """Sheet as parse_file returns it: lower-case headers, pandas dtypes"""
+    return pd.DataFrame.from_records(rows)
+
+
+class TestPreview:
+    """Test column-wise validation of uploaded sheets"""
+
+    def test_normalizes_spreadsheet_values(self, session):
+        df = _sheet(
+            {"admission_number": 1001.0, "gender": "female", "dob": "2005-03-14", "mobile": 9876543210.0,
+             "email": "A.Student@Example.COM", "course": "P1", "blood_group": "o+", "hostel_required": "yes"},
+            {"admission_number": 1002.0, "gender": None, "dob": "14/03/2005", "mobile": None,
+             "email": None, "course": "P1", "blood_group": None, "hostel_required": None},
+        )
+
+        rows = ImportService(session).validate_frame(df, {"P1": 1}, set())
+
+        assert [r.status for r in rows] == [ImportRowStatus.VALID, ImportRowStatus.VALID]
+        first, second = rows[0].data, rows[1].data
+        assert (first.admission_number, first.mobile, first.email) == ("1001", "9876543210", "A.Student@example.com")
+        assert (first.gender.value, first.blood_group.value, first.hostel_required) == ("FEMALE", "O+", "YES")
+        assert first.dob == second.dob == datetime(2005, 3, 14).date()
+        assert (second.gender.value, second.scholarship_category.value, second.father_mobile) == ("MALE", "GENERAL", "9999999999")
+
+    def test_invalid_rows_keep_sheet_values(self, session):
+        df = _sheet(
+            {"admission_number": "A-17", "email": "a@example.com", "course": "P1"},
+            {"admission_number": "1003", "email": "not-an-email", "gender": "ALIEN", "course": "P1"},
+            {"admission_number": "1004", "course": "P9"},
+        )
+
+        rows = ImportService(session).validate_frame(df, {"P1": 1}, set())
+
+        assert [r.status for r in rows] == [ImportRowStatus.INVALID] * 3
+        assert [e.field for e in rows[0].errors] == ["admission_number"]
+        assert sorted(e.field for e in rows[1].errors) == ["email", "gender"]
+        assert rows[1].data["gender"] == "ALIEN"
+        assert [e.message for e in rows[2].errors] == ["Course 'P9' not found"]
+        assert ImportService(session).validate_frame(df.iloc[2:], {"P1": 1}, set(), default_program_code="P1")[0].status == ImportRowStatus.VALID
+
+    def test_duplicates_across_chunks(self, session):
+        service = ImportService(session)
+        seen = {}
+        first = service.validate_frame(_sheet({"admission_number": "1005"}, {"admission_number": "1006"}),
+                                       {"BTECH-CS": 1}, {"1006"}, seen_admissions=seen)
+        second = service.validate_frame(_sheet({"admission_number": "1007"}, {"admission_number": "1005"}),
+                                        {"BTECH-CS": 1}, {"1006"}, seen_admissions=seen, first_row_number=3)
+
+        assert [r.status for r in first + second] == [
+            ImportRowStatus.VALID, ImportRowStatus.DUPLICATE, ImportRowStatus.VALID, ImportRowStatus.DUPLICATE,
+        ]
+        assert first[1].errors[0].message == "Student already exists"
+        assert (second[1].row_number, second[1].errors[0].message) == (4, "Duplicate of row 1")
+
+    def test_preview_response_serializes(self, session):
+        df = _sheet({"admission_number": "1008", "course": "P1"}, {"admission_number": "x", "course": "P1"})
+        rows = ImportService(session).validate_frame(df, {"P1": 1}, set())
+
+        payload = [ImportPreviewRow.model_validate(r.model_dump(mode="json")) for r in rows]
+
+        assert isinstance(payload[0].data, StudentImportRow)
+        assert payload[1].data["admission_number"] == "x"
+
+
+def _upload(df: pd.DataFrame, name: str) -> UploadFile:
+    stream = io.BytesIO()
+    if name.endswith(".xlsx"):
+        df.to_excel(stream, index=False)
+    else:
+        df.to_csv(stream, index=False)
+    stream.seek(0)
+    return UploadFile(file=stream, filename=name)
+
+
+class TestStreamingPreview:
+    """Test chunked parsing, stored previews and paging"""
+
+    SHEET = pd.DataFrame({
+        "Admission Number": ["1101", "1102", "1103", "1101", "abc"],
+        "Full Name": ["A", "B", "C", "D", "E"],
+        "Email": [f"s{n}@example.com" for n in range(5)],
+        "Mobile": [9876543210.0, None, 9876543211.0, None, None],
+        "Aadhaar": ["123456789012", None, None, None, None],
+        "Course": ["P1"] * 5,
+    })
+
+    @pytest.mark.parametrize("name", ["sheet.csv", "sheet.xlsx"])
+    def test_chunks_match_whole_file(self, session, monkeypatch, name):
+        monkeypatch.setattr(import_service.settings, "IMPORT_PREVIEW_CHUNK_SIZE", 2)
+        service = ImportService(session)
+        assert [len(df) for df in service.read_chunks(_upload(self.SHEET, name))] == [2, 2, 1]
+
+        preview = service.preview_import(_upload(self.SHEET, name), 1, limit=3)
+
+        assert (preview.total_rows, preview.valid_count, preview.invalid_count, preview.duplicate_count) == (5, 3, 1, 1)
+        assert [r.row_number for r in preview.rows] == [1, 2, 3]
+        assert (preview.rows[0].data.mobile, preview.rows[0].data.aadhaar) == ("9876543210", "123456789012")
+        rest = service.get_preview(preview.log_id, skip=3)
+        assert [(r.row_number, r.status) for r in rest.rows] == [(4, ImportRowStatus.DUPLICATE), (5, ImportRowStatus.INVALID)]
+        assert rest.rows[0].errors[0].message == "Duplicate of row 1"
+        assert rest.rows[1].data["admission_number"] == "abc"
+
+    def test_rejects_unknown_format(self, session):
+        with pytest.raises(HTTPException) as e:
+            ImportService(session).preview_import(_upload(self.SHEET, "sheet.txt"), 1)
+        assert e.value.status_code == 400
+
+    def test_execute_stored_preview(self, session, api_client):
+        client = api_client()
+        upload = {"file": ("sheet.csv", self.SHEET.to_csv(index=False), "text/csv")}
+
+        preview = client.post("/api/v1/import/preview?limit=2", files=upload).json()
+        assert (preview["valid_count"], len(preview["rows"])) == (3, 2)
+        invalid = client.get(f"/api/v1/import/previews/{preview['log_id']}?row_status=INVALID").json()
+        assert [r["row_number"] for r in invalid["rows"]] == [5]
+
+        response = client.post(f"/api/v1/import/previews/{preview['log_id']}/execute?background=false")
+        assert response.status_code == 200, response.text
+        job = client.get(f"/api/v1/import/jobs/{preview['log_id']}").json()
+        assert (job["status"], job["imported_count"], job["total_rows"]) == ("SUCCESS", 3, 5)
+        assert client.post(f"/api/v1/import/previews/{preview['log_id']}/execute").status_code == 400
+        assert client.get(f"/api/v1/import/previews/{preview['log_id']}").status_code == 404
+
+    def test_preview_is_queued_once(self, session, sqlite_engine):
+        log_id = ImportService(session).preview_import(_upload(self.SHEET, "sheet.csv"), 1).log_id
+        with Session(sqlite_engine) as other:
+            # A second request that read the preview before the first queued it
+            stale = other.get(ImportLog, log_id)
+            assert stale.status == "PREVIEW"
+            ImportService(session).queue_preview(log_id)
+
+            with pytest.raises(HTTPException) as e:
+                ImportService(other).queue_preview(log_id)
+        assert e.value.status_code == 400
+        assert _count(session, ImportLogRow) == 5
+
+    def test_expired_previews_are_deleted(self, session):
+        service = ImportService(session)
+        old = service.preview_import(_upload(self.SHEET, "old.csv"), 1).log_id
+        queued = service.preview_import(_upload(self.SHEET, "queued.csv"), 1).log_id
+        service.queue_preview(queued)
+        for log_id in (old, queued):
+            log = session.get(ImportLog, log_id)
+            log.timestamp = datetime.utcnow() - timedelta(hours=25)
+            session.add(log)
+        session.commit()
+
+        service.preview_import(_upload(self.SHEET, "new.csv"), 1)
+
+        assert session.get(ImportLog, old) is None
+        assert session.get(ImportLog, queued).status == "PENDING"
+        assert _count(session, ImportLogRow) == 10
+
+
+class TestBulkImport:
+    """Test chunked bulk inserts"""
+
+    def test_creates_user_student_and_parent(self, session):
+        rows = [_row(n) for n in range(1, 8)]
+
+        log = ImportService(session).execute_import(rows, 1, "sheet.csv")
+
+        assert (log.imported_count, log.failed_count, log.status) == (7, 0, "SUCCESS")
+        student = session.exec(select(Student).where(Student.admission_number == "9003")).one()
+        user = session.get(User, student.user_id)
+        parent = session.exec(select(Parent).where(Parent.linked_student_id == student.id)).one()
+        assert user.username == "9003"
+        assert user.hashed_password == "hashed:01012000"
+        assert student.batch_id == 1
+        assert student.batch_semester_id == 1
+        assert student.section_id == 1
+        assert student.status == StudentStatus.IMPORTED_PENDING_VERIFICATION
+        assert parent.father_name == "Unknown"
+
+    def test_failing_chunk_falls_back_to_rows(self, session, monkeypatch):
+        monkeypatch.setattr(import_service.settings, "IMPORT_CHUNK_SIZE", 3)
+        # Row 5 reuses row 4's email; only the second chunk is retried row by row
+        rows = [_row(n) for n in range(1, 8)]
+        rows[4] = _row(5, email="imported4@example.com")
+
+        log = ImportService(session).execute_import(rows, 1, "sheet.csv")
+
+        assert (log.imported_count, log.failed_count, log.status) == (6, 1, "PARTIAL")
+        assert _count(session, Student) == CAMPUS.students + 6
+        assert _count(session, Parent) == 6
+        assert session.exec(select(Student).where(Student.admission_number == "9005")).first() is None
+
+    def test_unknown_batch_fails_row(self, session):
+        rows = [_row(1), _row(2, batch="2019-2023")]
+
+        log = ImportService(session).execute_import(rows, 1, "sheet.csv")
+
+        assert (log.imported_count, log.failed_count) == (1, 1)
+
+
+class TestRowImport:
+    """Test bulk=False, one savepoint per row"""
+
+    def test_matches_bulk_result(self, session):
+        rows = [_row(1), _row(2, email="imported1@example.com"), _row(3)]
+
+        log = ImportService(session).execute_import(rows, 1, "sheet.csv", bulk=False)
+
+        assert (log.imported_count, log.failed_count) == (2, 1)
+        assert _count(session, Parent) == 2
+
+
+class TestImportJobs:
+    """Test queued imports, row outcomes and resuming"""
+
+    def test_job_records_row_outcomes(self, session):
+        rows = [_row(1), _row(2, batch="2019-2023"), _row(3)]
+        log = ImportService(session).create_import_job(rows, 1, "sheet.csv")
+        assert log.status == "PENDING"
+
+        log = ImportService(session).run_import_job(log.id)
+
+        assert (log.status, log.processed_count, log.imported_count, log.failed_count) == ("PARTIAL", 3, 2, 1)
+        outcomes = session.exec(select(ImportLogRow).order_by(ImportLogRow.row_number)).all()
+        assert [r.status for r in outcomes] == ["IMPORTED", "FAILED", "IMPORTED"]
+        assert "Batch '2019-2023' not found" in outcomes[1].error
+        assert session.get(Student, outcomes[0].student_id).admission_number == "9001"
+
+    def test_resumes_after_last_committed_chunk(self, session, monkeypatch):
+        monkeypatch.setattr(import_service.settings, "IMPORT_CHUNK_SIZE", 2)
+        service = ImportService(session)
+        log = service.create_import_job([_row(n) for n in range(1, 6)], 1, "sheet.csv")
+        # A worker claims the job, commits one chunk and dies
+        assert service.claim_import_job(log.id)
+        chunk = session.exec(select(ImportLogRow).order_by(ImportLogRow.row_number).limit(2)).all()
+        service._import_chunk(session.get(ImportLog, log.id), chunk, {"P1": 1}, service._academic_structure([1]))
+        session.commit()
+
+        # Its heartbeat is fresh, so nobody else may take the job yet
+        assert service.run_import_job(log.id) is None
+
+        log = session.get(ImportLog, log.id)
+        log.heartbeat_at = datetime.utcnow() - timedelta(seconds=import_service.settings.IMPORT_JOB_STALE_SECONDS + 1)
+        session.add(log)
+        session.commit()
+        log = service.run_import_job(log.id)
+
+        assert (log.status, log.processed_count, log.imported_count) == ("SUCCESS", 5, 5)
+        assert _count(session, Student) == CAMPUS.students + 5
+        assert service.run_import_job(log.id) is None
+
+    def test_job_endpoints(self, session, api_client):
+        client = api_client()
+        preview = {
+            "total_rows": 2, "valid_count": 1, "invalid_count": 1, "duplicate_count": 0,
+            "rows": [_row(1).model_dump(mode="json"), _row(2, batch="2019-2023").model_dump(mode="json")],
+        }
+
+        response = client.post("/api/v1/import/execute?file_name=sheet.csv&background=false", json=preview)
+        assert response.status_code == 200, response.text
+        log_id = response.json()["log_id"]
+
+        job = client.get(f"/api/v1/import/jobs/{log_id}").json()
+        assert (job["status"], job["processed_count"], job["imported_count"]) == ("PARTIAL", 2, 1)
+        failed = client.get(f"/api/v1/import/jobs/{log_id}/rows?row_status=FAILED").json()
+        assert [(r["row_number"], r["admission_number"]) for r in failed] == [(2, "9002")]
+        assert client.post(f"/api/v1/import/jobs/{log_id}/resume").status_code == 400
+
+
+class TestPasswordHashes:
+    """Test hashing in worker processes"""
+
+    def test_hashes_in_order(self, monkeypatch):
+        # Workers are started with the parent's context, so they get the cheap one
+        monkeypatch.setattr(security, "pwd_context", CryptContext(schemes=["bcrypt"], bcrypt__rounds=4))
+        passwords = [f"pw{i}" for i in range(20)]
+        try:
+            hashes = security.get_password_hashes(passwords, workers=2)
+            # Later imports reuse the running pool
+            assert security._get_hash_pool(2) is security._hash_pool
+        finally:
+            security.shutdown_hash_pool()
+
+        assert security._hash_pool is None
+        assert len(set(hashes)) == 20
+        assert all(h.startswith("$2b$04$") for h in hashes)
+        assert all(security.verify_password(p, h) for p, h in zip(passwords, hashes))
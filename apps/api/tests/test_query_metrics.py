@@ -0,0 +1,99 @@
+"""
+Query Metrics - Integration Tests
+Per-request SQL statement counting, Server-Timing headers, /metrics and
+slow-request logging
+"""
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.config.settings import settings
+from app.middleware.query_metrics import RouteMetrics
+
+client = TestClient(app)
+
+
+METRICS_TOKEN = "scrape-token"
+
+
+@pytest.fixture
+def metrics_db(sqlite_engine, api_client, monkeypatch):
+    """Empty in-memory database behind the sync session, /metrics enabled"""
+    monkeypatch.setattr(settings, "METRICS_TOKEN", METRICS_TOKEN)
+    api_client(user=None)
+    RouteMetrics.clear()
+    return sqlite_engine
+
+
+def _scrape():
+    return client.get("/metrics", headers={"Authorization": f"Bearer {METRICS_TOKEN}"})
+
+
+class TestServerTiming:
+    """Test the Server-Timing response header"""
+
+    def test_header_reports_query_count(self, metrics_db):
+        response = client.get("/api/v1/exams/student/1/results")
+
+        assert response.status_code == 200
+        db, app_timing = response.headers["server-timing"].split(", ")
+        assert db.startswith("db;dur=")
+        assert db.endswith('desc="1 queries"')
+        assert app_timing.startswith("app;dur=")
+
+    def test_requests_without_sql_report_zero(self, metrics_db):
+        response = client.get("/")
+
+        assert 'desc="0 queries"' in response.headers["server-timing"]
+
+
+class TestPrometheusEndpoint:
+    """Test /metrics exposition"""
+
+    def test_routes_are_labelled_by_template(self, metrics_db):
+        client.get("/api/v1/exams/student/1/results")
+        client.get("/api/v1/exams/student/2/results")
+
+        response = _scrape()
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        labels = 'method="GET",route="/api/v1/exams/student/{student_id}/results"'
+        assert f"erp_db_statements_per_request_count{{{labels}}} 2" in response.text
+        assert f"erp_db_statements_per_request_sum{{{labels}}} 2.000000" in response.text
+        assert f'erp_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in response.text
+
+    def test_disabled_without_token(self, metrics_db, monkeypatch):
+        monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+
+        assert _scrape().status_code == 404
+
+    @pytest.mark.parametrize("headers", [{}, {"Authorization": "Bearer wrong"}])
+    def test_requires_bearer_token(self, metrics_db, headers):
+        response = client.get("/metrics", headers=headers)
+
+        assert response.status_code == 401
+        assert response.headers["www-authenticate"] == "Bearer"
+
+    def test_unmatched_paths_share_one_label(self, metrics_db):
+        client.get("/no/such/path")
+
+        assert 'route="unmatched"' in _scrape().text
+
+
+class TestSlowRequests:
+    """Test slow-request logging thresholds"""
+
+    def test_query_count_threshold_logs_statements(self, metrics_db, monkeypatch, caplog):
+        monkeypatch.setattr(settings, "SLOW_REQUEST_QUERY_COUNT", 1)
+
+        with caplog.at_level(logging.WARNING, logger="app.middleware.query_metrics"):
+            client.get("/api/v1/exams/student/1/results")
+
+        assert "Slow request GET /api/v1/exams/student/1/results" in caplog.text
+        assert "1 queries" in caplog.text
+        assert "SELECT" in caplog.text
+        assert 'erp_slow_requests_total{method="GET",route="/api/v1/exams/student/{student_id}/results"} 1' \
+            in _scrape().text
@@ -3,15 +3,18 @@
 import React, { useState } from 'react';
 import { Card, CardContent, CardHeader } from '@/components/ui/card';
 import { Button } from '@/components/ui/button';
-import { importService, ImportPreviewResponse, ImportRowStatus } from '@/utils/import-service';
+import { importService, ImportJobStatus, ImportPreviewResponse, ImportRowStatus } from '@/utils/import-service';
 import { Upload, CheckCircle, AlertTriangle, FileText, Download } from 'lucide-react';
 
+const PREVIEW_PAGE_SIZE = 100;
+
 export default function StudentImportWizard() {
     const [step, setStep] = useState(1);
     const [file, setFile] = useState<File | null>(null);
     const [previewData, setPreviewData] = useState<ImportPreviewResponse | null>(null);
     const [isLoading, setIsLoading] = useState(false);
-    const [importResult, setImportResult] = useState<any>(null);
+    const [importResult, setImportResult] = useState<ImportJobStatus | null>(null);
+    const [importProgress, setImportProgress] = useState<ImportJobStatus | null>(null);
 
     const handleFileChange = (e: React.ChangeEvent<HTMLInputElement>) => {
         if (e.target.files && e.target.files[0]) {
@@ -40,8 +43,11 @@ export default function StudentImportWizard() {
 
         setIsLoading(true);
         try {
-            const result = await importService.executeImport(previewData, file.name);
-            setImportResult(result);
+            const queued = previewData.log_id
+                ? await importService.executePreview(previewData.log_id)
+                : await importService.executeImport(previewData, file.name);
+            const job = await importService.waitForImportJob(queued.log_id, setImportProgress);
+            setImportResult(job);
             setStep(3);
         } catch (error) {
             console.error('Import failed', error);
@@ -51,6 +57,18 @@ export default function StudentImportWizard() {
         }
     };
 
+    const loadPreviewPage = async (skip: number) => {
+        if (!previewData?.log_id) return;
+        setIsLoading(true);
+        try {
+            setPreviewData(await importService.getPreviewPage(previewData.log_id, skip, PREVIEW_PAGE_SIZE));
+        } catch (error) {
+            console.error('Failed to load preview page', error);
+        } finally {
+            setIsLoading(false);
+        }
+    };
+
     const downloadTemplate = async () => {
         setIsLoading(true);
         try {
@@ -174,10 +192,30 @@ export default function StudentImportWizard() {
                             </table>
                         </div>
 
+                        {previewData.total_rows > previewData.rows.length && (
+                            <div className="flex justify-between items-center text-sm text-gray-600">
+                                <span>
+                                    Rows {previewData.skip + 1}-{previewData.skip + previewData.rows.length} of {previewData.total_rows}
+                                </span>
+                                <div className="flex gap-2">
+                                    <Button variant="outline" size="sm" disabled={isLoading || previewData.skip === 0}
+                                        onClick={() => loadPreviewPage(Math.max(0, previewData.skip - PREVIEW_PAGE_SIZE))}>
+                                        Previous
+                                    </Button>
+                                    <Button variant="outline" size="sm" disabled={isLoading || previewData.skip + previewData.rows.length >= previewData.total_rows}
+                                        onClick={() => loadPreviewPage(previewData.skip + PREVIEW_PAGE_SIZE)}>
+                                        Next
+                                    </Button>
+                                </div>
+                            </div>
+                        )}
+
                         <div className="flex justify-between">
                             <Button variant="outline" onClick={() => setStep(1)} disabled={isLoading}>Back</Button>
                             <Button onClick={handleExecuteImport} disabled={isLoading || previewData.valid_count === 0}>
-                                {isLoading ? 'Importing...' : `Import ${previewData.valid_count} Students`}
+                                {isLoading
+                                    ? `Importing... ${importProgress?.processed_count ?? 0} / ${previewData.valid_count}`
+                                    : `Import ${previewData.valid_count} Students`}
                             </Button>
                         </div>
                     </CardContent>
@@ -197,15 +235,15 @@ export default function StudentImportWizard() {
 
                         <div className="grid grid-cols-3 gap-4 max-w-lg mx-auto bg-gray-50 p-6 rounded-lg">
                             <div>
-                                <p className="text-2xl font-bold text-gray-900">{importResult.log_id}</p>
+                                <p className="text-2xl font-bold text-gray-900">{importResult.id}</p>
                                 <p className="text-xs text-gray-500 uppercase">Log ID</p>
                             </div>
                             <div>
-                                <p className="text-2xl font-bold text-green-600">{previewData?.valid_count}</p>
+                                <p className="text-2xl font-bold text-green-600">{importResult.imported_count}</p>
                                 <p className="text-xs text-gray-500 uppercase">Imported</p>
                             </div>
                             <div>
-                                <p className="text-2xl font-bold text-red-600">{previewData?.invalid_count}</p>
+                                <p className="text-2xl font-bold text-red-600">{importResult.failed_count + (previewData?.invalid_count ?? 0)}</p>
                                 <p className="text-xs text-gray-500 uppercase">Failed</p>
                             </div>
                         </div>
@@ -20,10 +20,13 @@ export interface ImportPreviewRow {
 }
 
 export interface ImportPreviewResponse {
+    log_id?: number;
     total_rows: number;
     valid_count: number;
     invalid_count: number;
     duplicate_count: number;
+    skip: number;
+    limit?: number;
     rows: ImportPreviewRow[];
 }
 
@@ -33,6 +36,23 @@ export interface ImportExecuteResponse {
     status: string;
 }
 
+export interface ImportJobStatus {
+    id: number;
+    file_name: string;
+    status: string;
+    total_rows: number;
+    processed_count: number;
+    imported_count: number;
+    failed_count: number;
+    duplicate_count: number;
+    timestamp: string;
+    started_at?: string;
+    finished_at?: string;
+    error?: string;
+}
+
+const FINISHED_IMPORT_STATUSES = ['SUCCESS', 'PARTIAL', 'FAILED'];
+
 export const importService = {
     async downloadTemplate(): Promise<void> {
         try {
@@ -66,11 +86,43 @@ export const importService = {
         return response.data;
     },
 
+    async getPreviewPage(logId: number, skip = 0, limit = 100, rowStatus?: ImportRowStatus): Promise<ImportPreviewResponse> {
+        const response = await api.get(`/import/previews/${logId}`, {
+            params: { skip, limit, row_status: rowStatus }
+        });
+        return response.data;
+    },
+
+    async executePreview(logId: number): Promise<ImportExecuteResponse> {
+        const response = await api.post(`/import/previews/${logId}/execute`);
+        return response.data;
+    },
+
     async executeImport(previewData: ImportPreviewResponse, fileName: string): Promise<ImportExecuteResponse> {
         const response = await api.post('/import/execute', null, {
             params: { file_name: fileName },
             data: previewData
         });
         return response.data;
+    },
+
+    async getImportJob(logId: number): Promise<ImportJobStatus> {
+        const response = await api.get(`/import/jobs/${logId}`);
+        return response.data;
+    },
+
+    async waitForImportJob(
+        logId: number,
+        onProgress?: (job: ImportJobStatus) => void,
+        intervalMs = 2000
+    ): Promise<ImportJobStatus> {
+        while (true) {
+            const job = await this.getImportJob(logId);
+            onProgress?.(job);
+            if (FINISHED_IMPORT_STATUSES.includes(job.status)) {
+                return job;
+            }
+            await new Promise(resolve => setTimeout(resolve, intervalMs));
+        }
     }
 };
@@ -294,6 +294,7 @@ export interface ScholarshipSlab {
     applicable_fee_heads: string[];
     academic_year_id?: number;
     program_id?: number;
+    scholarship_category?: 'GENERAL' | 'SC' | 'ST' | 'OBC' | 'EWS'; // Applied automatically on bulk fee assignment
     is_active: boolean;
     created_at: string;
     updated_at: string;